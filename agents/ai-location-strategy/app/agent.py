@@ -15,7 +15,8 @@
 """Retail Location Strategy Agent - Root Agent Definition.
 
 This module defines the root agent for the Location Strategy Pipeline.
-It uses a SequentialAgent to orchestrate 7 specialized sub-agents:
+It orchestrates 7 specialized sub-agents through a dependency-aware stage
+scheduler (see pipeline_scheduler.py), so independent stages run concurrently:
 
 1. MarketResearchAgent - Live web research with Google Search
 2. CompetitorMappingAgent - Competitor mapping with Maps Places API
@@ -25,6 +26,14 @@ It uses a SequentialAgent to orchestrate 7 specialized sub-agents:
 6. InfographicGeneratorAgent - Visual infographic generation
 7. MapGeneratorAgent - Interactive Google Maps visualization
 
+Each stage declares the state keys it reads and writes. Market research and
+competitor mapping run in parallel, followed by gap analysis and strategy
+synthesis, after which the report, infographic and map generators run in
+parallel. Per-stage start/end times are recorded in state["stage_timings"].
+With LOCATION_STRATEGY_CHECKPOINTS=TRUE, stage outputs are checkpointed by
+input hash, so a rerun after a failure resumes at the first stage whose
+inputs changed.
+
 The pipeline analyzes a target location for a specific business type and
 produces comprehensive location intelligence including recommendations,
 an HTML report, and an infographic.
@@ -47,11 +56,24 @@ Usage:
     - maps_api_key: Google Maps API key for Places search
 """
 
-from google.adk.agents import SequentialAgent
 from google.adk.agents.llm_agent import Agent
 from google.adk.tools.agent_tool import AgentTool
 
-from .config import APP_NAME, FAST_MODEL
+from .callbacks import after_pipeline, before_pipeline
+from .config import (
+    APP_NAME,
+    CONTEXT_COMPACTION,
+    CONTEXT_TOKEN_BUDGETS,
+    FAST_MODEL,
+    MEMO_TTL_BY_STAGE,
+    MEMOIZE_LLM_STAGES,
+    MODEL_HEDGE_AFTER_SECONDS,
+    PIPELINE_CHECKPOINTS,
+    STAGE_METRICS,
+)
+from .metrics import metrics
+from .model_router import routed_model
+from .pipeline_scheduler import PipelineStage, build_stage_pipeline
 from .prompt_utils import make_instruction_provider
 from .sub_agents.competitor_mapping.agent import competitor_mapping_agent
 from .sub_agents.gap_analysis.agent import gap_analysis_agent
@@ -61,6 +83,14 @@ from .sub_agents.map_generator.agent import map_generator_agent
 from .sub_agents.market_research.agent import market_research_agent
 from .sub_agents.report_generator.agent import report_generator_agent
 from .sub_agents.strategy_advisor.agent import strategy_advisor_agent
+from .tools.artifact_refs import (
+    HTML_REPORT_KEYS,
+    INFOGRAPHIC_KEYS,
+    INFOGRAPHIC_THUMBNAIL_KEYS,
+    MAP_KEYS,
+    output_state_key,
+)
+from .tools.persistent_cache import get_cache
 
 ROOT_INSTRUCTION_RETAIL = """Your primary role is to orchestrate the retail location strategy analysis.
 1. Start by greeting the user.
@@ -78,8 +108,11 @@ ROOT_INSTRUCTION_DATACENTER = """Your primary role is to orchestrate the data ce
 5. After the `IntakeAgent` is successful, delegate the full analysis to the `LocationStrategyPipeline`.
 Your main function is to manage this workflow conversationally."""
 
+# Shared request inputs set by the IntakeAgent
+REQUEST_KEYS = ("target_location", "business_type")
+
 # location_strategy_pipeline
-location_strategy_pipeline = SequentialAgent(
+location_strategy_pipeline = build_stage_pipeline(
     name="LocationStrategyPipeline",
     description="""Comprehensive location strategy analysis pipeline.
 
@@ -99,20 +132,97 @@ To use, get the following details:
 The analysis runs automatically through all stages and produces artifacts
 including JSON report, HTML report, and infographic image.
 """,
-    sub_agents=[
-        market_research_agent,  # Part 1: Market research with search
-        competitor_mapping_agent,  # Part 2A: Competitor mapping with Maps
-        gap_analysis_agent,  # Part 2B: Gap analysis with code exec
-        strategy_advisor_agent,  # Part 3: Strategy synthesis
-        report_generator_agent,  # Part 4: HTML report generation
-        infographic_generator_agent,  # Part 5: Infographic generation
-        map_generator_agent,  # Part 6: Interactive map generation
+    stages=[
+        # Part 1: Market research with search
+        PipelineStage(
+            market_research_agent,
+            name="market_research",
+            reads=REQUEST_KEYS,
+            writes=["market_research_findings"],
+        ),
+        # Part 2A: Competitor mapping with Maps
+        PipelineStage(
+            competitor_mapping_agent,
+            name="competitor_mapping",
+            reads=(*REQUEST_KEYS, "maps_api_key"),
+            writes=["competitor_analysis"],
+            optional_writes=["competitor_dataset"],
+        ),
+        # Part 2B: Gap analysis (native scoring, code exec fallback)
+        PipelineStage(
+            gap_analysis_agent,
+            name="gap_analysis",
+            reads=(
+                *REQUEST_KEYS,
+                "market_research_findings",
+                "competitor_analysis",
+                "competitor_dataset",
+            ),
+            writes=["gap_analysis"],
+            optional_writes=[
+                "gap_analysis_code",
+                "gap_analysis_zones",
+                "spatial_metrics",
+            ],
+        ),
+        # Part 3: Strategy synthesis
+        PipelineStage(
+            strategy_advisor_agent,
+            name="strategy_synthesis",
+            reads=(
+                *REQUEST_KEYS,
+                "market_research_findings",
+                "competitor_analysis",
+                "gap_analysis",
+                "spatial_metrics",
+            ),
+            writes=["strategic_report"],
+        ),
+        # Part 4: HTML report generation
+        PipelineStage(
+            report_generator_agent,
+            name="report_generation",
+            reads=(*REQUEST_KEYS, "strategic_report"),
+            writes=["report_generation_result", output_state_key(HTML_REPORT_KEYS)],
+        ),
+        # Part 5: Infographic generation
+        PipelineStage(
+            infographic_generator_agent,
+            name="infographic_generation",
+            reads=(*REQUEST_KEYS, "strategic_report"),
+            writes=["infographic_result", output_state_key(INFOGRAPHIC_KEYS)],
+            optional_writes=[output_state_key(INFOGRAPHIC_THUMBNAIL_KEYS)],
+        ),
+        # Part 6: Interactive map generation
+        PipelineStage(
+            map_generator_agent,
+            name="map_generation",
+            reads=(
+                *REQUEST_KEYS,
+                "strategic_report",
+                "maps_api_key",
+                "competitor_dataset",
+            ),
+            writes=["map_generation_result", output_state_key(MAP_KEYS)],
+        ),
     ],
+    before_agent_callback=before_pipeline,
+    after_agent_callback=after_pipeline,
+    # Opt-in: resume reruns at the first stage whose inputs changed
+    checkpoint_store=get_cache() if PIPELINE_CHECKPOINTS else None,
+    # Opt-in: reuse model responses for identical rendered instructions
+    memo_store=get_cache() if MEMOIZE_LLM_STAGES else None,
+    memo_ttls=MEMO_TTL_BY_STAGE,
+    # Per-stage latency/token/tool metrics, served at /metrics by the backend
+    metrics_registry=metrics if STAGE_METRICS else None,
+    # Budgeted digests of upstream outputs; full text kept in artifacts
+    context_budgets=CONTEXT_TOKEN_BUDGETS if CONTEXT_COMPACTION else None,
 )
 
 # Root agent orchestrating the complete location strategy pipeline
 root_agent = Agent(
-    model=FAST_MODEL,
+    # Latency-critical: the user waits on every root turn (optional hedging)
+    model=routed_model(FAST_MODEL, hedge_after=MODEL_HEDGE_AFTER_SECONDS),
     name=APP_NAME,
     description="A strategic partner for location strategy analysis, guiding users to optimal locations for their business or facility based on market data, competition, infrastructure, and risk factors.",
     instruction=make_instruction_provider(ROOT_INSTRUCTION_RETAIL, ROOT_INSTRUCTION_DATACENTER),
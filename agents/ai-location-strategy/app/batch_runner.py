@@ -0,0 +1,443 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Batch portfolio runner: screen many candidate regions in one go.
+
+Reads a CSV with target_location and business_type columns (optional:
+additional_context, prompt_style) and runs location_strategy_pipeline for
+every row, seeding session state directly instead of going through the
+conversational root agent and IntakeAgent.
+
+- Rows run concurrently up to --concurrency; model calls of all rows share
+  per-model rate limits (BATCH_MODEL_RATE_LIMITS in config.py). The limits
+  belong to the batch's own Runner, so interactive sessions served by the
+  same process are not throttled.
+- Rows share the Places/geocode caches. Each batch run has its own user ID,
+  so stage checkpoints (when enabled) are never shared between runs.
+- Each row's artifacts, strategic report and stage timings are written to
+  <output>/<row>-<slug>/, and ranking.csv ranks all rows by the score of
+  their top recommendation.
+
+Usage:
+    python -m app.batch_runner regions.csv --output batch_output
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+import logging
+import re
+import time
+import uuid
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from .agent import location_strategy_pipeline
+from .config import APP_NAME, BATCH_MAX_CONCURRENCY, BATCH_MODEL_RATE_LIMITS
+from .rate_limits import ModelRateLimitPlugin
+
+logger = logging.getLogger("LocationStrategyPipeline")
+
+# Stages whose completion marks a row as fully processed
+STAGE_NAMES = [
+    "market_research",
+    "competitor_mapping",
+    "gap_analysis",
+    "strategy_synthesis",
+    "report_generation",
+    "infographic_generation",
+    "map_generation",
+]
+
+
+@dataclass
+class BatchRow:
+    """One candidate region of a batch."""
+
+    index: int
+    target_location: str
+    business_type: str
+    additional_context: str = ""
+    prompt_style: str = "retail"
+
+    @property
+    def slug(self) -> str:
+        """Directory name for this row's outputs."""
+        name = re.sub(r"[^a-z0-9]+", "-", self.target_location.lower()).strip("-")
+        return f"{self.index:03d}-{name[:40] or 'row'}"
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one batch row."""
+
+    row: BatchRow
+    status: str  # "complete", "partial" or "failed"
+    duration_seconds: float
+    stage_timings: dict = field(default_factory=dict)
+    report: dict | None = None
+    output_dir: str = ""
+    error: str = ""
+
+    @property
+    def score(self) -> int | None:
+        """Overall score of the row's top recommendation, if any."""
+        if not self.report:
+            return None
+        return (self.report.get("top_recommendation") or {}).get("overall_score")
+
+    def ranking_record(self) -> dict:
+        """Flat record for the consolidated ranking table."""
+        top = (self.report or {}).get("top_recommendation") or {}
+        record = {
+            "row": self.row.index,
+            "target_location": self.row.target_location,
+            "business_type": self.row.business_type,
+            "status": self.status,
+            "top_recommendation": top.get("location_name", ""),
+            "overall_score": self.score,
+            "opportunity_type": top.get("opportunity_type", ""),
+            "total_competitors_found": (self.report or {}).get(
+                "total_competitors_found"
+            ),
+            "duration_seconds": round(self.duration_seconds, 1),
+        }
+        for stage in STAGE_NAMES:
+            timing = self.stage_timings.get(stage) or {}
+            record[f"{stage}_seconds"] = timing.get("duration_seconds")
+        record["output_dir"] = self.output_dir
+        record["error"] = self.error
+        return record
+
+
+def parse_batch_csv(text: str, default_prompt_style: str = "retail") -> list[BatchRow]:
+    """Parse batch CSV text into rows, skipping rows without both inputs.
+
+    Raises:
+        ValueError: If the required columns are missing.
+    """
+    reader = csv.DictReader(io.StringIO(text))
+    missing = {"target_location", "business_type"} - set(reader.fieldnames or [])
+    if missing:
+        raise ValueError(f"Batch CSV is missing columns: {sorted(missing)}")
+
+    rows = []
+    for record in reader:
+        target = (record.get("target_location") or "").strip()
+        business = (record.get("business_type") or "").strip()
+        if not target or not business:
+            continue
+        rows.append(
+            BatchRow(
+                index=len(rows) + 1,
+                target_location=target,
+                business_type=business,
+                additional_context=(record.get("additional_context") or "").strip(),
+                prompt_style=(record.get("prompt_style") or "").strip()
+                or default_prompt_style,
+            )
+        )
+    return rows
+
+
+def read_batch_csv(path: str | Path, default_prompt_style: str = "retail") -> list[BatchRow]:
+    """Read a batch CSV file (see parse_batch_csv)."""
+    return parse_batch_csv(
+        Path(path).read_text(encoding="utf-8-sig"), default_prompt_style
+    )
+
+
+def create_batch_runner(
+    rate_limits: Mapping[str, float] = BATCH_MODEL_RATE_LIMITS,
+) -> Runner:
+    """Create a Runner for the pipeline limited to `rate_limits` (per minute)."""
+    return Runner(
+        app_name=APP_NAME,
+        agent=location_strategy_pipeline,
+        session_service=InMemorySessionService(),
+        artifact_service=InMemoryArtifactService(),
+        plugins=[ModelRateLimitPlugin(rate_limits)],
+    )
+
+
+def batch_user_id() -> str:
+    """A fresh user ID for one batch run, scoping its sessions and checkpoints."""
+    return f"batch-{uuid.uuid4().hex}"
+
+
+def _row_status(state: Mapping[str, Any]) -> str:
+    completed = set(state.get("stages_completed") or [])
+    if all(stage in completed for stage in STAGE_NAMES):
+        return "complete"
+    if state.get("strategic_report"):
+        return "partial"
+    return "failed"
+
+
+def _report_dict(report: Any) -> dict | None:
+    if report is None:
+        return None
+    if hasattr(report, "model_dump"):
+        return report.model_dump()
+    return report if isinstance(report, dict) else None
+
+
+async def _save_outputs(
+    runner: Runner,
+    user_id: str,
+    session_id: str,
+    state: Mapping[str, Any],
+    row_dir: Path,
+) -> None:
+    """Write the row's artifacts, report and timings, then free them."""
+    row_dir.mkdir(parents=True, exist_ok=True)
+    artifact_service = runner.artifact_service
+    keys = await artifact_service.list_artifact_keys(
+        app_name=APP_NAME, user_id=user_id, session_id=session_id
+    )
+    for key in keys:
+        part = await artifact_service.load_artifact(
+            app_name=APP_NAME,
+            user_id=user_id,
+            session_id=session_id,
+            filename=key,
+        )
+        if part is not None and part.inline_data is not None:
+            (row_dir / Path(key).name).write_bytes(part.inline_data.data)
+        await artifact_service.delete_artifact(
+            app_name=APP_NAME,
+            user_id=user_id,
+            session_id=session_id,
+            filename=key,
+        )
+
+    report = _report_dict(state.get("strategic_report"))
+    if report:
+        (row_dir / "strategic_report.json").write_text(
+            json.dumps(report, indent=2), encoding="utf-8"
+        )
+    (row_dir / "timings.json").write_text(
+        json.dumps(
+            {
+                "stage_timings": state.get("stage_timings", {}),
+                "stage_checkpoints": state.get("stage_checkpoints", {}),
+                "stage_models": state.get("stage_models", {}),
+                "context_compaction": state.get("context_compaction", {}),
+            },
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+
+
+def row_state(row: BatchRow) -> dict[str, Any]:
+    """Initial session state for a row: what IntakeAgent would have set."""
+    return {
+        "target_location": row.target_location,
+        "business_type": row.business_type,
+        "additional_context": row.additional_context,
+        "prompt_style": row.prompt_style,
+        "stages_completed": ["intake"],
+    }
+
+
+def row_message(row: BatchRow) -> types.Content:
+    """The user message that starts a row's pipeline run."""
+    return types.Content(
+        role="user",
+        parts=[
+            types.Part(
+                text=f"Analyze {row.business_type} opportunities in "
+                f"{row.target_location}."
+            )
+        ],
+    )
+
+
+async def run_row(
+    runner: Runner, row: BatchRow, output_dir: Path, user_id: str
+) -> BatchResult:
+    """Run the pipeline for one row under `user_id` and save its outputs."""
+    start = time.monotonic()
+    row_dir = output_dir / row.slug
+    session = await runner.session_service.create_session(
+        app_name=APP_NAME, user_id=user_id, state=row_state(row)
+    )
+    session_id = session.id
+    message = row_message(row)
+
+    error = ""
+    try:
+        async for _ in runner.run_async(
+            user_id=user_id, session_id=session_id, new_message=message
+        ):
+            pass
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        logger.warning(f"BATCH: row {row.index} ({row.target_location}) failed: {error}")
+
+    session = await runner.session_service.get_session(
+        app_name=APP_NAME, user_id=user_id, session_id=session_id
+    )
+    state = session.state if session else {}
+    try:
+        await _save_outputs(runner, user_id, session_id, state, row_dir)
+    except Exception as e:
+        error = error or f"Saving outputs failed: {e}"
+    # Rows only need their outputs on disk; free the session's memory
+    await runner.session_service.delete_session(
+        app_name=APP_NAME, user_id=user_id, session_id=session_id
+    )
+
+    return BatchResult(
+        row=row,
+        status=_row_status(state),
+        duration_seconds=time.monotonic() - start,
+        stage_timings=dict(state.get("stage_timings") or {}),
+        report=_report_dict(state.get("strategic_report")),
+        output_dir=str(row_dir),
+        error=error,
+    )
+
+
+def rank_results(results: Iterable[BatchResult]) -> list[BatchResult]:
+    """Order results by top-recommendation score, unscored rows last."""
+    return sorted(
+        results,
+        key=lambda r: (r.score is None, -(r.score or 0), r.row.index),
+    )
+
+
+def write_ranking(results: Iterable[BatchResult], output_dir: Path) -> Path:
+    """Write the consolidated ranking table as ranking.csv."""
+    records = [
+        {"rank": rank, **result.ranking_record()}
+        for rank, result in enumerate(rank_results(results), start=1)
+    ]
+    path = output_dir / "ranking.csv"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(
+            f, fieldnames=list(records[0]) if records else ["rank"]
+        )
+        writer.writeheader()
+        writer.writerows(records)
+    return path
+
+
+async def run_batch(
+    rows: list[BatchRow],
+    output_dir: str | Path,
+    max_concurrency: int = BATCH_MAX_CONCURRENCY,
+    rate_limits: Mapping[str, float] = BATCH_MODEL_RATE_LIMITS,
+    on_result: Callable[[BatchResult, int, int], None] | None = None,
+) -> list[BatchResult]:
+    """Run the pipeline over all rows and write the ranking table.
+
+    Args:
+        rows: Rows to process.
+        output_dir: Directory for ranking.csv and per-row outputs.
+        max_concurrency: Maximum number of rows running at once.
+        rate_limits: Requests per minute by model name.
+        on_result: Optional progress callback(result, done, total).
+
+    Returns:
+        Results in ranking order.
+    """
+    output_dir = Path(output_dir)
+    runner = create_batch_runner(rate_limits)
+    user_id = batch_user_id()
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    results: list[BatchResult] = []
+    batch_start = time.monotonic()
+
+    async def run_one(row: BatchRow) -> None:
+        async with semaphore:
+            logger.info(
+                f"BATCH: starting row {row.index}/{len(rows)}: "
+                f"{row.business_type} in {row.target_location}"
+            )
+            result = await run_row(runner, row, output_dir, user_id)
+        results.append(result)
+        logger.info(
+            f"BATCH [{len(results)}/{len(rows)}] {row.target_location}: "
+            f"{result.status}, score {result.score}, "
+            f"{result.duration_seconds:.0f}s"
+        )
+        write_ranking(results, output_dir)
+        if on_result:
+            on_result(result, len(results), len(rows))
+
+    try:
+        await asyncio.gather(*(run_one(row) for row in rows))
+    finally:
+        await runner.close()
+
+    path = write_ranking(results, output_dir)
+    logger.info(
+        f"BATCH: {len(results)} rows in {time.monotonic() - batch_start:.0f}s, "
+        f"ranking written to {path}"
+    )
+    return rank_results(results)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(
+        description="Run the location strategy pipeline over a CSV of regions."
+    )
+    parser.add_argument(
+        "csv", help="CSV with target_location and business_type columns"
+    )
+    parser.add_argument(
+        "--output", default="batch_output", help="Output directory"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=BATCH_MAX_CONCURRENCY,
+        help="Maximum rows running at once",
+    )
+    parser.add_argument(
+        "--prompt-style",
+        choices=["retail", "datacenter"],
+        default="retail",
+        help="Prompt style for rows without a prompt_style column",
+    )
+    args = parser.parse_args(argv)
+
+    rows = read_batch_csv(args.csv, args.prompt_style)
+    results = asyncio.run(run_batch(rows, args.output, args.concurrency))
+
+    print(f"\n{'Rank':<5}{'Score':<7}{'Status':<10}Location")
+    for rank, result in enumerate(results, start=1):
+        score = "-" if result.score is None else str(result.score)
+        print(
+            f"{rank:<5}{score:<7}{result.status:<10}"
+            f"{result.row.business_type} in {result.row.target_location}"
+        )
+    print(f"\nRanking: {Path(args.output) / 'ranking.csv'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -21,6 +21,7 @@ from .pipeline_callbacks import (
     after_map_generator,
     # After callbacks
     after_market_research,
+    after_pipeline,
     after_report_generator,
     after_strategy_advisor,
     before_competitor_mapping,
@@ -29,9 +30,16 @@ from .pipeline_callbacks import (
     before_map_generator,
     # Before callbacks
     before_market_research,
+    before_pipeline,
     before_report_generator,
     before_strategy_advisor,
 )
+from .code_block_callbacks import index_code_blocks
+from .dataset_callbacks import (
+    capture_competitor_places,
+    finalize_competitor_dataset,
+)
+from .gap_scoring_callbacks import inject_spatial_metrics, native_gap_analysis
 
 __all__ = [
     "after_competitor_mapping",
@@ -39,6 +47,7 @@ __all__ = [
     "after_infographic_generator",
     "after_map_generator",
     "after_market_research",
+    "after_pipeline",
     "after_report_generator",
     "after_strategy_advisor",
     "before_competitor_mapping",
@@ -46,6 +55,12 @@ __all__ = [
     "before_infographic_generator",
     "before_map_generator",
     "before_market_research",
+    "before_pipeline",
     "before_report_generator",
     "before_strategy_advisor",
+    "capture_competitor_places",
+    "finalize_competitor_dataset",
+    "index_code_blocks",
+    "inject_spatial_metrics",
+    "native_gap_analysis",
 ]
@@ -0,0 +1,300 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Checkpoint callbacks for resumable pipeline runs.
+
+Each stage's outputs are persisted together with a hash of its inputs: the
+stage and agent names, the model, the instruction templates, prompt_style
+and the values of the state keys the stage declares as reads. On a rerun,
+a stage whose input hash matches a stored checkpoint is skipped and its
+outputs are restored into state, so the pipeline resumes at the first stage
+whose inputs changed (or which never completed).
+
+Because upstream outputs are part of downstream hashes, re-running a stage
+with a different result invalidates every checkpoint that depends on it.
+
+Checkpoints are scoped to the user and kept for CHECKPOINT_TTL. Outputs
+that are artifact references (report, infographic, map, competitor dataset)
+are checkpointed with the artifact bytes: on restore the artifact is saved
+again into the current session and the reference rewritten to point at it,
+so nothing refers to the session of an earlier run. Input hashes identify
+such references by content (sha256), not by session and version.
+
+Stages that skip their agent from a before_agent_callback (e.g. native gap
+scoring) don't reach the after callbacks, so their checkpoint is saved when
+that callback returns.
+"""
+
+import asyncio
+import base64
+import functools
+import hashlib
+import inspect
+import json
+import logging
+from typing import TYPE_CHECKING, Any
+
+from google.adk.agents.callback_context import CallbackContext
+from google.genai import types
+
+from ..config import CHECKPOINT_TTL
+from ..tools.persistent_cache import PersistentCache
+from .pipeline_callbacks import _complete_stage, _output_content, _start_stage
+
+if TYPE_CHECKING:
+    from ..pipeline_scheduler import PipelineStage
+
+logger = logging.getLogger("LocationStrategyPipeline")
+
+CHECKPOINT_NAMESPACE = "stage_checkpoint"
+# Reference fields that differ between copies of the same artifact content
+_ARTIFACT_LOCATION_FIELDS = ("version", "session_id", "user_id")
+
+
+def _jsonable(value: Any) -> Any:
+    """Convert Pydantic models (e.g. strategic_report) into plain data."""
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    return str(value)
+
+
+def _instruction_fingerprint(agent: Any) -> Any:
+    """Return the instruction template(s) of an agent for hashing."""
+    instruction = getattr(agent, "instruction", "")
+    if isinstance(instruction, str):
+        return instruction
+    if hasattr(instruction, "retail_instruction"):
+        return [
+            instruction.retail_instruction,
+            instruction.datacenter_instruction,
+        ]
+    return getattr(instruction, "__qualname__", type(instruction).__name__)
+
+
+def stage_input_hash(stage: "PipelineStage", state: Any) -> str:
+    """Hash everything that determines a stage's outputs."""
+    agent = stage.agent
+    payload = {
+        "stage": stage.name,
+        "agent": agent.name,
+        "model": str(getattr(agent, "model", "")),
+        "instruction": _instruction_fingerprint(agent),
+        "prompt_style": state.get("prompt_style"),
+        "inputs": {
+            key: _content_identity(state.get(key)) for key in sorted(stage.reads)
+        },
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=_jsonable)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _is_artifact_ref(value: Any) -> bool:
+    return isinstance(value, dict) and "artifact_name" in value and "version" in value
+
+
+def _content_identity(value: Any) -> Any:
+    """Drop the location of an artifact reference that carries its sha256."""
+    if _is_artifact_ref(value) and value.get("sha256"):
+        return {
+            k: v for k, v in value.items() if k not in _ARTIFACT_LOCATION_FIELDS
+        }
+    return value
+
+
+def _checkpoint_key(callback_context: CallbackContext, input_hash: str) -> str:
+    invocation = getattr(callback_context, "_invocation_context", None)
+    user_id = getattr(invocation, "user_id", "") or ""
+    return f"{user_id}:{input_hash}"
+
+
+def _record_checkpoint(
+    callback_context: CallbackContext,
+    stage: str,
+    input_hash: str,
+    restored: bool,
+) -> None:
+    checkpoints = callback_context.state.get("stage_checkpoints", {})
+    checkpoints[stage] = {"input_hash": input_hash, "restored": restored}
+    callback_context.state["stage_checkpoints"] = checkpoints
+
+
+async def _load_artifacts(
+    callback_context: CallbackContext, outputs: dict[str, Any]
+) -> dict[str, str] | None:
+    """Base64 bytes of the artifacts referenced by a stage's outputs.
+
+    Returns:
+        The bytes per output key, or None if one of them can't be loaded.
+    """
+    artifacts = {}
+    for key, ref in outputs.items():
+        if not _is_artifact_ref(ref):
+            continue
+        part = await callback_context.load_artifact(
+            ref["artifact_name"], version=ref["version"]
+        )
+        if part is None or part.inline_data is None:
+            return None
+        artifacts[key] = base64.b64encode(part.inline_data.data).decode("ascii")
+    return artifacts
+
+
+async def _restore_artifacts(
+    callback_context: CallbackContext,
+    outputs: dict[str, Any],
+    artifacts: dict[str, str],
+) -> None:
+    """Save checkpointed artifacts into this session and repoint the refs."""
+    invocation = callback_context._invocation_context
+    for key, encoded in artifacts.items():
+        ref = outputs[key]
+        version = await callback_context.save_artifact(
+            ref["artifact_name"],
+            types.Part.from_bytes(
+                data=base64.b64decode(encoded), mime_type=ref["mime_type"]
+            ),
+        )
+        outputs[key] = {
+            **ref,
+            "version": version,
+            "session_id": invocation.session.id,
+            "user_id": invocation.user_id,
+        }
+
+
+def add_checkpointing(stage: "PipelineStage", store: PersistentCache) -> None:
+    """Wrap a stage's agent callbacks with checkpoint restore/save.
+
+    The restore callback runs before the stage's own before callbacks: on a
+    hit it re-saves the checkpointed artifacts, restores the outputs, records
+    the stage as completed and returns Content, which makes ADK skip the
+    agent (and its other callbacks). On a miss it clears the stage's outputs
+    so stale values from an earlier run can't be mistaken for this run's
+    results.
+
+    The save callback runs after the stage's own after callbacks, or when one
+    of its before callbacks returns Content, and only persists the outputs
+    once every required write key is set and every referenced artifact can
+    be loaded.
+    """
+
+    async def restore_checkpoint(
+        callback_context: CallbackContext,
+    ) -> types.Content | None:
+        input_hash = stage_input_hash(stage, callback_context.state)
+        try:
+            hit, checkpoint = await asyncio.to_thread(
+                store.get,
+                CHECKPOINT_NAMESPACE,
+                _checkpoint_key(callback_context, input_hash),
+            )
+            if hit:
+                outputs = checkpoint["outputs"]
+                await _restore_artifacts(
+                    callback_context, outputs, checkpoint["artifacts"]
+                )
+        except Exception as e:
+            logger.warning(f"CHECKPOINT: restore failed for {stage.name}: {e}")
+            hit = False
+
+        if not hit:
+            for key in stage.all_writes:
+                if callback_context.state.get(key) is not None:
+                    callback_context.state[key] = None
+            _record_checkpoint(callback_context, stage.name, input_hash, False)
+            return None
+
+        _start_stage(callback_context, stage.name)
+        for key, value in outputs.items():
+            callback_context.state[key] = value
+        _record_checkpoint(callback_context, stage.name, input_hash, True)
+        _complete_stage(callback_context, stage.name)
+        logger.info(
+            f"CHECKPOINT: {stage.name} restored "
+            f"(inputs {input_hash[:12]} unchanged)"
+        )
+        output_key = getattr(stage.agent, "output_key", None)
+        if output_key and outputs.get(output_key) is not None:
+            return _output_content(outputs[output_key])
+        message = f"{stage.agent.name}: inputs unchanged, restored from checkpoint."
+        return types.Content(role="model", parts=[types.Part(text=message)])
+
+    async def save_checkpoint(
+        callback_context: CallbackContext,
+    ) -> types.Content | None:
+        missing = [k for k in stage.writes if not callback_context.state.get(k)]
+        if missing:
+            logger.info(
+                f"CHECKPOINT: {stage.name} not saved, missing outputs: {missing}"
+            )
+            return None
+
+        input_hash = stage_input_hash(stage, callback_context.state)
+        outputs = {
+            key: json.loads(
+                json.dumps(callback_context.state.get(key), default=_jsonable)
+            )
+            for key in stage.all_writes
+            if callback_context.state.get(key) is not None
+        }
+        try:
+            artifacts = await _load_artifacts(callback_context, outputs)
+            if artifacts is None:
+                logger.info(
+                    f"CHECKPOINT: {stage.name} not saved, artifact unavailable"
+                )
+                return None
+            await asyncio.to_thread(
+                store.set,
+                CHECKPOINT_NAMESPACE,
+                _checkpoint_key(callback_context, input_hash),
+                {"outputs": outputs, "artifacts": artifacts},
+                CHECKPOINT_TTL,
+            )
+            logger.info(f"CHECKPOINT: {stage.name} saved ({input_hash[:12]})")
+        except Exception as e:
+            logger.warning(f"CHECKPOINT: failed to save {stage.name}: {e}")
+        return None
+
+    def save_when_skipped(callback: Any) -> Any:
+        """Save the checkpoint when a before callback skips the agent."""
+
+        @functools.wraps(callback)
+        async def wrapper(callback_context: CallbackContext) -> types.Content | None:
+            content = callback(callback_context=callback_context)
+            if inspect.isawaitable(content):
+                content = await content
+            if content is not None:
+                await save_checkpoint(callback_context)
+            return content
+
+        return wrapper
+
+    agent = stage.agent
+    agent.before_agent_callback = [
+        restore_checkpoint,
+        *map(save_when_skipped, _as_list(agent.before_agent_callback)),
+    ]
+    agent.after_agent_callback = [
+        *_as_list(agent.after_agent_callback),
+        save_checkpoint,
+    ]
+
+
+def _as_list(callback: Any) -> list:
+    if callback is None:
+        return []
+    if isinstance(callback, list):
+        return list(callback)
+    return [callback]
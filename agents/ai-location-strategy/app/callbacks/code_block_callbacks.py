@@ -0,0 +1,150 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Incremental index of the code a stage executes.
+
+index_code_blocks is an after_model_callback: as model responses arrive it
+records their executable_code parts (BuiltInCodeExecutor) and fenced Python
+blocks in text, keyed by invocation and agent. after_gap_analysis then takes
+just the current invocation's blocks in O(blocks), instead of walking every
+event and part of an ever-growing multi-run session.
+
+Model calls answered by memoization skip after_model callbacks. For those,
+take_code_blocks() falls back to the session's trailing events, which belong
+to the current invocation, and stops at the first event of an earlier one.
+"""
+
+import logging
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmResponse
+from google.genai import types
+
+logger = logging.getLogger("LocationStrategyPipeline")
+
+FENCED_PYTHON = re.compile(r"```(?:python|py)\s*\n(.*?)```", re.DOTALL | re.IGNORECASE)
+
+# Indexed invocations kept at most; older ones are dropped (e.g. runs that
+# failed before their after_agent_callback took the blocks)
+MAX_INDEXED_INVOCATIONS = 256
+
+
+def fenced_python_blocks(text: str) -> list[str]:
+    """Non-empty fenced ```python blocks in markdown text."""
+    if not text:
+        return []
+    return [code.strip() for code in FENCED_PYTHON.findall(text) if code.strip()]
+
+
+def content_code_blocks(content: types.Content | None, include_text: bool = True) -> list[str]:
+    """Code blocks in a Content: executable_code parts, then fenced Python."""
+    blocks: list[str] = []
+    for part in (content.parts or []) if content else []:
+        executable = part.executable_code
+        if executable and executable.code and executable.code.strip():
+            blocks.append(executable.code.strip())
+        elif include_text and part.text and not part.thought:
+            blocks.extend(fenced_python_blocks(part.text))
+    return blocks
+
+
+class CodeBlockIndex:
+    """Code blocks per (invocation_id, agent_name) in emission order."""
+
+    def __init__(self, max_invocations: int = MAX_INDEXED_INVOCATIONS) -> None:
+        self._max_invocations = max_invocations
+        self._lock = threading.Lock()
+        # Blocks as dict keys: ordered and deduplicated (streamed responses
+        # may repeat a part in the final aggregated response)
+        self._blocks: OrderedDict[tuple[str, str], dict[str, None]] = OrderedDict()
+
+    def add(self, invocation_id: str, agent_name: str, blocks: Iterable[str]) -> None:
+        """Append blocks for an invocation and agent."""
+        key = (invocation_id, agent_name)
+        with self._lock:
+            entry = self._blocks.setdefault(key, {})
+            self._blocks.move_to_end(key)
+            for block in blocks:
+                entry[block] = None
+            while len(self._blocks) > self._max_invocations:
+                self._blocks.popitem(last=False)
+
+    def take(self, invocation_id: str, agent_name: str) -> list[str]:
+        """Remove and return the blocks of an invocation and agent."""
+        with self._lock:
+            return list(self._blocks.pop((invocation_id, agent_name), {}))
+
+
+code_block_index = CodeBlockIndex()
+
+
+def index_code_blocks(
+    callback_context: CallbackContext, llm_response: LlmResponse
+) -> LlmResponse | None:
+    """Index the code blocks of a model response (after_model_callback)."""
+    # Partial text chunks are repeated in the aggregated final response
+    blocks = content_code_blocks(
+        llm_response.content, include_text=not llm_response.partial
+    )
+    if blocks:
+        code_block_index.add(
+            callback_context.invocation_id, callback_context.agent_name, blocks
+        )
+    return None
+
+
+def _trailing_invocation_blocks(callback_context: CallbackContext) -> list[str]:
+    """Code blocks of this agent in the current invocation's events.
+
+    Walks the session's events backwards and stops at the first event of an
+    earlier invocation, so only this run's events are visited.
+    """
+    invocation = getattr(callback_context, "_invocation_context", None)
+    session = getattr(invocation, "session", None)
+    if session is None:
+        return []
+    agent_name = callback_context.agent_name
+    collected: list[list[str]] = []
+    for event in reversed(session.events or []):
+        if event.invocation_id != invocation.invocation_id:
+            break
+        if event.author == agent_name and not event.partial:
+            collected.append(content_code_blocks(event.content))
+    blocks = [block for group in reversed(collected) for block in group]
+    return list(dict.fromkeys(blocks))
+
+
+def take_code_blocks(callback_context: CallbackContext) -> list[str]:
+    """Code blocks the calling agent produced in the current invocation.
+
+    Args:
+        callback_context: The agent's CallbackContext.
+
+    Returns:
+        The blocks in emission order; the index entry is released.
+    """
+    blocks = code_block_index.take(
+        callback_context.invocation_id, callback_context.agent_name
+    )
+    if blocks:
+        return blocks
+    try:
+        return _trailing_invocation_blocks(callback_context)
+    except Exception as e:
+        logger.warning(f"Error extracting code from session events: {e}")
+        return []
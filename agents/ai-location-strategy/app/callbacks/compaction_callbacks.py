@@ -0,0 +1,147 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Token-budgeted context compaction between pipeline stages.
+
+The gap analysis and strategy advisor instructions inline whole upstream
+outputs ({market_research_findings}, {competitor_analysis}, {gap_analysis}),
+so input tokens grow with every stage and are paid again on every model
+call of a stage. add_context_compaction() wraps a stage's LlmAgent with a
+before_model_callback that, in the rendered system instruction, replaces
+each upstream output over its budget with a digest (tools/context_compaction.py).
+
+The full text is saved once per run as an artifact (context_<key>.md) and
+named in the digest's footer. Savings are recorded per stage in
+state["context_compaction"][stage] and counted in the
+context_tokens_saved_total metric.
+
+The callback goes first in the before-callback list, so memoization keys
+are computed from the compacted instruction.
+"""
+
+import hashlib
+import logging
+from collections.abc import Mapping
+from typing import TYPE_CHECKING
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from ..metrics import MetricsRegistry
+from ..tools.context_compaction import compact_text, estimate_tokens
+from .checkpoint_callbacks import _as_list
+
+if TYPE_CHECKING:
+    from ..pipeline_scheduler import PipelineStage
+
+logger = logging.getLogger("LocationStrategyPipeline")
+
+# Digests are shared by stages: each upstream output is saved once per run
+SAVED_STATE = "temp:context_artifacts"
+
+
+def context_artifact_name(key: str) -> str:
+    """Artifact holding the full text of a compacted state key."""
+    return f"context_{key}.md"
+
+
+async def _save_full_text(
+    callback_context: CallbackContext, key: str, text: str
+) -> None:
+    """Save the full text of key as an artifact unless already saved."""
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    saved = dict(callback_context.state.get(SAVED_STATE) or {})
+    if saved.get(key) == digest:
+        return
+    try:
+        await callback_context.save_artifact(
+            context_artifact_name(key),
+            types.Part.from_bytes(data=text.encode("utf-8"), mime_type="text/markdown"),
+        )
+    except Exception as e:
+        logger.warning(f"COMPACTION: failed to save full {key}: {e}")
+        return
+    saved[key] = digest
+    callback_context.state[SAVED_STATE] = saved
+
+
+def add_context_compaction(
+    stage: "PipelineStage",
+    budgets: Mapping[str, int],
+    registry: MetricsRegistry | None = None,
+) -> None:
+    """Wrap a stage's LlmAgent to compact upstream outputs in its instruction.
+
+    Args:
+        stage: The pipeline stage to wrap.
+        budgets: Token budget per state key; keys not listed are left whole.
+        registry: Optional metrics registry for tokens saved.
+    """
+
+    async def compact_context(
+        callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> LlmResponse | None:
+        config = llm_request.config
+        instruction = config.system_instruction if config else None
+        if not isinstance(instruction, str):
+            return None
+
+        state = callback_context.state
+        tokens_before = estimate_tokens(instruction)
+        compacted = []
+        for key, budget in budgets.items():
+            text = state.get(key)
+            if not isinstance(text, str) or text not in instruction:
+                continue
+            digest = compact_text(text, budget, context_artifact_name(key))
+            if digest == text:
+                continue
+            await _save_full_text(callback_context, key, text)
+            instruction = instruction.replace(text, digest)
+            compacted.append(key)
+        if not compacted:
+            return None
+
+        config.system_instruction = instruction
+        tokens_after = estimate_tokens(instruction)
+        saved = tokens_before - tokens_after
+
+        # Every model call of the stage resends the instruction
+        report = dict(state.get("context_compaction") or {})
+        entry = dict(report.get(stage.name) or {})
+        entry["model_calls"] = entry.get("model_calls", 0) + 1
+        entry["tokens_before"] = entry.get("tokens_before", 0) + tokens_before
+        entry["tokens_after"] = entry.get("tokens_after", 0) + tokens_after
+        entry["tokens_saved"] = entry.get("tokens_saved", 0) + saved
+        entry["compacted_keys"] = compacted
+        entry["artifacts"] = [context_artifact_name(key) for key in compacted]
+        report[stage.name] = entry
+        state["context_compaction"] = report
+
+        if registry is not None:
+            registry.inc("context_tokens_saved_total", saved, stage=stage.name)
+        logger.info(
+            f"COMPACTION: {stage.name} instruction {tokens_before} -> "
+            f"{tokens_after} tokens (compacted {', '.join(compacted)})"
+        )
+        return None
+
+    agent = stage.agent
+    if not hasattr(agent, "before_model_callback"):
+        return  # not an LlmAgent
+    agent.before_model_callback = [
+        compact_context,
+        *_as_list(agent.before_model_callback),
+    ]
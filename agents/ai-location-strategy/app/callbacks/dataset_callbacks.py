@@ -0,0 +1,71 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Callbacks that capture Places results into the competitor dataset.
+
+capture_competitor_places is an after_tool_callback of the competitor
+mapping agent: the places of every successful search_places response are
+collected in temp state, leaving the tool response the model sees
+unchanged. finalize_competitor_dataset runs after the stage and writes them
+once as the columnar dataset artifact (see tools/competitor_dataset.py).
+"""
+
+import logging
+from typing import Any
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.tools import BaseTool, ToolContext
+from google.genai import types
+
+from ..tools.competitor_dataset import collect_places, save_competitor_dataset
+
+logger = logging.getLogger("LocationStrategyPipeline")
+
+
+async def capture_competitor_places(
+    tool: BaseTool,
+    args: dict[str, Any],
+    tool_context: ToolContext,
+    tool_response: dict,
+) -> dict | None:
+    """Collect search_places results for the competitor dataset."""
+    if tool.name != "search_places" or not isinstance(tool_response, dict):
+        return None
+    if tool_response.get("status") != "success" or not tool_response.get("results"):
+        return None
+
+    try:
+        rows = collect_places(
+            tool_context.state, tool_response["results"], args.get("query", "")
+        )
+        logger.info(f"  Competitor dataset: {rows} places collected")
+    except Exception as e:
+        logger.warning(f"  Failed to collect competitor places: {e}")
+    return None
+
+
+async def finalize_competitor_dataset(
+    callback_context: CallbackContext,
+) -> types.Content | None:
+    """Save the collected places as the competitor dataset artifact."""
+    try:
+        ref = await save_competitor_dataset(callback_context)
+        if ref:
+            logger.info(
+                f"  Competitor dataset: {ref['rows']} places saved "
+                f"({ref['size']} bytes, v{ref['version']})"
+            )
+    except Exception as e:
+        logger.warning(f"  Failed to save competitor dataset: {e}")
+    return None
@@ -0,0 +1,145 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Native gap-analysis scoring with LLM code execution as fallback.
+
+inject_spatial_metrics runs first (for every prompt style) and writes the
+measured competitor density and spacing per zone (tools/spatial_index.py)
+to state["spatial_metrics"], which the gap analysis and strategy
+instructions include, so density figures are measured rather than guessed.
+
+The pandas/NumPy work of both callbacks runs in a worker thread
+(asyncio.to_thread), so concurrent sessions keep streaming meanwhile.
+
+native_gap_analysis runs as a before_agent_callback of GapAnalysisAgent.
+For retail runs with enough geolocated competitors it scores the zones of
+the competitor dataset artifact with tools/gap_scoring.py, writes the same
+gap_analysis state key the agent would and returns it as Content so ADK
+skips the code-execution model. Otherwise it returns None and the agent runs as
+before.
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+
+import pandas as pd
+from google.adk.agents.callback_context import CallbackContext
+from google.genai import types
+
+from ..config import GAP_MIN_COMPETITORS, NATIVE_GAP_ANALYSIS
+from ..tools.competitor_dataset import load_competitor_dataset
+from ..tools.gap_scoring import places_frame, render_gap_analysis, score_zones
+from ..tools.spatial_index import (
+    assign_zones,
+    render_spatial_metrics,
+    zone_spatial_metrics,
+)
+from .pipeline_callbacks import _complete_stage, _output_content
+
+logger = logging.getLogger("LocationStrategyPipeline")
+
+SCORING_SOURCE = inspect.getsource(score_zones)
+
+
+def _competitors(dataset) -> pd.DataFrame:
+    """Geolocated competitors of a dataset table."""
+    return places_frame(dataset.to_pandas())
+
+
+def _spatial_metrics(dataset) -> tuple[str, int, int] | None:
+    """Rendered spatial metrics, competitor and zone counts of a dataset."""
+    competitors = _competitors(dataset)
+    if competitors.empty:
+        return None
+    competitors = assign_zones(competitors)
+    zones = zone_spatial_metrics(competitors)
+    return render_spatial_metrics(competitors, zones), len(competitors), len(zones)
+
+
+async def inject_spatial_metrics(
+    callback_context: CallbackContext,
+) -> types.Content | None:
+    """Compute measured density and spacing per zone for the prompts."""
+    state = callback_context.state
+    state["spatial_metrics"] = ""
+    try:
+        dataset = await load_competitor_dataset(
+            callback_context, state.get("competitor_dataset")
+        )
+        if dataset is None:
+            return None
+        metrics = await asyncio.to_thread(_spatial_metrics, dataset)
+        if metrics is None:
+            return None
+    except Exception as e:
+        logger.warning(f"  Spatial metrics failed: {e}")
+        return None
+
+    state["spatial_metrics"], competitor_count, zone_count = metrics
+    logger.info(
+        f"  Spatial index: {competitor_count} competitors in {zone_count} zones"
+    )
+    return None
+
+
+async def native_gap_analysis(
+    callback_context: CallbackContext,
+) -> types.Content | None:
+    """Score zones natively, skipping the agent, when the data allows it."""
+    state = callback_context.state
+    if not NATIVE_GAP_ANALYSIS:
+        return None
+    if state.get("prompt_style", "datacenter") != "retail":
+        logger.info("  Native scoring is retail-only, using code execution")
+        return None
+
+    try:
+        dataset = await load_competitor_dataset(
+            callback_context, state.get("competitor_dataset")
+        )
+        if dataset is None:
+            logger.info("  No competitor dataset, using code execution")
+            return None
+        competitors = await asyncio.to_thread(_competitors, dataset)
+        if len(competitors) < GAP_MIN_COMPETITORS:
+            logger.info(
+                f"  Only {len(competitors)} geolocated competitors, "
+                "using code execution"
+            )
+            return None
+        zones = await asyncio.to_thread(score_zones, competitors)
+    except Exception as e:
+        logger.warning(f"  Native gap scoring failed, using code execution: {e}")
+        return None
+
+    state["gap_analysis"] = render_gap_analysis(
+        zones,
+        competitor_count=len(competitors),
+        target_location=state.get("target_location", ""),
+        business_type=state.get("business_type", ""),
+    )
+    state["gap_analysis_code"] = SCORING_SOURCE
+    # Round-trip through JSON so state holds plain (serializable) types
+    state["gap_analysis_zones"] = json.loads(
+        zones.drop(columns=["zone_id"]).to_json(orient="records")
+    )
+    _complete_stage(callback_context, "gap_analysis")
+
+    logger.info(
+        f"STAGE 2B: COMPLETE - Scored {len(zones)} zones natively from "
+        f"{len(competitors)} competitors"
+    )
+    return _output_content(state["gap_analysis"])
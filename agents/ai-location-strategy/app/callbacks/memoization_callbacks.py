@@ -0,0 +1,190 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Content-addressed memoization of LLM stage model calls (opt-in).
+
+A before_model_callback hashes the model name, the fully rendered system
+instruction (the output of make_instruction_provider, with session state
+already injected), the stage's declared state inputs and the stage's own
+tool-call turns so far. If a fresh response for that hash is stored, it is
+returned directly and ADK skips the model call entirely. Otherwise an
+after_model_callback stores the final, error-free response. Both run the
+SQLite lookups in a worker thread so they don't block the event loop.
+
+Earlier conversation history (greetings, other agents' messages) is
+deliberately left out of the key: everything a stage depends on reaches it
+through the instruction and its declared state inputs, so identical
+target_location/business_type requests from different users share entries.
+For the same reason, nothing session-specific is hashed: artifact
+references are reduced to their content (as for checkpoints), and tool
+turns to their text, call names and arguments and response bodies, without
+the per-call IDs, thought signatures and VOLATILE_RESPONSE_FIELDS.
+
+The instructions include "CURRENT DATE: {current_date}", which would make
+every key expire at midnight; the date is masked before hashing, and
+freshness is configured per stage instead (MEMO_TTL_BY_STAGE in config.py).
+Stages without a TTL are not memoized.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from typing import TYPE_CHECKING, Any
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+
+from ..tools.persistent_cache import PersistentCache
+from .checkpoint_callbacks import _as_list, _content_identity
+
+if TYPE_CHECKING:
+    from ..pipeline_scheduler import PipelineStage
+
+logger = logging.getLogger("LocationStrategyPipeline")
+
+# Tool response fields that differ between otherwise identical calls
+VOLATILE_RESPONSE_FIELDS = frozenset({"cache_hit"})
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, type) and hasattr(value, "model_json_schema"):
+        # An output_schema class passed as the response_schema
+        return value.model_json_schema()
+    if hasattr(value, "model_dump"):
+        return value.model_dump(exclude_none=True, mode="json")
+    return str(value)
+
+
+def _part_identity(part: Any) -> Any:
+    """What a tool-turn part says, without call IDs or thought signatures."""
+    if part.function_call:
+        return {"call": part.function_call.name, "args": part.function_call.args}
+    if part.function_response:
+        response = part.function_response.response
+        if isinstance(response, dict):
+            response = {
+                k: _content_identity(v)
+                for k, v in response.items()
+                if k not in VOLATILE_RESPONSE_FIELDS
+            }
+        return {"response": part.function_response.name, "body": response}
+    return {"text": part.text} if part.text and not part.thought else None
+
+
+def _tool_turns(llm_request: LlmRequest) -> list:
+    """Return the trailing function_call/function_response contents.
+
+    These are the current stage's own tool-call round trips; the first model
+    call of a stage has none.
+    """
+    turns: list = []
+    for content in reversed(llm_request.contents or []):
+        parts = content.parts or []
+        if not any(p.function_call or p.function_response for p in parts):
+            break
+        identities = [_part_identity(part) for part in parts]
+        turns.append([identity for identity in identities if identity is not None])
+    return list(reversed(turns))
+
+
+def _mask_date(instruction: Any, state: Any) -> Any:
+    """Replace the rendered {current_date} with its placeholder."""
+    current_date = state.get("current_date")
+    if isinstance(instruction, str) and current_date:
+        return instruction.replace(str(current_date), "{current_date}")
+    return instruction
+
+
+def memo_key(
+    stage: "PipelineStage", state: Any, llm_request: LlmRequest
+) -> str:
+    """Hash the model, rendered instruction, state inputs and tool turns."""
+    config = llm_request.config
+    payload = {
+        "model": llm_request.model,
+        "instruction": _mask_date(
+            config.system_instruction if config else None, state
+        ),
+        "response_schema": config.response_schema if config else None,
+        "inputs": {
+            key: _content_identity(state.get(key)) for key in sorted(stage.reads)
+        },
+        "tool_turns": _tool_turns(llm_request),
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=_jsonable)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def add_memoization(
+    stage: "PipelineStage", store: PersistentCache, ttl_seconds: float
+) -> None:
+    """Wrap a stage's LlmAgent with model-call memoization callbacks."""
+    key_state = f"temp:memo_key:{stage.agent.name}"
+
+    async def lookup_memo(
+        callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> LlmResponse | None:
+        key = memo_key(stage, callback_context.state, llm_request)
+        try:
+            hit, cached = await asyncio.to_thread(store.get, "llm_memo", key)
+        except Exception as e:
+            logger.warning(f"MEMO: lookup failed for {stage.name}: {e}")
+            hit, cached = False, None
+
+        if hit:
+            logger.info(
+                f"MEMO: {stage.name} model call served from cache ({key[:12]})"
+            )
+            return LlmResponse.model_validate_json(cached)
+
+        callback_context.state[key_state] = key
+        return None
+
+    async def store_memo(
+        callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> LlmResponse | None:
+        key = callback_context.state.get(key_state)
+        if (
+            not key
+            or llm_response.partial
+            or llm_response.error_code
+            or not llm_response.content
+        ):
+            return None
+        callback_context.state[key_state] = None
+        try:
+            await asyncio.to_thread(
+                store.set,
+                "llm_memo",
+                key,
+                # JSON mode keeps bytes (e.g. thought signatures) round-trippable
+                llm_response.model_dump_json(exclude_none=True),
+                ttl_seconds,
+            )
+            logger.info(f"MEMO: {stage.name} model response stored ({key[:12]})")
+        except Exception as e:
+            logger.warning(f"MEMO: failed to store {stage.name} response: {e}")
+        return None
+
+    agent = stage.agent
+    agent.before_model_callback = [
+        lookup_memo,
+        *_as_list(getattr(agent, "before_model_callback", None)),
+    ]
+    agent.after_model_callback = [
+        *_as_list(getattr(agent, "after_model_callback", None)),
+        store_memo,
+    ]
+
@@ -0,0 +1,170 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Per-stage model and tool metrics callbacks.
+
+add_metrics() wraps a stage's LlmAgent so every model call records its
+latency, outcome and usage_metadata tokens, and every tool call its latency
+and outcome, labelled with the stage name (see metrics.py). Model metrics are
+labelled with the model that served the call, and calls answered by a
+fallback model are counted. The timing
+callbacks go last in the before-callback lists, so model calls answered by
+memoization or skipped stages are not counted as model calls.
+"""
+
+import time
+from typing import TYPE_CHECKING, Any
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.tools import BaseTool, ToolContext
+
+from ..metrics import MetricsRegistry
+from ..model_router import served_model
+from .checkpoint_callbacks import _as_list
+
+if TYPE_CHECKING:
+    from ..pipeline_scheduler import PipelineStage
+
+
+def add_metrics(stage: "PipelineStage", registry: MetricsRegistry) -> None:
+    """Wrap a stage's LlmAgent with model and tool metrics callbacks."""
+    start_state = f"temp:metrics_model_start:{stage.agent.name}"
+
+    def _tool_start_state(tool_context: ToolContext) -> str:
+        return f"temp:metrics_tool_start:{tool_context.function_call_id}"
+
+    def start_model_timer(
+        callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> LlmResponse | None:
+        callback_context.state[start_state] = {
+            "start": time.perf_counter(),
+            "model": llm_request.model,
+        }
+        return None
+
+    def _finish_model_call(
+        callback_context: CallbackContext,
+        usage_metadata: Any,
+        error: bool,
+        served: str | None = None,
+    ) -> None:
+        started = callback_context.state.get(start_state)
+        if not started:
+            return
+        callback_context.state[start_state] = None
+        requested = started["model"] or str(getattr(stage.agent, "model", ""))
+        if served and served != requested:
+            registry.record_fallback(stage.name, requested, served)
+        registry.record_model_call(
+            stage.name,
+            served or requested,
+            time.perf_counter() - started["start"],
+            usage_metadata,
+            error=error,
+        )
+
+    def record_model_response(
+        callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> LlmResponse | None:
+        if llm_response.partial:
+            return None
+        _finish_model_call(
+            callback_context,
+            llm_response.usage_metadata,
+            error=bool(llm_response.error_code),
+            served=served_model(llm_response),
+        )
+        return None
+
+    def record_model_error(
+        callback_context: CallbackContext,
+        llm_request: LlmRequest,
+        error: Exception,
+    ) -> LlmResponse | None:
+        _finish_model_call(callback_context, None, error=True)
+        return None
+
+    def start_tool_timer(
+        tool: BaseTool, args: dict[str, Any], tool_context: ToolContext
+    ) -> dict | None:
+        tool_context.state[_tool_start_state(tool_context)] = time.perf_counter()
+        return None
+
+    def _finish_tool_call(
+        tool: BaseTool, tool_context: ToolContext, outcome: str
+    ) -> None:
+        key = _tool_start_state(tool_context)
+        started = tool_context.state.get(key)
+        if started is None:
+            return
+        tool_context.state[key] = None
+        registry.observe(
+            "tool_latency_seconds",
+            time.perf_counter() - started,
+            stage=stage.name,
+            tool=tool.name,
+        )
+        registry.inc(
+            "tool_calls_total", stage=stage.name, tool=tool.name, outcome=outcome
+        )
+
+    def record_tool_response(
+        tool: BaseTool,
+        args: dict[str, Any],
+        tool_context: ToolContext,
+        tool_response: Any,
+    ) -> dict | None:
+        failed = (
+            isinstance(tool_response, dict) and tool_response.get("status") == "error"
+        )
+        _finish_tool_call(tool, tool_context, "error" if failed else "ok")
+        return None
+
+    def record_tool_error(
+        tool: BaseTool,
+        args: dict[str, Any],
+        tool_context: ToolContext,
+        error: Exception,
+    ) -> dict | None:
+        _finish_tool_call(tool, tool_context, "error")
+        return None
+
+    agent = stage.agent
+    if not hasattr(agent, "before_model_callback"):
+        return  # not an LlmAgent
+    agent.before_model_callback = [
+        *_as_list(agent.before_model_callback),
+        start_model_timer,
+    ]
+    agent.after_model_callback = [
+        *_as_list(agent.after_model_callback),
+        record_model_response,
+    ]
+    agent.on_model_error_callback = [
+        *_as_list(getattr(agent, "on_model_error_callback", None)),
+        record_model_error,
+    ]
+    agent.before_tool_callback = [
+        *_as_list(agent.before_tool_callback),
+        start_tool_timer,
+    ]
+    agent.after_tool_callback = [
+        *_as_list(agent.after_tool_callback),
+        record_tool_response,
+    ]
+    agent.on_tool_error_callback = [
+        *_as_list(getattr(agent, "on_tool_error_callback", None)),
+        record_tool_error,
+    ]
@@ -17,19 +17,21 @@
 This module provides before/after callbacks for each agent in the
 Location Strategy Pipeline. Callbacks handle:
 - Logging stage transitions
-- Tracking pipeline progress in state
+- Tracking pipeline progress in state (stages_completed, stage_timings)
 - Saving artifacts (JSON report, HTML report, infographic)
 """
 
 import json
 import logging
-import re
-import traceback
+import uuid
 from datetime import datetime
 
 from google.adk.agents.callback_context import CallbackContext
 from google.genai import types
 
+from ..metrics import metrics
+from .code_block_callbacks import fenced_python_blocks, take_code_blocks
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -37,6 +39,137 @@ logging.basicConfig(
 )
 logger = logging.getLogger("LocationStrategyPipeline")
 
+# Every stage of a full run, in logical order (intake runs before the pipeline)
+PIPELINE_STAGES = (
+    "intake",
+    "market_research",
+    "competitor_mapping",
+    "gap_analysis",
+    "strategy_synthesis",
+    "report_generation",
+    "infographic_generation",
+    "map_generation",
+)
+
+
+# ============================================================================
+# STAGE TRACKING HELPERS
+# ============================================================================
+
+
+def _start_stage(callback_context: CallbackContext, stage: str) -> None:
+    """Mark a stage as current and record its start time in stage_timings.
+
+    Stages may run concurrently, so the timings are keyed by stage name and
+    kept next to stages_completed for measuring the achieved overlap.
+    """
+    now = datetime.now()
+    callback_context.state["current_date"] = now.strftime("%Y-%m-%d")
+    callback_context.state["pipeline_stage"] = stage
+
+    timings = callback_context.state.get("stage_timings", {})
+    timings[stage] = {"start": now.isoformat()}
+    callback_context.state["stage_timings"] = timings
+
+
+def _complete_stage(callback_context: CallbackContext, stage: str) -> None:
+    """Append a stage to stages_completed and record its end time."""
+    stages = callback_context.state.get("stages_completed", [])
+    stages.append(stage)
+    callback_context.state["stages_completed"] = stages
+
+    now = datetime.now()
+    timings = callback_context.state.get("stage_timings", {})
+    timing = timings.get(stage, {})
+    timing["end"] = now.isoformat()
+    if "start" in timing:
+        started = datetime.fromisoformat(timing["start"])
+        timing["duration_seconds"] = round((now - started).total_seconds(), 2)
+        metrics.observe(
+            "stage_duration_seconds", timing["duration_seconds"], stage=stage
+        )
+    timings[stage] = timing
+    callback_context.state["stage_timings"] = timings
+
+
+def _output_content(output: object) -> types.Content:
+    """Content for a callback that skips an agent, carrying the stage output.
+
+    LlmAgent writes the text of such Content to its output_key (validated
+    against its output_schema), so the text must be the output itself rather
+    than a status message.
+    """
+    text = output if isinstance(output, str) else json.dumps(output)
+    return types.Content(role="model", parts=[types.Part(text=text)])
+
+
+# ============================================================================
+# PIPELINE CALLBACKS
+# ============================================================================
+
+
+def before_pipeline(
+    callback_context: CallbackContext,
+) -> types.Content | None:
+    """Initialize pipeline tracking before any stage starts."""
+    callback_context.state["pipeline_start_time"] = datetime.now().isoformat()
+    # Don't reset stages_completed - intake stage may already be tracked
+    if "stages_completed" not in callback_context.state:
+        callback_context.state["stages_completed"] = []
+    callback_context.state["stage_timings"] = {}
+    callback_context.state["stage_models"] = {}
+    callback_context.state["context_compaction"] = {}
+
+    return None
+
+
+def after_pipeline(
+    callback_context: CallbackContext,
+) -> types.Content | None:
+    """Log the final pipeline summary, including how much stages overlapped.
+
+    Stages run concurrently and a failed one doesn't stop the others, so a
+    run with missing stages is logged as incomplete, listing them.
+    """
+    stages = callback_context.state.get("stages_completed", [])
+    timings = callback_context.state.get("stage_timings", {})
+
+    now = datetime.now()
+    callback_context.state["pipeline_end_time"] = now.isoformat()
+    start_time = callback_context.state.get("pipeline_start_time")
+    wall_seconds = (
+        (now - datetime.fromisoformat(start_time)).total_seconds()
+        if start_time
+        else 0.0
+    )
+    stage_seconds = sum(t.get("duration_seconds", 0.0) for t in timings.values())
+
+    missing = [stage for stage in PIPELINE_STAGES if stage not in stages]
+    logger.info("=" * 60)
+    if missing:
+        logger.warning(f"PIPELINE INCOMPLETE - missing stages: {missing}")
+    else:
+        logger.info("PIPELINE COMPLETE")
+    logger.info(f"  Stages completed: {stages}")
+    logger.info(f"  Total stages: {len(PIPELINE_STAGES) - len(missing)}/{len(PIPELINE_STAGES)}")
+    for stage, timing in timings.items():
+        logger.info(f"  {stage}: {timing.get('duration_seconds', '?')}s")
+    logger.info(
+        f"  Wall clock: {wall_seconds:.1f}s, sum of stages: {stage_seconds:.1f}s "
+        f"(overlap saved {max(stage_seconds - wall_seconds, 0.0):.1f}s)"
+    )
+    compaction = callback_context.state.get("context_compaction") or {}
+    if compaction:
+        per_stage = ", ".join(
+            f"{stage}: {entry.get('tokens_saved', 0)}"
+            for stage, entry in compaction.items()
+        )
+        saved = sum(entry.get("tokens_saved", 0) for entry in compaction.values())
+        logger.info(f"  Context compaction saved ~{saved} input tokens ({per_stage})")
+    logger.info("=" * 60)
+
+    return None
+
 
 # ============================================================================
 # BEFORE AGENT CALLBACKS
@@ -46,7 +179,7 @@ logger = logging.getLogger("LocationStrategyPipeline")
 def before_market_research(
     callback_context: CallbackContext,
 ) -> types.Content | None:
-    """Log start of market research phase and initialize pipeline tracking."""
+    """Log start of market research phase."""
     logger.info("=" * 60)
     logger.info("STAGE 1: MARKET RESEARCH - Starting")
     logger.info(
@@ -57,15 +190,8 @@ def before_market_research(
     )
     logger.info("=" * 60)
 
-    # Set current date for state injection in agent instruction
-    callback_context.state["current_date"] = datetime.now().strftime("%Y-%m-%d")
-
-    # Initialize pipeline tracking
-    callback_context.state["pipeline_stage"] = "market_research"
-    callback_context.state["pipeline_start_time"] = datetime.now().isoformat()
-    # Don't reset stages_completed - intake stage may already be tracked
-    if "stages_completed" not in callback_context.state:
-        callback_context.state["stages_completed"] = []
+    # Set current date for state injection and record the stage start time
+    _start_stage(callback_context, "market_research")
 
     return None  # Allow agent to proceed
 
@@ -79,17 +205,19 @@ def before_competitor_mapping(
     logger.info("  Using Google Maps Places API for real competitor data...")
     logger.info("=" * 60)
 
-    # Set current date for state injection in agent instruction
-    callback_context.state["current_date"] = datetime.now().strftime("%Y-%m-%d")
-    callback_context.state["pipeline_stage"] = "competitor_mapping"
+    # Set current date for state injection and record the stage start time
+    _start_stage(callback_context, "competitor_mapping")
 
     # Workaround for AG-UI middleware issue: initialize state variable
     # The middleware may end agent prematurely after tool calls, preventing output_key from being set
-    if "competitor_analysis" not in callback_context.state:
+    if not callback_context.state.get("competitor_analysis"):
         callback_context.state["competitor_analysis"] = (
             "Competitor data being collected via Google Maps API..."
         )
 
+    # Reference to this run's Places dataset (set by capture_competitor_places)
+    callback_context.state["competitor_dataset"] = None
+
     return None
 
 
@@ -102,12 +230,11 @@ def before_gap_analysis(
     logger.info("  Executing Python code for quantitative market analysis...")
     logger.info("=" * 60)
 
-    # Set current date for state injection in agent instruction
-    callback_context.state["current_date"] = datetime.now().strftime("%Y-%m-%d")
-    callback_context.state["pipeline_stage"] = "gap_analysis"
+    # Set current date for state injection and record the stage start time
+    _start_stage(callback_context, "gap_analysis")
 
     # Workaround for AG-UI middleware issue: initialize state variable
-    if "gap_analysis" not in callback_context.state:
+    if not callback_context.state.get("gap_analysis"):
         callback_context.state["gap_analysis"] = (
             "Gap analysis being computed..."
         )
@@ -125,9 +252,8 @@ def before_strategy_advisor(
     logger.info("  Generating structured LocationIntelligenceReport...")
     logger.info("=" * 60)
 
-    # Set current date for state injection in agent instruction
-    callback_context.state["current_date"] = datetime.now().strftime("%Y-%m-%d")
-    callback_context.state["pipeline_stage"] = "strategy_synthesis"
+    # Set current date for state injection and record the stage start time
+    _start_stage(callback_context, "strategy_synthesis")
 
     return None
 
@@ -141,9 +267,11 @@ def before_report_generator(
     logger.info("  Generating McKinsey/BCG style HTML executive report...")
     logger.info("=" * 60)
 
-    # Set current date for state injection in agent instruction
-    callback_context.state["current_date"] = datetime.now().strftime("%Y-%m-%d")
-    callback_context.state["pipeline_stage"] = "report_generation"
+    # Set current date for state injection and record the stage start time
+    _start_stage(callback_context, "report_generation")
+
+    # Partial HTML is published under this ID while the report streams in
+    callback_context.state["html_report_stream_id"] = uuid.uuid4().hex
 
     return None
 
@@ -157,9 +285,8 @@ def before_infographic_generator(
     logger.info("  Calling Gemini image generation API...")
     logger.info("=" * 60)
 
-    # Set current date for state injection in agent instruction
-    callback_context.state["current_date"] = datetime.now().strftime("%Y-%m-%d")
-    callback_context.state["pipeline_stage"] = "infographic_generation"
+    # Set current date for state injection and record the stage start time
+    _start_stage(callback_context, "infographic_generation")
 
     return None
 
@@ -173,9 +300,8 @@ def before_map_generator(
     logger.info("  Geocoding locations and building interactive Google Map...")
     logger.info("=" * 60)
 
-    # Set current date for state injection in agent instruction
-    callback_context.state["current_date"] = datetime.now().strftime("%Y-%m-%d")
-    callback_context.state["pipeline_stage"] = "map_generation"
+    # Set current date for state injection and record the stage start time
+    _start_stage(callback_context, "map_generation")
 
     return None
 
@@ -197,9 +323,7 @@ def after_market_research(
     )
 
     # Update stages completed
-    stages = callback_context.state.get("stages_completed", [])
-    stages.append("market_research")
-    callback_context.state["stages_completed"] = stages
+    _complete_stage(callback_context, "market_research")
 
     return None
 
@@ -215,9 +339,7 @@ def after_competitor_mapping(
         f"STAGE 2A: COMPLETE - Competitor analysis: {analysis_len} characters"
     )
 
-    stages = callback_context.state.get("stages_completed", [])
-    stages.append("competitor_mapping")
-    callback_context.state["stages_completed"] = stages
+    _complete_stage(callback_context, "competitor_mapping")
 
     return None
 
@@ -231,12 +353,17 @@ def after_gap_analysis(
 
     logger.info(f"STAGE 2B: COMPLETE - Gap analysis: {gap_len} characters")
 
-    # Extract Python code from the gap_analysis content first
-    extracted_code = _extract_python_code_from_content(gap)
+    # Code blocks indexed from this run's model responses (BuiltInCodeExecutor
+    # uses executable_code parts); taking them also releases the index entry
+    indexed_blocks = take_code_blocks(callback_context)
 
-    # Try to extract from invocation context (BuiltInCodeExecutor uses executable_code parts)
-    if not extracted_code:
-        extracted_code = _extract_code_from_invocation(callback_context)
+    # Prefer Python code shown in the gap_analysis content itself
+    extracted_code = "\n\n# ---\n\n".join(
+        fenced_python_blocks(gap if isinstance(gap, str) else "")
+    )
+    if not extracted_code and indexed_blocks:
+        logger.info(f"  Found {len(indexed_blocks)} code blocks from this run")
+        extracted_code = "\n\n# --- Next Code Block ---\n\n".join(indexed_blocks)
 
     if extracted_code:
         callback_context.state["gap_analysis_code"] = extracted_code
@@ -246,89 +373,12 @@ def after_gap_analysis(
     else:
         logger.info("  No Python code blocks found to extract")
 
-    stages = callback_context.state.get("stages_completed", [])
-    stages.append("gap_analysis")
-    callback_context.state["stages_completed"] = stages
+    _complete_stage(callback_context, "gap_analysis")
 
     return None
 
 
-def _extract_code_from_invocation(callback_context: CallbackContext) -> str:
-    """Extract Python code from invocation context session events."""
-    code_blocks = []
-
-    try:
-        # Access via the private _invocation_context as shown in ADK docs
-        invocation = getattr(
-            callback_context, "_invocation_context", None
-        ) or getattr(callback_context, "invocation_context", None)
-
-        if not invocation:
-            logger.debug("No invocation context available")
-            return ""
-
-        # Access session from invocation context
-        session = getattr(invocation, "session", None)
-        if not session:
-            logger.debug("No session in invocation context")
-            return ""
-
-        # Get events from session
-        events = getattr(session, "events", None) or []
-        logger.debug(f"Found {len(events)} events in session")
-
-        for event in events:
-            # Get content from event
-            content = getattr(event, "content", None)
-            if not content:
-                continue
-
-            # Get parts from content
-            parts = getattr(content, "parts", None) or []
-            for part in parts:
-                # Check for executable_code (Gemini native code execution)
-                exec_code = getattr(part, "executable_code", None)
-                if exec_code:
-                    code = getattr(exec_code, "code", None)
-                    if code and code.strip():
-                        code_blocks.append(code.strip())
-                        logger.debug(
-                            f"Found executable_code: {len(code)} chars"
-                        )
-
-        if code_blocks:
-            logger.info(
-                f"  Found {len(code_blocks)} code blocks from session events"
-            )
-
-    except Exception as e:
-        logger.warning(f"Error extracting code from invocation context: {e}")
-
-        logger.debug(traceback.format_exc())
-
-    return "\n\n# --- Next Code Block ---\n\n".join(code_blocks)
-
-
-def _extract_python_code_from_content(content: str) -> str:
-    """Extract Python code blocks from markdown content."""
-
-    if not content:
-        return ""
-
-    # Match fenced code blocks with python language specifier
-    code_blocks = []
-    pattern = r"```(?:python|py)\s*\n(.*?)```"
-    matches = re.findall(pattern, content, re.DOTALL | re.IGNORECASE)
-
-    for match in matches:
-        code = match.strip()
-        if code:
-            code_blocks.append(code)
-
-    return "\n\n# ---\n\n".join(code_blocks)
-
-
-def after_strategy_advisor(
+async def after_strategy_advisor(
     callback_context: CallbackContext,
 ) -> types.Content | None:
     """Log completion and save JSON artifact."""
@@ -348,16 +398,14 @@ def after_strategy_advisor(
             json_artifact = types.Part.from_bytes(
                 data=json_str.encode("utf-8"), mime_type="application/json"
             )
-            callback_context.save_artifact(
+            await callback_context.save_artifact(
                 "intelligence_report.json", json_artifact
             )
             logger.info("  Saved artifact: intelligence_report.json")
         except Exception as e:
             logger.warning(f"  Failed to save JSON artifact: {e}")
 
-    stages = callback_context.state.get("stages_completed", [])
-    stages.append("strategy_synthesis")
-    callback_context.state["stages_completed"] = stages
+    _complete_stage(callback_context, "strategy_synthesis")
 
     return None
 
@@ -375,9 +423,7 @@ def after_report_generator(
     logger.info("STAGE 4: COMPLETE - HTML report generation finished")
     logger.info("  (Artifact saved directly by generate_html_report tool)")
 
-    stages = callback_context.state.get("stages_completed", [])
-    stages.append("report_generation")
-    callback_context.state["stages_completed"] = stages
+    _complete_stage(callback_context, "report_generation")
 
     return None
 
@@ -395,9 +441,7 @@ def after_infographic_generator(
     logger.info("STAGE 5: COMPLETE - Infographic generation finished")
     logger.info("  (Artifact saved directly by generate_infographic tool)")
 
-    stages = callback_context.state.get("stages_completed", [])
-    stages.append("infographic_generation")
-    callback_context.state["stages_completed"] = stages
+    _complete_stage(callback_context, "infographic_generation")
 
     return None
 
@@ -409,15 +453,6 @@ def after_map_generator(
     logger.info("STAGE 6: COMPLETE - Interactive map generation finished")
     logger.info("  (Artifact saved directly by generate_interactive_map tool)")
 
-    stages = callback_context.state.get("stages_completed", [])
-    stages.append("map_generation")
-    callback_context.state["stages_completed"] = stages
-
-    # Log final pipeline summary
-    logger.info("=" * 60)
-    logger.info("PIPELINE COMPLETE")
-    logger.info(f"  Stages completed: {stages}")
-    logger.info(f"  Total stages: {len(stages)}/8")
-    logger.info("=" * 60)
+    _complete_stage(callback_context, "map_generation")
 
     return None
@@ -0,0 +1,55 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Served-model tracking callbacks.
+
+add_model_tracking() wraps a stage's LlmAgent so the model that actually
+answered (tagged by RoutedGemini, see model_router.py) is recorded in
+state["stage_models"][stage][agent_name]. Tools that call Gemini directly
+record under their own name, so e.g. report_generation shows both the
+agent's and generate_html_report's model.
+"""
+
+from typing import TYPE_CHECKING
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmResponse
+
+from ..model_router import record_served_model, served_model
+from .checkpoint_callbacks import _as_list
+
+if TYPE_CHECKING:
+    from ..pipeline_scheduler import PipelineStage
+
+
+def add_model_tracking(stage: "PipelineStage") -> None:
+    """Wrap a stage's LlmAgent to record which model served it."""
+
+    def track_served_model(
+        callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> LlmResponse | None:
+        model = served_model(llm_response)
+        if model and not llm_response.partial:
+            record_served_model(
+                callback_context.state, stage.name, callback_context.agent_name, model
+            )
+        return None
+
+    agent = stage.agent
+    if not hasattr(agent, "after_model_callback"):
+        return  # not an LlmAgent
+    agent.after_model_callback = [
+        *_as_list(agent.after_model_callback),
+        track_served_model,
+    ]
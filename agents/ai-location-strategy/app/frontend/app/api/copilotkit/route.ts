@@ -15,17 +15,28 @@ import { NextRequest } from "next/server";
 // Use empty adapter since we're proxying to a remote AG-UI backend
 const serviceAdapter = new ExperimentalEmptyAdapter();
 
-// Use LangGraphHttpAgent with agents configuration for AG-UI protocol compatibility
-// The agent name must match the app_name in the backend ADKAgent configuration
-const runtime = new CopilotRuntime({
-  agents: {
-    ai_location_strategy: new LangGraphHttpAgent({
-      url: process.env.REMOTE_ACTION_URL || "http://localhost:8000",
-    }),
-  },
-});
+// The backend identifies the user by its session cookie (or an auth proxy
+// header), so they are forwarded with each request.
+const FORWARDED_HEADERS = ["cookie", process.env.AUTH_HEADER?.toLowerCase()];
 
 export const POST = async (req: NextRequest) => {
+  const headers: Record<string, string> = {};
+  for (const name of FORWARDED_HEADERS) {
+    const value = name && req.headers.get(name);
+    if (name && value) headers[name] = value;
+  }
+
+  // Use LangGraphHttpAgent with agents configuration for AG-UI protocol compatibility
+  // The agent name must match the app_name in the backend ADKAgent configuration
+  const runtime = new CopilotRuntime({
+    agents: {
+      ai_location_strategy: new LangGraphHttpAgent({
+        url: process.env.REMOTE_ACTION_URL || "http://localhost:8000",
+        headers,
+      }),
+    },
+  });
+
   const { handleRequest } = copilotRuntimeNextJSAppRouterEndpoint({
     runtime,
     serviceAdapter,
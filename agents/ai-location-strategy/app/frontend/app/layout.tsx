@@ -1,8 +1,8 @@
 import type { Metadata } from "next";
 import { Inter } from "next/font/google";
-import { CopilotKit } from "@copilotkit/react-core";
 import "@copilotkit/react-ui/styles.css";
 import "./globals.css";
+import { CopilotProvider } from "@/components/CopilotProvider";
 
 const inter = Inter({ subsets: ["latin"] });
 
@@ -21,13 +21,7 @@ export default function RootLayout({
   return (
     <html lang="en">
       <body className={inter.className}>
-        <CopilotKit
-          runtimeUrl="/api/copilotkit"
-          agent="ai_location_strategy"
-          showDevConsole={false}
-        >
-          {children}
-        </CopilotKit>
+        <CopilotProvider>{children}</CopilotProvider>
       </body>
     </html>
   );
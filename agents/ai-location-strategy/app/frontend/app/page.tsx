@@ -9,6 +9,7 @@ import { CompetitorCard } from "@/components/CompetitorCard";
 import { MarketCard } from "@/components/MarketCard";
 import { AlternativeLocations } from "@/components/AlternativeLocations";
 import { ArtifactViewer } from "@/components/ArtifactViewer";
+import { artifactSource, imageSource } from "@/lib/artifacts";
 import type { AgentState } from "@/lib/types";
 
 const EXAMPLES: Record<"retail" | "datacenter", string> = {
@@ -185,13 +186,16 @@ export default function Home() {
               </div>
 
               {/* Artifact Viewer - HTML Report, Infographic, and Interactive Map */}
-              {(state.html_report_content || state.infographic_base64 || state.map_html_content) && (
-                <ArtifactViewer
-                  htmlReport={state.html_report_content}
-                  infographic={state.infographic_base64}
-                  mapHtml={state.map_html_content}
-                />
-              )}
+              <ArtifactViewer
+                htmlReport={artifactSource(state.html_report_artifact, state.html_report_content)}
+                infographic={imageSource(
+                  state.infographic_artifact,
+                  state.infographic_base64,
+                  state.infographic_thumbnail_artifact,
+                  state.infographic_thumbnail_base64
+                )}
+                mapHtml={artifactSource(state.map_artifact, state.map_html_content)}
+              />
             </div>
           )}
 
@@ -0,0 +1,114 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Server-side user identity for the AG-UI backend.
+
+Sessions and artifacts are stored per user, so the user ID must not come
+from the client. It is taken from, in order:
+
+- the header named by LOCATION_STRATEGY_AUTH_HEADER, set by an
+  authenticating proxy in front of the backend (e.g.
+  X-Goog-Authenticated-User-Email behind IAP), when that is configured, or
+- otherwise a session cookie issued by POST /auth/session: a random user ID
+  signed with LOCATION_STRATEGY_SESSION_SECRET (HMAC-SHA256), so clients
+  can't choose or forge another user's ID.
+
+The two modes don't mix: behind a proxy, requests that bypassed it carry no
+header and are refused rather than issued a cookie. Requests without an
+identity are refused with 401.
+"""
+
+import hashlib
+import hmac
+import logging
+import re
+import secrets
+import uuid
+
+from fastapi import HTTPException, Request, Response
+
+from app.config import AUTH_HEADER, SESSION_COOKIE, SESSION_COOKIE_MAX_AGE, SESSION_SECRET
+
+logger = logging.getLogger("LocationStrategyPipeline")
+
+USER_ID_PATTERN = re.compile(r"[A-Za-z0-9_.@:-]{1,128}")
+
+if SESSION_SECRET:
+    _secret = SESSION_SECRET.encode("utf-8")
+else:
+    # Cookies only verify on this process; several workers need the setting
+    _secret = secrets.token_bytes(32)
+    logger.warning(
+        "LOCATION_STRATEGY_SESSION_SECRET is not set; session cookies are "
+        "only valid for this worker until it restarts"
+    )
+
+
+def _signature(user_id: str) -> str:
+    return hmac.new(_secret, user_id.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def _cookie_user_id(value: str | None) -> str | None:
+    """The user ID of a session cookie, or None if it isn't validly signed."""
+    if not value or "." not in value:
+        return None
+    user_id, signature = value.rsplit(".", 1)
+    if not hmac.compare_digest(signature, _signature(user_id)):
+        return None
+    return user_id
+
+
+def request_user_id(request: Request) -> str | None:
+    """The authenticated user ID of a request, or None."""
+    if AUTH_HEADER:
+        user_id = request.headers.get(AUTH_HEADER)
+        if user_id and USER_ID_PATTERN.fullmatch(user_id):
+            return user_id
+        return None
+    return _cookie_user_id(request.cookies.get(SESSION_COOKIE))
+
+
+def authenticated_user(request: Request) -> str:
+    """FastAPI dependency: the request's user ID.
+
+    Raises:
+        HTTPException: 401 if the request carries no valid identity.
+    """
+    user_id = request_user_id(request)
+    if user_id is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return user_id
+
+
+def start_session(request: Request, response: Response) -> str:
+    """Return the request's user ID, issuing a session cookie if it has none.
+
+    Raises:
+        HTTPException: 401 if LOCATION_STRATEGY_AUTH_HEADER is set and the
+            request carries no valid user in that header.
+    """
+    if AUTH_HEADER:
+        return authenticated_user(request)
+    user_id = request_user_id(request)
+    if user_id is None:
+        user_id = f"user-{uuid.uuid4().hex}"
+    response.set_cookie(
+        SESSION_COOKIE,
+        f"{user_id}.{_signature(user_id)}",
+        max_age=SESSION_COOKIE_MAX_AGE,
+        httponly=True,
+        samesite="lax",
+        secure=request.url.scheme == "https",
+    )
+    return user_id
@@ -25,18 +25,36 @@ Usage:
     # Or with uv:
     uv pip install -r requirements.txt
     uv run python main.py
+
+    # Several workers need persistent sessions and artifacts (app/services.py):
+    LOCATION_STRATEGY_SESSION_DB=sqlite+aiosqlite:///./location_strategy.db \
+        WEB_CONCURRENCY=4 python main.py
+
+Requests are routed by user. The user ID is established server-side
+(auth.py): from an authenticating proxy's header, or from the signed session
+cookie POST /auth/session issues. Requests without one get 401.
 """
 
+import asyncio
+import hashlib
+import json
 import os
+import re
 import sys
+import tempfile
+import uuid
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 import uvicorn
 
 # Import AG-UI middleware (CopilotKit official package)
+from ag_ui.core import BaseEvent, RunAgentInput
 from ag_ui_adk import ADKAgent, add_adk_fastapi_endpoint
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Header, HTTPException, Request, Response
+from fastapi.responses import HTMLResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 # Add app directory to path for imports
@@ -47,27 +65,106 @@ sys.path.insert(0, str(project_root))
 
 # Import the EXISTING root_agent - no modifications needed
 from app.agent import root_agent
+from app.batch_runner import BatchResult, parse_batch_csv, rank_results, run_batch
+from app.config import (
+    CACHE_DIR,
+    EVENT_LOOP_SAMPLE_SECONDS,
+    MAX_CONCURRENT_RUNS,
+    STATE_DELTAS,
+)
+from app.metrics import metrics, monitor_event_loop_lag
+from app.model_router import model_router
+from app.services import (
+    create_artifact_service,
+    create_session_service,
+    persistent_services_configured,
+)
+from app.tools.competitor_dataset import (
+    COMPETITOR_DATASET_ARTIFACT,
+    parquet_to_table,
+)
+from app.tools.html_report_generator import get_report_stream
+from auth import authenticated_user, start_session
+from state_deltas import StateDeltaEncoder
 
 # Load environment variables from app/.env
 env_path = app_dir / ".env"
 if env_path.exists():
     load_dotenv(env_path)
 
+APP_NAME = "ai_location_strategy"
+# Outside the source tree; GET /batch/{job_id} is the way to read the status
+BATCH_OUTPUT_DIR = Path(
+    os.environ.get("BATCH_OUTPUT_DIR")
+    or Path(CACHE_DIR or tempfile.gettempdir()) / "batch_output"
+)
+
+# In memory unless LOCATION_STRATEGY_SESSION_DB is set. The artifact service
+# is shared with the endpoints below so they can serve session artifacts.
+session_service = create_session_service()
+artifact_service = create_artifact_service()
+
+
+async def _authenticated_state(request: Request, run_input: RunAgentInput) -> dict:
+    """AG-UI request hook: refuse unauthenticated requests, record the user.
+
+    The returned state overrides whatever the client sent under user_id.
+
+    Raises:
+        HTTPException: 401 if the request carries no valid identity.
+    """
+    return {"user_id": authenticated_user(request)}
+
+
+def _request_user_id(run_input: RunAgentInput) -> str:
+    """User ID of an AG-UI run, as set by _authenticated_state."""
+    return run_input.state["user_id"]
+
+
+class DeltaEncodingADKAgent(ADKAgent):
+    """ADKAgent that streams state as minimal JSON Patch diffs.
+
+    Each run's STATE_DELTA/STATE_SNAPSHOT events are diffed against the state
+    the client sent with the run plus everything streamed since, with a
+    periodic full snapshot (state_deltas.py).
+    """
+
+    async def run(self, input: RunAgentInput) -> AsyncGenerator[BaseEvent, None]:
+        encoder = StateDeltaEncoder(input.state)
+        async for event in super().run(input):
+            encoded = encoder.encode(event)
+            if encoded is not None:
+                yield encoded
+
+
 # Create AG-UI wrapper around the existing ADK agent
 # Increase timeout for Strategy Synthesis which uses extended thinking
-adk_agent = ADKAgent(
+adk_agent = (DeltaEncodingADKAgent if STATE_DELTAS else ADKAgent)(
     adk_agent=root_agent,
-    app_name="ai_location_strategy",
-    user_id="demo_user",
+    app_name=APP_NAME,
+    user_id_extractor=_request_user_id,
+    session_service=session_service,
+    artifact_service=artifact_service,
+    max_concurrent_executions=MAX_CONCURRENT_RUNS,
     execution_timeout_seconds=1800,  # 30 minutes for full pipeline
     tool_timeout_seconds=600,  # 10 minutes for individual tools
 )
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Sample event-loop lag (served at /metrics) while the server runs."""
+    monitor = asyncio.create_task(monitor_event_loop_lag(EVENT_LOOP_SAMPLE_SECONDS))
+    yield
+    monitor.cancel()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Retail Location Strategy API",
     description="AG-UI compatible API for the Retail AI Location Strategy agent",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS configuration for frontend
@@ -86,16 +183,284 @@ app.add_middleware(
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "agent": "LocationStrategyPipeline"}
+    return {
+        "status": "healthy",
+        "agent": "LocationStrategyPipeline",
+        # Circuit state and latency of every model called so far
+        "models": model_router.snapshot(),
+    }
+
+
+@app.post("/auth/session")
+async def auth_session(request: Request, response: Response):
+    """Start (or resume) a browser session: sets the signed session cookie.
+
+    Behind an authenticating proxy, returns the proxy's user instead.
+    """
+    return {"user_id": start_session(request, response)}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Per-stage latency, token, tool-call and retry metrics (Prometheus).
+
+    Histograms cover stage durations, model latency per stage and model,
+    tool latency per stage and tool, and this server's event-loop lag;
+    *_quantiles gauges give the p50/p95 of recent calls in this process.
+    """
+    return PlainTextResponse(
+        metrics.render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@app.get("/report-stream/{stream_id}", response_class=HTMLResponse)
+async def report_stream(stream_id: str):
+    """Partial HTML of a report that is still being generated.
+
+    The stream ID is published in state (html_report_stream_id) when report
+    generation starts; once the final report is in state this returns 404.
+    The partial HTML is held in the memory of the worker running the
+    pipeline, so with WEB_CONCURRENCY > 1 other workers also return 404.
+    """
+    html = get_report_stream(stream_id)
+    if html is None:
+        raise HTTPException(status_code=404, detail="No report in progress")
+    return HTMLResponse(html, headers={"Cache-Control": "no-store"})
+
+
+@app.get("/datasets/{session_id}/competitors")
+async def competitor_dataset(
+    session_id: str,
+    version: int | None = None,
+    user_id: str = Depends(authenticated_user),
+):
+    """Competitor dataset of a session of the requesting user, as columnar JSON.
+
+    The Parquet artifact is referenced by state["competitor_dataset"]
+    (session_id and version); without a version the latest is returned.
+    """
+    part = await artifact_service.load_artifact(
+        app_name=APP_NAME,
+        user_id=user_id,
+        session_id=session_id,
+        filename=COMPETITOR_DATASET_ARTIFACT,
+        version=version,
+    )
+    if part is None or part.inline_data is None:
+        raise HTTPException(status_code=404, detail="No competitor dataset")
+    table = parquet_to_table(part.inline_data.data)
+    return {"rows": table.num_rows, "columns": table.to_pydict()}
+
+
+def _byte_range(header: str, size: int) -> tuple[int, int] | None:
+    """Parse a single-range "bytes=" header into inclusive (start, end).
+
+    Returns None for headers that aren't a single byte range (the full
+    content is served then).
+
+    Raises:
+        HTTPException: 416 if the range can't be satisfied.
+    """
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:  # suffix range: the last N bytes
+        start, end = max(size - int(last), 0), size - 1
+    if start > end or start >= size:
+        raise HTTPException(
+            status_code=416,
+            detail="Range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, end
+
+
+@app.get("/artifacts/{session_id}/{artifact_name}")
+async def session_artifact(
+    session_id: str,
+    artifact_name: str,
+    version: int | None = None,
+    download: bool = False,
+    user_id: str = Depends(authenticated_user),
+    range_header: str | None = Header(None, alias="Range"),
+    if_none_match: str | None = Header(None, alias="If-None-Match"),
+):
+    """Bytes of an artifact of the requesting user's session, e.g. the report
+    a state reference names.
+
+    State references ({artifact_name, version, session_id, ...}) pin a
+    version, whose bytes never change: those responses are cacheable for
+    good. Supports conditional requests (ETag / If-None-Match) and single
+    byte ranges.
+    """
+    part = await artifact_service.load_artifact(
+        app_name=APP_NAME,
+        user_id=user_id,
+        session_id=session_id,
+        filename=artifact_name,
+        version=version,
+    )
+    if part is None or part.inline_data is None:
+        raise HTTPException(status_code=404, detail="No such artifact")
+    data = part.inline_data.data
+    etag = f'"{hashlib.sha256(data).hexdigest()[:32]}"'
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": (
+            "private, max-age=31536000, immutable"
+            if version is not None
+            else "private, no-cache"
+        ),
+    }
+    if download:
+        headers["Content-Disposition"] = f'attachment; filename="{artifact_name}"'
+    media_type = part.inline_data.mime_type or "application/octet-stream"
+
+    if if_none_match and etag in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    byte_range = _byte_range(range_header, len(data)) if range_header else None
+    if byte_range is None:
+        return Response(data, media_type=media_type, headers=headers)
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+    return Response(
+        data[start : end + 1],
+        status_code=206,
+        media_type=media_type,
+        headers=headers,
+    )
+
+
+# Batch jobs started by this worker, by ID: {"user_id", "status", "total",
+# "results", "output_dir", "task"}. Each job's view is also written to
+# status.json in its output directory, so any worker sharing BATCH_OUTPUT_DIR
+# can report it. Jobs are only visible to the user who started them.
+batch_jobs: dict[str, dict] = {}
+
+
+def _batch_job_view(job_id: str, job: dict) -> dict:
+    return {
+        "job_id": job_id,
+        "user_id": job["user_id"],
+        "status": job["status"],
+        "total": job["total"],
+        "done": len(job["results"]),
+        "output_dir": job["output_dir"],
+        "ranking": [
+            {"rank": rank, **result.ranking_record()}
+            for rank, result in enumerate(rank_results(job["results"]), start=1)
+        ],
+    }
+
+
+@app.post("/batch", status_code=202)
+async def start_batch(
+    request: Request,
+    prompt_style: str = "retail",
+    user_id: str = Depends(authenticated_user),
+):
+    """Start a batch portfolio run from a CSV request body.
+
+    The CSV needs target_location and business_type columns (see
+    app/batch_runner.py). Poll GET /batch/{job_id} for progress and the
+    ranking; per-row outputs are written under BATCH_OUTPUT_DIR.
+    """
+    if any(job["status"] == "running" for job in batch_jobs.values()):
+        raise HTTPException(status_code=409, detail="A batch is already running")
+    try:
+        rows = parse_batch_csv((await request.body()).decode("utf-8-sig"), prompt_style)
+    except (UnicodeDecodeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    if not rows:
+        raise HTTPException(status_code=400, detail="Batch CSV has no rows")
+
+    job_id = uuid.uuid4().hex
+    job = {
+        "user_id": user_id,
+        "status": "running",
+        "total": len(rows),
+        "results": [],
+        "output_dir": str(BATCH_OUTPUT_DIR / job_id),
+    }
+
+    def write_status() -> None:
+        status_path = Path(job["output_dir"]) / "status.json"
+        status_path.parent.mkdir(parents=True, exist_ok=True)
+        status_path.write_text(
+            json.dumps(_batch_job_view(job_id, job)), encoding="utf-8"
+        )
+
+    def on_result(result: BatchResult, done: int, total: int) -> None:
+        job["results"].append(result)
+        write_status()
+
+    async def run() -> None:
+        try:
+            await run_batch(rows, job["output_dir"], on_result=on_result)
+            job["status"] = "done"
+        except Exception as e:
+            job["status"] = f"failed: {e}"
+        write_status()
+
+    batch_jobs[job_id] = job
+    write_status()
+    job["task"] = asyncio.create_task(run())
+    return _batch_job_view(job_id, job)
+
+
+@app.get("/batch/{job_id}")
+async def batch_status(job_id: str, user_id: str = Depends(authenticated_user)):
+    """Progress and current ranking of one of the user's batch jobs.
+
+    Other users' jobs get 404, like unknown ones.
+    """
+    job = batch_jobs.get(job_id)
+    if job is not None:
+        view = _batch_job_view(job_id, job)
+    else:
+        # Started by another worker
+        status_path = BATCH_OUTPUT_DIR / job_id / "status.json"
+        if not re.fullmatch(r"[0-9a-f]{32}", job_id) or not status_path.exists():
+            raise HTTPException(status_code=404, detail="Unknown batch job")
+        view = json.loads(status_path.read_text(encoding="utf-8"))
+    if view.get("user_id") != user_id:
+        raise HTTPException(status_code=404, detail="Unknown batch job")
+    return view
 
 
 # Add AG-UI endpoint at root path
 # This handles all AG-UI protocol communication
-add_adk_fastapi_endpoint(app, adk_agent, path="/")
+add_adk_fastapi_endpoint(
+    app, adk_agent, path="/", extract_state_from_request=_authenticated_state
+)
 
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", "8000"))
-    print(f"Starting AG-UI server at http://0.0.0.0:{port}")
+    workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+    if workers > 1 and not persistent_services_configured():
+        print(
+            "WEB_CONCURRENCY > 1 needs LOCATION_STRATEGY_SESSION_DB (in-memory "
+            "sessions can't be shared between workers); starting 1 worker"
+        )
+        workers = 1
+    print(f"Starting AG-UI server at http://0.0.0.0:{port} ({workers} worker(s))")
     print("Frontend should connect to this URL")
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    if workers == 1:
+        uvicorn.run(app, host="0.0.0.0", port=port)
+    else:
+        # Workers import the app themselves, so it is passed by name
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=port,
+            workers=workers,
+            app_dir=str(Path(__file__).parent),
+        )
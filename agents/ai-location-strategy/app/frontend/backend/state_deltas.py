@@ -0,0 +1,190 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Minimal JSON Patch (RFC 6902) encoding of AG-UI state updates.
+
+ag_ui_adk turns every ADK state delta into a STATE_DELTA that re-sends each
+changed top-level key whole (e.g. all of stage_timings when one stage
+finishes), and ends every run with a STATE_SNAPSHOT of the entire session
+state: findings, reports and all. StateDeltaEncoder re-encodes that stream
+for one run:
+
+- it tracks the state the client holds, starting from the state the client
+  sent with the run (RunAgentInput.state, i.e. what it has applied) and
+  advancing with every update sent on the ordered SSE stream;
+- each STATE_DELTA or STATE_SNAPSHOT becomes a STATE_DELTA with the diff
+  from that state: nested add/replace/remove operations, with list appends
+  as "/-" adds. Updates that change nothing are dropped;
+- a full STATE_SNAPSHOT is still sent every STATE_RESYNC_EVENTS deltas or
+  STATE_RESYNC_SECONDS, and whenever the patch would be larger than the
+  snapshot, so a client that missed or failed to apply a patch recovers.
+
+Strings are replaced whole (JSON Patch has no substring operation).
+"""
+
+import copy
+import json
+import time
+from collections.abc import Callable
+from typing import Any
+
+from ag_ui.core import BaseEvent, EventType, StateDeltaEvent, StateSnapshotEvent
+
+from app.config import STATE_RESYNC_EVENTS, STATE_RESYNC_SECONDS
+from app.metrics import metrics
+
+
+def _pointer(path: str, key: Any) -> str:
+    """Append key to a JSON Pointer, escaping "~" and "/"."""
+    return f"{path}/{str(key).replace('~', '~0').replace('/', '~1')}"
+
+
+def _same(old: Any, new: Any) -> bool:
+    return old is new or (type(old) is type(new) and old == new)
+
+
+def json_patch(old: Any, new: Any, path: str = "") -> list[dict[str, Any]]:
+    """RFC 6902 operations that turn old into new.
+
+    Args:
+        old: The document the client holds.
+        new: The document it should hold.
+        path: JSON Pointer of old/new within the whole document.
+
+    Returns:
+        The operations, empty if old equals new.
+    """
+    if _same(old, new):
+        return []
+    if isinstance(old, dict) and isinstance(new, dict):
+        operations = [
+            {"op": "remove", "path": _pointer(path, key)} for key in old if key not in new
+        ]
+        for key, value in new.items():
+            if key in old:
+                operations.extend(json_patch(old[key], value, _pointer(path, key)))
+            else:
+                operations.append({"op": "add", "path": _pointer(path, key), "value": value})
+        return operations
+    if isinstance(old, list) and isinstance(new, list):
+        if len(new) >= len(old) and new[: len(old)] == old:
+            return [{"op": "add", "path": f"{path}/-", "value": value} for value in new[len(old):]]
+        if len(new) == len(old):
+            operations = []
+            for index, (before, after) in enumerate(zip(old, new, strict=True)):
+                operations.extend(json_patch(before, after, _pointer(path, index)))
+            return operations
+    return [{"op": "replace", "path": path, "value": new}]
+
+
+def apply_patch(state: dict, operations: list[dict[str, Any]]) -> None:
+    """Apply the add/replace/remove operations of a JSON Patch in place.
+
+    Raises:
+        ValueError: For other operations (move, copy, test).
+    """
+    for operation in operations:
+        if operation["op"] not in ("add", "replace", "remove"):
+            raise ValueError(f"Unsupported JSON Patch operation {operation['op']}")
+        tokens = [
+            token.replace("~1", "/").replace("~0", "~")
+            for token in operation.get("path", "").lstrip("/").split("/")
+        ]
+        target: Any = state
+        for token in tokens[:-1]:
+            target = target[int(token) if isinstance(target, list) else token]
+        key = tokens[-1]
+        if isinstance(target, list):
+            index = len(target) if key == "-" else int(key)
+            if operation["op"] == "remove":
+                del target[index]
+            elif operation["op"] == "add":
+                target.insert(index, operation["value"])
+            else:
+                target[index] = operation["value"]
+        elif operation["op"] == "remove":
+            target.pop(key, None)
+        else:
+            target[key] = operation["value"]
+
+
+def _size(value: Any) -> int:
+    return len(json.dumps(value, default=str))
+
+
+class StateDeltaEncoder:
+    """Re-encodes the state events of one AG-UI run as diffs (see module doc)."""
+
+    def __init__(
+        self,
+        client_state: Any,
+        resync_events: int = STATE_RESYNC_EVENTS,
+        resync_seconds: float = STATE_RESYNC_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.client_state: dict = (
+            copy.deepcopy(client_state) if isinstance(client_state, dict) else {}
+        )
+        self.resync_events = resync_events
+        self.resync_seconds = resync_seconds
+        self.clock = clock
+        self.deltas_since_snapshot = 0
+        self.last_snapshot = clock()
+
+    def _resync_due(self) -> bool:
+        return (
+            self.deltas_since_snapshot >= self.resync_events
+            or self.clock() - self.last_snapshot >= self.resync_seconds
+        )
+
+    def encode(self, event: BaseEvent) -> BaseEvent | None:
+        """The event to send instead of event, or None if it changes nothing.
+
+        Events other than STATE_DELTA and STATE_SNAPSHOT are returned as-is.
+        """
+        if isinstance(event, StateSnapshotEvent):
+            original = event.snapshot
+            state = copy.deepcopy(event.snapshot) if isinstance(event.snapshot, dict) else {}
+        elif isinstance(event, StateDeltaEvent):
+            original = [
+                op.model_dump(by_alias=True) if hasattr(op, "model_dump") else op
+                for op in event.delta
+            ]
+            state = copy.deepcopy(self.client_state)
+            try:
+                apply_patch(state, copy.deepcopy(original))
+            except (KeyError, IndexError, TypeError, ValueError):
+                # Not applicable to the tracked state: pass it on and resync
+                self.deltas_since_snapshot = self.resync_events
+                return event
+        else:
+            return event
+
+        metrics.inc("state_stream_bytes_total", _size(original), stream="original")
+        patch = json_patch(self.client_state, state)
+        if not patch:
+            return None
+        self.client_state = state
+
+        patch_bytes = _size(patch)
+        resync = self._resync_due()
+        # Only large patches can outgrow the snapshot
+        if resync or (patch_bytes > 1024 and patch_bytes >= _size(state)):
+            self.deltas_since_snapshot = 0
+            self.last_snapshot = self.clock()
+            metrics.inc("state_stream_bytes_total", _size(state), stream="sent")
+            return StateSnapshotEvent(type=EventType.STATE_SNAPSHOT, snapshot=state)
+        self.deltas_since_snapshot += 1
+        metrics.inc("state_stream_bytes_total", patch_bytes, stream="sent")
+        return StateDeltaEvent(type=EventType.STATE_DELTA, delta=patch)
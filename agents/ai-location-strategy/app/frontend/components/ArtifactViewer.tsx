@@ -1,16 +1,20 @@
 "use client";
 
 import { useState } from "react";
+import { downloadArtifact, type ArtifactSource } from "@/lib/artifacts";
+import { ProgressiveImage } from "./ProgressiveImage";
 
 interface ArtifactViewerProps {
-  htmlReport?: string;
-  infographic?: string;
-  mapHtml?: string;
+  htmlReport?: ArtifactSource;
+  infographic?: ArtifactSource;
+  mapHtml?: ArtifactSource;
 }
 
 /**
  * ArtifactViewer provides a tabbed interface to view the generated
  * HTML executive report, infographic image, and interactive map.
+ * Content is loaded from the backend when the state holds artifact
+ * references, so it is only fetched once its tab is opened.
  */
 export function ArtifactViewer({ htmlReport, infographic, mapHtml }: ArtifactViewerProps) {
   const [activeTab, setActiveTab] = useState<"report" | "infographic" | "map">("report");
@@ -68,22 +72,15 @@ export function ArtifactViewer({ htmlReport, infographic, mapHtml }: ArtifactVie
           <div className="space-y-4">
             <div className="flex justify-end">
               <button
-                onClick={() => {
-                  const blob = new Blob([htmlReport], { type: "text/html" });
-                  const url = URL.createObjectURL(blob);
-                  const a = document.createElement("a");
-                  a.href = url;
-                  a.download = "executive_report.html";
-                  a.click();
-                  URL.revokeObjectURL(url);
-                }}
+                onClick={() => downloadArtifact(htmlReport, "executive_report.html", "text/html")}
                 className="px-3 py-1.5 text-sm bg-blue-500 text-white rounded-lg hover:bg-blue-600 transition-colors"
               >
                 Download HTML
               </button>
             </div>
             <iframe
-              srcDoc={htmlReport}
+              src={htmlReport.url}
+              srcDoc={htmlReport.url ? undefined : htmlReport.content}
               className="w-full h-[600px] border rounded-lg"
               title="Executive Report"
               sandbox="allow-same-origin"
@@ -95,15 +92,15 @@ export function ArtifactViewer({ htmlReport, infographic, mapHtml }: ArtifactVie
           <div className="space-y-4">
             <div className="flex justify-end">
               <a
-                href={infographic}
-                download="infographic.png"
+                href={infographic.downloadUrl || infographic.content}
+                download={infographic.filename || "infographic"}
                 className="px-3 py-1.5 text-sm bg-blue-500 text-white rounded-lg hover:bg-blue-600 transition-colors"
               >
                 Download Image
               </a>
             </div>
-            <img
-              src={infographic}
+            <ProgressiveImage
+              source={infographic}
               alt="Location Strategy Infographic"
               className="w-full rounded-lg shadow-sm"
             />
@@ -114,22 +111,15 @@ export function ArtifactViewer({ htmlReport, infographic, mapHtml }: ArtifactVie
           <div className="space-y-4">
             <div className="flex justify-end">
               <button
-                onClick={() => {
-                  const blob = new Blob([mapHtml], { type: "text/html" });
-                  const url = URL.createObjectURL(blob);
-                  const a = document.createElement("a");
-                  a.href = url;
-                  a.download = "interactive_map.html";
-                  a.click();
-                  URL.revokeObjectURL(url);
-                }}
+                onClick={() => downloadArtifact(mapHtml, "interactive_map.html", "text/html")}
                 className="px-3 py-1.5 text-sm bg-blue-500 text-white rounded-lg hover:bg-blue-600 transition-colors"
               >
                 Download HTML
               </button>
             </div>
             <iframe
-              srcDoc={mapHtml}
+              src={mapHtml.url}
+              srcDoc={mapHtml.url ? undefined : mapHtml.content}
               className="w-full h-[600px] border rounded-lg"
               title="Interactive Map"
               sandbox="allow-same-origin allow-scripts"
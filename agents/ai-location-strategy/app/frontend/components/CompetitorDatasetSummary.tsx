@@ -0,0 +1,40 @@
+"use client";
+
+import { useEffect, useState } from "react";
+import type { ArtifactRef } from "@/lib/types";
+import {
+  fetchCompetitorDataset,
+  summarizeCompetitorDataset,
+} from "@/lib/competitorDataset";
+
+interface CompetitorDatasetSummaryProps {
+  datasetRef: ArtifactRef;
+  fallback: string;
+}
+
+/**
+ * Summary line computed from the structured competitor dataset.
+ * Shows the fallback (text-derived) summary until the dataset has loaded.
+ */
+export function CompetitorDatasetSummary({
+  datasetRef,
+  fallback,
+}: CompetitorDatasetSummaryProps) {
+  const [summary, setSummary] = useState<string | null>(null);
+
+  useEffect(() => {
+    let cancelled = false;
+    fetchCompetitorDataset(datasetRef)
+      .then((dataset) => {
+        if (dataset && !cancelled) setSummary(summarizeCompetitorDataset(dataset));
+      })
+      .catch(() => {
+        // Keep the fallback summary
+      });
+    return () => {
+      cancelled = true;
+    };
+  }, [datasetRef.session_id, datasetRef.version]);
+
+  return <p className="text-gray-700 text-sm font-medium">{summary ?? fallback}</p>;
+}
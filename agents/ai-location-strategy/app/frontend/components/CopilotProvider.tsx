@@ -0,0 +1,29 @@
+"use client";
+
+import { useEffect, useState } from "react";
+import { CopilotKit } from "@copilotkit/react-core";
+import { startSession } from "@/lib/user";
+
+/**
+ * CopilotKit provider. The backend keys sessions and artifacts by the user of
+ * its session cookie, so the session is started before the first run.
+ */
+export function CopilotProvider({ children }: { children: React.ReactNode }) {
+  const [ready, setReady] = useState(false);
+
+  useEffect(() => {
+    startSession().then(() => setReady(true));
+  }, []);
+
+  if (!ready) return null;
+
+  return (
+    <CopilotKit
+      runtimeUrl="/api/copilotkit"
+      agent="ai_location_strategy"
+      showDevConsole={false}
+    >
+      {children}
+    </CopilotKit>
+  );
+}
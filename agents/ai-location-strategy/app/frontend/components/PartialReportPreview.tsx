@@ -0,0 +1,59 @@
+"use client";
+
+import { useEffect, useState } from "react";
+
+const BACKEND_URL = process.env.NEXT_PUBLIC_BACKEND_URL || "http://localhost:8000";
+const POLL_INTERVAL_MS = 2000;
+
+interface PartialReportPreviewProps {
+  streamId: string;
+}
+
+/**
+ * Live preview of the HTML report while it is still being generated.
+ * Polls the backend for the partial HTML streamed so far and renders it
+ * in a sandboxed iframe; replaced by the final report once state arrives.
+ */
+export function PartialReportPreview({ streamId }: PartialReportPreviewProps) {
+  const [html, setHtml] = useState("");
+
+  useEffect(() => {
+    let cancelled = false;
+
+    const poll = async () => {
+      try {
+        const res = await fetch(`${BACKEND_URL}/report-stream/${streamId}`);
+        if (res.ok && !cancelled) {
+          setHtml(await res.text());
+        }
+      } catch {
+        // Backend unreachable; keep the last preview and try again
+      }
+    };
+
+    poll();
+    const timer = setInterval(poll, POLL_INTERVAL_MS);
+    return () => {
+      cancelled = true;
+      clearInterval(timer);
+    };
+  }, [streamId]);
+
+  if (!html) {
+    return <p className="text-gray-500 text-sm italic">Generating report...</p>;
+  }
+
+  return (
+    <div className="space-y-2">
+      <p className="text-gray-500 text-sm italic">
+        Generating report... ({Math.round(html.length / 1024)} KB received)
+      </p>
+      <iframe
+        srcDoc={html}
+        sandbox=""
+        title="Report preview"
+        className="w-full h-64 border border-gray-200 rounded"
+      />
+    </div>
+  );
+}
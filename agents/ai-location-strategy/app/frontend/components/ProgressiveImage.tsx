@@ -0,0 +1,49 @@
+"use client";
+
+import { useEffect, useState } from "react";
+import type { ArtifactSource } from "@/lib/artifacts";
+
+interface ProgressiveImageProps {
+  source: ArtifactSource;
+  alt: string;
+  className?: string;
+}
+
+/**
+ * Shows an image's thumbnail right away and swaps in the full image once
+ * the browser has downloaded it. The width/height from the artifact
+ * reference reserve the layout, so the swap doesn't shift the page.
+ */
+export function ProgressiveImage({ source, alt, className }: ProgressiveImageProps) {
+  const full = source.url || source.content;
+  const [loaded, setLoaded] = useState<string | null>(source.thumbnail ? null : full ?? null);
+
+  useEffect(() => {
+    if (!full || !source.thumbnail) {
+      setLoaded(full ?? null);
+      return;
+    }
+    let cancelled = false;
+    const img = new Image();
+    img.onload = () => {
+      if (!cancelled) setLoaded(full);
+    };
+    img.src = full;
+    return () => {
+      cancelled = true;
+      img.onload = null;
+    };
+  }, [full, source.thumbnail]);
+
+  return (
+    <img
+      src={loaded || source.thumbnail || full}
+      alt={alt}
+      width={source.width}
+      height={source.height}
+      decoding="async"
+      className={`${className ?? ""} ${loaded ? "" : "blur-sm"}`.trim()}
+      style={{ height: "auto" }}
+    />
+  );
+}
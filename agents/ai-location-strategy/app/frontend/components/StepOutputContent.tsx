@@ -1,9 +1,12 @@
 "use client";
 
+import { artifactSource, downloadArtifact, imageSource, openArtifact } from "@/lib/artifacts";
 import type { AgentState } from "@/lib/types";
 import {
   summarizeCompetitorAnalysis,
 } from "@/lib/summaryHelpers";
+import { CompetitorDatasetSummary } from "./CompetitorDatasetSummary";
+import { PartialReportPreview } from "./PartialReportPreview";
 import { ScrollableMarkdown } from "./ScrollableMarkdown";
 import { TabbedGapAnalysis } from "./TabbedGapAnalysis";
 
@@ -42,7 +45,11 @@ export function StepOutputContent({ stepId, state }: StepOutputContentProps) {
       const summary = summarizeCompetitorAnalysis(state.competitor_analysis, state.strategic_report);
       return (
         <div className="space-y-2">
-          <p className="text-gray-700 text-sm font-medium">{summary}</p>
+          {state.competitor_dataset ? (
+            <CompetitorDatasetSummary datasetRef={state.competitor_dataset} fallback={summary} />
+          ) : (
+            <p className="text-gray-700 text-sm font-medium">{summary}</p>
+          )}
           {state.competitor_analysis && (
             <ScrollableMarkdown
               content={state.competitor_analysis}
@@ -83,8 +90,12 @@ export function StepOutputContent({ stepId, state }: StepOutputContentProps) {
         </div>
       );
 
-    case "report_generation":
-      if (!state.html_report_content) {
+    case "report_generation": {
+      const report = artifactSource(state.html_report_artifact, state.html_report_content);
+      if (!report) {
+        if (state.html_report_stream_id) {
+          return <PartialReportPreview streamId={state.html_report_stream_id} />;
+        }
         return <p className="text-gray-500 text-sm italic">Generating report...</p>;
       }
       return (
@@ -92,25 +103,13 @@ export function StepOutputContent({ stepId, state }: StepOutputContentProps) {
           <span className="text-sm text-green-700">7-slide McKinsey-style presentation ready</span>
           <div className="flex gap-2">
             <button
-              onClick={() => {
-                const blob = new Blob([state.html_report_content!], { type: "text/html" });
-                const url = URL.createObjectURL(blob);
-                window.open(url, "_blank");
-              }}
+              onClick={() => openArtifact(report, "text/html")}
               className="px-3 py-1 text-xs bg-blue-500 text-white rounded hover:bg-blue-600 transition-colors"
             >
               View Report
             </button>
             <button
-              onClick={() => {
-                const blob = new Blob([state.html_report_content!], { type: "text/html" });
-                const url = URL.createObjectURL(blob);
-                const a = document.createElement("a");
-                a.href = url;
-                a.download = "executive_report.html";
-                a.click();
-                URL.revokeObjectURL(url);
-              }}
+              onClick={() => downloadArtifact(report, "executive_report.html", "text/html")}
               className="px-3 py-1 text-xs bg-gray-200 text-gray-700 rounded hover:bg-gray-300 transition-colors"
             >
               Download HTML
@@ -118,9 +117,16 @@ export function StepOutputContent({ stepId, state }: StepOutputContentProps) {
           </div>
         </div>
       );
+    }
 
-    case "infographic_generation":
-      if (!state.infographic_base64) {
+    case "infographic_generation": {
+      const infographic = imageSource(
+        state.infographic_artifact,
+        state.infographic_base64,
+        state.infographic_thumbnail_artifact,
+        state.infographic_thumbnail_base64
+      );
+      if (!infographic) {
         return <p className="text-gray-500 text-sm italic">Creating infographic...</p>;
       }
       return (
@@ -129,36 +135,33 @@ export function StepOutputContent({ stepId, state }: StepOutputContentProps) {
             <span className="text-sm text-green-700">Executive infographic generated</span>
             <div className="flex gap-2">
               <button
-                onClick={() => {
-                  const win = window.open("", "_blank");
-                  if (win) {
-                    win.document.write(`<img src="${state.infographic_base64}" style="max-width:100%;"/>`);
-                  }
-                }}
+                onClick={() => openArtifact(infographic, "image/*")}
                 className="px-3 py-1 text-xs bg-blue-500 text-white rounded hover:bg-blue-600 transition-colors"
               >
                 View Image
               </button>
               <a
-                href={state.infographic_base64}
-                download="infographic.png"
+                href={infographic.downloadUrl || infographic.content}
+                download={infographic.filename || "infographic"}
                 className="px-3 py-1 text-xs bg-gray-200 text-gray-700 rounded hover:bg-gray-300 transition-colors"
               >
-                Download PNG
+                Download Image
               </a>
             </div>
           </div>
-          {/* Small thumbnail preview */}
+          {/* Small thumbnail preview (never loads the full image) */}
           <img
-            src={state.infographic_base64}
+            src={infographic.thumbnail || infographic.url || infographic.content}
             alt="Infographic preview"
             className="w-32 h-auto rounded shadow-sm border"
           />
         </div>
       );
+    }
 
-    case "map_generation":
-      if (!state.map_html_content) {
+    case "map_generation": {
+      const map = artifactSource(state.map_artifact, state.map_html_content);
+      if (!map) {
         return <p className="text-gray-500 text-sm italic">Generating interactive map...</p>;
       }
       return (
@@ -166,25 +169,13 @@ export function StepOutputContent({ stepId, state }: StepOutputContentProps) {
           <span className="text-sm text-green-700">Interactive map generated</span>
           <div className="flex gap-2">
             <button
-              onClick={() => {
-                const blob = new Blob([state.map_html_content!], { type: "text/html" });
-                const url = URL.createObjectURL(blob);
-                window.open(url, "_blank");
-              }}
+              onClick={() => openArtifact(map, "text/html")}
               className="px-3 py-1 text-xs bg-blue-500 text-white rounded hover:bg-blue-600 transition-colors"
             >
               View Map
             </button>
             <button
-              onClick={() => {
-                const blob = new Blob([state.map_html_content!], { type: "text/html" });
-                const url = URL.createObjectURL(blob);
-                const a = document.createElement("a");
-                a.href = url;
-                a.download = "interactive_map.html";
-                a.click();
-                URL.revokeObjectURL(url);
-              }}
+              onClick={() => downloadArtifact(map, "interactive_map.html", "text/html")}
               className="px-3 py-1 text-xs bg-gray-200 text-gray-700 rounded hover:bg-gray-300 transition-colors"
             >
               Download HTML
@@ -192,6 +183,7 @@ export function StepOutputContent({ stepId, state }: StepOutputContentProps) {
           </div>
         </div>
       );
+    }
 
     default:
       return null;
@@ -0,0 +1,102 @@
+import type { ArtifactRef } from "./types";
+
+const BACKEND_URL = process.env.NEXT_PUBLIC_BACKEND_URL || "http://localhost:8000";
+
+/**
+ * URL of the artifact version a state reference points to, served by the
+ * backend's /artifacts endpoint to the user of the session cookie. With
+ * download, the response is sent as an attachment (the download attribute is
+ * ignored cross-origin).
+ */
+export function artifactUrl(ref: ArtifactRef, download = false): string | undefined {
+  if (!ref.session_id) return undefined;
+  let url =
+    `${BACKEND_URL}/artifacts/${encodeURIComponent(ref.session_id)}/` +
+    `${encodeURIComponent(ref.artifact_name)}?version=${ref.version}`;
+  return download ? `${url}&download=true` : url;
+}
+
+/**
+ * Where to display a tool output from: the artifact reference if the
+ * backend runs in reference mode, otherwise the content copied into state
+ * (HTML text or a data: URL).
+ */
+export interface ArtifactSource {
+  url?: string; // backend URL (reference mode)
+  content?: string; // inline HTML (legacy mode)
+  downloadUrl?: string;
+  filename?: string; // artifact name (reference mode)
+  thumbnail?: string; // images: small preview URL or data: URL
+  width?: number;
+  height?: number;
+}
+
+export function artifactSource(
+  ref: ArtifactRef | undefined,
+  content: string | undefined
+): ArtifactSource | undefined {
+  if (ref) {
+    const url = artifactUrl(ref);
+    if (url) {
+      return {
+        url,
+        downloadUrl: artifactUrl(ref, true),
+        filename: ref.artifact_name,
+        width: ref.width,
+        height: ref.height,
+      };
+    }
+  }
+  return content ? { content } : undefined;
+}
+
+/**
+ * Like artifactSource, for an image with a thumbnail to show while the full
+ * image loads.
+ */
+export function imageSource(
+  ref: ArtifactRef | undefined,
+  content: string | undefined,
+  thumbnailRef: ArtifactRef | undefined,
+  thumbnailContent: string | undefined
+): ArtifactSource | undefined {
+  const source = artifactSource(ref, content);
+  if (!source) return undefined;
+  const thumbnail = artifactSource(thumbnailRef, thumbnailContent);
+  return { ...source, thumbnail: thumbnail?.url || thumbnail?.content };
+}
+
+/**
+ * Triggers a browser download of an artifact source.
+ */
+export function downloadArtifact(source: ArtifactSource, filename: string, mimeType: string) {
+  const a = document.createElement("a");
+  if (source.downloadUrl) {
+    a.href = source.downloadUrl;
+  } else if (source.content?.startsWith("data:")) {
+    a.href = source.content;
+  } else {
+    const blob = new Blob([source.content || ""], { type: mimeType });
+    a.href = URL.createObjectURL(blob);
+    setTimeout(() => URL.revokeObjectURL(a.href), 0);
+  }
+  a.download = filename;
+  a.click();
+}
+
+/**
+ * Opens an artifact source in a new tab.
+ */
+export function openArtifact(source: ArtifactSource, mimeType: string) {
+  if (source.url) {
+    window.open(source.url, "_blank");
+  } else if (mimeType.startsWith("image/")) {
+    const win = window.open("", "_blank");
+    if (win) {
+      win.document.write(`<img src="${source.content}" style="max-width:100%;"/>`);
+    }
+  } else {
+    const blob = new Blob([source.content || ""], { type: mimeType });
+    window.open(URL.createObjectURL(blob), "_blank");
+  }
+}
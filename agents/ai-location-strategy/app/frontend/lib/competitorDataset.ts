@@ -0,0 +1,34 @@
+import type { ArtifactRef, CompetitorDataset } from "./types";
+
+const BACKEND_URL = process.env.NEXT_PUBLIC_BACKEND_URL || "http://localhost:8000";
+
+/**
+ * Fetches the competitor dataset a state reference points to.
+ * Returns null if the backend doesn't have it (e.g. the session expired).
+ */
+export async function fetchCompetitorDataset(
+  ref: ArtifactRef
+): Promise<CompetitorDataset | null> {
+  if (!ref.session_id) return null;
+  const res = await fetch(
+    `${BACKEND_URL}/datasets/${ref.session_id}/competitors?version=${ref.version}`,
+    { credentials: "include" }
+  );
+  if (!res.ok) return null;
+  return res.json();
+}
+
+/**
+ * Summarizes the dataset for timeline display, e.g.
+ * "57 competitors • 12 high-performers • 4.3 avg rating".
+ */
+export function summarizeCompetitorDataset(dataset: CompetitorDataset): string {
+  const ratings = dataset.columns.rating.filter(
+    (r): r is number => r !== null && r > 0
+  );
+  const highPerformers = ratings.filter((r) => r >= 4.5).length;
+  const avgRating = ratings.length
+    ? (ratings.reduce((sum, r) => sum + r, 0) / ratings.length).toFixed(1)
+    : "N/A";
+  return `${dataset.rows} competitors • ${highPerformers} high-performers • ${avgRating} avg rating`;
+}
@@ -119,6 +119,52 @@ export type PipelineStage =
   | "infographic_generation"
   | "map_generation";
 
+/**
+ * Start/end timestamps for a single pipeline stage (ISO 8601).
+ * Independent stages run concurrently, so their intervals may overlap.
+ */
+export interface StageTiming {
+  start?: string;
+  end?: string;
+  duration_seconds?: number;
+}
+
+/**
+ * Reference to a session artifact kept in state instead of its content.
+ */
+export interface ArtifactRef {
+  artifact_name: string;
+  version: number;
+  size: number;
+  mime_type: string;
+  rows?: number;
+  width?: number; // images: pixel dimensions
+  height?: number;
+  session_id?: string;
+  user_id?: string; // owner of the artifact (served only to that user's session)
+}
+
+/**
+ * Columnar competitor dataset (one array per column, aligned by row).
+ * Served by the backend from the Parquet artifact in competitor_dataset.
+ */
+export interface CompetitorDataset {
+  rows: number;
+  columns: {
+    place_id: string[];
+    name: string[];
+    address: string[];
+    rating: (number | null)[];
+    user_ratings_total: (number | null)[];
+    price_level: (number | null)[];
+    business_status: string[];
+    types: string[][];
+    lat: (number | null)[];
+    lng: (number | null)[];
+    query: string[];
+  };
+}
+
 /**
  * Complete agent state type for useCoAgent hook.
  * These fields are set by the existing callbacks in pipeline_callbacks.py
@@ -130,7 +176,12 @@ export interface AgentState {
   // Pipeline tracking (set by before_*/after_* callbacks)
   pipeline_stage: PipelineStage | string;
   stages_completed: string[];
+  stage_timings?: Record<string, StageTiming>;
+  stage_checkpoints?: Record<string, { input_hash: string; restored: boolean }>;
+  // Model that served each stage, per agent/tool (differs on fallback)
+  stage_models?: Record<string, Record<string, string>>;
   pipeline_start_time?: string;
+  pipeline_end_time?: string;
 
   // User request (set by IntakeAgent via after_intake callback)
   target_location: string;
@@ -140,15 +191,25 @@ export interface AgentState {
   // Intermediate analysis results
   market_research_findings?: string;
   competitor_analysis?: string;
+  competitor_dataset?: ArtifactRef; // Parquet artifact of the raw Places results
   gap_analysis?: string;
   gap_analysis_code?: string; // Extracted Python code from gap analysis
 
   // Final strategic report (set by StrategyAdvisorAgent)
   strategic_report?: LocationIntelligenceReport;
 
-  // Artifact content (set by tools for AG-UI frontend display)
+  // Tool outputs (set by tools for AG-UI frontend display). By default only
+  // artifact references are set; the bytes are served by /artifacts.
+  html_report_artifact?: ArtifactRef;
+  infographic_artifact?: ArtifactRef;
+  infographic_thumbnail_artifact?: ArtifactRef; // Small WebP, shown first
+  map_artifact?: ArtifactRef;
+  html_report_stream_id?: string; // Poll /report-stream/{id} while generating
+
+  // Inline artifact content (LOCATION_STRATEGY_ARTIFACT_REFS=FALSE)
   html_report_content?: string;
   infographic_base64?: string;
+  infographic_thumbnail_base64?: string;
   map_html_content?: string;
 
   // Metadata
@@ -0,0 +1,19 @@
+const BACKEND_URL = process.env.NEXT_PUBLIC_BACKEND_URL || "http://localhost:8000";
+
+/**
+ * Starts (or resumes) this browser's backend session. The backend sets a
+ * signed, HttpOnly session cookie (or uses the identity of an auth proxy)
+ * and keys sessions and artifacts by that user; the browser never chooses
+ * its own user ID. Resolves to false if the backend couldn't be reached.
+ */
+export async function startSession(): Promise<boolean> {
+  try {
+    const res = await fetch(`${BACKEND_URL}/auth/session`, {
+      method: "POST",
+      credentials: "include",
+    });
+    return res.ok;
+  } catch {
+    return false;
+  }
+}
@@ -0,0 +1,296 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Process-wide pipeline metrics in Prometheus text format.
+
+Stage callbacks (callbacks/metrics_callbacks.py), _complete_stage() and the
+tools that call Gemini directly record into the module-level `metrics`
+registry; the AG-UI backend serves render_prometheus() at /metrics.
+
+Metrics (all prefixed location_strategy_):
+- stage_duration_seconds{stage}: wall-clock time per completed stage.
+- model_latency_seconds{stage,model}: time per model call (model is the one
+  that served it, see model_router.py).
+- model_calls_total{stage,model,outcome}: model calls, outcome ok/error.
+- model_tokens_total{stage,model,kind}: prompt, output and thinking tokens.
+- tool_latency_seconds{stage,tool} and tool_calls_total{stage,tool,outcome}.
+- retries_total{stage,source}: retries of the direct Gemini calls in tools.
+- model_fallbacks_total{stage,requested,served}: calls served by a fallback.
+- intake_parses_total{parser}: IntakeAgent requests parsed by rules (no
+  model call) or by the model.
+- context_tokens_saved_total{stage}: estimated instruction tokens removed by
+  context compaction (callbacks/compaction_callbacks.py).
+- state_stream_bytes_total{stream}: bytes of AG-UI state updates as
+  ag_ui_adk emits them (original) and as sent after JSON Patch encoding
+  (sent, app/frontend/backend/state_deltas.py).
+- event_loop_lag_seconds: how late the event loop runs a timer, sampled by
+  monitor_event_loop_lag() in the AG-UI backend. Sustained lag means sync
+  work is blocking the loop and delaying every concurrent session.
+
+Histograms are exported with cumulative buckets (aggregate across replicas
+with histogram_quantile()) and, per process, a <name>_quantiles gauge with
+the p50/p95 of the most recent observations.
+"""
+
+import asyncio
+import bisect
+import math
+import threading
+from collections import deque
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+PREFIX = "location_strategy_"
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600)
+LOOP_LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+QUANTILES = (0.5, 0.95)
+QUANTILE_WINDOW = 1000  # recent observations kept per series for p50/p95
+
+# name -> (type, help, buckets)
+METRIC_DEFINITIONS: dict[str, tuple[str, str, Sequence[float]]] = {
+    "stage_duration_seconds": (
+        "histogram", "Wall-clock duration of completed pipeline stages.",
+        LATENCY_BUCKETS,
+    ),
+    "model_latency_seconds": (
+        "histogram", "Latency of model calls per stage and model.",
+        LATENCY_BUCKETS,
+    ),
+    "tool_latency_seconds": (
+        "histogram", "Latency of tool calls per stage and tool.",
+        LATENCY_BUCKETS,
+    ),
+    "model_calls_total": ("counter", "Model calls per stage and model.", ()),
+    "model_tokens_total": (
+        "counter", "Tokens per stage, model and kind (prompt/output/thinking).", (),
+    ),
+    "tool_calls_total": ("counter", "Tool calls per stage and tool.", ()),
+    "retries_total": ("counter", "Retried Gemini calls made by tools.", ()),
+    "model_fallbacks_total": (
+        "counter", "Model calls served by a fallback model of the chain.", (),
+    ),
+    "intake_parses_total": (
+        "counter", "IntakeAgent requests parsed by rules or by the model.", (),
+    ),
+    "context_tokens_saved_total": (
+        "counter", "Estimated instruction tokens removed by context compaction.", (),
+    ),
+    "places_cache_lookups_total": (
+        "counter", "search_places cache lookups by result (hit/miss).", (),
+    ),
+    "state_stream_bytes_total": (
+        "counter", "Bytes of AG-UI state updates before and after delta encoding.", (),
+    ),
+    "event_loop_lag_seconds": (
+        "histogram", "Delay of event-loop timer callbacks past their deadline.",
+        LOOP_LAG_BUCKETS,
+    ),
+}
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class _Histogram:
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+        self.recent: deque[float] = deque(maxlen=QUANTILE_WINDOW)
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+        self.recent.append(value)
+
+    def quantile(self, q: float) -> float:
+        values = sorted(self.recent)
+        if not values:
+            return math.nan
+        # Nearest-rank quantile
+        return values[max(0, math.ceil(q * len(values)) - 1)]
+
+
+def _labels(labels: Mapping[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Labels = ()) -> str:
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ""
+    escaped = (
+        (k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in pairs
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms keyed by metric name and labels."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[Labels, float]] = {}
+        self._histograms: dict[str, dict[Labels, _Histogram]] = {}
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        """Increase a counter."""
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Record one observation of a histogram."""
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = _Histogram(METRIC_DEFINITIONS[name][2])
+            series[key].observe(value)
+
+    def record_model_call(
+        self,
+        stage: str,
+        model: str | None,
+        seconds: float,
+        usage_metadata: Any = None,
+        error: bool = False,
+    ) -> None:
+        """Record latency, outcome and token usage of one model call.
+
+        Args:
+            stage: Pipeline stage name.
+            model: Model name.
+            seconds: Wall-clock latency of the call.
+            usage_metadata: The response's usage_metadata, if any.
+            error: Whether the call failed.
+        """
+        model = model or "unknown"
+        self.observe("model_latency_seconds", seconds, stage=stage, model=model)
+        self.inc(
+            "model_calls_total", stage=stage, model=model,
+            outcome="error" if error else "ok",
+        )
+        if usage_metadata is None:
+            return
+        for kind, field in (
+            ("prompt", "prompt_token_count"),
+            ("output", "candidates_token_count"),
+            ("thinking", "thoughts_token_count"),
+        ):
+            count = getattr(usage_metadata, field, None)
+            if count:
+                self.inc(
+                    "model_tokens_total", count, stage=stage, model=model, kind=kind
+                )
+
+    def record_fallback(self, stage: str, requested: str, served: str) -> None:
+        """Count one model call served by another model than requested."""
+        self.inc(
+            "model_fallbacks_total", stage=stage, requested=requested, served=served
+        )
+
+    def record_retry(self, stage: str, source: str) -> None:
+        """Count one retried Gemini call made by a tool."""
+        self.inc("retries_total", stage=stage, source=source)
+
+    def reset(self) -> None:
+        """Drop all recorded series."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render_prometheus(self) -> str:
+        """Render all series in the Prometheus text exposition format."""
+        lines: list[str] = []
+        with self._lock:
+            for name, (kind, help_text, buckets) in METRIC_DEFINITIONS.items():
+                full = PREFIX + name
+                if kind == "counter":
+                    series = self._counters.get(name, {})
+                    lines += [f"# HELP {full} {help_text}", f"# TYPE {full} counter"]
+                    for labels, value in sorted(series.items()):
+                        lines.append(
+                            f"{full}{_format_labels(labels)} {_format_value(value)}"
+                        )
+                    continue
+
+                histograms = self._histograms.get(name, {})
+                lines += [f"# HELP {full} {help_text}", f"# TYPE {full} histogram"]
+                for labels, histogram in sorted(histograms.items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        le = (("le", _format_value(bound)),)
+                        lines.append(
+                            f"{full}_bucket{_format_labels(labels, le)} {cumulative}"
+                        )
+                    inf = (("le", "+Inf"),)
+                    lines.append(
+                        f"{full}_bucket{_format_labels(labels, inf)} {histogram.count}"
+                    )
+                    lines.append(
+                        f"{full}_sum{_format_labels(labels)} "
+                        f"{_format_value(histogram.sum)}"
+                    )
+                    lines.append(
+                        f"{full}_count{_format_labels(labels)} {histogram.count}"
+                    )
+
+                lines += [
+                    f"# HELP {full}_quantiles p50/p95 of the last "
+                    f"{QUANTILE_WINDOW} observations in this process.",
+                    f"# TYPE {full}_quantiles gauge",
+                ]
+                for labels, histogram in sorted(histograms.items()):
+                    for q in QUANTILES:
+                        quantile = (("quantile", str(q)),)
+                        lines.append(
+                            f"{full}_quantiles{_format_labels(labels, quantile)} "
+                            f"{_format_value(histogram.quantile(q))}"
+                        )
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+async def monitor_event_loop_lag(
+    interval: float, registry: MetricsRegistry = metrics
+) -> None:
+    """Record event-loop lag every `interval` seconds until cancelled.
+
+    Args:
+        interval: Seconds between samples.
+        registry: Registry receiving event_loop_lag_seconds.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        deadline = loop.time() + interval
+        await asyncio.sleep(interval)
+        registry.observe("event_loop_lag_seconds", max(0.0, loop.time() - deadline))
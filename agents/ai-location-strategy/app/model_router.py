@@ -0,0 +1,414 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Overload-aware model routing with circuit breakers and tier fallback.
+
+Every model is tried through its fallback chain (MODEL_FALLBACKS, e.g.
+gemini-3.1-pro-preview -> gemini-2.5-pro -> gemini-2.5-flash). The router
+tracks the health of each model in the process: after
+CIRCUIT_FAILURE_THRESHOLD consecutive overload errors (5xx, 429, timeouts)
+its circuit opens and calls go straight to the next model in the chain for
+CIRCUIT_OPEN_SECONDS. Then a single trial call is let through (half-open);
+its success closes the circuit again.
+
+Agents use routed_model(FAST_MODEL) etc. as their model: a RoutedGemini,
+which keeps the configured model name (so request hashing, rate limits and
+metrics see the same model as before) and tags each response with the model
+that actually served it in custom_metadata["served_model"]. Tools calling
+genai.Client directly go through model_router.call().
+
+Optional hedging (hedge_after) is meant for latency-critical agents: when
+the first model hasn't produced its first response after hedge_after
+seconds, the next healthy model in the chain is started too and whichever
+answers first is used. It trades extra cost for tail latency.
+
+Fallback only happens before a model has produced any output; an error in
+the middle of a streamed response is raised as usual.
+"""
+
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections.abc import AsyncGenerator, Awaitable, Callable, Mapping, Sequence
+from typing import Any, TypeVar
+
+from google.adk.models import Gemini, LlmRequest, LlmResponse
+from google.genai.errors import ClientError, ServerError
+
+from .config import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_OPEN_SECONDS,
+    MODEL_FALLBACKS,
+    MODEL_ROUTER,
+    RETRY_ATTEMPTS,
+)
+from .rate_limits import acquire_model_slot
+
+logger = logging.getLogger("LocationStrategyPipeline")
+
+T = TypeVar("T")
+
+SERVED_MODEL_KEY = "served_model"
+LATENCY_EWMA_ALPHA = 0.2
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """Whether an error means "try another model" rather than a bad request."""
+    if isinstance(error, ServerError | asyncio.TimeoutError | TimeoutError):
+        return True
+    return isinstance(error, ClientError) and getattr(error, "code", None) == 429
+
+
+class ModelHealth:
+    """Circuit breaker state and call statistics of one model."""
+
+    def __init__(self) -> None:
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.trial_in_flight = False
+        self.calls = 0
+        self.failures = 0
+        self.latency_ewma: float | None = None
+
+    def state(self, now: float) -> str:
+        if self.open_until == 0.0:
+            return "closed"
+        return "open" if now < self.open_until else "half_open"
+
+
+class ModelRouter:
+    """Per-model health tracking and fallback over model chains."""
+
+    def __init__(
+        self,
+        fallbacks: Mapping[str, Sequence[str]],
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        open_seconds: float = CIRCUIT_OPEN_SECONDS,
+    ) -> None:
+        self._fallbacks = {model: tuple(chain) for model, chain in fallbacks.items()}
+        self._failure_threshold = failure_threshold
+        self._open_seconds = open_seconds
+        self._health: dict[str, ModelHealth] = {}
+        self._lock = threading.Lock()
+
+    def chain(self, model: str) -> list[str]:
+        """The model followed by its fallbacks, without duplicates."""
+        return list(dict.fromkeys((model, *self._fallbacks.get(model, ()))))
+
+    def _get(self, model: str) -> ModelHealth:
+        return self._health.setdefault(model, ModelHealth())
+
+    def candidates(self, model: str) -> list[str]:
+        """Models of the chain that may be called now, in order.
+
+        Open circuits are skipped; a half-open one is offered to one caller
+        at a time. If every circuit is open, the model whose circuit closes
+        soonest is returned so callers never get an empty chain.
+        """
+        now = time.monotonic()
+        chain = self.chain(model)
+        available: list[str] = []
+        with self._lock:
+            for name in chain:
+                health = self._get(name)
+                state = health.state(now)
+                if state == "closed":
+                    available.append(name)
+                elif state == "half_open" and not health.trial_in_flight:
+                    health.trial_in_flight = True
+                    available.append(name)
+            if available:
+                return available
+            return [min(chain, key=lambda name: self._get(name).open_until)]
+
+    def release(self, model: str) -> None:
+        """Give back a half-open trial slot that was not used."""
+        with self._lock:
+            self._get(model).trial_in_flight = False
+
+    def record_success(self, model: str, seconds: float) -> None:
+        """Record a successful call; closes the model's circuit."""
+        with self._lock:
+            health = self._get(model)
+            if health.open_until:
+                logger.info(f"ROUTER: circuit for {model} closed")
+            health.calls += 1
+            health.consecutive_failures = 0
+            health.open_until = 0.0
+            health.trial_in_flight = False
+            health.latency_ewma = (
+                seconds
+                if health.latency_ewma is None
+                else (1 - LATENCY_EWMA_ALPHA) * health.latency_ewma
+                + LATENCY_EWMA_ALPHA * seconds
+            )
+
+    def record_failure(self, model: str) -> None:
+        """Record an overload error; may open the model's circuit."""
+        with self._lock:
+            health = self._get(model)
+            health.calls += 1
+            health.failures += 1
+            health.consecutive_failures += 1
+            half_open = health.trial_in_flight
+            health.trial_in_flight = False
+            if half_open or health.consecutive_failures >= self._failure_threshold:
+                health.open_until = time.monotonic() + self._open_seconds
+                logger.warning(
+                    f"ROUTER: circuit for {model} open for {self._open_seconds}s "
+                    f"after {health.consecutive_failures} consecutive failures"
+                )
+
+    def reset(self) -> None:
+        """Forget all health state."""
+        with self._lock:
+            self._health.clear()
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Health of every model seen so far, for /health."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                name: {
+                    "state": health.state(now),
+                    "calls": health.calls,
+                    "failures": health.failures,
+                    "consecutive_failures": health.consecutive_failures,
+                    "latency_ewma_seconds": (
+                        round(health.latency_ewma, 3)
+                        if health.latency_ewma is not None
+                        else None
+                    ),
+                }
+                for name, health in sorted(self._health.items())
+            }
+
+    async def call(
+        self, model: str, fn: Callable[[str], Awaitable[T]]
+    ) -> tuple[T, str]:
+        """Call fn(model_name) along the model's chain until one succeeds.
+
+        Args:
+            model: The configured (primary) model.
+            fn: Makes the request with the given model name.
+
+        Returns:
+            (result, the model that served it). Non-overload errors are
+            raised immediately; if every model is overloaded the last error
+            is raised (callers may still retry the whole chain).
+        """
+        candidates = self.candidates(model)
+        last_error: BaseException | None = None
+        for index, name in enumerate(candidates):
+            if index:
+                logger.warning(f"ROUTER: falling back from {model} to {name}")
+            started = time.perf_counter()
+            try:
+                result = await fn(name)
+            except Exception as e:
+                if not is_overload_error(e):
+                    self.release(name)
+                    for rest in candidates[index + 1:]:
+                        self.release(rest)
+                    raise
+                self.record_failure(name)
+                last_error = e
+                continue
+            self.record_success(name, time.perf_counter() - started)
+            for rest in candidates[index + 1:]:
+                self.release(rest)
+            return result, name
+        assert last_error is not None
+        raise last_error
+
+
+# Without MODEL_ROUTER every chain is just the configured model
+model_router = ModelRouter(MODEL_FALLBACKS if MODEL_ROUTER else {})
+
+
+def served_model(llm_response: LlmResponse) -> str | None:
+    """The model that served a response routed by RoutedGemini, if tagged."""
+    return (llm_response.custom_metadata or {}).get(SERVED_MODEL_KEY)
+
+
+def record_served_model(state: Any, stage: str, source: str, model: str) -> None:
+    """Record in state["stage_models"] which model served a stage.
+
+    Args:
+        state: Session state (callback or tool context state).
+        stage: Pipeline stage name.
+        source: Agent or tool name that made the call.
+        model: The model that answered.
+    """
+    stage_models = dict(state.get("stage_models", {}))
+    sources = dict(stage_models.get(stage, {}))
+    if sources.get(source) == model:
+        return
+    sources[source] = model
+    stage_models[stage] = sources
+    state["stage_models"] = stage_models
+
+
+class RoutedGemini(Gemini):
+    """Gemini model whose calls go through the model router.
+
+    Attributes:
+        hedge_after: Seconds to wait for the first response before also
+            starting the next model of the chain; None disables hedging.
+    """
+
+    hedge_after: float | None = None
+
+    def __str__(self) -> str:
+        # Checkpoint input hashes use str(agent.model)
+        return self.model
+
+    def _start(
+        self, llm_request: LlmRequest, model: str, stream: bool
+    ) -> AsyncGenerator[LlmResponse, None]:
+        request = llm_request.model_copy(update={"model": model})
+        return super().generate_content_async(request, stream)
+
+    async def _first_response(
+        self,
+        llm_request: LlmRequest,
+        candidates: list[str],
+        stream: bool,
+    ) -> tuple[str, LlmResponse | None, AsyncGenerator[LlmResponse, None], float]:
+        """Start models along the candidates until one yields a response.
+
+        With hedging, the next candidate is started when the current one
+        hasn't answered within hedge_after seconds; the first to answer
+        wins and the others are cancelled.
+        """
+        pending: dict[asyncio.Task, tuple[str, AsyncGenerator, float]] = {}
+        remaining = list(candidates)
+        last_error: BaseException | None = None
+
+        async def launch() -> None:
+            name = remaining.pop(0)
+            if name != self.model:
+                # The rate limit plugin only sees the configured model
+                await acquire_model_slot(name)
+            if name != candidates[0]:
+                logger.warning(f"ROUTER: {self.model} -> trying {name}")
+            agen = self._start(llm_request, name, stream)
+            task = asyncio.ensure_future(agen.__anext__())
+            pending[task] = (name, agen, time.perf_counter())
+
+        async def cancel_pending() -> None:
+            for task, (name, agen, _) in pending.items():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                await agen.aclose()
+                model_router.release(name)
+            for name in remaining:
+                model_router.release(name)
+
+        await launch()
+        try:
+            while pending:
+                timeout = (
+                    self.hedge_after if self.hedge_after and remaining else None
+                )
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    logger.info(
+                        f"ROUTER: {self.model} slow after {self.hedge_after}s, hedging"
+                    )
+                    await launch()
+                    continue
+                for task in done:
+                    name, agen, started = pending.pop(task)
+                    try:
+                        first = task.result()
+                    except StopAsyncIteration:
+                        first = None
+                    except Exception as e:
+                        await agen.aclose()
+                        if not is_overload_error(e):
+                            model_router.release(name)
+                            raise
+                        model_router.record_failure(name)
+                        last_error = e
+                        continue
+                    await cancel_pending()
+                    return name, first, agen, started
+                if not pending and remaining:
+                    await launch()
+        except BaseException:
+            await cancel_pending()
+            raise
+        assert last_error is not None
+        raise last_error
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        """Generate content with the first healthy model of the chain."""
+        name, first, agen, started = await self._first_response(
+            llm_request, model_router.candidates(self.model), stream
+        )
+        try:
+            response = first
+            while response is not None:
+                response.custom_metadata = {
+                    **(response.custom_metadata or {}),
+                    SERVED_MODEL_KEY: name,
+                }
+                yield response
+                try:
+                    response = await agen.__anext__()
+                except StopAsyncIteration:
+                    response = None
+        except Exception as e:
+            if is_overload_error(e):
+                model_router.record_failure(name)
+            else:
+                model_router.release(name)
+            raise
+        finally:
+            # Frees a half-open trial slot if the caller stopped early
+            model_router.release(name)
+            await agen.aclose()
+        model_router.record_success(name, time.perf_counter() - started)
+
+
+def routed_model(model: str, hedge_after: float | None = None) -> str | Gemini:
+    """The `model` argument for an LlmAgent.
+
+    Args:
+        model: The configured model name.
+        hedge_after: Optional hedging delay in seconds (see RoutedGemini).
+
+    Returns:
+        A RoutedGemini, or the plain model name when MODEL_ROUTER is off.
+    """
+    if not MODEL_ROUTER:
+        return model
+    return RoutedGemini(model=model, hedge_after=hedge_after)
+
+
+def retry_attempts(model: str) -> int:
+    """HTTP retry attempts per model for an agent using routed_model(model).
+
+    The router tries each model of the chain in turn, so RETRY_ATTEMPTS is
+    spread over the chain: the request as a whole still gets at least
+    RETRY_ATTEMPTS attempts, but falls back after a couple of them.
+    """
+    return max(2, math.ceil(RETRY_ATTEMPTS / len(model_router.chain(model))))
@@ -0,0 +1,202 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Dependency-aware stage scheduler for the Location Strategy Pipeline.
+
+Each pipeline stage declares the session state keys it reads and writes.
+build_stage_pipeline() derives the dependency graph from those declarations,
+groups stages into levels (a stage's level is one past the deepest stage it
+depends on) and returns a SequentialAgent over the levels. Levels holding
+more than one stage are wrapped in a ParallelAgent so independent stages run
+concurrently.
+
+Bookkeeping keys shared by every stage (current_date, pipeline_stage,
+stages_completed, stage_timings, stage_checkpoints, stage_models,
+context_compaction) must not be
+declared; they are written by the callbacks and would otherwise serialize the
+whole pipeline.
+
+The same declarations drive checkpointing: when a checkpoint store is given,
+every stage is wrapped with the callbacks from checkpoint_callbacks.py so a
+rerun skips stages whose inputs are unchanged. Likewise, stages listed in
+memo_ttls get the model-call memoization from memoization_callbacks.py, and
+a metrics registry gets the per-stage callbacks from metrics_callbacks.py.
+Stages listed in context_budgets get the upstream-output compaction from
+compaction_callbacks.py.
+Every stage records the model that served it (routing_callbacks.py).
+"""
+
+from collections.abc import Collection, Mapping, Sequence
+from dataclasses import dataclass
+
+from google.adk.agents import BaseAgent, ParallelAgent, SequentialAgent
+from google.adk.agents.base_agent import AfterAgentCallback, BeforeAgentCallback
+
+from .callbacks.checkpoint_callbacks import add_checkpointing
+from .callbacks.compaction_callbacks import add_context_compaction
+from .callbacks.memoization_callbacks import add_memoization
+from .callbacks.metrics_callbacks import add_metrics
+from .callbacks.routing_callbacks import add_model_tracking
+from .metrics import MetricsRegistry
+from .tools.persistent_cache import PersistentCache
+
+
+@dataclass(frozen=True)
+class PipelineStage:
+    """A pipeline stage and the session state keys it depends on.
+
+    Attributes:
+        agent: The sub-agent that runs this stage.
+        name: Stage name used in stages_completed and stage_timings.
+        reads: State keys the stage consumes (instruction placeholders,
+            keys read by its tools and callbacks).
+        writes: State keys the stage produces (output_key and any keys set
+            by its tools and callbacks). A stage only counts as successful,
+            and is only checkpointed, once all of them are set.
+        optional_writes: State keys the stage may produce but doesn't need
+            to for success.
+    """
+
+    agent: BaseAgent
+    name: str
+    reads: Collection[str] = ()
+    writes: Collection[str] = ()
+    optional_writes: Collection[str] = ()
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "reads", frozenset(self.reads))
+        object.__setattr__(self, "writes", frozenset(self.writes))
+        object.__setattr__(
+            self, "optional_writes", frozenset(self.optional_writes)
+        )
+
+    @property
+    def all_writes(self) -> frozenset[str]:
+        """Required and optional output keys."""
+        return frozenset(self.writes) | frozenset(self.optional_writes)
+
+    def depends_on(self, earlier: "PipelineStage") -> bool:
+        """Whether this stage must run after an earlier-declared stage.
+
+        Covers read-after-write, write-after-write and write-after-read
+        conflicts so concurrent stages never race on the same key.
+        """
+        reads, writes = set(self.reads), self.all_writes
+        return bool(
+            reads & earlier.all_writes
+            or writes & earlier.all_writes
+            or writes & set(earlier.reads)
+        )
+
+
+def schedule_levels(stages: Sequence[PipelineStage]) -> list[list[PipelineStage]]:
+    """Group stages into levels that can each run concurrently.
+
+    Stages are considered in declaration order, so the declared order is the
+    tie-breaker for conflicting stages and the schedule is deterministic.
+
+    Args:
+        stages: Pipeline stages in their logical (sequential) order.
+
+    Returns:
+        A list of levels; every stage in a level depends only on stages in
+        earlier levels.
+    """
+    levels: list[int] = []
+    for i, stage in enumerate(stages):
+        deps = [levels[j] for j in range(i) if stage.depends_on(stages[j])]
+        levels.append(max(deps, default=-1) + 1)
+
+    grouped: list[list[PipelineStage]] = [
+        [] for _ in range(max(levels, default=-1) + 1)
+    ]
+    for stage, level in zip(stages, levels):
+        grouped[level].append(stage)
+    return grouped
+
+
+def build_stage_pipeline(
+    name: str,
+    description: str,
+    stages: Sequence[PipelineStage],
+    before_agent_callback: BeforeAgentCallback | None = None,
+    after_agent_callback: AfterAgentCallback | None = None,
+    checkpoint_store: PersistentCache | None = None,
+    memo_store: PersistentCache | None = None,
+    memo_ttls: Mapping[str, float] | None = None,
+    metrics_registry: MetricsRegistry | None = None,
+    context_budgets: Mapping[str, Mapping[str, int]] | None = None,
+) -> SequentialAgent:
+    """Build a SequentialAgent that runs independent stages concurrently.
+
+    Args:
+        name: Name of the resulting pipeline agent.
+        description: Description of the resulting pipeline agent.
+        stages: Pipeline stages in their logical (sequential) order.
+        before_agent_callback: Optional callback run once before the pipeline.
+        after_agent_callback: Optional callback run once after the pipeline.
+        checkpoint_store: Optional store for stage checkpoints. When set,
+            stages whose input hash matches a stored checkpoint are skipped
+            and their outputs restored.
+        memo_store: Optional store for memoized model responses.
+        memo_ttls: Freshness in seconds per stage name; only stages listed
+            here are memoized.
+        metrics_registry: Optional registry for per-stage model and tool
+            metrics.
+        context_budgets: Token budgets per stage name and state key for
+            compacting upstream outputs in the stage's instruction; only
+            stages listed here are compacted.
+
+    Returns:
+        A SequentialAgent over the scheduled levels.
+    """
+    if checkpoint_store is not None:
+        for stage in stages:
+            add_checkpointing(stage, checkpoint_store)
+    if memo_store is not None:
+        for stage in stages:
+            ttl = (memo_ttls or {}).get(stage.name)
+            if ttl:
+                add_memoization(stage, memo_store, ttl)
+    # After memoization, so compaction runs first and memo keys see digests
+    for stage in stages:
+        budgets = (context_budgets or {}).get(stage.name)
+        if budgets:
+            add_context_compaction(stage, budgets, metrics_registry)
+    if metrics_registry is not None:
+        for stage in stages:
+            add_metrics(stage, metrics_registry)
+    for stage in stages:
+        add_model_tracking(stage)
+
+    sub_agents: list[BaseAgent] = []
+    for index, level in enumerate(schedule_levels(stages), start=1):
+        if len(level) == 1:
+            sub_agents.append(level[0].agent)
+        else:
+            sub_agents.append(
+                ParallelAgent(
+                    name=f"{name}Level{index}",
+                    description=" + ".join(s.agent.name for s in level),
+                    sub_agents=[s.agent for s in level],
+                )
+            )
+
+    return SequentialAgent(
+        name=name,
+        description=description,
+        sub_agents=sub_agents,
+        before_agent_callback=before_agent_callback,
+        after_agent_callback=after_agent_callback,
+    )
@@ -2,12 +2,184 @@
 
 Provides make_instruction_provider() which creates an async callable
 (InstructionProvider) that reads prompt_style from session state and
-returns the appropriate prompt constant.
+returns the appropriate prompt constant with session state injected.
+
+ADK calls the provider before every model call of a stage, including every
+tool-call turn, and the downstream templates inline multi-kilobyte upstream
+outputs ({market_research_findings}, {competitor_analysis}, ...). Instead of
+running inject_session_state's regex over the full template each time:
+
+- each template is compiled once into literal and placeholder segments
+  (CompiledTemplate), with the set of state keys it references;
+- the rendered instruction is cached per session and prompt style, and
+  reused until the value of one of its referenced keys changes.
+
+Rendering follows inject_session_state exactly: {key?} is optional, None
+renders as "", invalid names are left as-is, and a missing key raises
+KeyError. Templates that reference {artifact.*} are always rendered by
+inject_session_state, since artifacts are not part of the session state.
 """
 
+import re
+from collections import OrderedDict
+from collections.abc import Mapping
+from copy import deepcopy
+from dataclasses import dataclass
+from typing import Any
+
 from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.sessions.state import State
 from google.adk.utils.instructions_utils import inject_session_state
 
+from .config import INSTRUCTION_CACHE_SESSIONS
+
+# Placeholder syntax and state-name rules of inject_session_state, kept here
+# rather than imported from ADK's private helpers, which aren't stable across
+# the google-adk versions pyproject.toml allows
+_TEMPLATE_VAR_PATTERN = re.compile(r"(?<![\$\{\\]){+[^{}]*}+")
+_STATE_PREFIXES = (State.APP_PREFIX, State.USER_PREFIX, State.TEMP_PREFIX)
+
+_MISSING = object()
+# Values compared by equality; anything else is snapshotted with deepcopy
+_IMMUTABLE = (str, int, float, bool, bytes, type(None))
+
+
+def _is_valid_state_name(name: str) -> bool:
+    """True for an identifier, optionally with an app:, user: or temp: prefix."""
+    prefix, _, key = name.rpartition(":")
+    if not prefix:
+        return name.isidentifier()
+    return f"{prefix}:" in _STATE_PREFIXES and key.isidentifier()
+
+
+@dataclass(frozen=True)
+class _Placeholder:
+    """A {key} or {key?} reference to session state."""
+
+    key: str
+    optional: bool
+
+
+class CompiledTemplate:
+    """An instruction template parsed once into literals and placeholders."""
+
+    def __init__(self, template: str):
+        self.template = template
+        self.segments: list[str | _Placeholder] = []
+        self.uses_artifacts = False
+        keys: dict[str, None] = {}
+        literal: list[str] = []
+        last = 0
+        for match in _TEMPLATE_VAR_PATTERN.finditer(template):
+            literal.append(template[last : match.start()])
+            last = match.end()
+            name = match.group().lstrip("{").rstrip("}").strip()
+            optional = name.endswith("?")
+            name = name.removesuffix("?")
+            if name.startswith("artifact."):
+                self.uses_artifacts = True
+            if name.startswith("artifact.") or not _is_valid_state_name(name):
+                literal.append(match.group())
+                continue
+            self.segments.append("".join(literal))
+            self.segments.append(_Placeholder(name, optional))
+            keys[name] = None
+            literal = []
+        literal.append(template[last:])
+        self.segments.append("".join(literal))
+        self.keys: tuple[str, ...] = tuple(keys)
+
+    def render(self, state: Mapping[str, Any], agent_name: str = "") -> str:
+        """Render the template from state, as inject_session_state would.
+
+        Args:
+            state: Session state.
+            agent_name: Agent name for the error message of a missing key.
+
+        Returns:
+            The rendered instruction.
+        """
+        parts = []
+        for segment in self.segments:
+            if isinstance(segment, str):
+                parts.append(segment)
+            elif segment.key in state:
+                value = state[segment.key]
+                parts.append("" if value is None else str(value))
+            elif not segment.optional:
+                raise KeyError(
+                    f"Context variable not found: `{segment.key}` in agent"
+                    f" '{agent_name}'."
+                )
+        return "".join(parts)
+
+
+def _snapshot(values: tuple) -> tuple:
+    """Copy mutable values so in-place changes are detected later."""
+    return tuple(
+        v if v is _MISSING or isinstance(v, _IMMUTABLE) else deepcopy(v) for v in values
+    )
+
+
+def _unchanged(snapshot: tuple, values: tuple) -> bool:
+    return all(
+        old is new or (type(old) is type(new) and old == new)
+        for old, new in zip(snapshot, values, strict=True)
+    )
+
+
+class StyledInstructionProvider:
+    """Async instruction provider that picks a template by prompt_style.
+
+    The templates are kept as attributes so other components (e.g. pipeline
+    checkpointing) can fingerprint the instruction without rendering it.
+    """
+
+    def __init__(self, retail_instruction: str, datacenter_instruction: str):
+        self.retail_instruction = retail_instruction
+        self.datacenter_instruction = datacenter_instruction
+        self._compiled = {
+            template: CompiledTemplate(template)
+            for template in (retail_instruction, datacenter_instruction)
+        }
+        # (session id, template) -> (snapshot of referenced values, rendered)
+        self._rendered: OrderedDict[tuple[str, str], tuple[tuple, str]] = OrderedDict()
+        self.cache_hits = 0
+        self.renders = 0
+
+    def template_for(self, state) -> str:
+        """Return the raw template selected by state["prompt_style"]."""
+        style = state.get("prompt_style", "datacenter")
+        if style == "retail":
+            return self.retail_instruction
+        return self.datacenter_instruction
+
+    def compiled_for(self, state) -> CompiledTemplate:
+        """Return the compiled template selected by state["prompt_style"]."""
+        return self._compiled[self.template_for(state)]
+
+    async def __call__(self, ctx: ReadonlyContext) -> str:
+        compiled = self.compiled_for(ctx.state)
+        if compiled.uses_artifacts:
+            return await inject_session_state(compiled.template, ctx)
+
+        state = ctx.state
+        values = tuple(state.get(key, _MISSING) for key in compiled.keys)
+        cache_key = (ctx.session.id, compiled.template)
+        cached = self._rendered.get(cache_key)
+        if cached is not None and _unchanged(cached[0], values):
+            self._rendered.move_to_end(cache_key)
+            self.cache_hits += 1
+            return cached[1]
+
+        rendered = compiled.render(state, ctx.agent_name)
+        self.renders += 1
+        self._rendered[cache_key] = (_snapshot(values), rendered)
+        self._rendered.move_to_end(cache_key)
+        while len(self._rendered) > INSTRUCTION_CACHE_SESSIONS:
+            self._rendered.popitem(last=False)
+        return rendered
+
 
 def make_instruction_provider(retail_instruction: str, datacenter_instruction: str):
     """Create an async instruction provider that switches on prompt_style.
@@ -19,10 +191,4 @@ def make_instruction_provider(retail_instruction: str, datacenter_instruction: s
     Returns:
         An async callable compatible with ADK's InstructionProvider protocol.
     """
-
-    async def _provider(ctx: ReadonlyContext) -> str:
-        style = ctx.state.get("prompt_style", "datacenter")
-        template = retail_instruction if style == "retail" else datacenter_instruction
-        return await inject_session_state(template, ctx)
-
-    return _provider
+    return StyledInstructionProvider(retail_instruction, datacenter_instruction)
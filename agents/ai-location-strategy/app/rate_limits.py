@@ -0,0 +1,113 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Per-model request rate limits, scoped to the Runner that installs them.
+
+The batch runner installs ModelRateLimitPlugin(limits) on its own Runner,
+which makes every agent model call of that Runner wait for a slot.
+Interactive sessions run on a Runner without the plugin and are never
+throttled. Tools that call Gemini directly (HTML report, infographic) and
+the model router's fallbacks wait via acquire_model_slot(), which applies
+the limits of the invocation it runs in: the plugin sets them in a context
+variable when a run starts, and the tasks of that run inherit it.
+"""
+
+import asyncio
+import contextvars
+import logging
+from collections.abc import Mapping
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.plugins.base_plugin import BasePlugin
+
+logger = logging.getLogger("LocationStrategyPipeline")
+
+
+class RateLimiter:
+    """Spaces requests evenly to at most `per_minute` requests per minute."""
+
+    def __init__(self, per_minute: float) -> None:
+        self.interval = 60.0 / per_minute
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> float:
+        """Wait for the next free slot and return the seconds waited."""
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+
+# Limiters of the current invocation; empty outside a rate-limited Runner
+_active_limiters: contextvars.ContextVar[Mapping[str, RateLimiter] | None] = (
+    contextvars.ContextVar("model_rate_limiters", default=None)
+)
+
+
+async def _acquire(
+    limiters: Mapping[str, RateLimiter] | None, model: str | None
+) -> None:
+    limiter = (limiters or {}).get(model or "")
+    if limiter is None:
+        return
+    waited = await limiter.acquire()
+    if waited > 1:
+        logger.info(f"Rate limit: waited {waited:.1f}s for {model}")
+
+
+async def acquire_model_slot(model: str | None) -> None:
+    """Wait until a request to `model` is allowed in the current invocation.
+
+    A no-op outside a Runner with ModelRateLimitPlugin, or for models
+    without a limit.
+    """
+    await _acquire(_active_limiters.get(), model)
+
+
+class ModelRateLimitPlugin(BasePlugin):
+    """Runner plugin applying per-model limits to the Runner's model calls.
+
+    Args:
+        limits: Requests per minute by model name; non-positive values
+            mean no limit.
+    """
+
+    def __init__(self, limits: Mapping[str, float]) -> None:
+        super().__init__(name="model_rate_limit")
+        self.limiters = {
+            model: RateLimiter(per_minute)
+            for model, per_minute in limits.items()
+            if per_minute and per_minute > 0
+        }
+
+    async def before_run_callback(
+        self, *, invocation_context: InvocationContext
+    ) -> None:
+        # Set in the task running the invocation, so only its tools see it
+        _active_limiters.set(self.limiters)
+        return None
+
+    async def before_model_callback(
+        self, *, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> LlmResponse | None:
+        await _acquire(self.limiters, llm_request.model)
+        return None
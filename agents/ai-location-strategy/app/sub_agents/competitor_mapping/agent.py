@@ -15,14 +15,22 @@
 """Competitor Mapping Agent - Part 2A of the Location Strategy Pipeline.
 
 This agent maps competitors using the Google Maps Places API to get
-ground-truth data about existing businesses in the target area.
+ground-truth data about existing businesses in the target area. The raw
+Places results are also captured into a columnar dataset artifact
+(state["competitor_dataset"]) for downstream stages and the frontend.
 """
 
 from google.adk.agents import LlmAgent
 from google.genai import types
 
-from ...callbacks import after_competitor_mapping, before_competitor_mapping
-from ...config import FAST_MODEL, RETRY_ATTEMPTS, RETRY_INITIAL_DELAY
+from ...callbacks import (
+    after_competitor_mapping,
+    before_competitor_mapping,
+    capture_competitor_places,
+    finalize_competitor_dataset,
+)
+from ...config import FAST_MODEL, RETRY_INITIAL_DELAY
+from ...model_router import retry_attempts, routed_model
 from ...prompt_utils import make_instruction_provider
 from ...tools import search_places
 
@@ -42,6 +50,11 @@ Call the search_places function with queries like:
 - "{business_type} near {target_location}"
 - Related business types in the same area
 
+Each call returns one page of up to 20 places. If a result has
+more_results set and you need more coverage of that query, call it again
+with max_pages=2 or max_pages=3: that result contains the places you already
+have plus the next pages, so use it instead of the first one.
+
 ## Step 2: Analyze the Results
 For each competitor found, note:
 - Business name
@@ -105,6 +118,11 @@ Call the search_places function with multiple queries to get comprehensive cover
 - "server farm near {target_location}"
 - "cloud data center near {target_location}"
 
+Each call returns one page of up to 20 places. If a result has
+more_results set and you need more coverage of that query, call it again
+with max_pages=2 or max_pages=3: that result contains the places you already
+have plus the next pages, so use it instead of the first one.
+
 ## Step 2: Analyze the Results
 For each facility found, note:
 - Facility name and operator (e.g., Equinix, Digital Realty, CyrusOne, QTS, CoreSite)
@@ -160,19 +178,20 @@ Be specific and reference the actual data you receive from the search_places too
 
 competitor_mapping_agent = LlmAgent(
     name="CompetitorMappingAgent",
-    model=FAST_MODEL,
+    model=routed_model(FAST_MODEL),
     description="Maps competitors using Google Maps Places API for ground-truth competitor data",
     instruction=make_instruction_provider(COMPETITOR_MAPPING_INSTRUCTION_RETAIL, COMPETITOR_MAPPING_INSTRUCTION_DATACENTER),
     generate_content_config=types.GenerateContentConfig(
         http_options=types.HttpOptions(
             retry_options=types.HttpRetryOptions(
                 initial_delay=RETRY_INITIAL_DELAY,
-                attempts=RETRY_ATTEMPTS,
+                attempts=retry_attempts(FAST_MODEL),
             ),
         ),
     ),
     tools=[search_places],
     output_key="competitor_analysis",
     before_agent_callback=before_competitor_mapping,
-    after_agent_callback=after_competitor_mapping,
+    after_agent_callback=[after_competitor_mapping, finalize_competitor_dataset],
+    after_tool_callback=capture_competitor_places,
 )
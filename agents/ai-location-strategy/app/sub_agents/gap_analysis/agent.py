@@ -16,14 +16,25 @@
 
 This agent performs quantitative gap analysis using Python code execution
 to calculate saturation indices, viability scores, and zone rankings.
+
+Retail runs are normally scored natively (see tools/gap_scoring.py) by the
+native_gap_analysis callback, which skips the model; code execution is the
+fallback for datacenter runs and sparse competitor data.
 """
 
 from google.adk.agents import LlmAgent
 from google.adk.code_executors import BuiltInCodeExecutor
 from google.genai import types
 
-from ...callbacks import after_gap_analysis, before_gap_analysis
-from ...config import CODE_EXEC_MODEL, RETRY_ATTEMPTS, RETRY_INITIAL_DELAY
+from ...callbacks import (
+    after_gap_analysis,
+    before_gap_analysis,
+    index_code_blocks,
+    inject_spatial_metrics,
+    native_gap_analysis,
+)
+from ...config import CODE_EXEC_MODEL, RETRY_INITIAL_DELAY
+from ...model_router import retry_attempts, routed_model
 from ...prompt_utils import make_instruction_provider
 
 GAP_ANALYSIS_INSTRUCTION_RETAIL = """You are a data scientist analyzing market opportunities using quantitative methods.
@@ -42,6 +53,9 @@ CURRENT DATE: {current_date}
 ### COMPETITOR ANALYSIS (Part 2):
 {competitor_analysis}
 
+### SPATIAL METRICS (measured from Places coordinates):
+{spatial_metrics?}
+
 ## Your Mission
 Write and execute Python code to perform comprehensive quantitative analysis.
 
@@ -66,7 +80,7 @@ For each identified zone, compute:
 
 **Basic Metrics:**
 - Competitor count
-- Competitor density (per estimated area)
+- Competitor density (use the measured spatial metrics where available)
 - Average competitor rating
 - Total review volume
 
@@ -130,6 +144,9 @@ CURRENT DATE: {current_date}
 ### FACILITY LANDSCAPE ANALYSIS (Part 2):
 {competitor_analysis}
 
+### SPATIAL METRICS (measured from Places coordinates):
+{spatial_metrics?}
+
 ## Your Mission
 Write and execute Python code to perform comprehensive quantitative analysis for data center site selection.
 
@@ -209,19 +226,25 @@ Execute the code and provide actionable site selection recommendations based on
 
 gap_analysis_agent = LlmAgent(
     name="GapAnalysisAgent",
-    model=CODE_EXEC_MODEL,
+    model=routed_model(CODE_EXEC_MODEL),
     description="Performs quantitative gap analysis using Python code execution for zone rankings and viability scores",
     instruction=make_instruction_provider(GAP_ANALYSIS_INSTRUCTION_RETAIL, GAP_ANALYSIS_INSTRUCTION_DATACENTER),
     generate_content_config=types.GenerateContentConfig(
         http_options=types.HttpOptions(
             retry_options=types.HttpRetryOptions(
                 initial_delay=RETRY_INITIAL_DELAY,
-                attempts=RETRY_ATTEMPTS,
+                attempts=retry_attempts(CODE_EXEC_MODEL),
             ),
         ),
     ),
     code_executor=BuiltInCodeExecutor(),
     output_key="gap_analysis",
-    before_agent_callback=before_gap_analysis,
+    before_agent_callback=[
+        before_gap_analysis,
+        inject_spatial_metrics,
+        native_gap_analysis,
+    ],
+    # Index executed code as responses arrive, for gap_analysis_code
+    after_model_callback=index_code_blocks,
     after_agent_callback=after_gap_analysis,
 )
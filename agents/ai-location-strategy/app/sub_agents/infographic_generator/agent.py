@@ -25,7 +25,8 @@ from ...callbacks import (
     after_infographic_generator,
     before_infographic_generator,
 )
-from ...config import FAST_MODEL, RETRY_ATTEMPTS, RETRY_INITIAL_DELAY
+from ...config import FAST_MODEL, RETRY_INITIAL_DELAY
+from ...model_router import retry_attempts, routed_model
 from ...prompt_utils import make_instruction_provider
 from ...tools import generate_infographic
 
@@ -184,14 +185,14 @@ Store this result so the after_agent_callback can save the artifact.
 
 infographic_generator_agent = LlmAgent(
     name="InfographicGeneratorAgent",
-    model=FAST_MODEL,
+    model=routed_model(FAST_MODEL),
     description="Generates visual infographic summary using Gemini image generation",
     instruction=make_instruction_provider(INFOGRAPHIC_GENERATOR_INSTRUCTION_RETAIL, INFOGRAPHIC_GENERATOR_INSTRUCTION_DATACENTER),
     generate_content_config=types.GenerateContentConfig(
         http_options=types.HttpOptions(
             retry_options=types.HttpRetryOptions(
                 initial_delay=RETRY_INITIAL_DELAY,
-                attempts=RETRY_ATTEMPTS,
+                attempts=retry_attempts(FAST_MODEL),
             ),
         ),
     ),
@@ -17,15 +17,32 @@
 This agent parses the user's natural language request and extracts the
 required parameters (target_location, business_type) into session state
 for use by subsequent agents in the pipeline.
+
+Clearly structured requests are parsed by rules (tools/request_parser.py)
+in a before_model_callback, which answers in place of the model; only
+ambiguous requests cost a model call.
 """
 
+import logging
+
 from google.adk.agents import LlmAgent
 from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
 from google.genai import types
 from pydantic import BaseModel, Field
 
-from ...config import FAST_MODEL, RETRY_ATTEMPTS, RETRY_INITIAL_DELAY
+from ...config import (
+    FAST_INTAKE,
+    FAST_MODEL,
+    MODEL_HEDGE_AFTER_SECONDS,
+    RETRY_INITIAL_DELAY,
+)
+from ...metrics import metrics
+from ...model_router import retry_attempts, routed_model
 from ...prompt_utils import make_instruction_provider
+from ...tools.request_parser import parse_request
+
+logger = logging.getLogger("LocationStrategyPipeline")
 
 
 class UserRequest(BaseModel):
@@ -43,6 +60,38 @@ class UserRequest(BaseModel):
     )
 
 
+def parse_request_by_rules(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> LlmResponse | None:
+    """Answer with a rule-based parse when the request is unambiguous."""
+    contents = llm_request.contents or []
+    request = contents[-1] if contents else None
+    if request is None or request.role != "user":
+        return None
+    text = "\n".join(part.text for part in request.parts or [] if part.text)
+    style = callback_context.state.get("prompt_style", "datacenter")
+
+    parsed = parse_request(text, style)
+    metrics.inc("intake_parses_total", parser="rules" if parsed else "model")
+    if parsed is None:
+        logger.info("INTAKE: request is ambiguous, parsing with the model")
+        return None
+
+    logger.info(
+        f"INTAKE: parsed by rules: {parsed.business_type} in {parsed.target_location}"
+    )
+    result = UserRequest(
+        target_location=parsed.target_location,
+        business_type=parsed.business_type,
+        additional_context=parsed.additional_context,
+    )
+    return LlmResponse(
+        content=types.Content(
+            role="model", parts=[types.Part(text=result.model_dump_json())]
+        )
+    )
+
+
 def after_intake(callback_context: CallbackContext) -> types.Content | None:
     """After intake, copy the parsed values to state for other agents."""
     parsed = callback_context.state.get("parsed_request", {})
@@ -139,18 +188,19 @@ If the user doesn't specify a clear location or facility type, make a reasonable
 
 intake_agent = LlmAgent(
     name="IntakeAgent",
-    model=FAST_MODEL,
+    model=routed_model(FAST_MODEL, hedge_after=MODEL_HEDGE_AFTER_SECONDS),
     description="Parses user request to extract target location and facility/business type",
     instruction=make_instruction_provider(INTAKE_INSTRUCTION_RETAIL, INTAKE_INSTRUCTION_DATACENTER),
     generate_content_config=types.GenerateContentConfig(
         http_options=types.HttpOptions(
             retry_options=types.HttpRetryOptions(
                 initial_delay=RETRY_INITIAL_DELAY,
-                attempts=RETRY_ATTEMPTS,
+                attempts=retry_attempts(FAST_MODEL),
             ),
         ),
     ),
     output_schema=UserRequest,
     output_key="parsed_request",
+    before_model_callback=parse_request_by_rules if FAST_INTAKE else None,
     after_agent_callback=after_intake,
 )
@@ -25,7 +25,8 @@ from ...callbacks import (
     after_map_generator,
     before_map_generator,
 )
-from ...config import FAST_MODEL, RETRY_ATTEMPTS, RETRY_INITIAL_DELAY
+from ...config import FAST_MODEL, RETRY_INITIAL_DELAY
+from ...model_router import retry_attempts, routed_model
 from ...prompt_utils import make_instruction_provider
 from ...tools import generate_interactive_map
 
@@ -61,14 +62,14 @@ The generate_interactive_map tool will return a result dict containing:
 
 map_generator_agent = LlmAgent(
     name="MapGeneratorAgent",
-    model=FAST_MODEL,
+    model=routed_model(FAST_MODEL),
     description="Generates interactive Google Maps visualization of recommended locations",
     instruction=make_instruction_provider(MAP_GENERATOR_INSTRUCTION, MAP_GENERATOR_INSTRUCTION),
     generate_content_config=types.GenerateContentConfig(
         http_options=types.HttpOptions(
             retry_options=types.HttpRetryOptions(
                 initial_delay=RETRY_INITIAL_DELAY,
-                attempts=RETRY_ATTEMPTS,
+                attempts=retry_attempts(FAST_MODEL),
             ),
         ),
     ),
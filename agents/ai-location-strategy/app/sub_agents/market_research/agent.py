@@ -23,7 +23,8 @@ from google.adk.tools import google_search
 from google.genai import types
 
 from ...callbacks import after_market_research, before_market_research
-from ...config import FAST_MODEL, RETRY_ATTEMPTS, RETRY_INITIAL_DELAY
+from ...config import FAST_MODEL, RETRY_INITIAL_DELAY
+from ...model_router import retry_attempts, routed_model
 from ...prompt_utils import make_instruction_provider
 
 MARKET_RESEARCH_INSTRUCTION_RETAIL = """You are a market research analyst specializing in retail location intelligence.
@@ -129,14 +130,14 @@ Include specific recommendations for site selection strategy.
 
 market_research_agent = LlmAgent(
     name="MarketResearchAgent",
-    model=FAST_MODEL,
+    model=routed_model(FAST_MODEL),
     description="Researches market viability using Google Search for real-time demographics, trends, and commercial data",
     instruction=make_instruction_provider(MARKET_RESEARCH_INSTRUCTION_RETAIL, MARKET_RESEARCH_INSTRUCTION_DATACENTER),
     generate_content_config=types.GenerateContentConfig(
         http_options=types.HttpOptions(
             retry_options=types.HttpRetryOptions(
                 initial_delay=RETRY_INITIAL_DELAY,
-                attempts=RETRY_ATTEMPTS,
+                attempts=retry_attempts(FAST_MODEL),
             ),
         ),
     ),
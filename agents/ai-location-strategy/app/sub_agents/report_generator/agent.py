@@ -26,7 +26,8 @@ from google.adk.agents import LlmAgent
 from google.genai import types
 
 from ...callbacks import after_report_generator, before_report_generator
-from ...config import FAST_MODEL, RETRY_ATTEMPTS, RETRY_INITIAL_DELAY
+from ...config import FAST_MODEL, RETRY_INITIAL_DELAY
+from ...model_router import retry_attempts, routed_model
 from ...prompt_utils import make_instruction_provider
 from ...tools import generate_html_report
 
@@ -115,14 +116,14 @@ If there was an error, report what went wrong.
 
 report_generator_agent = LlmAgent(
     name="ReportGeneratorAgent",
-    model=FAST_MODEL,
+    model=routed_model(FAST_MODEL),
     description="Generates professional McKinsey/BCG-style HTML executive reports using the generate_html_report tool",
     instruction=make_instruction_provider(REPORT_GENERATOR_INSTRUCTION_RETAIL, REPORT_GENERATOR_INSTRUCTION_DATACENTER),
     generate_content_config=types.GenerateContentConfig(
         http_options=types.HttpOptions(
             retry_options=types.HttpRetryOptions(
                 initial_delay=RETRY_INITIAL_DELAY,
-                attempts=RETRY_ATTEMPTS,
+                attempts=retry_attempts(FAST_MODEL),
             ),
         ),
     ),
@@ -24,7 +24,8 @@ from google.genai import types
 from google.genai.types import ThinkingConfig
 
 from ...callbacks import after_strategy_advisor, before_strategy_advisor
-from ...config import PRO_MODEL, RETRY_ATTEMPTS, RETRY_INITIAL_DELAY
+from ...config import PRO_MODEL, RETRY_INITIAL_DELAY
+from ...model_router import retry_attempts, routed_model
 from ...prompt_utils import make_instruction_provider
 from ...schemas import LocationIntelligenceReport
 
@@ -44,6 +45,9 @@ CURRENT DATE: {current_date}
 ### COMPETITOR ANALYSIS (Part 2A):
 {competitor_analysis}
 
+### SPATIAL METRICS (measured from Places coordinates):
+{spatial_metrics?}
+
 ### GAP ANALYSIS (Part 2B):
 {gap_analysis}
 
@@ -64,7 +68,8 @@ For each promising zone, evaluate:
 - Overall Score: 0-100 weighted composite
 - Strengths: Top 3-4 factors with evidence from the analysis
 - Concerns: Top 2-3 risks with specific mitigation strategies
-- Competition Profile: Summarize density, quality, chain presence
+- Competition Profile: Summarize density, quality, chain presence. Take
+  `density_per_km2` from the measured spatial metrics of the zone when available
 - Market Characteristics: Population, income, infrastructure, foot traffic, costs
 - Best Customer Segment: Primary target demographic
 - Next Steps: 3-5 specific actionable recommendations
@@ -111,6 +116,9 @@ CURRENT DATE: {current_date}
 ### FACILITY LANDSCAPE ANALYSIS (Part 2A):
 {competitor_analysis}
 
+### SPATIAL METRICS (measured from Places coordinates):
+{spatial_metrics?}
+
 ### GAP ANALYSIS (Part 2B):
 {gap_analysis}
 
@@ -189,14 +197,14 @@ Reinterpret schema fields for data center context as described above.
 
 strategy_advisor_agent = LlmAgent(
     name="StrategyAdvisorAgent",
-    model=PRO_MODEL,
+    model=routed_model(PRO_MODEL),
     description="Synthesizes findings into strategic recommendations using extended reasoning and structured output",
     instruction=make_instruction_provider(STRATEGY_ADVISOR_INSTRUCTION_RETAIL, STRATEGY_ADVISOR_INSTRUCTION_DATACENTER),
     generate_content_config=types.GenerateContentConfig(
         http_options=types.HttpOptions(
             retry_options=types.HttpRetryOptions(
                 initial_delay=RETRY_INITIAL_DELAY,
-                attempts=RETRY_ATTEMPTS,
+                attempts=retry_attempts(PRO_MODEL),
             ),
         ),
     ),
@@ -0,0 +1,126 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Artifact references in session state.
+
+The report, infographic and map tools save their output as artifacts. With
+ARTIFACT_REFS_IN_STATE (the default) state only carries a reference to the
+saved version, e.g.
+
+    state["html_report_artifact"] = {
+        "artifact_name": "executive_report.html",
+        "version": 0,
+        "size": 48213,
+        "sha256": "...",
+        "mime_type": "text/html",
+        "session_id": "...",
+        "user_id": "...",
+    }
+
+and the AG-UI backend serves the bytes at /artifacts/{session_id}/{name}
+(to the user of the request's session, since artifacts are stored per user). The sha256 of the
+bytes identifies the content independently of the session and version it
+was saved as (see checkpoint_callbacks.py).
+Without it, the whole content is copied into state as before
+(html_report_content, infographic_base64, map_html_content), so every
+state delta and persisted session carries it.
+"""
+
+import base64
+import hashlib
+
+from google.adk.tools import ToolContext
+from google.genai import types
+
+from ..config import ARTIFACT_REFS_IN_STATE
+
+# State key for each tool output: (reference key, inline content key)
+HTML_REPORT_KEYS = ("html_report_artifact", "html_report_content")
+INFOGRAPHIC_KEYS = ("infographic_artifact", "infographic_base64")
+INFOGRAPHIC_THUMBNAIL_KEYS = (
+    "infographic_thumbnail_artifact",
+    "infographic_thumbnail_base64",
+)
+MAP_KEYS = ("map_artifact", "map_html_content")
+
+
+def output_state_key(keys: tuple[str, str]) -> str:
+    """The state key a tool output is written to in the configured mode."""
+    ref_key, content_key = keys
+    return ref_key if ARTIFACT_REFS_IN_STATE else content_key
+
+
+def artifact_ref(
+    artifact_name: str,
+    version: int,
+    data: bytes,
+    mime_type: str,
+    session_id: str | None,
+    **extra,
+) -> dict:
+    """Build the state reference to one saved artifact version."""
+    return {
+        "artifact_name": artifact_name,
+        "version": version,
+        "size": len(data),
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "mime_type": mime_type,
+        "session_id": session_id,
+        **extra,
+    }
+
+
+async def save_output_artifact(
+    tool_context: ToolContext,
+    filename: str,
+    data: bytes,
+    mime_type: str,
+    keys: tuple[str, str],
+    **extra,
+) -> int:
+    """Save a tool output as an artifact and publish it in state.
+
+    Args:
+        tool_context: The tool's context.
+        filename: Artifact filename.
+        data: Artifact bytes.
+        mime_type: Artifact MIME type.
+        keys: (reference key, inline content key) of the output.
+        **extra: Additional fields of the reference (e.g. width, height).
+
+    Returns:
+        int: The saved artifact version.
+    """
+    version = await tool_context.save_artifact(
+        filename=filename,
+        artifact=types.Part.from_bytes(data=data, mime_type=mime_type),
+    )
+    ref_key, content_key = keys
+    if ARTIFACT_REFS_IN_STATE:
+        invocation = tool_context._invocation_context
+        tool_context.state[ref_key] = artifact_ref(
+            filename,
+            version,
+            data,
+            mime_type,
+            invocation.session.id,
+            user_id=invocation.user_id,
+            **extra,
+        )
+    elif mime_type.startswith("text/"):
+        tool_context.state[content_key] = data.decode("utf-8")
+    else:
+        encoded = base64.b64encode(data).decode("utf-8")
+        tool_context.state[content_key] = f"data:{mime_type};base64,{encoded}"
+    return version
@@ -0,0 +1,223 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Columnar competitor dataset built from search_places results.
+
+Places results are collected into an Arrow table (one row per unique
+place_id) and saved as a Parquet artifact. Session state only carries a
+reference to it:
+
+    state["competitor_dataset"] = {
+        "artifact_name": "competitor_places.parquet",
+        "version": 2,
+        "size": 18231,
+        "sha256": "...",
+        "mime_type": "application/vnd.apache.parquet",
+        "rows": 57,
+        "session_id": "...",
+        "user_id": "...",
+    }
+
+While the competitor mapping stage runs, collect_places() accumulates the
+rows of each search in temp state (PENDING_PLACES_STATE, dropped after the
+invocation); save_competitor_dataset() serializes them once when the stage
+is done. Collecting doesn't await, so parallel search_places calls can't
+lose each other's rows.
+
+When the competitor mapping stage is restored from a checkpoint, the
+dataset is saved again into the current session and the reference points
+at that copy (see checkpoint_callbacks.py).
+"""
+
+import io
+import logging
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from google.genai import types
+
+from .artifact_refs import artifact_ref
+
+logger = logging.getLogger("LocationStrategyPipeline")
+
+COMPETITOR_DATASET_ARTIFACT = "competitor_places.parquet"
+PARQUET_MIME_TYPE = "application/vnd.apache.parquet"
+
+# Rows collected by this invocation's searches, not yet saved
+PENDING_PLACES_STATE = "temp:competitor_places"
+
+COMPETITOR_SCHEMA = pa.schema([
+    ("place_id", pa.string()),
+    ("name", pa.string()),
+    ("address", pa.string()),
+    ("rating", pa.float64()),
+    ("user_ratings_total", pa.int64()),
+    ("price_level", pa.int64()),
+    ("business_status", pa.string()),
+    ("types", pa.list_(pa.string())),
+    ("lat", pa.float64()),
+    ("lng", pa.float64()),
+    ("query", pa.string()),
+])
+
+
+def _number(value: Any, kind: type) -> Any:
+    """Coerce Places values ("N/A", None, numbers) to kind or None."""
+    try:
+        return kind(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _place_row(place: Mapping, query: str) -> dict:
+    """Flatten a search_places result into a COMPETITOR_SCHEMA row."""
+    location = place.get("location") or {}
+    return {
+        "place_id": place.get("place_id") or "",
+        "name": place.get("name", "Unknown"),
+        "address": place.get("address", ""),
+        "rating": _number(place.get("rating"), float),
+        "user_ratings_total": _number(place.get("user_ratings_total"), int),
+        "price_level": _number(place.get("price_level"), int),
+        "business_status": place.get("business_status", "UNKNOWN"),
+        "types": list(place.get("types") or []),
+        "lat": _number(location.get("lat"), float),
+        "lng": _number(location.get("lng"), float),
+        "query": query,
+    }
+
+
+def places_to_table(places: Iterable[Mapping], query: str = "") -> pa.Table:
+    """Convert search_places results into a COMPETITOR_SCHEMA table."""
+    return pa.Table.from_pylist(
+        [_place_row(place, query) for place in places], schema=COMPETITOR_SCHEMA
+    )
+
+
+def merge_rows(existing: list[dict], new: Iterable[dict]) -> list[dict]:
+    """Append rows whose place_id isn't in the existing rows yet."""
+    known = {row["place_id"] for row in existing}
+    merged = list(existing)
+    for row in new:
+        if not row["place_id"] or row["place_id"] not in known:
+            merged.append(row)
+            known.add(row["place_id"])
+    return merged
+
+
+def table_to_parquet(table: pa.Table) -> bytes:
+    """Serialize a table as zstd-compressed Parquet."""
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, compression="zstd")
+    return buffer.getvalue()
+
+
+def parquet_to_table(data: bytes) -> pa.Table:
+    """Deserialize Parquet bytes into a table."""
+    return pq.read_table(io.BytesIO(data))
+
+
+def _dataset_ref(table: pa.Table, data: bytes, version: int, invocation: Any) -> dict:
+    return artifact_ref(
+        COMPETITOR_DATASET_ARTIFACT,
+        version,
+        data,
+        PARQUET_MIME_TYPE,
+        invocation.session.id,
+        rows=table.num_rows,
+        user_id=invocation.user_id,
+    )
+
+
+def collect_places(state: Any, places: Iterable[Mapping], query: str) -> int:
+    """Add search results to the rows pending for this invocation.
+
+    Args:
+        state: The tool context's state.
+        places: search_places results.
+        query: The query that found them.
+
+    Returns:
+        int: The number of unique places collected so far.
+    """
+    rows = merge_rows(
+        state.get(PENDING_PLACES_STATE) or [],
+        (_place_row(place, query) for place in places),
+    )
+    state[PENDING_PLACES_STATE] = rows
+    return len(rows)
+
+
+async def save_competitor_dataset(context: Any) -> dict | None:
+    """Save the collected rows as the dataset artifact and reference it.
+
+    Args:
+        context: The CallbackContext of the competitor mapping stage.
+
+    Returns:
+        dict: The new state["competitor_dataset"] reference, or None if no
+        search returned places.
+    """
+    rows = context.state.get(PENDING_PLACES_STATE)
+    if not rows:
+        return None
+    table = pa.Table.from_pylist(rows, schema=COMPETITOR_SCHEMA)
+    data = table_to_parquet(table)
+    version = await context.save_artifact(
+        filename=COMPETITOR_DATASET_ARTIFACT,
+        artifact=types.Part.from_bytes(data=data, mime_type=PARQUET_MIME_TYPE),
+    )
+    ref = _dataset_ref(table, data, version, context._invocation_context)
+    context.state["competitor_dataset"] = ref
+    context.state[PENDING_PLACES_STATE] = None
+    return ref
+
+
+async def load_competitor_dataset(
+    context: Any, ref: Mapping | None
+) -> pa.Table | None:
+    """Load the dataset a state reference points to.
+
+    Goes through the artifact service directly (rather than the context's
+    load_artifact) so the reference's own session_id is honored.
+
+    Args:
+        context: A CallbackContext or ToolContext.
+        ref: The state["competitor_dataset"] reference.
+
+    Returns:
+        The Arrow table, or None if there is no dataset or it can't be loaded.
+    """
+    if not ref:
+        return None
+    invocation = getattr(context, "_invocation_context", None)
+    artifact_service = getattr(invocation, "artifact_service", None)
+    if artifact_service is None:
+        return None
+    try:
+        part = await artifact_service.load_artifact(
+            app_name=invocation.app_name,
+            user_id=invocation.user_id,
+            session_id=ref.get("session_id") or invocation.session.id,
+            filename=ref["artifact_name"],
+            version=ref.get("version"),
+        )
+    except Exception as e:
+        logger.warning(f"Could not load competitor dataset {ref}: {e}")
+        return None
+    if part is None or part.inline_data is None:
+        return None
+    return parquet_to_table(part.inline_data.data)
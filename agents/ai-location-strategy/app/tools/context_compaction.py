@@ -0,0 +1,139 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Budgeted digests of upstream stage outputs.
+
+compact_text() shrinks a markdown stage output (market research findings,
+competitor analysis, gap analysis) to a token budget without a model call.
+The digest is extractive and deterministic, so identical inputs give
+identical digests and memoization keys stay stable:
+
+- headings and table header rows (with their separator row) are always
+  kept, so the digest keeps the outline of the original and the meaning of
+  table columns;
+- the remaining lines are ranked by how much hard data they carry (numbers,
+  percentages, currency, bullet and table rows, bold labels) and kept in
+  that order until the budget is spent;
+- kept lines appear in their original order; over-long lines are cut.
+
+Tokens are estimated at CHARS_PER_TOKEN characters per token, which is close
+enough for English prose and markdown to budget prompts.
+"""
+
+import re
+
+CHARS_PER_TOKEN = 4
+MAX_LINE_CHARS = 600  # longer lines are cut before ranking
+
+_HEADING = re.compile(r"^\s*(#{1,6}\s|\*\*[^*]+\*\*:?\s*$|[A-Z][A-Z0-9 /&()-]{3,}:?\s*$)")
+_NUMBER = re.compile(r"\d")
+_QUANTITY = re.compile(r"[$€£₹%]|\d[\d,.]*\s?(k|m|bn|km|mi|sq|mw|/10)\b", re.I)
+_BULLET = re.compile(r"^\s*([-*+]|\d+[.)])\s")
+_TABLE_ROW = re.compile(r"^\s*\|")
+_TABLE_RULE = re.compile(r"^\s*\|?\s*:?-{3,}")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of text."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _level(line: str) -> int:
+    """Heading level: 1-6 for markdown headings, 7 for bold/caps labels."""
+    hashes = len(line.lstrip()) - len(line.lstrip().lstrip("#"))
+    return hashes or 7
+
+
+def _score(line: str) -> float:
+    """Rank a non-heading line by the hard data it carries."""
+    score = 0.0
+    if _NUMBER.search(line):
+        score += 2
+    score += min(len(_QUANTITY.findall(line)), 3)
+    if _BULLET.match(line) or _TABLE_ROW.match(line):
+        score += 1
+    if "**" in line:
+        score += 0.5
+    # Prefer dense lines over long narrative paragraphs
+    return score - len(line) / 1000
+
+
+def compact_text(text: str, budget_tokens: int, artifact_name: str = "") -> str:
+    """Shrink text to roughly budget_tokens, keeping its outline and data.
+
+    Args:
+        text: Markdown stage output.
+        budget_tokens: Token budget for the digest, including its footer.
+        artifact_name: Artifact holding the full text, named in the footer.
+
+    Returns:
+        text unchanged if it fits the budget, otherwise the digest.
+    """
+    if budget_tokens <= 0 or estimate_tokens(text) <= budget_tokens:
+        return text
+
+    source = f" (full text: artifact {artifact_name})" if artifact_name else ""
+    footer = (
+        f"\n[Digest: {estimate_tokens(text)} tokens shortened to about "
+        f"{budget_tokens}{source}]"
+    )
+    budget_chars = budget_tokens * CHARS_PER_TOKEN - len(footer)
+
+    lines = []
+    table_headers = set()
+    for line in text.splitlines():
+        line = line.rstrip()
+        if _TABLE_RULE.match(line):
+            # Keep the separator with its header row, or the rows that
+            # follow no longer parse as a markdown table
+            if lines and _TABLE_ROW.match(lines[-1]):
+                table_headers.add(len(lines) - 1)
+                lines[-1] += "\n" + line
+            continue
+        if not line.strip():
+            continue
+        if len(line) > MAX_LINE_CHARS:
+            line = line[: MAX_LINE_CHARS - 3].rstrip() + "..."
+        lines.append(line)
+
+    keep: set[int] = set()
+    used = 0
+    headings = table_headers | {
+        i for i, line in enumerate(lines) if _HEADING.match(line)
+    }
+    others = sorted(
+        (i for i in range(len(lines)) if i not in headings),
+        key=lambda i: (-_score(lines[i]), i),
+    )
+    for index in [*sorted(headings), *others]:
+        cost = len(lines[index]) + 1
+        if used + cost > budget_chars:
+            continue
+        keep.add(index)
+        used += cost
+
+    # Drop headings whose section kept nothing (next kept line is a heading
+    # of the same or a higher level)
+    kept = sorted(keep)
+    digest = []
+    for n, i in enumerate(kept):
+        if i in headings:
+            following = kept[n + 1] if n + 1 < len(kept) else None
+            if following is None or (
+                following in headings
+                and _level(lines[following]) <= _level(lines[i])
+            ):
+                continue
+        digest.append(lines[i])
+    return "\n".join(digest) + footer
@@ -0,0 +1,268 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Deterministic gap-analysis scoring engine (retail).
+
+Implements the metrics of GAP_ANALYSIS_INSTRUCTION_RETAIL with vectorized
+pandas/NumPy over the columnar competitor dataset captured from
+search_places, instead of having the code-execution model re-parse the
+competitor analysis text and write the same analysis from scratch:
+
+- Zones are the cells of the spatial grid index (spatial_index.py), named
+  after the most common neighborhood in their competitors' addresses.
+- Competition Quality Score: mean of rating / 5, with high performers
+  (rating >= GAP_HIGH_PERFORMER_RATING) weighted 1.5x.
+- Demand Signal (0-100): log review volume of the zone relative to the
+  busiest zone. Review volume is the demand evidence Places data carries.
+- Market Saturation Index: (competitors * quality) / demand.
+- Viability Score (0-100): the weighted ranking of Step 5
+  (GAP_RANKING_WEIGHTS_RETAIL).
+
+Infrastructure quality is not observable in Places data and is scored
+neutrally (50) for every zone; costs are approximated by price_level.
+"""
+
+import re
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+from ..config import (
+    GAP_HIGH_PERFORMER_RATING,
+    GAP_RANKING_WEIGHTS_RETAIL,
+    GAP_ZONE_CELL_KM,
+)
+from .spatial_index import assign_zones
+
+NEUTRAL_INFRASTRUCTURE = 0.5
+NEUTRAL_QUALITY = 0.5
+MIN_DEMAND = 0.05  # floor so zones without reviews don't divide by zero
+
+
+def _brand(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", str(name).lower()).strip()
+
+
+def places_frame(places: pd.DataFrame) -> pd.DataFrame:
+    """Prepare the competitor dataset (tools/competitor_dataset.py) for scoring.
+
+    Places without coordinates, duplicates (by place_id) and permanently
+    closed businesses are dropped. A competitor counts as part of a chain
+    when its brand name appears more than once in the dataset.
+    """
+    columns = ["place_id", "name", "address", "rating", "user_ratings_total",
+               "price_level", "business_status", "lat", "lng"]
+    df = places.reindex(columns=columns).rename(
+        columns={"user_ratings_total": "reviews"}
+    )
+    df["place_id"] = df["place_id"].fillna("")
+    df["address"] = df["address"].fillna("")
+
+    for column in ("rating", "reviews", "price_level", "lat", "lng"):
+        df[column] = pd.to_numeric(df[column], errors="coerce")
+    # Places reports 0 for "no rating yet"
+    df["rating"] = df["rating"].where(df["rating"] > 0)
+    df["reviews"] = df["reviews"].fillna(0)
+
+    df = df.dropna(subset=["lat", "lng"])
+    df = df[df["business_status"] != "CLOSED_PERMANENTLY"]
+    with_id = df["place_id"] != ""
+    df = pd.concat(
+        [df[with_id].drop_duplicates("place_id"), df[~with_id]]
+    ).reset_index(drop=True)
+
+    brands = df["name"].map(_brand)
+    df["is_chain"] = brands.map(brands.value_counts()) > 1
+    return df
+
+
+def _minmax(values: pd.Series) -> pd.Series:
+    spread = values.max() - values.min()
+    if not np.isfinite(spread) or spread == 0:
+        return pd.Series(0.5, index=values.index)
+    return (values - values.min()) / spread
+
+
+def score_zones(
+    df: pd.DataFrame,
+    cell_km: float = GAP_ZONE_CELL_KM,
+    weights: Mapping[str, float] = GAP_RANKING_WEIGHTS_RETAIL,
+    high_rating: float = GAP_HIGH_PERFORMER_RATING,
+) -> pd.DataFrame:
+    """Compute zone metrics, saturation, viability and ranking.
+
+    Args:
+        df: Competitor DataFrame from places_frame().
+        cell_km: Zone grid cell size in kilometers.
+        weights: Weights of the ranking factors (see config.py).
+        high_rating: Rating at or above which a competitor is a high performer.
+
+    Returns:
+        One row per zone, sorted by rank (1 = best opportunity).
+    """
+    df = assign_zones(df, cell_km)
+    high = df["rating"] >= high_rating
+    df = df.assign(
+        high_performer=high,
+        quality=(df["rating"] / 5.0) * np.where(high, 1.5, 1.0),
+    )
+
+    zones = df.groupby(["zone_id", "zone"], sort=False).agg(
+        competitor_count=("name", "size"),
+        avg_rating=("rating", "mean"),
+        total_reviews=("reviews", "sum"),
+        high_performers=("high_performer", "sum"),
+        quality_score=("quality", "mean"),
+        chain_ratio=("is_chain", "mean"),
+        price_level=("price_level", "mean"),
+        local_density_per_km2=("local_density_per_km2", "mean"),
+        median_nearest_km=("nearest_km", "median"),
+        lat=("lat", "mean"),
+        lng=("lng", "mean"),
+    ).reset_index()
+
+    zones["quality_score"] = zones["quality_score"].fillna(NEUTRAL_QUALITY)
+    zones["density_per_km2"] = zones["competitor_count"] / cell_km**2
+
+    log_reviews = np.log1p(zones["total_reviews"])
+    demand = log_reviews / log_reviews.max() if log_reviews.max() > 0 else 0.0
+    zones["demand_signal"] = 100 * demand
+    zones["saturation_index"] = (
+        zones["competitor_count"] * zones["quality_score"]
+    ) / np.maximum(demand, MIN_DEMAND)
+    saturation = _minmax(zones["saturation_index"])
+
+    # Places price_level is 0 (free) to 4 (very expensive)
+    default_price = zones["price_level"].mean()
+    cost = (
+        zones["price_level"].fillna(2.0 if np.isnan(default_price) else default_price)
+        / 4.0
+    ).clip(0, 1)
+    zones["infrastructure_score"] = 100 * NEUTRAL_INFRASTRUCTURE
+    zones["cost_index"] = 100 * cost
+
+    zones["viability_score"] = 100 * (
+        weights["low_saturation"] * (1 - saturation)
+        + weights["demand"] * demand
+        + weights["low_chain_dominance"] * (1 - zones["chain_ratio"])
+        + weights["infrastructure"] * NEUTRAL_INFRASTRUCTURE
+        + weights["manageable_costs"] * (1 - cost)
+    )
+
+    zones["category"] = np.select(
+        [saturation >= 2 / 3, saturation <= 1 / 3],
+        ["SATURATED", "OPPORTUNITY"],
+        default="MODERATE",
+    )
+    zones["risk_level"] = np.select(
+        [zones["viability_score"] >= 65, zones["viability_score"] >= 45],
+        ["Low", "Medium"],
+        default="High",
+    )
+    zones["rank"] = (
+        zones["viability_score"].rank(ascending=False, method="first").astype(int)
+    )
+    return zones.sort_values("rank").reset_index(drop=True)
+
+
+def _markdown_table(df: pd.DataFrame) -> str:
+    lines = [
+        "| " + " | ".join(df.columns) + " |",
+        "| " + " | ".join("---" for _ in df.columns) + " |",
+    ]
+    lines += [
+        "| " + " | ".join(str(v) for v in row) + " |"
+        for row in df.itertuples(index=False)
+    ]
+    return "\n".join(lines)
+
+
+def _fmt(value: float, digits: int = 1) -> str:
+    return "n/a" if not np.isfinite(value) else f"{value:.{digits}f}"
+
+
+def render_gap_analysis(
+    zones: pd.DataFrame,
+    competitor_count: int,
+    target_location: str,
+    business_type: str,
+) -> str:
+    """Render scored zones as the markdown gap_analysis report."""
+    metrics = pd.DataFrame({
+        "Rank": zones["rank"],
+        "Zone": zones["zone"],
+        "Competitors": zones["competitor_count"],
+        "Density /km²": zones["density_per_km2"].map(_fmt),
+        "Nearest (km)": zones["median_nearest_km"].map(lambda v: _fmt(v, 2)),
+        "Avg Rating": zones["avg_rating"].map(lambda v: _fmt(v, 2)),
+        "Reviews": zones["total_reviews"].astype(int),
+        "4.5+ Rated": zones["high_performers"].astype(int),
+        "Chain %": (100 * zones["chain_ratio"]).map(lambda v: _fmt(v, 0)),
+        "Demand": zones["demand_signal"].map(_fmt),
+        "Saturation": zones["saturation_index"].map(lambda v: _fmt(v, 2)),
+        "Viability": zones["viability_score"].map(_fmt),
+        "Category": zones["category"],
+    })
+    risk = pd.DataFrame({
+        "Zone": zones["zone"],
+        "Category": zones["category"],
+        "Risk Level": zones["risk_level"],
+        "Competition Quality": zones["quality_score"].map(lambda v: _fmt(v, 2)),
+        "Chain %": (100 * zones["chain_ratio"]).map(lambda v: _fmt(v, 0)),
+        "Cost Index": zones["cost_index"].map(_fmt),
+    })
+
+    top = []
+    for zone in zones.head(3).itertuples(index=False):
+        top.append(
+            f"{zone.rank}. **{zone.zone}** — viability {zone.viability_score:.1f}/100, "
+            f"{zone.category}, {zone.risk_level} risk: {zone.competitor_count} "
+            f"competitors ({int(zone.high_performers)} rated 4.5+), demand signal "
+            f"{zone.demand_signal:.0f}, saturation index {zone.saturation_index:.2f}, "
+            f"{100 * zone.chain_ratio:.0f}% chains"
+        )
+
+    w = GAP_RANKING_WEIGHTS_RETAIL
+    return "\n".join([
+        f"## Quantitative Gap Analysis: {business_type} in {target_location}",
+        "",
+        f"Deterministic scoring of {competitor_count} geolocated competitors "
+        f"across {len(zones)} zones ({GAP_ZONE_CELL_KM:g} km grid cells).",
+        "",
+        "### Zone Metrics",
+        _markdown_table(metrics),
+        "",
+        "### Top 3 Recommended Zones",
+        *top,
+        "",
+        "### Risk Assessment Matrix",
+        _markdown_table(risk),
+        "",
+        "### Method",
+        "- Density is measured per zone cell; Nearest is the median distance "
+        "from a zone's competitors to their nearest competitor (n/a if alone).",
+        "- Competition Quality Score: mean rating/5, competitors rated "
+        f"{GAP_HIGH_PERFORMER_RATING}+ weighted 1.5x.",
+        "- Demand Signal: log review volume relative to the busiest zone "
+        "(Places reviews as foot-traffic proxy).",
+        "- Market Saturation Index: (competitors × quality) / demand.",
+        f"- Viability Score: low saturation {w['low_saturation']:.0%}, demand "
+        f"{w['demand']:.0%}, low chain dominance {w['low_chain_dominance']:.0%}, "
+        f"infrastructure {w['infrastructure']:.0%}, manageable costs "
+        f"{w['manageable_costs']:.0%}.",
+        "- Infrastructure is not observable in Places data and is scored "
+        "neutrally; weigh it using the market research findings. Costs use "
+        "the average Places price level as a proxy.",
+    ])
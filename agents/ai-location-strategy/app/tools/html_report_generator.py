@@ -17,26 +17,47 @@
 Uses direct text generation (same as original notebook Part 4) to create
 McKinsey/BCG style 7-slide HTML presentations from strategic report data.
 Saves the generated HTML as an artifact for download in adk web.
+
+Generation uses the async client and streams the response, so the event loop
+stays free for other sessions while the PRO model works. Partial HTML is
+published under state["html_report_stream_id"] (see get_report_stream) so
+the AG-UI backend can serve a live preview before the tool returns. The
+partial HTML lives in this process only: with several backend workers the
+preview is only served by the worker running the pipeline.
 """
 
 import logging
+import time
 from datetime import datetime
 
 from google import genai
 from google.adk.tools import ToolContext
 from google.genai import types
-from google.genai.errors import ServerError
 from tenacity import (
     retry,
-    retry_if_exception_type,
+    retry_if_exception,
     stop_after_attempt,
-    wait_exponential,
+    wait_random_exponential,
 )
 
 from ..config import PRO_MODEL
+from ..metrics import metrics
+from ..model_router import is_overload_error, model_router, record_served_model
+from ..rate_limits import acquire_model_slot
+from .artifact_refs import HTML_REPORT_KEYS, save_output_artifact
 
 logger = logging.getLogger("LocationStrategyPipeline")
 
+# Chunks of reports currently being generated, keyed by stream ID; joined
+# on read so appending a chunk doesn't copy the HTML received so far
+_report_streams: dict[str, list[str]] = {}
+
+
+def get_report_stream(stream_id: str) -> str | None:
+    """Return the HTML received so far for an in-progress report, if any."""
+    chunks = _report_streams.get(stream_id)
+    return None if chunks is None else "".join(chunks)
+
 
 async def generate_html_report(
     report_data: str, tool_context: ToolContext
@@ -152,29 +173,72 @@ Current date: {current_date}
 
         logger.info("Generating HTML report using Gemini...")
 
-        # Retry wrapper for handling model overload errors
-        @retry(
-            stop=stop_after_attempt(3),
-            wait=wait_exponential(multiplier=2, min=2, max=30),
-            retry=retry_if_exception_type(ServerError),
-            before_sleep=lambda retry_state: logger.warning(
+        stream_id = tool_context.state.get("html_report_stream_id")
+
+        # Retry wrapper for handling model overload errors. Jittered backoff
+        # keeps parallel sessions from retrying in lockstep, and tenacity
+        # awaits between attempts, so the event loop is never blocked.
+        def log_retry(retry_state) -> None:
+            metrics.record_retry("report_generation", "generate_html_report")
+            logger.warning(
                 f"Gemini API error, retrying in {retry_state.next_action.sleep} seconds... "
                 f"(attempt {retry_state.attempt_number}/3)"
-            ),
+            )
+
+        async def generate(model: str) -> str:
+            chunks: list[str] = []
+            usage = None
+            if stream_id:
+                _report_streams[stream_id] = chunks
+            await acquire_model_slot(model)
+            started = time.perf_counter()
+            try:
+                stream = await client.aio.models.generate_content_stream(
+                    model=model,
+                    contents=prompt,
+                    config=types.GenerateContentConfig(temperature=1.0),
+                )
+                async for chunk in stream:
+                    usage = chunk.usage_metadata or usage
+                    if chunk.text:
+                        chunks.append(chunk.text)
+            except Exception:
+                metrics.record_model_call(
+                    "report_generation", model,
+                    time.perf_counter() - started, error=True,
+                )
+                raise
+            metrics.record_model_call(
+                "report_generation", model, time.perf_counter() - started, usage
+            )
+            return "".join(chunks)
+
+        @retry(
+            stop=stop_after_attempt(3),
+            wait=wait_random_exponential(multiplier=2, min=2, max=30),
+            # Retries the whole chain, including the 429 raised when every
+            # model of it is overloaded
+            retry=retry_if_exception(is_overload_error),
+            before_sleep=log_retry,
         )
-        def generate_with_retry():
-            return client.models.generate_content(
-                model=PRO_MODEL,
-                contents=prompt,
-                config=types.GenerateContentConfig(temperature=1.0),
+        async def generate_with_retry() -> str:
+            # Falls back along PRO_MODEL's chain when it is overloaded
+            html, served = await model_router.call(PRO_MODEL, generate)
+            if served != PRO_MODEL:
+                metrics.record_fallback("report_generation", PRO_MODEL, served)
+            record_served_model(
+                tool_context.state, "report_generation", "generate_html_report", served
             )
+            return html
 
         # Direct text generation (NOT code execution)
         # Same as original notebook: types.GenerateContentConfig(temperature=1.0)
-        response = generate_with_retry()
+        try:
+            html_code = await generate_with_retry()
+        finally:
+            if stream_id:
+                _report_streams.pop(stream_id, None)
 
-        # Extract HTML from response.text
-        html_code = response.text
         # Strip markdown code fences if present
         if html_code.startswith("```"):
             # Remove opening fence (```html or ```)
@@ -197,19 +261,17 @@ Current date: {current_date}
         ) and not html_code.strip().startswith("<html"):
             logger.warning("Generated content may not be valid HTML")
 
-        # Save as artifact with proper MIME type so it appears in ADK web UI
-        html_artifact = types.Part.from_bytes(
-            data=html_code.encode("utf-8"), mime_type="text/html"
-        )
+        # Save as artifact with proper MIME type so it appears in ADK web UI,
+        # and publish it in state for AG-UI frontend display
         artifact_filename = "executive_report.html"
-
-        version = await tool_context.save_artifact(
-            filename=artifact_filename, artifact=html_artifact
+        version = await save_output_artifact(
+            tool_context,
+            artifact_filename,
+            html_code.encode("utf-8"),
+            "text/html",
+            HTML_REPORT_KEYS,
         )
 
-        # Also store in state for AG-UI frontend display
-        tool_context.state["html_report_content"] = html_code
-
         logger.info(
             f"Saved HTML report artifact: {artifact_filename} (version {version})"
         )
@@ -19,24 +19,35 @@ Uses gemini-3-pro-image-preview model for image generation.
 Requires GOOGLE_API_KEY environment variable to be set.
 
 Saves the generated infographic directly as an artifact using tool_context.save_artifact()
-so it's accessible in adk web UI.
+so it's accessible in adk web UI. The image is re-encoded (WebP by default) and
+saved with a thumbnail first, see image_processing.py.
 """
 
+import asyncio
 import base64
 import logging
+import time
 
 from google import genai
 from google.adk.tools import ToolContext
 from google.genai import types
-from google.genai.errors import ServerError
 from tenacity import (
     retry,
-    retry_if_exception_type,
+    retry_if_exception,
     stop_after_attempt,
-    wait_exponential,
+    wait_random_exponential,
 )
 
 from ..config import IMAGE_MODEL
+from ..metrics import metrics
+from ..model_router import is_overload_error, model_router, record_served_model
+from ..rate_limits import acquire_model_slot
+from .artifact_refs import (
+    INFOGRAPHIC_KEYS,
+    INFOGRAPHIC_THUMBNAIL_KEYS,
+    save_output_artifact,
+)
+from .image_processing import process_infographic
 
 logger = logging.getLogger("LocationStrategyPipeline")
 
@@ -49,8 +60,9 @@ async def generate_infographic(
     This tool creates a professional infographic visualizing the location
     intelligence report data using Gemini 3 Pro Image model via AI Studio.
 
-    The generated image is automatically saved as an artifact named "infographic.png"
-    which can be viewed in the adk web UI.
+    The generated image is automatically saved as an artifact named
+    "infographic.webp" (extension per INFOGRAPHIC_FORMAT), with a thumbnail
+    "infographic_thumbnail.webp", which can be viewed in the adk web UI.
 
     Args:
         data_summary: A concise summary of the location intelligence report
@@ -93,26 +105,58 @@ Create an infographic that a business executive would use in a board presentatio
         # Retry wrapper for handling model overload errors
         num_attempts = 10
 
-        @retry(
-            stop=stop_after_attempt(num_attempts),
-            wait=wait_exponential(multiplier=2, min=2, max=30),
-            retry=retry_if_exception_type(ServerError),
-            before_sleep=lambda retry_state: logger.warning(
+        # Jittered backoff, awaited between attempts (non-blocking)
+        def log_retry(retry_state) -> None:
+            metrics.record_retry("infographic_generation", "generate_infographic")
+            logger.warning(
                 f"Gemini API error, retrying in {retry_state.next_action.sleep} seconds... "
                 f"(attempt {retry_state.attempt_number}/{num_attempts})"
-            ),
+            )
+
+        async def generate(model: str):
+            await acquire_model_slot(model)
+            started = time.perf_counter()
+            try:
+                response = await client.aio.models.generate_content(
+                    model=model,
+                    contents=prompt,
+                    config=types.GenerateContentConfig(
+                        response_modalities=["TEXT", "IMAGE"],
+                        image_config=types.ImageConfig(
+                            aspect_ratio="16:9",
+                        ),
+                    ),
+                )
+            except Exception:
+                metrics.record_model_call(
+                    "infographic_generation", model,
+                    time.perf_counter() - started, error=True,
+                )
+                raise
+            metrics.record_model_call(
+                "infographic_generation", model,
+                time.perf_counter() - started, response.usage_metadata,
+            )
+            return response
+
+        @retry(
+            stop=stop_after_attempt(num_attempts),
+            wait=wait_random_exponential(multiplier=2, min=2, max=30),
+            # Retries the whole chain, including the 429 raised when every
+            # model of it is overloaded
+            retry=retry_if_exception(is_overload_error),
+            before_sleep=log_retry,
         )
         async def generate_with_retry():
-            return await client.aio.models.generate_content(
-                model=IMAGE_MODEL,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    response_modalities=["TEXT", "IMAGE"],
-                    image_config=types.ImageConfig(
-                        aspect_ratio="16:9",
-                    ),
-                ),
+            # Falls back along IMAGE_MODEL's chain when it is overloaded
+            response, served = await model_router.call(IMAGE_MODEL, generate)
+            if served != IMAGE_MODEL:
+                metrics.record_fallback("infographic_generation", IMAGE_MODEL, served)
+            record_served_model(
+                tool_context.state, "infographic_generation", "generate_infographic",
+                served,
             )
+            return response
 
         # Generate the image using Gemini 3 Pro Image model
         response = await generate_with_retry()
@@ -124,36 +168,58 @@ Create an infographic that a business executive would use in a board presentatio
                     image_bytes = part.inline_data.data
                     mime_type = part.inline_data.mime_type or "image/png"
 
+                    # Compressed primary image and thumbnail (CPU-bound)
+                    image, thumbnail = await asyncio.to_thread(
+                        process_infographic, image_bytes, mime_type
+                    )
+
                     # Save the image directly as an artifact using tool_context
                     # This is the recommended ADK pattern for saving binary artifacts
                     # Note: save_artifact is async, so we must await it
                     try:
-                        image_artifact = types.Part.from_bytes(
-                            data=image_bytes, mime_type=mime_type
-                        )
-                        artifact_filename = "infographic.png"
-                        version = await tool_context.save_artifact(
-                            filename=artifact_filename, artifact=image_artifact
+                        artifact_filename = f"infographic.{image.extension}"
+                        thumbnail_filename = None
+                        # Thumbnail first, so the frontend has it when the
+                        # full image's reference arrives
+                        if thumbnail is not None:
+                            thumbnail_filename = (
+                                f"infographic_thumbnail.{thumbnail.extension}"
+                            )
+                            await save_output_artifact(
+                                tool_context,
+                                thumbnail_filename,
+                                thumbnail.data,
+                                thumbnail.mime_type,
+                                INFOGRAPHIC_THUMBNAIL_KEYS,
+                                width=thumbnail.width,
+                                height=thumbnail.height,
+                            )
+                        # Also published in state for AG-UI frontend display
+                        version = await save_output_artifact(
+                            tool_context,
+                            artifact_filename,
+                            image.data,
+                            image.mime_type,
+                            INFOGRAPHIC_KEYS,
+                            width=image.width,
+                            height=image.height,
                         )
                         logger.info(
                             f"Saved infographic artifact: {artifact_filename} (version {version})"
                         )
 
-                        # Also store base64 in state for AG-UI frontend display
-                        b64_image = base64.b64encode(image_bytes).decode(
-                            "utf-8"
-                        )
-                        tool_context.state["infographic_base64"] = (
-                            f"data:{mime_type};base64,{b64_image}"
-                        )
-
                         return {
                             "status": "success",
                             "message": f"Infographic generated and saved as artifact '{artifact_filename}'",
                             "artifact_saved": True,
                             "artifact_filename": artifact_filename,
                             "artifact_version": version,
-                            "mime_type": mime_type,
+                            "mime_type": image.mime_type,
+                            "width": image.width,
+                            "height": image.height,
+                            "size_bytes": len(image.data),
+                            "original_size_bytes": len(image_bytes),
+                            "thumbnail_filename": thumbnail_filename,
                         }
                     except Exception as save_error:
                         logger.warning(f"Failed to save artifact: {save_error}")
@@ -162,10 +228,10 @@ Create an infographic that a business executive would use in a board presentatio
                             "status": "success",
                             "message": "Infographic generated but artifact save failed",
                             "artifact_saved": False,
-                            "image_data": base64.b64encode(image_bytes).decode(
+                            "image_data": base64.b64encode(image.data).decode(
                                 "utf-8"
                             ),
-                            "mime_type": mime_type,
+                            "mime_type": image.mime_type,
                             "save_error": str(save_error),
                         }
 
@@ -0,0 +1,145 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Post-processing of generated infographics.
+
+IMAGE_MODEL returns a multi-megabyte PNG. Before it is saved, the image is
+re-encoded in INFOGRAPHIC_FORMAT (WebP by default; AVIF where Pillow supports
+it, or an optimized PNG) and a small WebP thumbnail is made for the frontend
+to show while the full image loads. If re-encoding doesn't make the image
+smaller, or the bytes can't be decoded, the original is kept.
+
+Encoding is CPU-bound, so callers run process_infographic() in a worker
+thread (asyncio.to_thread).
+"""
+
+import io
+import logging
+from dataclasses import dataclass
+
+from PIL import Image, features
+
+from ..config import (
+    INFOGRAPHIC_FORMAT,
+    INFOGRAPHIC_QUALITY,
+    INFOGRAPHIC_THUMBNAIL_QUALITY,
+    INFOGRAPHIC_THUMBNAIL_WIDTH,
+)
+
+logger = logging.getLogger("LocationStrategyPipeline")
+
+# Pillow format -> (MIME type, file extension)
+IMAGE_FORMATS = {
+    "WEBP": ("image/webp", "webp"),
+    "AVIF": ("image/avif", "avif"),
+    "PNG": ("image/png", "png"),
+    "JPEG": ("image/jpeg", "jpg"),
+}
+
+
+@dataclass(frozen=True)
+class EncodedImage:
+    """Encoded image bytes and their dimensions."""
+
+    data: bytes
+    mime_type: str
+    width: int
+    height: int
+
+    @property
+    def extension(self) -> str:
+        for mime_type, extension in IMAGE_FORMATS.values():
+            if mime_type == self.mime_type:
+                return extension
+        return self.mime_type.rsplit("/", 1)[-1]
+
+
+def _target_format(requested: str) -> str | None:
+    """Pillow format to encode to; None keeps the original bytes."""
+    if requested == "ORIGINAL":
+        return None
+    if requested == "AVIF" and not features.check("avif"):
+        logger.warning("AVIF encoding not supported by Pillow, using WEBP")
+        return "WEBP"
+    if requested not in IMAGE_FORMATS:
+        logger.warning(f"Unknown infographic format {requested!r}, using WEBP")
+        return "WEBP"
+    return requested
+
+
+def _encode(image: Image.Image, image_format: str, quality: int) -> bytes:
+    buffer = io.BytesIO()
+    if image_format == "PNG":
+        image.save(buffer, format="PNG", optimize=True)
+    elif image_format == "WEBP":
+        image.save(buffer, format="WEBP", quality=quality, method=6)
+    elif image_format == "JPEG":
+        image.convert("RGB").save(
+            buffer, format="JPEG", quality=quality, optimize=True, progressive=True
+        )
+    else:
+        image.save(buffer, format=image_format, quality=quality)
+    return buffer.getvalue()
+
+
+def process_infographic(
+    data: bytes,
+    mime_type: str,
+    image_format: str = INFOGRAPHIC_FORMAT,
+) -> tuple[EncodedImage, EncodedImage | None]:
+    """Re-encode a generated infographic and make its thumbnail.
+
+    Args:
+        data: Image bytes returned by the model.
+        mime_type: Their MIME type.
+        image_format: WEBP, AVIF, PNG, JPEG or ORIGINAL.
+
+    Returns:
+        (primary image, thumbnail). The thumbnail is None if the image
+        could not be decoded; the primary image is then the original bytes
+        with unknown (0) dimensions.
+    """
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.load()
+    except Exception as e:
+        logger.warning(f"Could not decode infographic, keeping original: {e}")
+        return EncodedImage(data, mime_type, 0, 0), None
+
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    width, height = image.size
+
+    primary = EncodedImage(data, mime_type, width, height)
+    target = _target_format(image_format.upper())
+    if target is not None:
+        encoded = _encode(image, target, INFOGRAPHIC_QUALITY)
+        if len(encoded) < len(data):
+            primary = EncodedImage(encoded, IMAGE_FORMATS[target][0], width, height)
+        logger.info(
+            f"Infographic {width}x{height}: {len(data)} -> {len(primary.data)} bytes "
+            f"({primary.mime_type})"
+        )
+
+    thumbnail_image = image.copy()
+    thumbnail_image.thumbnail(
+        (INFOGRAPHIC_THUMBNAIL_WIDTH, INFOGRAPHIC_THUMBNAIL_WIDTH * 4),
+        Image.Resampling.LANCZOS,
+    )
+    thumbnail = EncodedImage(
+        _encode(thumbnail_image, "WEBP", INFOGRAPHIC_THUMBNAIL_QUALITY),
+        "image/webp",
+        *thumbnail_image.size,
+    )
+    return primary, thumbnail
@@ -21,20 +21,45 @@ and the Maps JavaScript API for client-side rendering.
 
 Requires MAPS_API_KEY environment variable (also used by places_search.py).
 The Google Cloud project must have Maps JavaScript API and Places API enabled.
+
+Geocode results (including "no results") are cached on disk via
+persistent_cache.py, and cache misses are looked up concurrently.
+
+The map also shows every competitor of the competitor dataset (hundreds to
+thousands of points) as clustered markers. To keep the page small they are
+embedded as an encoded polyline plus columnar metadata with lookup tables
+for repeated strings, and InfoWindow content is only built on click.
 """
 
+import asyncio
+import html
 import json
 import logging
 import os
 import re
+from collections.abc import Iterable
 
 import googlemaps
-from ..config import MAPS_API_KEY
+import pyarrow as pa
 from google.adk.tools import ToolContext
-from google.genai import types
+
+from ..config import (
+    GEOCODE_CACHE_TTL,
+    GEOCODE_MAX_CONCURRENCY,
+    GEOCODE_NEGATIVE_CACHE_TTL,
+    MAPS_API_KEY,
+)
+from .artifact_refs import MAP_KEYS, save_output_artifact
+from .competitor_dataset import load_competitor_dataset
+from .persistent_cache import PersistentCache, get_cache
+from .places_search import get_maps_client
 
 logger = logging.getLogger("LocationStrategyPipeline")
 
+MARKER_CLUSTERER_URL = (
+    "https://unpkg.com/@googlemaps/markerclusterer@2.5.3/dist/index.min.js"
+)
+
 
 def _extract_locations(report: dict) -> list[dict]:
     """Extract location entries from the strategic report.
@@ -107,38 +132,196 @@ def _clean_location_name(name: str) -> str:
     return name.strip()
 
 
-def _geocode_locations(
-    locations: list[dict], gmaps_client: googlemaps.Client
-) -> tuple[list[dict], list[str]]:
-    """Geocode each location via Places API, returning (geocoded_list, skipped_names)."""
-    geocoded: list[dict] = []
-    skipped: list[str] = []
+def _geocode_cache_key(query: str) -> str:
+    """Normalize a geocode query so equivalent spellings share a cache entry."""
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+def _lookup_place(gmaps_client: googlemaps.Client, query: str) -> dict | None:
+    """Resolve a query to the top Places result (blocking), or None if no match."""
+    result = gmaps_client.places(query)
+    places = result.get("results", [])
+    if not places:
+        return None
+    geo = places[0]["geometry"]["location"]
+    return {
+        "lat": geo["lat"],
+        "lng": geo["lng"],
+        "formatted_address": places[0].get("formatted_address", query),
+    }
+
+
+async def _geocode_locations(
+    locations: list[dict],
+    gmaps_client: googlemaps.Client,
+    cache: PersistentCache | None = None,
+    max_concurrency: int = GEOCODE_MAX_CONCURRENCY,
+) -> tuple[list[dict], list[str], int]:
+    """Geocode each location via Places API.
 
-    for loc in locations:
+    Cached results are used when fresh; misses are looked up in worker threads
+    with at most max_concurrency requests in flight. Successful lookups and
+    "no results" answers are both cached (with different TTLs); errors are not.
+    Cache reads and writes run in worker threads too (SQLite), and a failing
+    cache only costs that location its caching, never its marker.
+
+    Returns:
+        tuple: (geocoded_list, skipped_names, cache_hits), in input order.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _geocode(loc: dict) -> tuple[bool, bool]:
         clean_name = _clean_location_name(loc["location_name"])
         query = f"{clean_name}, {loc['area']}"
-        try:
-            result = gmaps_client.places(query)
-            places = result.get("results", [])
-            if places:
-                geo = places[0]["geometry"]["location"]
-                loc["lat"] = geo["lat"]
-                loc["lng"] = geo["lng"]
-                loc["formatted_address"] = places[0].get(
-                    "formatted_address", query
-                )
-                geocoded.append(loc)
-                logger.info(
-                    f"  Geocoded: {query} -> ({geo['lat']:.4f}, {geo['lng']:.4f})"
-                )
-            else:
-                skipped.append(loc["location_name"])
-                logger.warning(f"  Geocode returned no results for: {query}")
-        except Exception as e:
-            skipped.append(loc["location_name"])
-            logger.warning(f"  Geocode failed for {query}: {e}")
-
-    return geocoded, skipped
+        key = _geocode_cache_key(query)
+
+        hit, geo = False, None
+        if cache:
+            try:
+                hit, geo = await asyncio.to_thread(cache.get, "geocode", key)
+            except Exception as e:
+                logger.warning(f"  Geocode cache read failed for {query}: {e}")
+        if not hit:
+            try:
+                async with semaphore:
+                    geo = await asyncio.to_thread(
+                        _lookup_place, gmaps_client, query
+                    )
+            except Exception as e:
+                logger.warning(f"  Geocode failed for {query}: {e}")
+                return False, False
+            if cache:
+                ttl = GEOCODE_CACHE_TTL if geo else GEOCODE_NEGATIVE_CACHE_TTL
+                try:
+                    await asyncio.to_thread(cache.set, "geocode", key, geo, ttl)
+                except Exception as e:
+                    logger.warning(f"  Geocode cache write failed for {query}: {e}")
+
+        source = "cache" if hit else "api"
+        if geo is None:
+            logger.warning(
+                f"  Geocode returned no results for: {query} ({source})"
+            )
+            return False, hit
+
+        loc.update(geo)
+        logger.info(
+            f"  Geocoded: {query} -> ({geo['lat']:.4f}, {geo['lng']:.4f}) ({source})"
+        )
+        return True, hit
+
+    outcomes = await asyncio.gather(*(_geocode(loc) for loc in locations))
+
+    geocoded = [loc for loc, (ok, _) in zip(locations, outcomes) if ok]
+    skipped = [
+        loc["location_name"] for loc, (ok, _) in zip(locations, outcomes) if not ok
+    ]
+    cache_hits = sum(hit for _, hit in outcomes)
+    return geocoded, skipped, cache_hits
+
+
+def _encode_polyline(points: Iterable[tuple[float, float]]) -> str:
+    """Encode (lat, lng) pairs with Google's encoded polyline algorithm.
+
+    Coordinates are stored as deltas from the previous point at 1e-5 degree
+    (~1 m) precision, 5 bits per character, so nearby points take a few
+    bytes each instead of two full-precision JSON numbers.
+    """
+    chars: list[str] = []
+    prev_lat = prev_lng = 0
+    for lat, lng in points:
+        lat_e5, lng_e5 = round(lat * 1e5), round(lng * 1e5)
+        for delta in (lat_e5 - prev_lat, lng_e5 - prev_lng):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                chars.append(chr((0x20 | (value & 0x1F)) + 63))
+                value >>= 5
+            chars.append(chr(value + 63))
+        prev_lat, prev_lng = lat_e5, lng_e5
+    return "".join(chars)
+
+
+def _lookup_table(values: Iterable[str]) -> tuple[list[str], list[int]]:
+    """Deduplicate values into (table, index per value)."""
+    table: dict[str, int] = {}
+    indexes = [table.setdefault(value, len(table)) for value in values]
+    return list(table), indexes
+
+
+def _competitor_layer(competitors: pa.Table | None) -> dict | None:
+    """Compact columnar encoding of the competitor dataset for the map.
+
+    Points are sorted so consecutive coordinates are close (short polyline
+    deltas). Repeated strings (brand names, localities, business status)
+    are stored once in lookup tables; per-point columns are small integers.
+    """
+    if competitors is None or competitors.num_rows == 0:
+        return None
+    rows = [
+        place
+        for place in competitors.select(
+            ["name", "address", "rating", "user_ratings_total", "business_status",
+             "lat", "lng"]
+        ).to_pylist()
+        if place["lat"] is not None and place["lng"] is not None
+    ]
+    if not rows:
+        return None
+    rows.sort(key=lambda p: (round(p["lat"], 2), p["lng"]))
+
+    streets, localities = [], []
+    for place in rows:
+        street, _, locality = (place["address"] or "").partition(", ")
+        streets.append(street)
+        localities.append(locality)
+    names, name_index = _lookup_table(p["name"] or "" for p in rows)
+    locality_table, locality_index = _lookup_table(localities)
+    statuses, status_index = _lookup_table(
+        p["business_status"] or "UNKNOWN" for p in rows
+    )
+    return {
+        "count": len(rows),
+        "path": _encode_polyline((p["lat"], p["lng"]) for p in rows),
+        "names": names,
+        "name": name_index,
+        "street": streets,
+        "localities": locality_table,
+        "locality": locality_index,
+        # Rating x10 as integer, 0 = no rating
+        "rating": [round((p["rating"] or 0) * 10) for p in rows],
+        "reviews": [p["user_ratings_total"] or 0 for p in rows],
+        "statuses": statuses,
+        "status": status_index,
+    }
+
+
+def _script_json(data: object) -> str:
+    """Compact JSON that is safe to inline in a <script> element."""
+    return (
+        json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+        .replace("</", "<\\/")
+        .replace("\u2028", "\\u2028")
+        .replace("\u2029", "\\u2029")
+    )
+
+
+def _recommendation_meta(loc: dict) -> list[list[str]]:
+    """InfoWindow metadata lines of a recommended location as [kind, text]."""
+    meta = loc.get("extra_meta", {})
+    lines: list[list[str]] = []
+    if loc["is_top"]:
+        if meta.get("target_customer_segment"):
+            lines.append(["Target Segment", meta["target_customer_segment"]])
+        if meta.get("estimated_demand_level"):
+            lines.append(["Demand Level", meta["estimated_demand_level"]])
+        lines += [["+", str(s)] for s in meta.get("strengths", [])]
+        lines += [["-", str(c)] for c in meta.get("concerns", [])]
+    else:
+        if meta.get("key_strength"):
+            lines.append(["+", meta["key_strength"]])
+        if meta.get("key_concern"):
+            lines.append(["-", meta["key_concern"]])
+    return lines
 
 
 def _build_map_html(
@@ -146,62 +329,39 @@ def _build_map_html(
     api_key: str,
     target_location: str,
     business_type: str,
+    competitors: pa.Table | None = None,
 ) -> str:
-    """Build a self-contained HTML page with an interactive Google Map."""
-
-    # Build JavaScript location data
-    js_locations = []
-    for loc in geocoded_locations:
-        # Build metadata HTML for InfoWindow
-        meta_lines = []
-        if loc["is_top"]:
-            meta = loc.get("extra_meta", {})
-            if meta.get("target_customer_segment"):
-                meta_lines.append(
-                    f"<b>Target Segment:</b> {meta['target_customer_segment']}"
-                )
-            if meta.get("estimated_demand_level"):
-                meta_lines.append(
-                    f"<b>Demand Level:</b> {meta['estimated_demand_level']}"
-                )
-            for s in meta.get("strengths", []):
-                meta_lines.append(f"<span style='color:#059669'>+ {s}</span>")
-            for c in meta.get("concerns", []):
-                meta_lines.append(f"<span style='color:#d97706'>- {c}</span>")
-        else:
-            meta = loc.get("extra_meta", {})
-            if meta.get("key_strength"):
-                meta_lines.append(
-                    f"<span style='color:#059669'>+ {meta['key_strength']}</span>"
-                )
-            if meta.get("key_concern"):
-                meta_lines.append(
-                    f"<span style='color:#d97706'>- {meta['key_concern']}</span>"
-                )
-
-        meta_html = "<br>".join(meta_lines)
-
-        js_locations.append(
-            {
-                "name": loc["location_name"],
-                "lat": loc["lat"],
-                "lng": loc["lng"],
-                "address": loc.get("formatted_address", ""),
-                "score": loc["overall_score"],
-                "opportunity_type": loc["opportunity_type"],
-                "is_top": loc["is_top"],
-                "meta_html": meta_html,
-            }
-        )
-
-    locations_json = json.dumps(js_locations, indent=2)
+    """Build a self-contained HTML page with an interactive Google Map.
 
-    html = f"""<!DOCTYPE html>
+    Recommended locations get individual markers. Competitors from the
+    Places dataset (optional) are embedded compactly (_competitor_layer)
+    and drawn as clustered markers. InfoWindow content is only built when
+    a marker is clicked, in one shared InfoWindow.
+    """
+    recommendations = [
+        {
+            "name": loc["location_name"],
+            "lat": loc["lat"],
+            "lng": loc["lng"],
+            "address": loc.get("formatted_address", ""),
+            "score": loc["overall_score"],
+            "opportunity_type": loc["opportunity_type"],
+            "is_top": loc["is_top"],
+            "meta": _recommendation_meta(loc),
+        }
+        for loc in geocoded_locations
+    ]
+    locations_json = _script_json(recommendations)
+    competitors_json = _script_json(_competitor_layer(competitors))
+    title_business = html.escape(business_type)
+    title_location = html.escape(target_location)
+
+    page = f"""<!DOCTYPE html>
 <html lang="en">
 <head>
 <meta charset="UTF-8">
 <meta name="viewport" content="width=device-width, initial-scale=1.0">
-<title>Location Strategy Map - {business_type} in {target_location}</title>
+<title>Location Strategy Map - {title_business} in {title_location}</title>
 <style>
   * {{ margin: 0; padding: 0; box-sizing: border-box; }}
   body {{ font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif; }}
@@ -228,6 +388,7 @@ def _build_map_html(
   }}
   .legend-dot.top {{ background: #059669; }}
   .legend-dot.alt {{ background: #3b82f6; }}
+  .legend-dot.comp {{ background: #dc2626; width: 10px; height: 10px; }}
   .iw-content {{ max-width: 280px; font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif; }}
   .iw-content h3 {{ font-size: 15px; color: #1e3a8a; margin-bottom: 4px; }}
   .iw-content .address {{ font-size: 12px; color: #6b7280; margin-bottom: 8px; }}
@@ -240,6 +401,8 @@ def _build_map_html(
   .iw-content .score.low {{ background: #fee2e2; color: #991b1b; }}
   .iw-content .opp-type {{ font-size: 12px; color: #4b5563; margin-bottom: 6px; }}
   .iw-content .meta {{ font-size: 12px; line-height: 1.5; }}
+  .iw-content .plus {{ color: #059669; }}
+  .iw-content .minus {{ color: #d97706; }}
   .iw-content .top-badge {{
     display: inline-block; padding: 2px 8px; border-radius: 4px;
     background: #059669; color: white; font-size: 11px; font-weight: 600;
@@ -251,8 +414,8 @@ def _build_map_html(
 <div id="map"></div>
 
 <div class="title-bar">
-  <h1>{business_type} - Location Strategy Map</h1>
-  <p>{target_location}</p>
+  <h1>{title_business} - Location Strategy Map</h1>
+  <p>{title_location}</p>
 </div>
 
 <div class="legend">
@@ -264,10 +427,73 @@ def _build_map_html(
     <div class="legend-dot alt"></div>
     <span>Alternative Location</span>
   </div>
+  <div class="legend-item" id="legend-competitors" style="display:none">
+    <div class="legend-dot comp"></div>
+    <span>Competitor (clustered)</span>
+  </div>
 </div>
 
 <script>
 const LOCATIONS = {locations_json};
+const COMPETITORS = {competitors_json};
+
+function esc(value) {{
+  return String(value == null ? "" : value).replace(/[&<>"']/g, function(c) {{
+    return {{ "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;" }}[c];
+  }});
+}}
+
+// Google encoded polyline -> [{{lat, lng}}]
+function decodePath(str) {{
+  const points = [];
+  let index = 0, lat = 0, lng = 0;
+  while (index < str.length) {{
+    const deltas = [0, 0];
+    for (let axis = 0; axis < 2; axis++) {{
+      let shift = 0, result = 0, byte;
+      do {{
+        byte = str.charCodeAt(index++) - 63;
+        result |= (byte & 0x1f) << shift;
+        shift += 5;
+      }} while (byte >= 0x20);
+      deltas[axis] = (result & 1) ? ~(result >> 1) : (result >> 1);
+    }}
+    lat += deltas[0];
+    lng += deltas[1];
+    points.push({{ lat: lat / 1e5, lng: lng / 1e5 }});
+  }}
+  return points;
+}}
+
+function recommendationContent(loc) {{
+  const scoreClass = loc.score >= 75 ? "high" : (loc.score >= 50 ? "mid" : "low");
+  const meta = loc.meta.map(function(line) {{
+    if (line[0] === "+") return '<span class="plus">+ ' + esc(line[1]) + '</span>';
+    if (line[0] === "-") return '<span class="minus">- ' + esc(line[1]) + '</span>';
+    return '<b>' + esc(line[0]) + ':</b> ' + esc(line[1]);
+  }}).join("<br>");
+  return '<div class="iw-content">' +
+    (loc.is_top ? '<div class="top-badge">TOP RECOMMENDATION</div>' : '') +
+    '<h3>' + esc(loc.name) + '</h3>' +
+    '<div class="address">' + esc(loc.address) + '</div>' +
+    '<span class="score ' + scoreClass + '">Score: ' + esc(loc.score) + '/100</span>' +
+    '<div class="opp-type">' + esc(loc.opportunity_type) + '</div>' +
+    (meta ? '<div class="meta">' + meta + '</div>' : '') +
+    '</div>';
+}}
+
+function competitorContent(i) {{
+  const c = COMPETITORS;
+  const locality = c.localities[c.locality[i]];
+  const rating = c.rating[i] ? (c.rating[i] / 10).toFixed(1) + " ★ (" + c.reviews[i] + " reviews)" : "No rating";
+  const status = c.statuses[c.status[i]];
+  return '<div class="iw-content">' +
+    '<h3>' + esc(c.names[c.name[i]]) + '</h3>' +
+    '<div class="address">' + esc(c.street[i]) + (locality ? ", " + esc(locality) : "") + '</div>' +
+    '<div class="opp-type">Competitor · ' + esc(rating) + '</div>' +
+    (status !== "OPERATIONAL" ? '<div class="meta">' + esc(status) + '</div>' : '') +
+    '</div>';
+}}
 
 function initMap() {{
   const map = new google.maps.Map(document.getElementById("map"), {{
@@ -280,7 +506,13 @@ function initMap() {{
   }});
 
   const bounds = new google.maps.LatLngBounds();
-  let topInfoWindow = null;
+  // One shared InfoWindow; content is built on click
+  const infoWindow = new google.maps.InfoWindow();
+  function openInfo(marker, buildContent) {{
+    infoWindow.setContent(buildContent());
+    infoWindow.open(map, marker);
+  }}
+  let topMarker = null;
 
   LOCATIONS.forEach(function(loc) {{
     const position = {{ lat: loc.lat, lng: loc.lng }};
@@ -298,32 +530,41 @@ function initMap() {{
         strokeColor: "#ffffff",
         strokeWeight: 2.5,
       }},
-      zIndex: loc.is_top ? 100 : 50,
+      zIndex: loc.is_top ? 1000 : 500,
     }});
-
-    const scoreClass = loc.score >= 75 ? "high" : (loc.score >= 50 ? "mid" : "low");
-    const topBadge = loc.is_top ? '<div class="top-badge">TOP RECOMMENDATION</div>' : '';
-
-    const content = '<div class="iw-content">' +
-      topBadge +
-      '<h3>' + loc.name + '</h3>' +
-      '<div class="address">' + loc.address + '</div>' +
-      '<span class="score ' + scoreClass + '">Score: ' + loc.score + '/100</span>' +
-      '<div class="opp-type">' + loc.opportunity_type + '</div>' +
-      (loc.meta_html ? '<div class="meta">' + loc.meta_html + '</div>' : '') +
-      '</div>';
-
-    const infoWindow = new google.maps.InfoWindow({{ content: content }});
-
     marker.addListener("click", function() {{
-      infoWindow.open(map, marker);
+      openInfo(marker, function() {{ return recommendationContent(loc); }});
     }});
-
     if (loc.is_top) {{
-      topInfoWindow = {{ iw: infoWindow, marker: marker }};
+      topMarker = {{ marker: marker, loc: loc }};
     }}
   }});
 
+  if (COMPETITORS) {{
+    document.getElementById("legend-competitors").style.display = "";
+    const icon = {{
+      path: google.maps.SymbolPath.CIRCLE,
+      scale: 5,
+      fillColor: "#dc2626",
+      fillOpacity: 0.8,
+      strokeColor: "#ffffff",
+      strokeWeight: 1,
+    }};
+    const markers = decodePath(COMPETITORS.path).map(function(position, i) {{
+      bounds.extend(position);
+      const marker = new google.maps.Marker({{ position: position, icon: icon }});
+      marker.addListener("click", function() {{
+        openInfo(marker, function() {{ return competitorContent(i); }});
+      }});
+      return marker;
+    }});
+    if (window.markerClusterer) {{
+      new markerClusterer.MarkerClusterer({{ map: map, markers: markers }});
+    }} else {{
+      markers.forEach(function(marker) {{ marker.setMap(map); }});
+    }}
+  }}
+
   map.fitBounds(bounds);
 
   // Prevent over-zoom for single marker
@@ -334,18 +575,19 @@ function initMap() {{
   }});
 
   // Auto-open top recommendation InfoWindow
-  if (topInfoWindow) {{
-    topInfoWindow.iw.open(map, topInfoWindow.marker);
+  if (topMarker) {{
+    openInfo(topMarker.marker, function() {{ return recommendationContent(topMarker.loc); }});
   }}
 }}
 </script>
+<script src="{MARKER_CLUSTERER_URL}"></script>
 <script async defer
   src="https://maps.googleapis.com/maps/api/js?key={api_key}&callback=initMap">
 </script>
 </body>
 </html>"""
 
-    return html
+    return page
 
 
 async def generate_interactive_map(tool_context: ToolContext) -> dict:
@@ -354,8 +596,9 @@ async def generate_interactive_map(tool_context: ToolContext) -> dict:
     This tool reads the strategic_report from session state, geocodes all
     recommended locations, and generates a self-contained HTML page with
     an interactive Google Map. Markers are color-coded: green for the top
-    recommendation, blue for alternatives. Each marker has an InfoWindow
-    with score, opportunity type, and metadata.
+    recommendation, blue for alternatives, and red clustered markers for
+    the competitors found during competitor mapping. Each marker has an
+    InfoWindow with score, opportunity type, and metadata.
 
     The generated HTML is saved as an artifact and stored in state for
     the AG-UI frontend to display.
@@ -422,8 +665,13 @@ async def generate_interactive_map(tool_context: ToolContext) -> dict:
         )
 
         # Geocode locations
-        gmaps_client = googlemaps.Client(key=maps_api_key)
-        geocoded, skipped = _geocode_locations(locations, gmaps_client)
+        gmaps_client = get_maps_client(maps_api_key)
+        geocoded, skipped, cache_hits = await _geocode_locations(
+            locations, gmaps_client, cache=get_cache()
+        )
+        logger.info(
+            f"Map generation: {cache_hits}/{len(locations)} geocodes served from cache"
+        )
 
         if not geocoded:
             return {
@@ -432,29 +680,38 @@ async def generate_interactive_map(tool_context: ToolContext) -> dict:
             }
 
         # Build the interactive map HTML
+        # Competitors captured during competitor mapping, if any
+        competitors = await load_competitor_dataset(
+            tool_context, tool_context.state.get("competitor_dataset")
+        )
         map_html = _build_map_html(
-            geocoded, maps_api_key, target_location, business_type
+            geocoded, maps_api_key, target_location, business_type, competitors
         )
-
-        # Save as artifact
-        html_artifact = types.Part.from_bytes(
-            data=map_html.encode("utf-8"), mime_type="text/html"
+        competitor_count = competitors.num_rows if competitors is not None else 0
+        logger.info(
+            f"Map generation: {competitor_count} competitors, "
+            f"{len(map_html)} bytes of HTML"
         )
-        version = await tool_context.save_artifact(
-            filename="interactive_map.html", artifact=html_artifact
+
+        # Save as artifact and publish it in state for AG-UI frontend
+        version = await save_output_artifact(
+            tool_context,
+            "interactive_map.html",
+            map_html.encode("utf-8"),
+            "text/html",
+            MAP_KEYS,
         )
         logger.info(
             f"Saved interactive map artifact: interactive_map.html (version {version})"
         )
 
-        # Store in state for AG-UI frontend
-        tool_context.state["map_html_content"] = map_html
-
         return {
             "status": "success",
             "message": f"Interactive map generated with {len(geocoded)} locations and saved as 'interactive_map.html'",
             "geocoded_count": len(geocoded),
+            "competitor_count": competitor_count,
             "skipped_locations": skipped,
+            "geocode_cache_hits": cache_hits,
             "artifact_filename": "interactive_map.html",
             "artifact_version": version,
         }
@@ -0,0 +1,204 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Disk-backed key/value cache shared by the Maps tools.
+
+Entries live in a single SQLite database under CACHE_DIR, partitioned by
+namespace (e.g. "geocode") and stored as JSON with an absolute expiry time.
+A JSON null is a valid cached value, which lets callers cache negative
+results ("no results for this query") with their own, shorter TTL.
+
+Each operation opens its own short-lived connection, so the cache is safe to
+use from worker threads and from several processes at once.
+
+TieredCache puts a size-bounded in-memory LRU in front of one namespace of
+the disk store and counts hits and misses for logging and tool results.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from ..config import CACHE_DIR
+
+logger = logging.getLogger("LocationStrategyPipeline")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+)
+"""
+
+
+class PersistentCache:
+    """SQLite-backed cache with per-entry expiry."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=10)
+
+    def get(self, namespace: str, key: str) -> tuple[bool, Any]:
+        """Look up a key.
+
+        Returns:
+            tuple: (hit, value). hit is False for missing or expired entries;
+            value may be None for a cached negative result.
+        """
+        entry = self.get_entry(namespace, key)
+        if entry is None:
+            return False, None
+        return True, entry[0]
+
+    def get_entry(self, namespace: str, key: str) -> tuple[Any, float] | None:
+        """Look up a key, returning (value, expires_at) or None on a miss."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT value, expires_at FROM cache "
+                "WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0]), row[1]
+
+    def set(
+        self, namespace: str, key: str, value: Any, ttl_seconds: float
+    ) -> None:
+        """Store a JSON-serializable value for ttl_seconds."""
+        if ttl_seconds <= 0:
+            return
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) "
+                "VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value), time.time() + ttl_seconds),
+            )
+
+    def purge_expired(self) -> int:
+        """Delete expired entries and return how many were removed."""
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "DELETE FROM cache WHERE expires_at < ?", (time.time(),)
+            )
+        return cursor.rowcount
+
+
+class TieredCache:
+    """Size-bounded in-memory LRU backed by a PersistentCache namespace.
+
+    Lookups check memory first, then disk (promoting disk hits into memory).
+    Writes go to both. Without a store the cache is memory-only.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl_seconds: float,
+        max_entries: int,
+        store: PersistentCache | None = None,
+    ) -> None:
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        """Look up a key in memory, then on disk.
+
+        Returns:
+            tuple: (hit, value), as for PersistentCache.get().
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] >= now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[0]
+            self._entries.pop(key, None)
+
+        entry = self.store.get_entry(self.namespace, key) if self.store else None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            self._remember(key, entry)
+        return True, entry[0]
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a JSON-serializable value in memory and on disk."""
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._remember(key, (value, time.time() + self.ttl_seconds))
+        if self.store:
+            self.store.set(self.namespace, key, value, self.ttl_seconds)
+
+    def _remember(self, key: str, entry: tuple[Any, float]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Return hit/miss counters for logs and tool results."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+            }
+
+
+@lru_cache(maxsize=None)
+def get_cache(path: str | None = None) -> PersistentCache | None:
+    """Return the process-wide cache, or None if caching is disabled.
+
+    Caching is disabled by setting LOCATION_STRATEGY_CACHE_DIR to an empty
+    string. Failing to open the database is logged and also disables caching
+    rather than failing the calling tool.
+    """
+    if path is None:
+        if not CACHE_DIR:
+            return None
+        path = str(Path(CACHE_DIR) / "maps_cache.sqlite3")
+    try:
+        cache = PersistentCache(path)
+        cache.purge_expired()
+        return cache
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Maps cache disabled, could not open {path}: {e}")
+        return None
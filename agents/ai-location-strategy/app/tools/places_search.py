@@ -12,30 +12,173 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-"""Google Maps Places API search tool for competitor mapping."""
+"""Google Maps Places API search tool for competitor mapping.
 
+Text Search results are paginated (20 per page). search_places fetches
+one page by default; the agent can repeat a query with max_pages (up to 3)
+when it has more results. Pages are always fetched from the first one and
+merged into one result set, deduplicated by place_id, so a larger max_pages
+returns a superset of a smaller one.
+
+Clients are pooled per API key (see get_maps_client) so repeated searches
+reuse the same HTTP session and its open connections.
+
+Responses are cached across sessions and pipeline runs (see
+get_places_cache), keyed by the normalized query, page limit and a hash of
+the API key, so identical competitor queries don't spend Maps quota twice.
+A next_page_token expires within minutes and the agent can't continue
+from one, so it is never returned or cached; results only say whether more
+exist (more_results).
+"""
+
+import asyncio
+import hashlib
+import logging
 import os
+import re
+from functools import lru_cache
 
 import googlemaps
 from google.adk.tools import ToolContext
 
+from ..config import (
+    MAPS_BASE_URL,
+    PLACES_CACHE_MAX_ENTRIES,
+    PLACES_CACHE_TTL,
+    PLACES_DEFAULT_PAGES,
+    PLACES_MAX_PAGES,
+    PLACES_PAGE_TOKEN_DELAY,
+    PLACES_PAGE_TOKEN_RETRIES,
+)
+from ..metrics import metrics
+from .persistent_cache import TieredCache, get_cache
+
+logger = logging.getLogger("LocationStrategyPipeline")
+
+
+@lru_cache(maxsize=8)
+def get_maps_client(api_key: str) -> googlemaps.Client:
+    """Return the shared googlemaps.Client for an API key.
+
+    googlemaps.Client keeps a requests.Session, so sharing one client per key
+    reuses TCP/TLS connections across tool calls and pipeline stages.
+    Requests go to MAPS_BASE_URL when it is set (e.g. a load-test stand-in).
+    """
+    if MAPS_BASE_URL:
+        return googlemaps.Client(key=api_key, base_url=MAPS_BASE_URL.rstrip("/"))
+    return googlemaps.Client(key=api_key)
+
+
+@lru_cache(maxsize=1)
+def get_places_cache() -> TieredCache:
+    """Return the process-wide Places response cache."""
+    return TieredCache(
+        namespace="places",
+        ttl_seconds=PLACES_CACHE_TTL,
+        max_entries=PLACES_CACHE_MAX_ENTRIES,
+        store=get_cache(),
+    )
+
+
+def _places_cache_key(api_key: str, query: str, max_pages: int) -> str:
+    """Build a cache key scoped to the API key without storing the key itself."""
+    scope = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+    normalized = re.sub(r"\s+", " ", query).strip().lower()
+    return f"{scope}:{max_pages}:{normalized}"
+
+
+def _format_place(place: dict) -> dict:
+    """Flatten a raw Places result into the fields the agents use."""
+    return {
+        "name": place.get("name", "Unknown"),
+        "address": place.get("formatted_address", place.get("vicinity", "N/A")),
+        "rating": place.get("rating", 0),
+        "user_ratings_total": place.get("user_ratings_total", 0),
+        "price_level": place.get("price_level", "N/A"),
+        "types": place.get("types", []),
+        "business_status": place.get("business_status", "UNKNOWN"),
+        "location": {
+            "lat": place.get("geometry", {}).get("location", {}).get("lat"),
+            "lng": place.get("geometry", {}).get("location", {}).get("lng"),
+        },
+        "place_id": place.get("place_id", ""),
+    }
+
+
+async def _fetch_next_page(gmaps: googlemaps.Client, page_token: str) -> dict:
+    """Fetch the page behind a next_page_token, waiting for it to activate.
 
-def search_places(query: str, tool_context: ToolContext) -> dict:
+    Places returns INVALID_REQUEST for a token that is used too soon after it
+    was issued, so the request is retried after another delay.
+    """
+    for attempt in range(PLACES_PAGE_TOKEN_RETRIES):
+        await asyncio.sleep(PLACES_PAGE_TOKEN_DELAY)
+        try:
+            return await asyncio.to_thread(gmaps.places, page_token=page_token)
+        except googlemaps.exceptions.ApiError as e:
+            last_attempt = attempt == PLACES_PAGE_TOKEN_RETRIES - 1
+            if e.status != "INVALID_REQUEST" or last_attempt:
+                raise
+            logger.debug("Places page token not active yet, retrying...")
+    return {}
+
+
+async def fetch_places(
+    gmaps: googlemaps.Client, query: str, max_pages: int = PLACES_DEFAULT_PAGES
+) -> tuple[list[dict], str | None, int]:
+    """Run a Text Search and follow next_page_token up to max_pages.
+
+    Returns:
+        tuple: (places deduplicated by place_id in first-seen order,
+        next_page_token left unfollowed or None, pages fetched).
+    """
+    max_pages = max(1, min(max_pages, PLACES_MAX_PAGES))
+
+    result = await asyncio.to_thread(gmaps.places, query)
+    pages = 1
+    places: dict[str, dict] = {}
+    while True:
+        for place in result.get("results", []):
+            formatted = _format_place(place)
+            # Places without an ID can't be deduplicated; keep them all.
+            key = formatted["place_id"] or f"_anon_{len(places)}"
+            places.setdefault(key, formatted)
+
+        page_token = result.get("next_page_token")
+        if not page_token or pages >= max_pages:
+            return list(places.values()), page_token, pages
+
+        result = await _fetch_next_page(gmaps, page_token)
+        pages += 1
+
+
+async def search_places(
+    query: str, tool_context: ToolContext, max_pages: int = PLACES_DEFAULT_PAGES
+) -> dict:
     """Search for places using Google Maps Places API.
 
     This tool searches for businesses/places matching the query using the
     Google Maps Places API. It returns real competitor data including names,
-    addresses, ratings, and other relevant information.
+    addresses, ratings, and other relevant information. One call returns
+    one page of up to 20 places; if more_results is set, the same query can
+    be repeated with a higher max_pages, which returns all places of the
+    smaller call plus the following pages.
 
     Args:
         query: Search query combining business type and location.
                Example: "fitness studio near KR Puram, Bangalore, India"
+        max_pages: Number of result pages (20 places each) to fetch, 1-3.
+               Defaults to 1; ask for more only when the first page is full
+               and more coverage is needed.
 
     Returns:
         dict: A dictionary containing:
             - status: "success" or "error"
-            - results: List of places found with details
+            - results: List of places found with details (unique by place_id)
             - count: Number of results found
+            - pages_fetched: Number of result pages merged into results
+            - more_results: Whether more results exist beyond max_pages
+            - cache_hit: Whether this call was answered from the cache
             - error_message: Error details if status is "error"
     """
     try:
@@ -52,43 +195,41 @@ def search_places(query: str, tool_context: ToolContext) -> dict:
                 "count": 0,
             }
 
-        # Initialize Google Maps client
-        gmaps = googlemaps.Client(key=maps_api_key)
+        max_pages = max(1, min(max_pages, PLACES_MAX_PAGES))
+        cache = get_places_cache()
+        cache_key = _places_cache_key(maps_api_key, query, max_pages)
+        hit, response = await asyncio.to_thread(cache.get, cache_key)
 
-        # Perform places search
-        result = gmaps.places(query)
-
-        # Extract and format results
-        places = []
-        for place in result.get("results", []):
-            places.append(
-                {
-                    "name": place.get("name", "Unknown"),
-                    "address": place.get(
-                        "formatted_address", place.get("vicinity", "N/A")
-                    ),
-                    "rating": place.get("rating", 0),
-                    "user_ratings_total": place.get("user_ratings_total", 0),
-                    "price_level": place.get("price_level", "N/A"),
-                    "types": place.get("types", []),
-                    "business_status": place.get("business_status", "UNKNOWN"),
-                    "location": {
-                        "lat": place.get("geometry", {})
-                        .get("location", {})
-                        .get("lat"),
-                        "lng": place.get("geometry", {})
-                        .get("location", {})
-                        .get("lng"),
-                    },
-                    "place_id": place.get("place_id", ""),
-                }
+        if not hit:
+            # Perform paginated places search with the pooled client
+            gmaps = get_maps_client(maps_api_key)
+            places, next_page_token, pages = await fetch_places(
+                gmaps, query, max_pages
             )
+            response = {
+                "results": places,
+                "pages_fetched": pages,
+                "more_results": next_page_token is not None,
+            }
+            # Cached without the token, which would expire long before the entry
+            await asyncio.to_thread(cache.set, cache_key, response)
+
+        metrics.inc("places_cache_lookups_total", result="hit" if hit else "miss")
+        stats = cache.stats()
+        logger.info(
+            f"Places search {query!r}: cache {'hit' if hit else 'miss'} "
+            f"(hits={stats['hits']}, misses={stats['misses']})"
+        )
 
         return {
             "status": "success",
-            "results": places,
-            "count": len(places),
-            "next_page_token": result.get("next_page_token"),
+            "results": response["results"],
+            "count": len(response["results"]),
+            "pages_fetched": response["pages_fetched"],
+            "more_results": response.get(
+                "more_results", bool(response.get("next_page_token"))
+            ),
+            "cache_hit": hit,
         }
 
     except Exception as e:
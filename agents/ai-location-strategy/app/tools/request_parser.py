@@ -0,0 +1,328 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Rule-based parsing of location strategy requests (IntakeAgent fast path).
+
+parse_request() extracts target_location, business_type and
+additional_context from requests such as
+
+    "I want to open a coffee shop in Indiranagar, Bangalore"
+    "Where should I open my restaurant in San Francisco's Mission District?"
+    "Target location: Northern Virginia. Business type: hyperscale data center"
+
+and returns None whenever the result would be a guess, so the IntakeAgent's
+model call handles everything else. A request is only parsed when:
+
+- it names exactly one business type of the prompt style's gazetteer (or
+  states it as "business type: ..."),
+- exactly one place phrase appears, introduced by "in/near/around/at" (a
+  place after "to", "from", "than", ... makes the request ambiguous, e.g.
+  "expand to Denver"), and looks like a place name: capitalized words or
+  known places, with at most a few qualifiers such as "downtown" or "metro
+  area",
+- nothing follows the place phrase except a "with/for/targeting ..."
+  clause ("I live in Boston and want to open a bakery" is left to the
+  model), and
+- it contains no negation ("in Austin, not in Dallas").
+
+Capacities such as "50MW" and "with/for/targeting ..." clauses go to
+additional_context.
+"""
+
+import re
+from dataclasses import dataclass
+
+# Canonical business type -> phrases that name it (matched longest first)
+RETAIL_BUSINESS_TYPES = {
+    "coffee shop": ["coffee shop", "coffeeshop", "coffee house", "coffeehouse", "cafe", "café"],
+    "bakery": ["bakery", "patisserie", "pastry shop"],
+    "gym": ["gym", "fitness center", "fitness centre", "fitness studio", "health club"],
+    "yoga studio": ["yoga studio", "pilates studio"],
+    "restaurant": ["restaurant", "bistro", "diner", "eatery"],
+    "pizzeria": ["pizzeria", "pizza place", "pizza restaurant", "pizza shop"],
+    "bar": ["bar", "pub", "brewpub", "wine bar", "cocktail bar"],
+    "ice cream shop": ["ice cream shop", "ice cream parlor", "gelato shop", "gelateria"],
+    "bookstore": ["bookstore", "book store", "bookshop"],
+    "pharmacy": ["pharmacy", "drugstore", "chemist"],
+    "grocery store": ["grocery store", "grocery", "supermarket", "convenience store"],
+    "clothing store": ["clothing store", "boutique", "apparel store", "fashion store"],
+    "hair salon": ["hair salon", "salon", "barbershop", "barber shop"],
+    "spa": ["spa", "day spa", "nail salon"],
+    "pet store": ["pet store", "pet shop", "pet supplies store"],
+    "co-working space": ["co-working space", "coworking space", "co-working", "coworking"],
+    "laundromat": ["laundromat", "laundry"],
+    "florist": ["florist", "flower shop"],
+    "dental clinic": ["dental clinic", "dentist"],
+    "hotel": ["hotel", "boutique hotel", "hostel"],
+}
+DATACENTER_BUSINESS_TYPES = {
+    "hyperscale data center": ["hyperscale data center", "hyperscale campus", "hyperscale"],
+    "colocation data center": [
+        "colocation data center",
+        "colocation facility",
+        "colocation",
+        "colo facility",
+    ],
+    "edge data center": ["edge data center", "edge facility", "edge site"],
+    "AI/ML data center": [
+        "ai/ml data center",
+        "ai data center",
+        "ai training facility",
+        "ai training data center",
+        "gpu data center",
+        "gpu cluster",
+    ],
+    "enterprise data center": ["enterprise data center", "private data center"],
+}
+BUSINESS_TYPES = {
+    "retail": RETAIL_BUSINESS_TYPES,
+    "datacenter": DATACENTER_BUSINESS_TYPES,
+}
+
+# Known places (lowercase words); lowercase requests are accepted if their
+# place phrase contains one of them
+KNOWN_PLACES = {
+    # India
+    "bangalore", "bengaluru", "indiranagar", "koramangala", "whitefield",
+    "mumbai", "bandra", "delhi", "gurgaon", "gurugram", "noida", "hyderabad",
+    "chennai", "pune", "kolkata", "ahmedabad",
+    # United States
+    "seattle", "portland", "san", "francisco", "los", "angeles", "diego",
+    "jose", "oakland", "berkeley", "sacramento", "phoenix", "dallas", "fort",
+    "worth", "houston", "austin", "antonio", "denver", "chicago", "atlanta",
+    "miami", "orlando", "tampa", "boston", "brooklyn", "manhattan", "queens",
+    "york", "philadelphia", "washington", "virginia", "ashburn", "loudoun",
+    "columbus", "ohio", "texas", "arizona", "nevada", "reno", "vegas", "utah",
+    "oregon", "georgia", "carolina", "charlotte", "raleigh", "nashville",
+    "minneapolis", "detroit", "pittsburgh", "baltimore", "omaha", "iowa",
+    "mission", "soho", "midtown",
+    # Elsewhere
+    "london", "manchester", "dublin", "amsterdam", "frankfurt", "paris",
+    "berlin", "madrid", "barcelona", "stockholm", "oslo", "zurich", "singapore",
+    "tokyo", "osaka", "seoul", "sydney", "melbourne", "toronto", "vancouver",
+    "montreal", "dubai", "johannesburg", "sao", "paulo", "jakarta",
+}
+
+# Words allowed in a place phrase besides place names
+PLACE_QUALIFIERS = {
+    "downtown", "uptown", "midtown", "central", "greater", "metro", "metropolitan",
+    "area", "region", "district", "county", "city", "suburbs", "suburban",
+    "north", "south", "east", "west", "northern", "southern", "eastern",
+    "western", "northeast", "northwest", "southeast", "southwest",
+    "inner", "old", "new",
+}
+PLACE_CONNECTORS = {"of", "the", "de", "del", "la", "le", "upon", "on", "-"}
+MAX_PLACE_WORDS = 8
+
+# Prepositions that introduce the target location
+TARGET_PREPOSITIONS = {"in", "near", "around", "at", "within"}
+# Any preposition that can introduce a place
+_PREPOSITION = re.compile(
+    r"\b(in|near|around|at|within|to|into|from|towards?|between|outside|"
+    r"across|than|versus|vs\.?)\s+",
+    re.I,
+)
+# Where a place phrase ends: punctuation or the start of another clause
+_PLACE_END = re.compile(
+    r"[.?!;:\n]|,?\s+(?:for|with|that|which|where|targeting|to|so|because|"
+    r"and|or|but|in|near|around|at|within|by|from|than|versus|vs)\b",
+    re.I,
+)
+_CONTEXT_CLAUSE = r"(?:with|targeting|for|that|which|focusing on)\s+"
+_CONTEXT = re.compile(rf"(?:,\s*|\s+)({_CONTEXT_CLAUSE}[^.?!\n]+)", re.I)
+_NEGATION = re.compile(
+    r"\b(?:not|no|never|without|except|instead|rather than|other than)\b|n['’]t\b",
+    re.I,
+)
+_CAPACITY = re.compile(r"\b(\d+(?:\.\d+)?)\s?(MW|megawatts?)\b", re.I)
+_FIELD = re.compile(
+    r"\b(target[_ ]location|location|business[_ ]type|facility[_ ]type)\s*[:=]\s*"
+    r"([^\n;]+?)\s*(?=[\n;]|\.\s|$|,?\s*(?:target[_ ]location|location|business[_ ]type|"
+    r"facility[_ ]type|additional[_ ]context)\s*[:=])",
+    re.I,
+)
+_WORD = re.compile(r"[\w'’.-]+|-")
+
+
+@dataclass(frozen=True)
+class ParsedRequest:
+    """A request parsed without the model."""
+
+    target_location: str
+    business_type: str
+    additional_context: str | None = None
+
+
+def _named_business_types(text: str) -> set[str]:
+    """Canonical business types of any style named in text (longest phrases first)."""
+    lowered = f" {text.lower()} "
+    found = set()
+    phrases = sorted(
+        (
+            (phrase, canonical)
+            for gazetteer in BUSINESS_TYPES.values()
+            for canonical, names in gazetteer.items()
+            for phrase in names
+        ),
+        key=lambda item: -len(item[0]),
+    )
+    for phrase, canonical in phrases:
+        pattern = rf"(?<![\w/-]){re.escape(phrase)}s?(?![\w/-])"
+        if re.search(pattern, lowered):
+            found.add(canonical)
+            lowered = re.sub(pattern, " ", lowered)
+    return found
+
+
+def _is_other_style(business_types: set[str], style: str) -> bool:
+    """Whether a business type belongs to another prompt style's gazetteer."""
+    return any(canonical not in BUSINESS_TYPES.get(style, {}) for canonical in business_types)
+
+
+def _find_business_types(text: str, style: str) -> set[str]:
+    """Canonical business types of the prompt style named in text."""
+    found = _named_business_types(text)
+    # A term of the other style means the request is not what we expect
+    if _is_other_style(found, style):
+        return set()
+    return found
+
+
+def _is_place(words: list[str]) -> bool:
+    """Whether words look like a place name rather than part of a sentence."""
+    if not words or len(words) > MAX_PLACE_WORDS:
+        return False
+    named = 0
+    for word in words:
+        bare = word.strip(".,'’").lower()
+        if bare.endswith(("'s", "’s")):
+            bare = bare[:-2]
+        if word[:1].isupper() or bare in KNOWN_PLACES:
+            named += 1
+        elif bare not in PLACE_QUALIFIERS and bare not in PLACE_CONNECTORS:
+            return False
+    return named > 0
+
+
+def _normalize_place(place: str) -> str:
+    """Tidy a place phrase: "San Francisco's Mission District" -> "Mission District, San Francisco"."""
+    place = re.sub(r"^(?:the)\s+", "", place.strip(" ,"), flags=re.I)
+    possessive = re.match(r"^(.+?)['’]s\s+(.+)$", place)
+    if possessive:
+        place = f"{possessive.group(2)}, {possessive.group(1)}"
+    if place == place.lower():
+        place = " ".join(
+            word if word in PLACE_CONNECTORS else word.capitalize()
+            for word in place.split()
+        )
+    return place
+
+
+def _place_candidates(text: str) -> dict[str, tuple[int, str]]:
+    """Place phrases introduced by a preposition.
+
+    Returns:
+        The normalized place -> (end of the phrase, lowercase preposition).
+    """
+    candidates: dict[str, tuple[int, str]] = {}
+    for match in _PREPOSITION.finditer(text):
+        rest = text[match.end():]
+        end = _PLACE_END.search(rest)
+        phrase = rest[: end.start()] if end else rest
+        if _is_place(_WORD.findall(phrase)):
+            candidates.setdefault(
+                _normalize_place(phrase),
+                (match.end() + len(phrase), match.group(1).lower()),
+            )
+    return candidates
+
+
+def _additional_context(text: str, place: str, place_end: int) -> str | None:
+    """Capacities and qualifying clauses around the place phrase."""
+    parts = []
+    capacity = _CAPACITY.search(text)
+    if capacity:
+        parts.append(f"{capacity.group(1)}MW capacity requirement")
+    clause = _CONTEXT.search(text[:place_end])
+    if clause and place.lower() not in clause.group(1).lower():
+        parts.append(clause.group(1).strip(" ,"))
+    rest = text[place_end:].strip(" ,.?!")
+    if rest:
+        parts.append(rest)
+    return ", ".join(parts) or None
+
+
+def _parse_fields(text: str, style: str) -> ParsedRequest | None:
+    """Requests that state the fields, e.g. "Location: X. Business type: Y".
+
+    The field values get the same checks as free text: no negation
+    ("Location: Austin, not Dallas") and no business type of the other
+    prompt style.
+    """
+    fields = {}
+    for name, value in _FIELD.findall(text):
+        key = "location" if "location" in name.lower() else "business_type"
+        fields.setdefault(key, value.strip(" ,.\"'"))
+    if not fields.get("location") or not fields.get("business_type"):
+        return None
+    if any(_NEGATION.search(value) for value in fields.values()):
+        return None
+    if _is_other_style(_named_business_types(fields["business_type"]), style):
+        return None
+    context = re.search(r"additional[_ ]context\s*[:=]\s*([^\n]+)", text, re.I)
+    return ParsedRequest(
+        target_location=fields["location"],
+        business_type=fields["business_type"],
+        additional_context=context.group(1).strip(" .") if context else None,
+    )
+
+
+def parse_request(text: str, style: str = "retail") -> ParsedRequest | None:
+    """Parse a request without the model when the result is unambiguous.
+
+    Args:
+        text: The user's (or root agent's) request.
+        style: Prompt style, "retail" or "datacenter"; selects the gazetteer
+            of business types.
+
+    Returns:
+        The parsed request, or None if the model should parse it.
+    """
+    text = text.strip()
+    if not text:
+        return None
+    parsed = _parse_fields(text, style)
+    if parsed:
+        return parsed
+
+    if _NEGATION.search(text):
+        return None
+    business_types = _find_business_types(text, style)
+    if len(business_types) != 1:
+        return None
+    places = _place_candidates(text)
+    if len(places) != 1:
+        return None
+    (place, (place_end, preposition)), = places.items()
+    if preposition not in TARGET_PREPOSITIONS:
+        return None
+    # Only a qualifying clause may follow the place ("..., and want to ...")
+    rest = text[place_end:].strip(" ,.?!")
+    if rest and not re.match(_CONTEXT_CLAUSE, rest, re.I):
+        return None
+    return ParsedRequest(
+        target_location=place,
+        business_type=business_types.pop(),
+        additional_context=_additional_context(text, place, place_end),
+    )
@@ -0,0 +1,264 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Grid spatial index over competitor coordinates.
+
+Competitors are projected onto a local equirectangular plane (km) and
+bucketed into square cells; building the index is a sort of the cell keys,
+O(n log n). Neighbor queries only look at the cells around a point: radius
+counts at the cells within the radius, nearest-neighbor searches at rings of
+cells of growing size until no closer point can exist. Both are exact and
+close to linear for the few hundred competitors a dense metro returns.
+
+The same cells are the gap-analysis zones: assign_zones() labels each
+competitor with its cell and a human-readable zone name, and
+zone_spatial_metrics() aggregates measured density and spacing per zone.
+These numbers replace LLM estimates such as CompetitionProfile.density_per_km2.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from ..config import GAP_ZONE_CELL_KM, SPATIAL_LOCAL_RADIUS_KM
+
+KM_PER_DEGREE_LAT = 110.574
+KM_PER_DEGREE_LNG_EQUATOR = 111.320
+
+
+class GridIndex:
+    """Uniform grid index over (lat, lng) points.
+
+    Attributes:
+        x, y: Projected coordinates in km.
+        rows, cols: Grid cell of every point.
+    """
+
+    def __init__(self, lat, lng, cell_km: float = GAP_ZONE_CELL_KM) -> None:
+        lat = np.asarray(lat, dtype=float)
+        lng = np.asarray(lng, dtype=float)
+        self.cell_km = cell_km
+        km_per_lng = KM_PER_DEGREE_LNG_EQUATOR * math.cos(
+            math.radians(lat.mean() if lat.size else 0.0)
+        )
+        self.x = lng * km_per_lng
+        self.y = lat * KM_PER_DEGREE_LAT
+        self.rows = np.floor(self.y / cell_km).astype(np.int64)
+        self.cols = np.floor(self.x / cell_km).astype(np.int64)
+
+        # Sort points by cell so each cell is a contiguous slice of _order
+        self._order = np.lexsort((self.cols, self.rows))
+        cells = np.stack([self.rows, self.cols], axis=1)[self._order]
+        unique, starts, counts = np.unique(
+            cells, axis=0, return_index=True, return_counts=True
+        )
+        self._cells = {
+            (int(r), int(c)): (int(s), int(s + n))
+            for (r, c), s, n in zip(unique, starts, counts)
+        }
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    def cell_points(self, row: int, col: int) -> np.ndarray:
+        """Indices of the points in one cell."""
+        start, end = self._cells.get((row, col), (0, 0))
+        return self._order[start:end]
+
+    def _square(self, row: int, col: int, ring: int) -> np.ndarray:
+        """Indices of the points within `ring` cells (Chebyshev) of a cell."""
+        chunks = [
+            self.cell_points(r, c)
+            for r in range(row - ring, row + ring + 1)
+            for c in range(col - ring, col + ring + 1)
+            if (r, c) in self._cells
+        ]
+        return np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int64)
+
+    def _ring(self, row: int, col: int, ring: int) -> np.ndarray:
+        """Indices of the points exactly `ring` cells (Chebyshev) from a cell."""
+        if ring == 0:
+            return self.cell_points(row, col)
+        cells = [
+            *((r, c) for r in (row - ring, row + ring)
+              for c in range(col - ring, col + ring + 1)),
+            *((r, c) for c in (col - ring, col + ring)
+              for r in range(row - ring + 1, row + ring)),
+        ]
+        chunks = [self.cell_points(r, c) for r, c in cells if (r, c) in self._cells]
+        return np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int64)
+
+    def _distances(self, points: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+        dx = self.x[points][:, None] - self.x[candidates][None, :]
+        dy = self.y[points][:, None] - self.y[candidates][None, :]
+        return np.hypot(dx, dy)
+
+    def nearest_neighbor_km(self) -> np.ndarray:
+        """Distance from every point to its nearest other point (inf if alone).
+
+        For each occupied cell, rings of cells of increasing Chebyshev
+        distance are searched until every point in the cell has a neighbor
+        closer than any point in the remaining rings can be (a point `ring`
+        + 1 cells away is at least ring * cell_km away). Clustered points stop
+        after a ring or two. Once a search would look up more cells than are
+        occupied (an isolated point), it compares with all points instead.
+        """
+        nearest = np.full(len(self), np.inf)
+        for (row, col), (start, end) in self._cells.items():
+            points = self._order[start:end]
+            best = np.full(len(points), np.inf)
+            searched = 0
+            ring = 0
+            while searched < len(self):
+                if (2 * ring + 1) ** 2 > len(self._cells):
+                    candidates = self._order
+                else:
+                    candidates = self._ring(row, col, ring)
+                if len(candidates):
+                    dist = self._distances(points, candidates)
+                    dist[points[:, None] == candidates[None, :]] = np.inf
+                    best = np.minimum(best, dist.min(axis=1))
+                if len(candidates) == len(self) or np.all(best <= ring * self.cell_km):
+                    break
+                searched += len(candidates)
+                ring += 1
+            nearest[points] = best
+        return nearest
+
+    def count_within(self, radius_km: float) -> np.ndarray:
+        """Number of other points within radius_km of every point."""
+        counts = np.zeros(len(self), dtype=np.int64)
+        ring = math.ceil(radius_km / self.cell_km)
+        for (row, col), (start, end) in self._cells.items():
+            points = self._order[start:end]
+            candidates = self._square(row, col, ring)
+            within = self._distances(points, candidates) <= radius_km
+            counts[points] = within.sum(axis=1) - 1  # minus the point itself
+        return counts
+
+
+def area_label(address: str) -> str:
+    """Best-effort neighborhood from a formatted address.
+
+    "12 Main Rd, Indiranagar, Bengaluru, Karnataka 560038, India" yields
+    "Indiranagar"; shorter addresses fall back to the city component.
+    """
+    parts = [p.strip() for p in str(address or "").split(",") if p.strip()]
+    if len(parts) >= 5:
+        return parts[-4]
+    if len(parts) >= 3:
+        return parts[-3]
+    return parts[0] if parts else ""
+
+
+def assign_zones(
+    df: pd.DataFrame,
+    cell_km: float = GAP_ZONE_CELL_KM,
+    radius_km: float = SPATIAL_LOCAL_RADIUS_KM,
+) -> pd.DataFrame:
+    """Add zone membership and per-competitor spatial metrics.
+
+    Args:
+        df: Competitors with lat, lng and address columns.
+        cell_km: Zone grid cell size in kilometers.
+        radius_km: Radius for the local density around each competitor.
+
+    Returns:
+        A copy of df with zone_id, zone (human-readable, unique),
+        nearest_km and local_density_per_km2 columns.
+    """
+    index = GridIndex(df["lat"], df["lng"], cell_km)
+    zone_ids = pd.Series(
+        [f"{r}:{c}" for r, c in zip(index.rows, index.cols)], index=df.index
+    )
+    areas = df["address"].map(area_label)
+
+    # Name each cell after its most common neighborhood; disambiguate repeats
+    names = (
+        areas[areas != ""]
+        .groupby(zone_ids)
+        .agg(lambda s: s.value_counts().index[0])
+    )
+    labels: dict[str, str] = {}
+    seen: dict[str, int] = {}
+    for zone_id in zone_ids.unique():
+        base = names.get(zone_id) or f"Zone {zone_id}"
+        seen[base] = seen.get(base, 0) + 1
+        labels[zone_id] = base if seen[base] == 1 else f"{base} ({seen[base]})"
+
+    local_area = math.pi * radius_km**2
+    return df.assign(
+        zone_id=zone_ids,
+        zone=zone_ids.map(labels),
+        nearest_km=index.nearest_neighbor_km(),
+        # Count the competitor itself: a lone store is 1 per local area
+        local_density_per_km2=(index.count_within(radius_km) + 1) / local_area,
+    )
+
+
+def zone_spatial_metrics(
+    df: pd.DataFrame, cell_km: float = GAP_ZONE_CELL_KM
+) -> pd.DataFrame:
+    """Aggregate measured density and spacing per zone.
+
+    Args:
+        df: Output of assign_zones().
+        cell_km: Zone grid cell size in kilometers.
+
+    Returns:
+        One row per zone, densest first, with competitor_count,
+        density_per_km2 (per zone cell), local_density_per_km2 (mean around
+        each competitor) and median/min nearest-competitor distance in km.
+    """
+    zones = df.groupby(["zone_id", "zone"], sort=False).agg(
+        competitor_count=("lat", "size"),
+        local_density_per_km2=("local_density_per_km2", "mean"),
+        median_nearest_km=("nearest_km", "median"),
+        min_nearest_km=("nearest_km", "min"),
+    ).reset_index()
+    zones["density_per_km2"] = zones["competitor_count"] / cell_km**2
+    return zones.sort_values(
+        ["density_per_km2", "local_density_per_km2"], ascending=False
+    ).reset_index(drop=True)
+
+
+def _km(value: float) -> str:
+    if not np.isfinite(value):
+        return "none within search area"
+    return f"{value * 1000:.0f} m" if value < 1 else f"{value:.1f} km"
+
+
+def render_spatial_metrics(
+    df: pd.DataFrame,
+    zones: pd.DataFrame,
+    cell_km: float = GAP_ZONE_CELL_KM,
+    radius_km: float = SPATIAL_LOCAL_RADIUS_KM,
+) -> str:
+    """Render spatial metrics compactly for instruction injection."""
+    lines = [
+        f"Measured from {len(df)} geolocated competitors in {len(zones)} "
+        f"zones ({cell_km:g} km grid cells, {cell_km**2:g} km² each). "
+        f"Median nearest-competitor distance: {_km(df['nearest_km'].median())}.",
+        "Per zone: competitors, density per km² of zone, mean density within "
+        f"{radius_km:g} km of each competitor, median nearest-competitor distance.",
+    ]
+    for zone in zones.itertuples(index=False):
+        lines.append(
+            f"- {zone.zone}: {zone.competitor_count} competitors, "
+            f"{zone.density_per_km2:.2f}/km², "
+            f"{zone.local_density_per_km2:.2f}/km² local, "
+            f"nearest {_km(zone.median_nearest_km)}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,315 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Record/replay proxy for the Gemini API and Maps web services.
+
+The pipeline reaches Gemini through GOOGLE_GEMINI_BASE_URL and Maps (Places
+Text Search, the map's place lookups) through LOCATION_STRATEGY_MAPS_BASE_URL.
+Pointed at this server, both go through one port:
+
+- record: every request is forwarded to the real API (Maps paths to
+  maps.googleapis.com, everything else to generativelanguage.googleapis.com,
+  or --maps-upstream/--gemini-upstream) and the response is appended to the
+  cassette with its latency.
+- replay: requests are answered from the cassette without any network access,
+  after the recorded latency times --latency-scale (0 = immediately).
+
+Requests are matched by method, path, query and JSON body. API keys are
+dropped (and never stored), dates are masked, so the current_date in stage
+instructions does not break replays on later days, and Gemini contents are
+compared as a set, since the events of parallel stages interleave. A request without
+an exact match gets the next recorded response of the same method and path
+(counted as approximate); one without any gets a 404. Identical requests
+get their recorded responses in turn, cycling when a run is replayed again.
+
+A cassette is a JSON file (gzip-compressed if its name ends in .gz) holding
+the entries and free-form metadata, e.g. the request that was recorded.
+
+GET /cassette/stats returns the match counts; POST /cassette/save (record
+mode) writes the cassette with the posted JSON as metadata. Recording also
+saves on shutdown.
+
+Usage (replay_benchmark.py starts it itself):
+    python tests/load_test/cassette.py record pipeline.cassette.json.gz
+    python tests/load_test/cassette.py replay pipeline.cassette.json.gz
+"""
+
+import argparse
+import asyncio
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlencode
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+
+GEMINI_UPSTREAM = "https://generativelanguage.googleapis.com"
+MAPS_UPSTREAM = "https://maps.googleapis.com"
+CASSETTE_VERSION = 1
+
+# Query parameters and headers that carry credentials
+SECRET_PARAMS = {"key"}
+FORWARDED_HEADERS = {
+    "content-type",
+    "user-agent",
+    "x-goog-api-key",
+    "x-goog-api-client",
+    "x-server-timeout",
+}
+DATE = re.compile(r"\b\d{4}-\d{2}-\d{2}\b")
+TEXT_TYPES = ("application/json", "text/")
+
+logger = logging.getLogger("cassette")
+
+
+def request_key(method: str, path: str, query: list[tuple[str, str]], body: bytes) -> str:
+    """Match key of a request: credentials dropped, dates masked."""
+    params = urlencode(sorted((k, v) for k, v in query if k not in SECRET_PARAMS))
+    try:
+        data = json.loads(body) if body else ""
+    except ValueError:
+        text = body.decode("utf-8", "replace")
+    else:
+        if isinstance(data, dict) and isinstance(data.get("contents"), list):
+            # Events of parallel stages reach later stages in either order
+            data["contents"] = sorted(
+                data["contents"], key=lambda c: json.dumps(c, sort_keys=True)
+            )
+        text = json.dumps(data, sort_keys=True)
+    payload = f"{method} {path}?{params}\n{DATE.sub('<date>', text)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class Cassette:
+    """Recorded request/response pairs in recording order."""
+
+    entries: list[dict[str, Any]] = field(default_factory=list)
+    meta: dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "Cassette":
+        path = Path(path)
+        raw = path.read_bytes()
+        if path.suffix == ".gz":
+            raw = gzip.decompress(raw)
+        data = json.loads(raw)
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"{path}: unsupported cassette version {data.get('version')}")
+        return cls(entries=data["entries"], meta=data.get("meta", {}))
+
+    def save(self, path: str | Path) -> None:
+        path = Path(path)
+        raw = json.dumps(
+            {"version": CASSETTE_VERSION, "meta": self.meta, "entries": self.entries}
+        ).encode("utf-8")
+        if path.suffix == ".gz":
+            raw = gzip.compress(raw, compresslevel=6)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(raw)
+
+    @staticmethod
+    def entry(
+        key: str, method: str, path: str, response: httpx.Response, elapsed: float
+    ) -> dict[str, Any]:
+        content_type = response.headers.get("content-type", "")
+        entry = {
+            "key": key,
+            "method": method,
+            "path": path,
+            "status": response.status_code,
+            "content_type": content_type,
+            "elapsed": round(elapsed, 4),
+        }
+        if content_type.startswith(TEXT_TYPES):
+            entry["body"] = response.text
+        else:
+            entry["body_base64"] = base64.b64encode(response.content).decode("ascii")
+        return entry
+
+
+class Replayer:
+    """Looks up recorded responses, cycling through repeated requests."""
+
+    def __init__(self, cassette: Cassette) -> None:
+        self.by_key: dict[str, list[dict]] = defaultdict(list)
+        self.by_route: dict[tuple[str, str], list[dict]] = defaultdict(list)
+        for entry in cassette.entries:
+            self.by_key[entry["key"]].append(entry)
+            self.by_route[(entry["method"], entry["path"])].append(entry)
+        self.positions: Counter = Counter()
+        self.stats: Counter = Counter()
+
+    def _next(self, index: Any, entries: list[dict]) -> dict:
+        entry = entries[self.positions[index] % len(entries)]
+        self.positions[index] += 1
+        return entry
+
+    def lookup(self, key: str, method: str, path: str) -> dict | None:
+        if key in self.by_key:
+            self.stats["exact"] += 1
+            return self._next(key, self.by_key[key])
+        route = (method, path)
+        if route in self.by_route:
+            logger.warning(f"No exact match for {method} {path}, replaying by route")
+            self.stats["approximate"] += 1
+            return self._next(route, self.by_route[route])
+        logger.warning(f"No recorded response for {method} {path}")
+        self.stats["missed"] += 1
+        return None
+
+
+def create_cassette_app(
+    mode: str,
+    path: str | Path,
+    latency_scale: float = 0.0,
+    gemini_upstream: str = GEMINI_UPSTREAM,
+    maps_upstream: str = MAPS_UPSTREAM,
+) -> FastAPI:
+    """Proxy that records to, or replays from, the cassette at path."""
+    if mode == "record":
+        cassette = Cassette(meta={"recorded_at": datetime.now().isoformat()})
+        replayer = None
+    else:
+        cassette = Cassette.load(path)
+        replayer = Replayer(cassette)
+    recorded = Counter()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        async with httpx.AsyncClient(timeout=httpx.Timeout(600, connect=30)) as client:
+            app.state.client = client
+            yield
+        if mode == "record" and cassette.entries:
+            cassette.save(path)
+
+    app = FastAPI(title=f"Cassette {mode}", lifespan=lifespan)
+
+    @app.get("/cassette/stats")
+    async def stats() -> dict:
+        counts = dict(replayer.stats) if replayer else dict(recorded)
+        return {
+            "mode": mode,
+            "entries": len(cassette.entries),
+            "meta": cassette.meta,
+            **counts,
+        }
+
+    @app.post("/cassette/save")
+    async def save(request: Request) -> dict:
+        if mode != "record":
+            return {"saved": False, "entries": len(cassette.entries)}
+        cassette.meta.update(await request.json())
+        cassette.save(path)
+        return {"saved": True, "entries": len(cassette.entries)}
+
+    @app.api_route("/{full_path:path}", methods=["GET", "POST"])
+    async def proxy(request: Request, full_path: str) -> Response:
+        method = request.method
+        url_path = request.url.path
+        query = list(request.query_params.multi_items())
+        body = await request.body()
+        key = request_key(method, url_path, query, body)
+
+        if replayer is not None:
+            entry = replayer.lookup(key, method, url_path)
+            if entry is None:
+                return JSONResponse(
+                    {
+                        "error": {
+                            "code": 404,
+                            "message": f"No recorded response for {method} {url_path}",
+                            "status": "NOT_FOUND",
+                        }
+                    },
+                    status_code=404,
+                )
+            if latency_scale > 0:
+                await asyncio.sleep(entry["elapsed"] * latency_scale)
+            content = (
+                entry["body"].encode("utf-8")
+                if "body" in entry
+                else base64.b64decode(entry["body_base64"])
+            )
+            return Response(
+                content, status_code=entry["status"], media_type=entry["content_type"]
+            )
+
+        headers = {
+            name: value
+            for name, value in request.headers.items()
+            if name.lower() in FORWARDED_HEADERS
+        }
+        start = time.perf_counter()
+        response = await request.app.state.client.request(
+            method,
+            (maps_upstream if url_path.startswith("/maps/") else gemini_upstream)
+            + url_path,
+            params=query,
+            content=body,
+            headers=headers,
+        )
+        elapsed = time.perf_counter() - start
+        cassette.entries.append(Cassette.entry(key, method, url_path, response, elapsed))
+        recorded["recorded"] += 1
+        return Response(
+            response.content,
+            status_code=response.status_code,
+            media_type=response.headers.get("content-type"),
+        )
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("cassette", help="Cassette file (.json or .json.gz)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8783)
+    parser.add_argument(
+        "--latency-scale",
+        type=float,
+        default=0.0,
+        help="Replay: recorded latency multiplier (0 = no delay, 1 = as recorded)",
+    )
+    parser.add_argument("--gemini-upstream", default=GEMINI_UPSTREAM)
+    parser.add_argument("--maps-upstream", default=MAPS_UPSTREAM)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    app = create_cassette_app(
+        args.mode,
+        args.cassette,
+        args.latency_scale,
+        args.gemini_upstream.rstrip("/"),
+        args.maps_upstream.rstrip("/"),
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Microbenchmark of instruction rendering (app/prompt_utils.py).
+
+Renders the instructions of the stages that inline upstream outputs (gap
+analysis, strategy advisor, report generator), for both prompt styles,
+from a session state with realistically sized upstream outputs, and times
+per model call:
+
+- adk: inject_session_state over the raw template (the previous provider),
+- compiled: the compiled template rendered on every call (cache miss),
+- cached: the provider as used by the agents, where a stage's first call
+  renders and its tool-call turns (--calls per stage) reuse the result.
+
+Every compiled and cached result is checked against inject_session_state.
+--scale multiplies the upstream output sizes (1 is about a real run: 10-16
+KB per output). Results are printed and written to
+.results/instruction_benchmark.json.
+
+Usage:
+    uv run python tests/load_test/instruction_benchmark.py --scale 1 2 4
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+RESULTS_DIR = Path(__file__).with_name(".results")
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# Approximate sizes (characters) of the upstream outputs of a real run
+OUTPUT_SIZES = {
+    "market_research_findings": 12_000,
+    "competitor_analysis": 16_000,
+    "gap_analysis": 10_000,
+    "spatial_metrics": 2_000,
+}
+WORDS = (
+    "foot traffic rent demand density saturation competitor rating review "
+    "corridor residential office transit parking visibility premium growth "
+    "income population daytime weekend anchor tenant zoning grid fiber"
+).split()
+
+
+def markdown(size: int, seed: int) -> str:
+    """Deterministic markdown of about size characters: headings, bullets, tables."""
+    rng = random.Random(seed)
+    lines: list[str] = []
+    length = 0
+    section = 0
+    while length < size:
+        if section % 3 == 0 or rng.random() < 0.08:
+            line = f"## Section {section}: {' '.join(rng.sample(WORDS, 3)).title()}"
+        elif rng.random() < 0.3:
+            line = (
+                f"| {rng.choice(WORDS).title()} | {rng.randint(1, 500)} | "
+                f"{rng.uniform(1, 5):.1f} | ${rng.randint(10, 90)}/sq ft |"
+            )
+        else:
+            words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(12, 30)))
+            line = f"- **{rng.choice(WORDS).title()}**: {words} ({rng.randint(1, 99)}%)"
+        lines.append(line)
+        length += len(line) + 1
+        section += 1
+    return "\n".join(lines)
+
+
+def session_state(scale: float, style: str) -> dict[str, Any]:
+    """Session state as the downstream stages see it."""
+    state: dict[str, Any] = {
+        "prompt_style": style,
+        "target_location": "Indiranagar, Bangalore",
+        "business_type": "coffee shop",
+        "current_date": "2025-06-01",
+    }
+    for seed, (key, size) in enumerate(OUTPUT_SIZES.items()):
+        state[key] = markdown(int(size * scale), seed)
+    # strategy advisor output, stored as a dict (output_schema)
+    state["strategic_report"] = {
+        "target_location": state["target_location"],
+        "business_type": state["business_type"],
+        "top_recommendation": {
+            "location_name": "100 Feet Road",
+            "overall_score": 82,
+            "strengths": [markdown(int(600 * scale), 10 + i) for i in range(4)],
+            "concerns": [markdown(int(400 * scale), 20 + i) for i in range(3)],
+        },
+        "alternative_locations": [
+            {"location_name": f"Zone {i}", "summary": markdown(int(1500 * scale), 30 + i)}
+            for i in range(3)
+        ],
+        "key_insights": [markdown(int(300 * scale), 40 + i) for i in range(6)],
+        "methodology_summary": markdown(int(800 * scale), 50),
+    }
+    return state
+
+
+def context(agent_name: str, state: dict[str, Any], session_id: str) -> Any:
+    """A ReadonlyContext over an in-memory session."""
+    from google.adk.agents.readonly_context import ReadonlyContext
+    from google.adk.sessions import Session
+
+    session = Session(id=session_id, app_name="bench", user_id="bench", state=state)
+    invocation = SimpleNamespace(
+        session=session, agent=SimpleNamespace(name=agent_name), artifact_service=None
+    )
+    return ReadonlyContext(invocation)  # type: ignore[arg-type]
+
+
+async def bench_stage(agent: Any, state: dict, calls: int, iterations: int) -> dict:
+    """Time the three renderers for one stage; returns microseconds per call."""
+    from google.adk.utils.instructions_utils import inject_session_state
+
+    from app.prompt_utils import StyledInstructionProvider
+
+    provider = agent.instruction
+    template = provider.template_for(state)
+    compiled = provider.compiled_for(state)
+    ctx = context(agent.name, state, "check")
+    expected = await inject_session_state(template, ctx)
+    assert compiled.render(ctx.state, agent.name) == expected, agent.name
+
+    async def adk() -> None:
+        for _ in range(calls):
+            await inject_session_state(template, ctx)
+
+    async def uncached() -> None:
+        for _ in range(calls):
+            compiled.render(ctx.state, agent.name)
+
+    cached_provider = StyledInstructionProvider(
+        provider.retail_instruction, provider.datacenter_instruction
+    )
+    # A new session per stage run: the first call renders, the rest hit
+    stage_contexts = iter(
+        [context(agent.name, state, f"run-{i}") for i in range(iterations)]
+    )
+
+    stage_contexts_check = context(agent.name, state, "run-0")
+
+    async def cached() -> None:
+        stage_ctx = next(stage_contexts)
+        for _ in range(calls):
+            await cached_provider(stage_ctx)
+
+    timings = {}
+    for name, fn in (("adk", adk), ("compiled", uncached), ("cached", cached)):
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            await fn()
+            samples.append((time.perf_counter() - start) / calls * 1e6)
+        timings[f"{name}_us"] = round(statistics.median(samples), 1)
+    assert await cached_provider(stage_contexts_check) == expected, agent.name
+    timings["template_chars"] = len(template)
+    timings["rendered_chars"] = len(expected)
+    timings["referenced_keys"] = list(compiled.keys)
+    return timings
+
+
+async def run(scales: list[float], calls: int, iterations: int) -> list[dict]:
+    from app.sub_agents.gap_analysis.agent import gap_analysis_agent
+    from app.sub_agents.report_generator.agent import report_generator_agent
+    from app.sub_agents.strategy_advisor.agent import strategy_advisor_agent
+
+    results = []
+    for scale in scales:
+        for style in ("retail", "datacenter"):
+            state = session_state(scale, style)
+            for agent in (gap_analysis_agent, strategy_advisor_agent, report_generator_agent):
+                timings = await bench_stage(agent, state, calls, iterations)
+                results.append({"scale": scale, "style": style, "stage": agent.name, **timings})
+    return results
+
+
+def print_results(results: list[dict], calls: int) -> None:
+    print(
+        f"{'scale':>5}  {'style':<10} {'stage':<24} {'rendered':>9}  "
+        f"{'adk us':>8} {'compiled':>9} {'cached':>8}  speedup ({calls} calls/stage)"
+    )
+    for r in results:
+        speedup = r["adk_us"] / r["cached_us"] if r["cached_us"] else float("inf")
+        print(
+            f"{r['scale']:>5g}  {r['style']:<10} {r['stage']:<24} "
+            f"{r['rendered_chars']:>9,}  {r['adk_us']:>8.1f} {r['compiled_us']:>9.1f} "
+            f"{r['cached_us']:>8.1f}  {speedup:.1f}x"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--scale", type=float, nargs="+", default=[1.0, 4.0],
+        help="Upstream output size multipliers",
+    )
+    parser.add_argument(
+        "--calls", type=int, default=8,
+        help="Model calls per stage run (1 + tool-call turns)",
+    )
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.scale, args.calls, args.iterations))
+    print_results(results, args.calls)
+    RESULTS_DIR.mkdir(exist_ok=True)
+    path = RESULTS_DIR / "instruction_benchmark.json"
+    path.write_text(
+        json.dumps({"calls_per_stage": args.calls, "results": results}, indent=2),
+        encoding="utf-8",
+    )
+    print(f"\nResults written to {path}")
+
+
+if __name__ == "__main__":
+    main()
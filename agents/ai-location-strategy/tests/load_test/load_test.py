@@ -0,0 +1,469 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""End-to-end load test of the AG-UI backend against local stand-ins.
+
+Starts stub_servers.py (Gemini and Places stand-ins) and the AG-UI backend
+(app/frontend/backend/main.py) pointed at them, then runs full pipelines
+through the AG-UI endpoint at each concurrency level and reports:
+
+- end-to-end latency (request to RUN_FINISHED) and time to first event,
+- per-stage latency from state["stage_timings"],
+- the backend's event-loop lag during the level (event_loop_lag_seconds
+  histogram at /metrics, diffed before/after),
+- backend RSS: peak growth per concurrent pipeline and memory retained per
+  pipeline once the level is done.
+
+Results are printed and written to .results/results.json, with the stub and
+backend logs next to it.
+
+Usage:
+    uv run python tests/load_test/load_test.py                 # 1, 10, 50
+    uv run python tests/load_test/load_test.py --levels 10 --rounds 5 \\
+        --latency 1.0 --error-rate 0.05 --error-status 429
+    # Against a running backend (its model/Maps endpoints are up to you):
+    uv run python tests/load_test/load_test.py --backend-url http://localhost:8000 \\
+        --backend-pid 12345
+"""
+
+import argparse
+import asyncio
+import http.cookiejar
+import json
+import math
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import httpx
+from stub_servers import add_profile_arguments, profile_arguments
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BACKEND = PROJECT_ROOT / "app" / "frontend" / "backend" / "main.py"
+STUB_SERVERS = Path(__file__).with_name("stub_servers.py")
+RESULTS_DIR = Path(__file__).with_name(".results")
+LAG_METRIC = "location_strategy_event_loop_lag_seconds"
+
+
+@dataclass
+class PipelineRun:
+    """Outcome of one pipeline run through the AG-UI endpoint."""
+
+    thread_id: str
+    seconds: float = 0.0
+    first_event_seconds: float | None = None
+    events: int = 0
+    stages: dict[str, float] = field(default_factory=dict)
+    error: str | None = None
+
+
+def percentiles(values: list[float]) -> dict[str, float]:
+    """Nearest-rank p50/p95/p99, max and mean."""
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def rank(q: float) -> float:
+        return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+    return {
+        "p50": rank(0.5),
+        "p95": rank(0.95),
+        "p99": rank(0.99),
+        "max": ordered[-1],
+        "mean": sum(ordered) / len(ordered),
+    }
+
+
+def apply_patch(state: dict, operations: list[dict]) -> None:
+    """Apply the add/replace/remove operations of a JSON Patch in place."""
+    for operation in operations:
+        tokens = [
+            token.replace("~1", "/").replace("~0", "~")
+            for token in operation.get("path", "").lstrip("/").split("/")
+        ]
+        target = state
+        try:
+            for token in tokens[:-1]:
+                target = target[int(token) if isinstance(target, list) else token]
+            key = tokens[-1]
+            if isinstance(target, list):
+                index = len(target) if key == "-" else int(key)
+                if operation["op"] == "remove":
+                    del target[index]
+                elif operation["op"] == "add":
+                    target.insert(index, operation["value"])
+                else:
+                    target[index] = operation["value"]
+            elif operation["op"] == "remove":
+                target.pop(key, None)
+            elif operation["op"] in ("add", "replace"):
+                target[key] = operation["value"]
+        except (KeyError, IndexError, TypeError, ValueError):
+            continue  # a path into state this client never saw
+
+
+def rss_bytes(pid: int | None) -> int | None:
+    """Resident set size of a process (Linux /proc, else psutil if present)."""
+    if pid is None:
+        return None
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import psutil
+
+        return psutil.Process(pid).memory_info().rss
+    except Exception:
+        return None
+
+
+def lag_buckets(metrics_text: str) -> dict[float, float]:
+    """Cumulative event-loop lag histogram buckets from /metrics."""
+    buckets = {}
+    for line in metrics_text.splitlines():
+        if line.startswith(f"{LAG_METRIC}_bucket"):
+            le = re.search(r'le="([^"]+)"', line).group(1)
+            bound = math.inf if le == "+Inf" else float(le)
+            buckets[bound] = float(line.rsplit(" ", 1)[1])
+    return buckets
+
+
+def bucket_quantile(q: float, buckets: dict[float, float]) -> float | None:
+    """Quantile of a cumulative histogram, interpolated like PromQL."""
+    bounds = sorted(buckets)
+    if not bounds or not buckets[bounds[-1]]:
+        return None
+    rank = q * buckets[bounds[-1]]
+    lower, below = 0.0, 0.0
+    for bound in bounds:
+        count = buckets[bound]
+        if count >= rank:
+            if math.isinf(bound):
+                return lower
+            return lower + (bound - lower) * (rank - below) / max(count - below, 1e-9)
+        lower, below = bound, count
+    return lower
+
+
+async def run_pipeline(client: httpx.AsyncClient, url: str, name: str) -> PipelineRun:
+    """Run one pipeline through the AG-UI endpoint, following its events."""
+    run = PipelineRun(thread_id=f"loadtest-{name}-{uuid.uuid4().hex[:8]}")
+    body = {
+        "threadId": run.thread_id,
+        "runId": uuid.uuid4().hex,
+        "state": {},
+        "messages": [
+            {
+                "id": uuid.uuid4().hex,
+                "role": "user",
+                # Unique per run, so caches and checkpoints don't short-cut it
+                "content": "I want to open a coffee shop in load test district "
+                f"{run.thread_id}",
+            }
+        ],
+        "tools": [],
+        "context": [],
+    }
+    state: dict = {}
+    started = time.perf_counter()
+    try:
+        # A backend session (user) per run, as a new browser would get
+        session = await client.post(f"{url.rstrip('/')}/auth/session")
+        session.raise_for_status()
+        cookie = "; ".join(f"{k}={v}" for k, v in session.cookies.items())
+        headers = {"Accept": "text/event-stream", "Cookie": cookie}
+        async with client.stream("POST", url, json=body, headers=headers) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                event = json.loads(line[5:])
+                run.events += 1
+                if run.first_event_seconds is None:
+                    run.first_event_seconds = time.perf_counter() - started
+                kind = event.get("type")
+                if kind == "STATE_SNAPSHOT":
+                    state = event.get("snapshot") or {}
+                elif kind == "STATE_DELTA":
+                    apply_patch(state, event.get("delta") or [])
+                elif kind == "RUN_ERROR":
+                    run.error = event.get("message", "RUN_ERROR")
+    except (httpx.HTTPError, json.JSONDecodeError) as e:
+        run.error = f"{type(e).__name__}: {e}"
+    run.seconds = time.perf_counter() - started
+    run.stages = {
+        stage: timing["duration_seconds"]
+        for stage, timing in (state.get("stage_timings") or {}).items()
+        if isinstance(timing, dict) and "duration_seconds" in timing
+    }
+    if run.error is None and not run.stages:
+        run.error = "no stage completed"
+    return run
+
+
+async def run_level(
+    client: httpx.AsyncClient,
+    backend_url: str,
+    backend_pid: int | None,
+    concurrency: int,
+    rounds: int,
+) -> dict:
+    """Run concurrency x rounds pipelines, at most `concurrency` at once."""
+    semaphore = asyncio.Semaphore(concurrency)
+    lag_before = lag_buckets((await client.get(f"{backend_url}/metrics")).text)
+    rss_start = rss_bytes(backend_pid)
+    rss_peak = rss_start or 0
+    done = asyncio.Event()
+
+    async def sample_memory() -> None:
+        nonlocal rss_peak
+        while not done.is_set():
+            rss_peak = max(rss_peak, rss_bytes(backend_pid) or 0)
+            await asyncio.sleep(0.25)
+
+    async def one(index: int) -> PipelineRun:
+        async with semaphore:
+            return await run_pipeline(
+                client, f"{backend_url}/", f"{concurrency}-{index}"
+            )
+
+    sampler = asyncio.create_task(sample_memory())
+    started = time.perf_counter()
+    runs = await asyncio.gather(*(one(i) for i in range(concurrency * rounds)))
+    wall = time.perf_counter() - started
+    done.set()
+    await sampler
+
+    lag_after = lag_buckets((await client.get(f"{backend_url}/metrics")).text)
+    lag = {
+        bound: count - lag_before.get(bound, 0) for bound, count in lag_after.items()
+    }
+    rss_end = rss_bytes(backend_pid)
+    ok = [run for run in runs if run.error is None]
+    stage_names = sorted({stage for run in ok for stage in run.stages})
+    mb = 1024 * 1024
+    report = {
+        "concurrency": concurrency,
+        "pipelines": len(runs),
+        "failed": len(runs) - len(ok),
+        "errors": sorted({run.error for run in runs if run.error}),
+        "wall_seconds": wall,
+        "pipelines_per_minute": 60 * len(ok) / wall if wall else 0.0,
+        "end_to_end_seconds": percentiles([run.seconds for run in ok]),
+        "first_event_seconds": percentiles(
+            [run.first_event_seconds for run in ok if run.first_event_seconds]
+        ),
+        "stage_seconds": {
+            stage: percentiles([run.stages[stage] for run in ok if stage in run.stages])
+            for stage in stage_names
+        },
+        "event_loop_lag_seconds": {
+            f"p{round(q * 100)}": bucket_quantile(q, lag) for q in (0.5, 0.95, 0.99)
+        },
+        "runs": [asdict(run) for run in runs],
+    }
+    if rss_start is not None and rss_end is not None:
+        report["memory_mb"] = {
+            "rss_start": rss_start / mb,
+            "rss_peak": rss_peak / mb,
+            "rss_end": rss_end / mb,
+            "peak_per_concurrent_pipeline": (rss_peak - rss_start) / mb / concurrency,
+            "retained_per_pipeline": (rss_end - rss_start) / mb / len(runs),
+        }
+    return report
+
+
+def print_report(report: dict) -> None:
+    def row(label: str, stats: dict, scale: float = 1.0, unit: str = "s") -> None:
+        if stats and all(v is not None for v in stats.values()):
+            cells = "  ".join(
+                f"{key} {value * scale:8.3f}{unit}"
+                for key, value in stats.items()
+                if key != "mean"
+            )
+            print(f"  {label:<32}{cells}")
+
+    print(
+        f"\nConcurrency {report['concurrency']}: {report['pipelines']} pipelines, "
+        f"{report['failed']} failed, {report['wall_seconds']:.1f}s wall, "
+        f"{report['pipelines_per_minute']:.1f} pipelines/min"
+    )
+    row("end-to-end", report["end_to_end_seconds"])
+    row("first event", report["first_event_seconds"])
+    for stage, stats in report["stage_seconds"].items():
+        row(f"stage {stage}", stats)
+    row("event-loop lag", report["event_loop_lag_seconds"], 1000, "ms")
+    memory = report.get("memory_mb")
+    if memory:
+        print(
+            f"  {'memory (RSS)':<32}{memory['rss_start']:.0f} MB -> peak "
+            f"{memory['rss_peak']:.0f} MB, "
+            f"{memory['peak_per_concurrent_pipeline']:.2f} MB per concurrent "
+            f"pipeline, {memory['retained_per_pipeline']:.2f} MB retained per pipeline"
+        )
+    for error in report["errors"][:5]:
+        print(f"  error: {error[:200]}")
+
+
+async def wait_until_up(
+    client: httpx.AsyncClient, url: str, process: subprocess.Popen, timeout: float
+) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode}")
+        try:
+            if (await client.get(url)).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.5)
+    raise TimeoutError(f"{url} did not come up within {timeout:.0f}s")
+
+
+def start_process(argv: list[str], env: dict, log_name: str) -> subprocess.Popen:
+    log = open(RESULTS_DIR / log_name, "w", encoding="utf-8")  # noqa: SIM115
+    return subprocess.Popen(
+        argv, env=env, cwd=PROJECT_ROOT, stdout=log, stderr=subprocess.STDOUT
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    RESULTS_DIR.mkdir(exist_ok=True)
+    processes: list[subprocess.Popen] = []
+    backend_url = args.backend_url
+    backend_pid = args.backend_pid
+    timeout = httpx.Timeout(args.timeout, connect=30)
+    limits = httpx.Limits(max_connections=max(args.levels) + 10)
+    # Each run sends its own session cookie; the shared client keeps none
+    no_cookies = http.cookiejar.CookieJar(
+        http.cookiejar.DefaultCookiePolicy(allowed_domains=[])
+    )
+    async with httpx.AsyncClient(
+        timeout=timeout, limits=limits, cookies=no_cookies
+    ) as client:
+        try:
+            if backend_url is None:
+                gemini_url = f"http://127.0.0.1:{args.gemini_port}"
+                places_url = f"http://127.0.0.1:{args.places_port}"
+                stubs = start_process(
+                    [
+                        sys.executable,
+                        str(STUB_SERVERS),
+                        "--gemini-port",
+                        str(args.gemini_port),
+                        "--places-port",
+                        str(args.places_port),
+                        *profile_arguments(args),
+                    ],
+                    dict(os.environ),
+                    "stubs.log",
+                )
+                processes.append(stubs)
+                await wait_until_up(client, f"{gemini_url}/stats", stubs, 60)
+
+                env = {
+                    **os.environ,
+                    "PORT": str(args.backend_port),
+                    "WEB_CONCURRENCY": "1",
+                    "GOOGLE_GENAI_USE_VERTEXAI": "FALSE",
+                    "GOOGLE_API_KEY": "load-test",
+                    "GOOGLE_GEMINI_BASE_URL": gemini_url,
+                    # googlemaps rejects keys that don't look like API keys
+                    "MAPS_API_KEY": "AIzaLoadTest",
+                    "LOCATION_STRATEGY_MAPS_BASE_URL": places_url,
+                    # Fresh caches and checkpoints, no cross-session memoization
+                    "LOCATION_STRATEGY_CACHE_DIR": tempfile.mkdtemp(
+                        prefix="location-strategy-load-test-"
+                    ),
+                    "LOCATION_STRATEGY_MEMOIZE": "FALSE",
+                    "LOCATION_STRATEGY_MAX_CONCURRENT_RUNS": str(max(args.levels)),
+                }
+                env.pop("GEMINI_API_KEY", None)
+                backend = start_process(
+                    [sys.executable, str(BACKEND)], env, "backend.log"
+                )
+                processes.append(backend)
+                backend_url = f"http://127.0.0.1:{args.backend_port}"
+                backend_pid = backend.pid
+                await wait_until_up(client, f"{backend_url}/health", backend, 180)
+
+            for index in range(args.warmup):
+                run = await run_pipeline(client, f"{backend_url}/", f"warmup-{index}")
+                if run.error:
+                    raise RuntimeError(f"Warm-up pipeline failed: {run.error}")
+
+            reports = []
+            for concurrency in args.levels:
+                report = await run_level(
+                    client, backend_url, backend_pid, concurrency, args.rounds
+                )
+                print_report(report)
+                reports.append(report)
+
+            stub_stats = {}
+            if processes:
+                for name, url in (("gemini", gemini_url), ("places", places_url)):
+                    stub_stats[name] = (await client.get(f"{url}/stats")).json()
+        finally:
+            for process in reversed(processes):
+                process.terminate()
+                process.wait(timeout=30)
+
+    output = Path(args.output)
+    output.write_text(
+        json.dumps(
+            {"arguments": vars(args), "stubs": stub_stats, "levels": reports},
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--levels",
+        type=int,
+        nargs="+",
+        default=[1, 10, 50],
+        help="concurrent pipelines per level",
+    )
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=3,
+        help="pipelines per level = concurrency x rounds",
+    )
+    parser.add_argument("--warmup", type=int, default=1, help="unreported first runs")
+    parser.add_argument("--timeout", type=float, default=1800, help="per pipeline (s)")
+    parser.add_argument("--backend-url", help="use a running backend instead")
+    parser.add_argument("--backend-pid", type=int, help="its PID, for memory")
+    parser.add_argument("--backend-port", type=int, default=8780)
+    parser.add_argument("--gemini-port", type=int, default=8781)
+    parser.add_argument("--places-port", type=int, default=8782)
+    parser.add_argument("--output", default=str(RESULTS_DIR / "results.json"))
+    add_profile_arguments(parser)
+    asyncio.run(main(parser.parse_args()))
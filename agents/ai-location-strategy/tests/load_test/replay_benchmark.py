@@ -0,0 +1,382 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Deterministic offline benchmark of the pipeline from a recorded cassette.
+
+record: runs location_strategy_pipeline once, in this process, against the
+real Gemini and Maps APIs through cassette.py in record mode, and saves every
+interaction (plus the request that was analyzed) to the cassette.
+
+replay: runs the same request --runs times against cassette.py in replay
+mode. No API keys or network are needed and, at the default --latency-scale
+of 0, the model and Maps calls cost nothing but their local round trip, so
+the figures measure the ADK orchestration, callbacks, state handling and
+artifact saving. Per run it reports:
+
+- wall-clock and CPU time (of this process; the cassette server runs in
+  its own) and per-stage time from state["stage_timings"],
+- the number of events and their serialized size, the size of all state
+  deltas and of the final session state (state bloat shows up here),
+- the number and size of saved artifacts.
+
+Medians are printed and written to .results/replay_benchmark.json. With
+--baseline (an earlier results file), the script exits with status 1 when a
+median exceeds the baseline's by more than --tolerance, so CI can run it on
+every commit.
+
+Every run starts without Places/geocode cache, checkpoints or memoization,
+so each one makes the same calls.
+
+Usage:
+    uv run python tests/load_test/replay_benchmark.py record pipeline.cassette.json.gz \\
+        --location "Indiranagar, Bangalore" --business-type "coffee shop"
+    uv run python tests/load_test/replay_benchmark.py replay pipeline.cassette.json.gz \\
+        --runs 5 --baseline baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+import httpx
+from cassette import GEMINI_UPSTREAM, MAPS_UPSTREAM
+from load_test import PROJECT_ROOT, RESULTS_DIR, start_process, wait_until_up
+
+CASSETTE_SERVER = Path(__file__).with_name("cassette.py")
+USER_ID = "replay-benchmark"
+
+# Medians compared against --baseline
+GATED_METRICS = (
+    "wall_seconds",
+    "cpu_seconds",
+    "events",
+    "event_bytes",
+    "state_delta_bytes",
+    "state_bytes",
+)
+
+
+def configure_environment(cassette_url: str, record: bool) -> None:
+    """Point the app at the cassette server; must run before importing app."""
+    os.environ.update(
+        {
+            "GOOGLE_GENAI_USE_VERTEXAI": "FALSE",
+            "GOOGLE_GEMINI_BASE_URL": cassette_url,
+            "LOCATION_STRATEGY_MAPS_BASE_URL": cassette_url,
+            # No Places/geocode cache or checkpoints: every run makes every call
+            "LOCATION_STRATEGY_CACHE_DIR": "",
+            "LOCATION_STRATEGY_MEMOIZE": "FALSE",
+        }
+    )
+    if not record:
+        os.environ["GOOGLE_API_KEY"] = "replay"
+        # googlemaps rejects keys that don't look like API keys
+        os.environ["MAPS_API_KEY"] = "AIzaReplay"
+        os.environ.pop("GEMINI_API_KEY", None)
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+async def run_once(runner: Any, row: Any) -> dict[str, Any]:
+    """Run the pipeline for row and measure it."""
+    from app.batch_runner import _row_status, row_message, row_state
+    from app.config import APP_NAME
+    from app.tools.places_search import get_places_cache
+
+    get_places_cache.cache_clear()
+    session = await runner.session_service.create_session(
+        app_name=APP_NAME, user_id=USER_ID, state=row_state(row)
+    )
+    events = []
+    error = None
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    try:
+        async for event in runner.run_async(
+            user_id=USER_ID, session_id=session.id, new_message=row_message(row)
+        ):
+            events.append(event)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    wall_seconds = time.perf_counter() - start
+    cpu_seconds = time.process_time() - cpu_start
+
+    session = await runner.session_service.get_session(
+        app_name=APP_NAME, user_id=USER_ID, session_id=session.id
+    )
+    state = dict(session.state) if session else {}
+    artifact_bytes = 0
+    keys = await runner.artifact_service.list_artifact_keys(
+        app_name=APP_NAME, user_id=USER_ID, session_id=session.id
+    )
+    for key in keys:
+        part = await runner.artifact_service.load_artifact(
+            app_name=APP_NAME, user_id=USER_ID, session_id=session.id, filename=key
+        )
+        if part is not None and part.inline_data is not None:
+            artifact_bytes += len(part.inline_data.data)
+        elif part is not None and part.text:
+            artifact_bytes += len(part.text.encode("utf-8"))
+    await runner.session_service.delete_session(
+        app_name=APP_NAME, user_id=USER_ID, session_id=session.id
+    )
+
+    return {
+        "status": _row_status(state),
+        "error": error,
+        "wall_seconds": wall_seconds,
+        "cpu_seconds": cpu_seconds,
+        "events": len(events),
+        "event_bytes": sum(
+            len(event.model_dump_json(exclude_none=True)) for event in events
+        ),
+        "state_delta_bytes": sum(
+            len(json.dumps(event.actions.state_delta, default=str))
+            for event in events
+            if event.actions and event.actions.state_delta
+        ),
+        "state_bytes": len(json.dumps(state, default=str)),
+        "artifacts": len(keys),
+        "artifact_bytes": artifact_bytes,
+        "stages": {
+            stage: timing.get("duration_seconds")
+            for stage, timing in (state.get("stage_timings") or {}).items()
+        },
+    }
+
+
+def summarize(runs: list[dict]) -> dict[str, Any]:
+    """Median of every figure over the measured runs."""
+    summary = {
+        metric: statistics.median(run[metric] for run in runs)
+        for metric in (*GATED_METRICS, "artifacts", "artifact_bytes")
+    }
+    stages = sorted({stage for run in runs for stage in run["stages"]})
+    summary["stages"] = {
+        stage: statistics.median(
+            run["stages"][stage] for run in runs if run["stages"].get(stage) is not None
+        )
+        for stage in stages
+    }
+    return summary
+
+
+def compare(summary: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Regressions of summary against a baseline summary."""
+    regressions = []
+    for metric in GATED_METRICS:
+        before = baseline.get(metric)
+        after = summary.get(metric)
+        if before and after is not None and after > before * (1 + tolerance):
+            regressions.append(
+                f"{metric}: {after:,.3f} vs baseline {before:,.3f} "
+                f"(+{(after / before - 1) * 100:.0f}%)"
+            )
+    return regressions
+
+
+def print_summary(summary: dict, runs: int, cassette_stats: dict) -> None:
+    print(f"\nReplay benchmark: median of {runs} runs")
+    print(f"  {'wall clock':<28}{summary['wall_seconds']:10.3f}s")
+    print(f"  {'CPU':<28}{summary['cpu_seconds']:10.3f}s")
+    for stage, seconds in summary["stages"].items():
+        print(f"  {'stage ' + stage:<28}{seconds:10.3f}s")
+    print(f"  {'events':<28}{summary['events']:10.0f}")
+    print(f"  {'event bytes':<28}{summary['event_bytes']:10,.0f}")
+    print(f"  {'state delta bytes':<28}{summary['state_delta_bytes']:10,.0f}")
+    print(f"  {'final state bytes':<28}{summary['state_bytes']:10,.0f}")
+    print(
+        f"  {'artifacts':<28}{summary['artifacts']:10.0f} "
+        f"({summary['artifact_bytes']:,.0f} bytes)"
+    )
+    print(
+        f"  {'cassette matches':<28}exact {cassette_stats.get('exact', 0)}, "
+        f"approximate {cassette_stats.get('approximate', 0)}, "
+        f"missed {cassette_stats.get('missed', 0)}"
+    )
+
+
+async def record(args: argparse.Namespace, client: httpx.AsyncClient, url: str) -> int:
+    from app.batch_runner import BatchRow, create_batch_runner
+
+    row = BatchRow(0, args.location, args.business_type, prompt_style=args.prompt_style)
+    runner = create_batch_runner()
+    try:
+        run = await run_once(runner, row)
+    finally:
+        await runner.close()
+    if run["status"] != "complete":
+        print(f"Recorded run did not complete ({run['status']}): {run['error']}")
+        return 1
+    saved = (
+        await client.post(
+            f"{url}/cassette/save",
+            json={
+                "target_location": row.target_location,
+                "business_type": row.business_type,
+                "prompt_style": row.prompt_style,
+            },
+        )
+    ).json()
+    print(
+        f"Recorded {saved['entries']} interactions in {run['wall_seconds']:.0f}s "
+        f"to {args.cassette}"
+    )
+    return 0
+
+
+async def replay(args: argparse.Namespace, client: httpx.AsyncClient, url: str) -> int:
+    from app.batch_runner import BatchRow, create_batch_runner
+
+    # Read first: the baseline may be the file this run overwrites
+    baseline = (
+        json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        if args.baseline
+        else None
+    )
+    meta = (await client.get(f"{url}/cassette/stats")).json()["meta"]
+    row = BatchRow(
+        0,
+        meta["target_location"],
+        meta["business_type"],
+        prompt_style=meta.get("prompt_style", "retail"),
+    )
+    runner = create_batch_runner()
+    runs = []
+    try:
+        for index in range(args.warmup + args.runs):
+            run = await run_once(runner, row)
+            if run["status"] != "complete":
+                print(f"Run {index} did not complete ({run['status']}): {run['error']}")
+                return 1
+            if index >= args.warmup:
+                runs.append(run)
+    finally:
+        await runner.close()
+
+    cassette_stats = (await client.get(f"{url}/cassette/stats")).json()
+    summary = summarize(runs)
+    print_summary(summary, len(runs), cassette_stats)
+
+    output = Path(args.output)
+    output.write_text(
+        json.dumps(
+            {
+                "cassette": str(args.cassette),
+                "meta": meta,
+                "latency_scale": args.latency_scale,
+                "cassette_stats": {
+                    key: cassette_stats.get(key, 0)
+                    for key in ("exact", "approximate", "missed")
+                },
+                "summary": summary,
+                "runs": runs,
+            },
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+    print(f"\nResults written to {output}")
+
+    status = 0
+    if args.strict and (cassette_stats.get("approximate") or cassette_stats.get("missed")):
+        print("Requests differed from the recording (--strict)")
+        status = 1
+    if baseline:
+        regressions = compare(summary, baseline["summary"], args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            status = 1
+    return status
+
+
+async def main(args: argparse.Namespace) -> int:
+    RESULTS_DIR.mkdir(exist_ok=True)
+    url = f"http://127.0.0.1:{args.port}"
+    argv = [
+        sys.executable,
+        str(CASSETTE_SERVER),
+        args.mode,
+        str(Path(args.cassette).resolve()),
+        "--port",
+        str(args.port),
+    ]
+    if args.mode == "record":
+        argv += ["--gemini-upstream", args.gemini_upstream]
+        argv += ["--maps-upstream", args.maps_upstream]
+    else:
+        argv += ["--latency-scale", str(args.latency_scale)]
+    server = start_process(argv, dict(os.environ), "cassette.log")
+    configure_environment(url, record=args.mode == "record")
+    try:
+        async with httpx.AsyncClient(timeout=60) as client:
+            await wait_until_up(client, f"{url}/cassette/stats", server, 60)
+            if args.mode == "record":
+                return await record(args, client, url)
+            return await replay(args, client, url)
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    modes = parser.add_subparsers(dest="mode", required=True)
+    record_parser = modes.add_parser("record", help="Record one real pipeline run")
+    record_parser.add_argument("cassette", help="Cassette file (.json or .json.gz)")
+    record_parser.add_argument("--location", default="Indiranagar, Bangalore")
+    record_parser.add_argument("--business-type", default="coffee shop")
+    record_parser.add_argument(
+        "--prompt-style", choices=["retail", "datacenter"], default="retail"
+    )
+    record_parser.add_argument("--gemini-upstream", default=GEMINI_UPSTREAM)
+    record_parser.add_argument("--maps-upstream", default=MAPS_UPSTREAM)
+    replay_parser = modes.add_parser("replay", help="Benchmark replays of a cassette")
+    replay_parser.add_argument("cassette", help="Cassette file (.json or .json.gz)")
+    replay_parser.add_argument("--runs", type=int, default=5, help="Measured runs")
+    replay_parser.add_argument(
+        "--warmup", type=int, default=1, help="Unmeasured runs before them"
+    )
+    replay_parser.add_argument(
+        "--latency-scale",
+        type=float,
+        default=0.0,
+        help="Recorded latency multiplier (0 = none, 1 = as recorded)",
+    )
+    replay_parser.add_argument(
+        "--output", default=str(RESULTS_DIR / "replay_benchmark.json")
+    )
+    replay_parser.add_argument(
+        "--baseline", help="Earlier results file to compare the medians with"
+    )
+    replay_parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed relative increase over the baseline",
+    )
+    replay_parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="Fail if any request had no exact match in the cassette",
+    )
+    for sub in (record_parser, replay_parser):
+        sub.add_argument("--port", type=int, default=8783)
+    sys.exit(asyncio.run(main(parser.parse_args())))
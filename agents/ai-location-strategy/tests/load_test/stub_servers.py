@@ -0,0 +1,481 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Local stand-ins for the Gemini API and Maps Places Text Search.
+
+Both servers answer with synthetic but well-formed responses after a
+configurable latency and fail a configurable share of requests, so the full
+pipeline can run under load without quota or cost:
+
+- Gemini (POST /v1beta/models/{model}:generateContent and
+  :streamGenerateContent?alt=sse): calls every declared function once, in
+  order (transfer_to_agent last, to the agent named in the system
+  instruction), then answers with text. Structured-output requests get JSON
+  built from the response schema; image requests get a noisy PNG.
+- Places (GET /maps/api/place/textsearch/json): a page of geolocated
+  results around a center derived from the query, so native gap scoring
+  and the map run on real coordinates.
+
+GET /stats on either server returns request and error counts.
+
+Usage (load_test.py starts it itself):
+    python tests/load_test/stub_servers.py --gemini-port 8781 --places-port 8782
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import struct
+import zlib
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+ERROR_STATUS = {429: "RESOURCE_EXHAUSTED", 500: "INTERNAL", 503: "UNAVAILABLE"}
+PLACE_TYPES = ["cafe", "restaurant", "gym", "bakery", "store", "food"]
+
+
+@dataclass
+class StubProfile:
+    """Latency and error profile of a stand-in server.
+
+    Attributes:
+        latency: Median response time in seconds.
+        jitter: Sigma of the log-normal spread around the median (0 = fixed).
+        error_rate: Share of requests answered with error_status.
+        error_status: HTTP status of injected errors (429, 500 or 503).
+        model_latency: Median latency by model-name substring, checked in
+            order before `latency` (Gemini only).
+    """
+
+    latency: float = 0.5
+    jitter: float = 0.3
+    error_rate: float = 0.0
+    error_status: int = 503
+    model_latency: list[tuple[str, float]] = field(default_factory=list)
+
+    def delay(self, model: str = "") -> float:
+        median = next(
+            (seconds for key, seconds in self.model_latency if key in model),
+            self.latency,
+        )
+        if self.jitter <= 0:
+            return median
+        return median * random.lognormvariate(0, self.jitter)
+
+    def fails(self) -> bool:
+        return random.random() < self.error_rate
+
+
+def _png(size: int) -> bytes:
+    """An RGB PNG of random noise, about as large as a generated image."""
+    raw = b"".join(b"\x00" + os.urandom(size * 3) for _ in range(size))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    header = struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(raw, 1))
+        + chunk(b"IEND", b"")
+    )
+
+
+def _seed(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:8]
+
+
+def example_value(schema: dict, defs: dict, name: str = "value", seed: str = "") -> Any:
+    """A value matching a Gemini (OpenAPI subset) or JSON schema."""
+    ref = schema.get("$ref") or schema.get("ref")
+    if ref:
+        return example_value(defs.get(ref.rsplit("/", 1)[-1], {}), defs, name, seed)
+    for key in ("anyOf", "any_of", "oneOf"):
+        options = [
+            s for s in schema.get(key, []) if str(s.get("type", "")).upper() != "NULL"
+        ]
+        if options:
+            return example_value(options[0], defs, name, seed)
+    if schema.get("enum"):
+        return schema["enum"][0]
+
+    kind = schema.get("type", "STRING")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k.upper() != "NULL"), "NULL")
+    kind = kind.upper()
+    if kind == "OBJECT":
+        return {
+            key: example_value(value, defs, key, seed)
+            for key, value in schema.get("properties", {}).items()
+        }
+    if kind == "ARRAY":
+        count = max(int(schema.get("minItems", schema.get("min_items", 0))), 2)
+        if "maxItems" in schema:
+            count = min(count, int(schema["maxItems"]))
+        return [
+            example_value(schema.get("items", {}), defs, name, seed)
+            for _ in range(count)
+        ]
+    if kind in ("INTEGER", "NUMBER"):
+        value = 72 if kind == "INTEGER" else 4.2
+        if "maximum" in schema:
+            value = min(value, schema["maximum"])
+        if "minimum" in schema:
+            value = max(value, schema["minimum"])
+        return int(value) if kind == "INTEGER" else float(value)
+    if kind == "BOOLEAN":
+        return True
+    if kind == "NULL":
+        return None
+    return f"{name.replace('_', ' ')} {seed}".strip()
+
+
+def _field(data: dict, name: str, default: Any = None) -> Any:
+    """A request field by camelCase name; some SDK fields arrive snake_case."""
+    if name in data:
+        return data[name]
+    return data.get(re.sub(r"([A-Z])", r"_\1", name).lower(), default)
+
+
+def _text_of(content: dict | None) -> str:
+    parts = (content or {}).get("parts", [])
+    return "\n".join(part.get("text", "") for part in parts if "text" in part)
+
+
+def _next_function_call(body: dict, seed: str) -> dict | None:
+    """The next declared function not yet called since the last user text."""
+    declarations = [
+        declaration
+        for tool in body.get("tools", [])
+        for declaration in _field(tool, "functionDeclarations", [])
+    ]
+    if not declarations:
+        return None
+
+    called: set[str] = set()
+    for content in reversed(body.get("contents", [])):
+        parts = content.get("parts", [])
+        if content.get("role") == "user" and any("text" in part for part in parts):
+            break
+        calls = (_field(part, "functionCall") for part in parts)
+        called.update(call["name"] for call in calls if call)
+
+    # Transfers hand the turn to another agent, so they come last
+    declarations.sort(key=lambda d: d["name"] == "transfer_to_agent")
+    for declaration in declarations:
+        name = declaration["name"]
+        if name in called:
+            continue
+        if name == "transfer_to_agent":
+            instruction = _text_of(_field(body, "systemInstruction"))
+            match = re.search(r"Agent name: (\S+)", instruction)
+            if not match:
+                continue
+            return {"name": name, "args": {"agent_name": match.group(1)}}
+        schema = _field(declaration, "parameters") or _field(
+            declaration, "parametersJsonSchema", {}
+        )
+        args = (
+            example_value(schema, schema.get("$defs", {}), seed=seed) if schema else {}
+        )
+        return {"name": name, "args": args or {}}
+    return None
+
+
+def _text_response(body: dict, seed: str, words: int) -> str:
+    prompt = (
+        _text_of(_field(body, "systemInstruction"))
+        + " "
+        + json.dumps(body.get("contents", []))
+    ).lower()
+    paragraph = " ".join(f"finding-{seed}-{i}" for i in range(words))
+    if "html" in prompt:
+        slides = "".join(
+            f"<section><h2>Slide {i}</h2><p>{paragraph}</p></section>"
+            for i in range(1, 8)
+        )
+        head = f"<head><title>Report {seed}</title></head>"
+        return f"<!DOCTYPE html><html>{head}<body>{slides}</body></html>"
+    return f"## Analysis {seed}\n\n{paragraph}"
+
+
+def create_gemini_app(
+    profile: StubProfile, image_size: int, text_words: int
+) -> FastAPI:
+    """Gemini API stand-in (AI Studio REST surface)."""
+    app = FastAPI(title="Gemini stand-in")
+    stats: Counter = Counter()
+    image = base64.b64encode(_png(image_size)).decode("ascii")
+
+    def parts_for(body: dict) -> list[dict]:
+        user_text = next(
+            (_text_of(c) for c in body.get("contents", []) if _text_of(c)), ""
+        )
+        seed = _seed(user_text)
+        config = _field(body, "generationConfig", {})
+        modalities = _field(config, "responseModalities", [])
+        if "IMAGE" in [modality.upper() for modality in modalities]:
+            return [
+                {"text": f"Infographic {seed}"},
+                {"inlineData": {"mimeType": "image/png", "data": image}},
+            ]
+        call = _next_function_call(body, seed)
+        if call is not None:
+            return [{"functionCall": call}]
+        schema = _field(config, "responseJsonSchema") or _field(
+            config, "responseSchema"
+        )
+        if schema:
+            defs = schema.get("$defs") or schema.get("defs") or {}
+            return [{"text": json.dumps(example_value(schema, defs, seed=seed))}]
+        return [{"text": _text_response(body, seed, text_words)}]
+
+    def response(model: str, parts: list[dict], prompt_chars: int) -> dict:
+        output_chars = sum(len(p.get("text", "")) for p in parts)
+        return {
+            "candidates": [
+                {
+                    "content": {"role": "model", "parts": parts},
+                    "finishReason": "STOP",
+                    "index": 0,
+                }
+            ],
+            "usageMetadata": {
+                "promptTokenCount": prompt_chars // 4,
+                "candidatesTokenCount": output_chars // 4,
+                "totalTokenCount": (prompt_chars + output_chars) // 4,
+            },
+            "modelVersion": model,
+        }
+
+    def error(status: int) -> JSONResponse:
+        return JSONResponse(
+            {
+                "error": {
+                    "code": status,
+                    "message": "Injected by the load-test stand-in",
+                    "status": ERROR_STATUS.get(status, "UNKNOWN"),
+                }
+            },
+            status_code=status,
+        )
+
+    @app.get("/stats")
+    async def get_stats() -> dict:
+        return dict(stats)
+
+    @app.post("/{version}/models/{model_action}")
+    async def generate(version: str, model_action: str, request: Request):
+        model, _, action = model_action.partition(":")
+        raw = await request.body()
+        body = json.loads(raw)
+        stats[f"requests:{model}"] += 1
+        delay = profile.delay(model)
+        if profile.fails():
+            stats[f"errors:{model}"] += 1
+            await asyncio.sleep(delay / 4)
+            return error(profile.error_status)
+        parts = parts_for(body)
+
+        if action != "streamGenerateContent":
+            await asyncio.sleep(delay)
+            return response(model, parts, len(raw))
+
+        async def stream():
+            # Text streams in a few chunks; calls, JSON and images in one
+            text = parts[0].get("text", "") if len(parts) == 1 else ""
+            if text and not text.startswith(("{", "[")):
+                size = math.ceil(len(text) / 4)
+                chunks = [
+                    [{"text": text[i : i + size]}] for i in range(0, len(text), size)
+                ]
+            else:
+                chunks = [parts]
+            for chunk in chunks:
+                await asyncio.sleep(delay / len(chunks))
+                yield f"data: {json.dumps(response(model, chunk, len(raw)))}\r\n\r\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    return app
+
+
+def create_places_app(profile: StubProfile, results: int, pages: int) -> FastAPI:
+    """Maps Places Text Search stand-in."""
+    app = FastAPI(title="Places stand-in")
+    stats: Counter = Counter()
+
+    def page(query: str, page_number: int) -> dict:
+        rng = random.Random(f"{query}:{page_number}")
+        center = random.Random(query)
+        lat, lng = center.uniform(-40, 50), center.uniform(-120, 140)
+        places = [
+            {
+                "name": f"Competitor {page_number}-{i} ({_seed(query)})",
+                "formatted_address": f"{i} Load Test Road",
+                "geometry": {
+                    "location": {
+                        "lat": lat + rng.gauss(0, 0.02),
+                        "lng": lng + rng.gauss(0, 0.02),
+                    }
+                },
+                "rating": round(rng.uniform(3.0, 5.0), 1),
+                "user_ratings_total": rng.randint(5, 2000),
+                "price_level": rng.randint(1, 4),
+                "types": rng.sample(PLACE_TYPES, 2),
+                "business_status": "OPERATIONAL",
+                "place_id": f"stub-{_seed(query)}-{page_number}-{i}",
+            }
+            for i in range(results)
+        ]
+        result = {"status": "OK", "results": places, "html_attributions": []}
+        if page_number + 1 < pages:
+            result["next_page_token"] = base64.urlsafe_b64encode(
+                json.dumps([query, page_number + 1]).encode("utf-8")
+            ).decode("ascii")
+        return result
+
+    @app.get("/stats")
+    async def get_stats() -> dict:
+        return dict(stats)
+
+    @app.get("/maps/api/place/textsearch/json")
+    async def text_search(query: str = "", pagetoken: str = ""):
+        stats["requests"] += 1
+        await asyncio.sleep(profile.delay())
+        if profile.fails():
+            stats["errors"] += 1
+            return JSONResponse(
+                {"status": "UNKNOWN_ERROR"}, status_code=profile.error_status
+            )
+        if pagetoken:
+            query, page_number = json.loads(base64.urlsafe_b64decode(pagetoken))
+            return page(query, page_number)
+        return page(query, 0)
+
+    return app
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    """Latency/error options, shared with load_test.py."""
+    group = parser.add_argument_group("stand-in servers")
+    group.add_argument(
+        "--latency", type=float, default=0.5, help="median Gemini latency (s)"
+    )
+    group.add_argument(
+        "--model-latency",
+        action="append",
+        default=[],
+        metavar="SUBSTRING=SECONDS",
+        help="median latency for models whose name contains SUBSTRING "
+        "(repeatable; default image=3 pro=2)",
+    )
+    group.add_argument("--jitter", type=float, default=0.3, help="log-normal sigma")
+    group.add_argument(
+        "--error-rate", type=float, default=0.0, help="share of failed Gemini calls"
+    )
+    group.add_argument(
+        "--error-status", type=int, default=503, choices=sorted(ERROR_STATUS)
+    )
+    group.add_argument(
+        "--places-latency", type=float, default=0.2, help="median Places latency (s)"
+    )
+    group.add_argument("--places-error-rate", type=float, default=0.0)
+    group.add_argument(
+        "--places-results", type=int, default=20, help="results per page"
+    )
+    group.add_argument(
+        "--places-pages", type=int, default=1, help="pages per query (1-3)"
+    )
+    group.add_argument(
+        "--image-size", type=int, default=1024, help="infographic edge (px)"
+    )
+    group.add_argument(
+        "--text-words", type=int, default=400, help="words per text answer"
+    )
+
+
+def profile_arguments(args: argparse.Namespace) -> list[str]:
+    """The command-line form of the options of add_profile_arguments()."""
+    argv = []
+    for name in (
+        "latency",
+        "jitter",
+        "error_rate",
+        "error_status",
+        "places_latency",
+        "places_error_rate",
+        "places_results",
+        "places_pages",
+        "image_size",
+        "text_words",
+    ):
+        argv += [f"--{name.replace('_', '-')}", str(getattr(args, name))]
+    for item in args.model_latency:
+        argv += ["--model-latency", item]
+    return argv
+
+
+async def serve(args: argparse.Namespace) -> None:
+    model_latency = [
+        (key, float(seconds))
+        for key, _, seconds in (item.partition("=") for item in args.model_latency)
+    ] or [("image", 3.0), ("pro", 2.0)]
+    gemini = create_gemini_app(
+        StubProfile(
+            args.latency, args.jitter, args.error_rate, args.error_status, model_latency
+        ),
+        args.image_size,
+        args.text_words,
+    )
+    places = create_places_app(
+        StubProfile(
+            args.places_latency, args.jitter, args.places_error_rate, args.error_status
+        ),
+        args.places_results,
+        args.places_pages,
+    )
+    servers = [
+        uvicorn.Server(
+            uvicorn.Config(app, host=args.host, port=port, log_level="warning")
+        )
+        for app, port in ((gemini, args.gemini_port), (places, args.places_port))
+    ]
+    await asyncio.gather(*(server.serve() for server in servers))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--gemini-port", type=int, default=8781)
+    parser.add_argument("--places-port", type=int, default=8782)
+    add_profile_arguments(parser)
+    asyncio.run(serve(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Unit tests for backend user identity (app/frontend/backend/auth.py)."""
+
+import pytest
+from fastapi import HTTPException, Response
+from starlette.requests import Request
+
+from app.config import SESSION_COOKIE
+from app.frontend.backend import auth
+
+PROXY_HEADER = "X-Goog-Authenticated-User-Email"
+
+
+def _request(headers: dict[str, str] | None = None) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "scheme": "http",
+            "method": "POST",
+            "path": "/auth/session",
+            "headers": [
+                (k.lower().encode(), v.encode()) for k, v in (headers or {}).items()
+            ],
+        }
+    )
+
+
+def _issued_cookie(response: Response) -> str:
+    header = response.headers["set-cookie"]
+    assert header.startswith(f"{SESSION_COOKIE}=")
+    return header.split(";", 1)[0].split("=", 1)[1]
+
+
+def test_cookie_mode_issues_and_accepts_a_signed_cookie(monkeypatch) -> None:
+    """Without a proxy header, new clients get a cookie identifying them."""
+    monkeypatch.setattr(auth, "AUTH_HEADER", "")
+    response = Response()
+    user_id = auth.start_session(_request(), response)
+    cookie = _issued_cookie(response)
+
+    returning = _request({"Cookie": f"{SESSION_COOKIE}={cookie}"})
+    assert auth.authenticated_user(returning) == user_id
+    assert auth.start_session(returning, Response()) == user_id
+
+
+def test_cookie_mode_rejects_forged_cookies(monkeypatch) -> None:
+    """A cookie not signed by the backend carries no identity."""
+    monkeypatch.setattr(auth, "AUTH_HEADER", "")
+    forged = _request({"Cookie": f"{SESSION_COOKIE}=user-admin.0000"})
+    with pytest.raises(HTTPException) as error:
+        auth.authenticated_user(forged)
+    assert error.value.status_code == 401
+
+
+def test_header_mode_uses_the_proxy_header(monkeypatch) -> None:
+    """Behind a proxy the header is the user and no cookie is issued."""
+    monkeypatch.setattr(auth, "AUTH_HEADER", PROXY_HEADER)
+    response = Response()
+    request = _request({PROXY_HEADER: "ana@example.com"})
+    assert auth.start_session(request, response) == "ana@example.com"
+    assert "set-cookie" not in response.headers
+
+
+def test_header_mode_refuses_requests_without_the_header(monkeypatch) -> None:
+    """Requests that bypassed the proxy get 401, even with a valid cookie."""
+    monkeypatch.setattr(auth, "AUTH_HEADER", "")
+    cookie_response = Response()
+    auth.start_session(_request(), cookie_response)
+    cookie = _issued_cookie(cookie_response)
+
+    monkeypatch.setattr(auth, "AUTH_HEADER", PROXY_HEADER)
+    for request in (_request(), _request({"Cookie": f"{SESSION_COOKIE}={cookie}"})):
+        response = Response()
+        with pytest.raises(HTTPException) as error:
+            auth.start_session(request, response)
+        assert error.value.status_code == 401
+        assert "set-cookie" not in response.headers
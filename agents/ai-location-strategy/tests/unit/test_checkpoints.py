@@ -0,0 +1,143 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Unit tests for stage checkpoints (app/callbacks/checkpoint_callbacks.py)."""
+
+import asyncio
+import hashlib
+from types import SimpleNamespace
+
+from google.adk.agents import LlmAgent
+from google.genai import types
+
+from app.callbacks.checkpoint_callbacks import add_checkpointing
+from app.pipeline_scheduler import PipelineStage
+from app.tools.persistent_cache import PersistentCache
+
+MAP_HTML = b"<html>map</html>"
+
+
+class FakeContext:
+    """Callback context with an in-memory state and per-session artifacts."""
+
+    def __init__(self, session_id: str, state: dict) -> None:
+        self.state = state
+        self.artifacts: dict[str, list[types.Part]] = {}
+        self._invocation_context = SimpleNamespace(
+            user_id="user-1", session=SimpleNamespace(id=session_id)
+        )
+
+    async def save_artifact(self, filename: str, artifact: types.Part) -> int:
+        versions = self.artifacts.setdefault(filename, [])
+        versions.append(artifact)
+        return len(versions) - 1
+
+    async def load_artifact(
+        self, filename: str, version: int | None = None
+    ) -> types.Part | None:
+        versions = self.artifacts.get(filename, [])
+        return versions[version] if version is not None else versions[-1]
+
+
+def _stage(tmp_path) -> PipelineStage:
+    stage = PipelineStage(
+        LlmAgent(
+            name="MapAgent",
+            model="gemini-test",
+            instruction="Map {target_location}",
+            output_key="map_summary",
+        ),
+        name="map",
+        reads=["target_location"],
+        writes=["map_summary", "map_artifact"],
+    )
+    add_checkpointing(stage, PersistentCache(tmp_path / "cache.sqlite3"))
+    return stage
+
+
+def _run_stage(stage: PipelineStage, context: FakeContext) -> None:
+    """Produce the stage outputs the way the agent's tools would."""
+    version = asyncio.run(
+        context.save_artifact(
+            "map.html", types.Part.from_bytes(data=MAP_HTML, mime_type="text/html")
+        )
+    )
+    context.state["map_summary"] = "Mapped 12 competitors"
+    context.state["map_artifact"] = {
+        "artifact_name": "map.html",
+        "version": version,
+        "sha256": hashlib.sha256(MAP_HTML).hexdigest(),
+        "mime_type": "text/html",
+        "session_id": context._invocation_context.session.id,
+        "user_id": "user-1",
+    }
+    asyncio.run(stage.agent.after_agent_callback[-1](context))
+
+
+def test_miss_runs_the_stage_and_clears_stale_outputs(tmp_path) -> None:
+    """Without a checkpoint the agent runs and old outputs are dropped."""
+    stage = _stage(tmp_path)
+    context = FakeContext(
+        "session-1", {"target_location": "Austin, TX", "map_summary": "stale"}
+    )
+
+    assert asyncio.run(stage.agent.before_agent_callback[0](context)) is None
+    assert context.state["map_summary"] is None
+    assert context.state["stage_checkpoints"]["map"]["restored"] is False
+
+
+def test_hit_restores_outputs_and_skips_the_stage(tmp_path) -> None:
+    """A rerun with the same inputs gets the outputs without running the agent."""
+    stage = _stage(tmp_path)
+    first = FakeContext("session-1", {"target_location": "Austin, TX"})
+    asyncio.run(stage.agent.before_agent_callback[0](first))
+    _run_stage(stage, first)
+
+    second = FakeContext("session-2", {"target_location": "Austin, TX"})
+    content = asyncio.run(stage.agent.before_agent_callback[0](second))
+
+    assert content.parts[0].text == "Mapped 12 competitors"
+    assert second.state["map_summary"] == "Mapped 12 competitors"
+    assert second.state["stages_completed"] == ["map"]
+    assert second.state["stage_checkpoints"]["map"]["restored"] is True
+
+
+def test_restore_saves_artifacts_into_the_new_session(tmp_path) -> None:
+    """Restored artifact refs point at copies saved in the current session."""
+    stage = _stage(tmp_path)
+    first = FakeContext("session-1", {"target_location": "Austin, TX"})
+    asyncio.run(stage.agent.before_agent_callback[0](first))
+    _run_stage(stage, first)
+
+    second = FakeContext("session-2", {"target_location": "Austin, TX"})
+    second.artifacts["map.html"] = [types.Part(text="older map")]
+    asyncio.run(stage.agent.before_agent_callback[0](second))
+
+    ref = second.state["map_artifact"]
+    assert ref["session_id"] == "session-2"
+    assert ref["version"] == 1
+    assert second.artifacts["map.html"][1].inline_data.data == MAP_HTML
+
+
+def test_changed_inputs_miss_the_checkpoint(tmp_path) -> None:
+    """A different target location reruns the stage."""
+    stage = _stage(tmp_path)
+    first = FakeContext("session-1", {"target_location": "Austin, TX"})
+    asyncio.run(stage.agent.before_agent_callback[0](first))
+    _run_stage(stage, first)
+
+    second = FakeContext("session-2", {"target_location": "Dallas, TX"})
+    assert asyncio.run(stage.agent.before_agent_callback[0](second)) is None
+    assert "map_artifact" not in second.state
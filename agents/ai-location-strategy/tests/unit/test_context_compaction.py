@@ -0,0 +1,57 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Unit tests for budgeted digests (app/tools/context_compaction.py)."""
+
+from app.tools.context_compaction import compact_text, estimate_tokens
+
+FINDINGS = "\n".join(
+    [
+        "## Market Overview",
+        "The neighbourhood has changed a great deal over the last decade. " * 8,
+        "- Median household income: $84,000 (up 12% since 2019)",
+        "- Population: 48,200 within 2 km",
+        "## Competitors",
+        "| Name | Rating | Reviews |",
+        "|---|---|---|",
+        "| Cafe One | 4.6 | 1,204 |",
+        "| Bean Co | 4.1 | 310 |",
+        "Foot traffic is steady throughout the week, say local owners. " * 8,
+    ]
+)
+
+
+def test_text_within_budget_is_unchanged() -> None:
+    """Short outputs are passed whole."""
+    assert compact_text(FINDINGS, estimate_tokens(FINDINGS)) == FINDINGS
+
+
+def test_digest_keeps_outline_and_figures() -> None:
+    """Headings and data lines survive; narrative is dropped first."""
+    digest = compact_text(FINDINGS, 120, "context_findings.md")
+
+    assert estimate_tokens(digest) <= 120
+    assert "## Market Overview" in digest
+    assert "- Median household income: $84,000 (up 12% since 2019)" in digest
+    assert "great deal" not in digest
+    assert digest.endswith("(full text: artifact context_findings.md)]")
+
+
+def test_digest_keeps_table_separator_with_its_header() -> None:
+    """Kept table rows still form a markdown table."""
+    digest = compact_text(FINDINGS, 120)
+    table = "| Name | Rating | Reviews |\n|---|---|---|\n| Cafe One | 4.6 | 1,204 |"
+
+    assert table in digest
@@ -0,0 +1,121 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Unit tests for the native gap-analysis scoring engine (app/tools/gap_scoring.py)."""
+
+import pandas as pd
+
+from app.tools.gap_scoring import places_frame, render_gap_analysis, score_zones
+
+
+def _place(place_id: str, name: str, lat: float, lng: float, **fields) -> dict:
+    return {
+        "place_id": place_id,
+        "name": name,
+        "address": fields.pop("address", "1 Main St, Downtown, Austin, TX 78701, USA"),
+        "rating": fields.pop("rating", 4.0),
+        "user_ratings_total": fields.pop("reviews", 100),
+        "price_level": fields.pop("price_level", 2),
+        "business_status": fields.pop("business_status", "OPERATIONAL"),
+        "lat": lat,
+        "lng": lng,
+    }
+
+
+def _competitors() -> pd.DataFrame:
+    """A crowded, well-rated downtown cluster and a sparse, busy suburb."""
+    downtown = [
+        _place(f"d{i}", f"Cafe {i}", 30.2672 + 0.0002 * i, -97.7431, rating=4.7, reviews=50)
+        for i in range(8)
+    ]
+    suburb = [
+        _place(
+            f"s{i}",
+            f"Bakery {i}",
+            30.4000 + 0.0002 * i,
+            -97.7000,
+            rating=3.8,
+            reviews=2000,
+            address="9 Oak Ave, Northwood, Austin, TX 78758, USA",
+        )
+        for i in range(2)
+    ]
+    return pd.DataFrame(downtown + suburb)
+
+
+def test_places_frame_cleans_the_dataset() -> None:
+    """Ungeolocated, duplicate and closed places are dropped; chains flagged."""
+    raw = pd.DataFrame([
+        _place("a", "Blue Bottle", 30.1, -97.1, rating=0),
+        _place("a", "Blue Bottle", 30.1, -97.1),
+        _place("b", "Blue Bottle!", 30.2, -97.2),
+        _place("c", "Corner Cafe", None, None),
+        _place("d", "Old Cafe", 30.3, -97.3, business_status="CLOSED_PERMANENTLY"),
+        _place("", "No ID Cafe", 30.4, -97.4),
+        _place("", "No ID Cafe Two", 30.5, -97.5),
+    ])
+    df = places_frame(raw)
+
+    assert sorted(df["name"]) == ["Blue Bottle", "Blue Bottle!", "No ID Cafe", "No ID Cafe Two"]
+    # A rating of 0 means "not rated yet"
+    assert df.loc[df["place_id"] == "a", "rating"].isna().all()
+    assert df.set_index("name")["is_chain"].to_dict() == {
+        "Blue Bottle": True,
+        "Blue Bottle!": True,
+        "No ID Cafe": False,
+        "No ID Cafe Two": False,
+    }
+
+
+def test_score_zones_ranks_the_less_saturated_zone_first() -> None:
+    """Few competitors with heavy review volume beat a crowded, strong cluster."""
+    zones = score_zones(places_frame(_competitors()), cell_km=1.0)
+
+    assert list(zones["rank"]) == [1, 2]
+    assert list(zones["zone"]) == ["Northwood", "Downtown"]
+    assert list(zones["competitor_count"]) == [2, 8]
+    assert list(zones["category"]) == ["OPPORTUNITY", "SATURATED"]
+    assert zones["viability_score"].between(0, 100).all()
+    assert zones["viability_score"].is_monotonic_decreasing
+    # Demand is relative to the busiest zone
+    assert zones["demand_signal"].max() == 100
+
+
+def test_score_zones_weights_high_performers() -> None:
+    """Competitors rated at or above the threshold count 1.5x in quality."""
+    df = places_frame(pd.DataFrame([
+        _place("a", "Top", 30.0, -97.0, rating=5.0),
+        _place("b", "Mid", 30.0, -97.0005, rating=4.0),
+    ]))
+    zones = score_zones(df, cell_km=1.0, high_rating=4.5)
+
+    assert zones.loc[0, "high_performers"] == 1
+    assert zones.loc[0, "quality_score"] == (1.5 * 5.0 / 5 + 4.0 / 5) / 2
+
+
+def test_render_gap_analysis_lists_every_zone() -> None:
+    """The markdown report has the metric tables and the top zones."""
+    zones = score_zones(places_frame(_competitors()), cell_km=1.0)
+    text = render_gap_analysis(zones, 10, "Austin, TX", "coffee shop")
+
+    assert text.startswith("## Quantitative Gap Analysis: coffee shop in Austin, TX")
+    for heading in (
+        "### Zone Metrics",
+        "### Top 3 Recommended Zones",
+        "### Risk Assessment Matrix",
+    ):
+        assert heading in text
+    assert "1. **Northwood**" in text
+    assert "2. **Downtown**" in text
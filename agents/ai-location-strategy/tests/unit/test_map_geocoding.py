@@ -0,0 +1,85 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Unit tests for geocoding map locations (app/tools/map_generator.py)."""
+
+import asyncio
+import sqlite3
+from pathlib import Path
+
+from app.tools.map_generator import _geocode_locations
+from app.tools.persistent_cache import PersistentCache
+
+
+class FakeMaps:
+    """A googlemaps.Client stand-in answering Text Search from a dict."""
+
+    def __init__(self, places: dict[str, tuple[float, float]]) -> None:
+        self.places_by_query = places
+        self.queries: list[str] = []
+
+    def places(self, query: str) -> dict:
+        self.queries.append(query)
+        if query not in self.places_by_query:
+            return {"results": []}
+        lat, lng = self.places_by_query[query]
+        return {
+            "results": [
+                {"geometry": {"location": {"lat": lat, "lng": lng}},
+                 "formatted_address": query}
+            ]
+        }
+
+
+class BrokenCache:
+    """A cache whose database fails on every write."""
+
+    def get(self, namespace: str, key: str) -> tuple[bool, object]:
+        return False, None
+
+    def set(self, namespace: str, key: str, value: object, ttl_seconds: float) -> None:
+        raise sqlite3.OperationalError("database is locked")
+
+
+def _locations() -> list[dict]:
+    return [
+        {"location_name": "Mueller (Zone A)", "area": "Austin"},
+        {"location_name": "Nowhere", "area": "Austin"},
+    ]
+
+
+def test_geocodes_and_caches_results(tmp_path: Path) -> None:
+    """Hits and negative results are cached; a second run calls no API."""
+    maps = FakeMaps({"Mueller, Austin": (30.3, -97.7)})
+    cache = PersistentCache(tmp_path / "cache.sqlite3")
+
+    geocoded, skipped, hits = asyncio.run(_geocode_locations(_locations(), maps, cache))
+    assert [loc["lat"] for loc in geocoded] == [30.3]
+    assert (skipped, hits) == (["Nowhere"], 0)
+
+    geocoded, skipped, hits = asyncio.run(_geocode_locations(_locations(), maps, cache))
+    assert [loc["lat"] for loc in geocoded] == [30.3]
+    assert (skipped, hits) == (["Nowhere"], 2)
+    assert len(maps.queries) == 2
+
+
+def test_cache_errors_do_not_drop_locations() -> None:
+    """A failing cache write only loses the caching, not the marker."""
+    maps = FakeMaps({"Mueller, Austin": (30.3, -97.7)})
+    geocoded, skipped, hits = asyncio.run(
+        _geocode_locations(_locations(), maps, BrokenCache())
+    )
+    assert [loc["location_name"] for loc in geocoded] == ["Mueller (Zone A)"]
+    assert skipped == ["Nowhere"]
@@ -0,0 +1,150 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Unit tests for model-call memo keys (app/callbacks/memoization_callbacks.py)."""
+
+import asyncio
+from types import SimpleNamespace
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from app.callbacks.memoization_callbacks import add_memoization, memo_key
+from app.pipeline_scheduler import PipelineStage
+from app.schemas.report_schema import LocationIntelligenceReport
+from app.tools.persistent_cache import PersistentCache
+
+STAGE = PipelineStage(
+    BaseAgent(name="GapAnalysisAgent"),
+    name="gap_analysis",
+    reads=["target_location", "competitor_dataset"],
+    writes=["gap_analysis"],
+)
+
+
+def _state(session: str, user: str, version: int, date: str) -> dict:
+    return {
+        "target_location": "Austin, TX",
+        "current_date": date,
+        "competitor_dataset": {
+            "artifact_name": "competitor_places.parquet",
+            "version": version,
+            "size": 5750,
+            "sha256": "a1ce2a8d",
+            "mime_type": "application/vnd.apache.parquet",
+            "rows": 60,
+            "session_id": session,
+            "user_id": user,
+        },
+    }
+
+
+def _request(
+    call_id: str, cache_hit: bool, date: str, query: str = "bakery near Austin"
+) -> LlmRequest:
+    places = [{"place_id": "p1", "name": "Cafe", "rating": 4.5}]
+    return LlmRequest(
+        model="gemini-test",
+        config=types.GenerateContentConfig(
+            system_instruction=f"Map competitors. CURRENT DATE: {date}"
+        ),
+        contents=[
+            types.Content(role="user", parts=[types.Part(text="Analyze Austin")]),
+            types.Content(role="model", parts=[
+                types.Part(
+                    function_call=types.FunctionCall(
+                        id=call_id, name="search_places", args={"query": query}
+                    ),
+                    thought_signature=call_id.encode(),
+                ),
+            ]),
+            types.Content(role="user", parts=[
+                types.Part(
+                    function_response=types.FunctionResponse(
+                        id=call_id,
+                        name="search_places",
+                        response={
+                            "status": "success",
+                            "results": places,
+                            "count": 1,
+                            "cache_hit": cache_hit,
+                        },
+                    )
+                ),
+            ]),
+        ],
+    )
+
+
+def test_sessions_with_identical_inputs_share_a_key() -> None:
+    """Session, user, artifact version, call IDs, cache hits and date don't matter."""
+    first = memo_key(
+        STAGE,
+        _state("session-1", "user-1", 0, "2025-01-01"),
+        _request("adk-1", False, "2025-01-01"),
+    )
+    second = memo_key(
+        STAGE,
+        _state("session-2", "user-2", 3, "2025-01-02"),
+        _request("adk-2", True, "2025-01-02"),
+    )
+    assert first == second
+
+
+def test_output_schema_class_is_hashed_by_its_json_schema() -> None:
+    """Stages with an output_schema pass the model class as response_schema."""
+    request = _request("adk-1", False, "2025-01-01")
+    request.config.response_schema = LocationIntelligenceReport
+    key = memo_key(STAGE, _state("session-1", "user-1", 0, "2025-01-01"), request)
+    assert key == memo_key(STAGE, _state("session-2", "user-2", 1, "2025-01-01"), request)
+
+
+def test_different_inputs_get_different_keys() -> None:
+    """Changed tool arguments or artifact content change the key."""
+    state = _state("session-1", "user-1", 0, "2025-01-01")
+    key = memo_key(STAGE, state, _request("adk-1", False, "2025-01-01"))
+
+    other_query = _request("adk-1", False, "2025-01-01", query="gym near Austin")
+    assert memo_key(STAGE, state, other_query) != key
+
+    other_dataset = _state("session-1", "user-1", 0, "2025-01-01")
+    other_dataset["competitor_dataset"]["sha256"] = "ffffffff"
+    assert memo_key(STAGE, other_dataset, _request("adk-1", False, "2025-01-01")) != key
+
+
+def test_stored_response_is_served_to_the_next_session(tmp_path) -> None:
+    """A response stored by one session is returned before another's model call."""
+    stage = PipelineStage(
+        LlmAgent(name="GapAnalysisAgent", model="gemini-test"),
+        name="gap_analysis",
+        reads=STAGE.reads,
+        writes=STAGE.writes,
+    )
+    add_memoization(stage, PersistentCache(tmp_path / "cache.sqlite3"), 60)
+    lookup = stage.agent.before_model_callback[0]
+    store = stage.agent.after_model_callback[-1]
+    response = LlmResponse(
+        content=types.Content(role="model", parts=[types.Part(text="Gaps")])
+    )
+
+    first = SimpleNamespace(state=_state("session-1", "user-1", 0, "2025-01-01"))
+    request = _request("adk-1", False, "2025-01-01")
+    assert asyncio.run(lookup(first, request)) is None
+    asyncio.run(store(first, response))
+
+    second = SimpleNamespace(state=_state("session-2", "user-2", 1, "2025-01-01"))
+    cached = asyncio.run(lookup(second, _request("adk-2", True, "2025-01-01")))
+    assert cached.content.parts[0].text == "Gaps"
@@ -0,0 +1,141 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Unit tests for circuit breakers and fallback (app/model_router.py)."""
+
+import asyncio
+
+import pytest
+from google.genai.errors import ClientError, ServerError
+
+from app import model_router
+from app.model_router import ModelRouter, is_overload_error, retry_attempts
+
+FALLBACKS = {"pro": ["pro-2", "flash"], "flash": []}
+
+
+@pytest.mark.parametrize(
+    ("error", "overload"),
+    [
+        (ServerError(503, {}), True),
+        (ClientError(429, {}), True),
+        (TimeoutError(), True),
+        (asyncio.TimeoutError(), True),
+        (ClientError(400, {}), False),
+        (ValueError("bad request"), False),
+    ],
+)
+def test_is_overload_error(error: BaseException, overload: bool) -> None:
+    """Only overload errors make the router try another model."""
+    assert is_overload_error(error) is overload
+
+
+def test_chain_starts_with_the_model() -> None:
+    """The chain is the model and its fallbacks, without duplicates."""
+    router = ModelRouter({"pro": ["flash", "pro", "flash"]})
+    assert router.chain("pro") == ["pro", "flash"]
+    assert router.chain("unknown") == ["unknown"]
+
+
+def test_circuit_opens_after_consecutive_failures() -> None:
+    """An open circuit is skipped until open_seconds have passed."""
+    router = ModelRouter(FALLBACKS, failure_threshold=2, open_seconds=60)
+    router.record_failure("pro")
+    assert router.candidates("pro") == ["pro", "pro-2", "flash"]
+    router.record_failure("pro")
+    assert router.candidates("pro") == ["pro-2", "flash"]
+    assert router.snapshot()["pro"]["state"] == "open"
+
+
+def test_success_resets_the_failure_count() -> None:
+    """Failures only open the circuit when they are consecutive."""
+    router = ModelRouter(FALLBACKS, failure_threshold=2, open_seconds=60)
+    router.record_failure("pro")
+    router.record_success("pro", 1.0)
+    router.record_failure("pro")
+    assert router.candidates("pro")[0] == "pro"
+
+
+def test_half_open_circuit_allows_one_trial() -> None:
+    """After open_seconds one caller gets a trial; its result decides."""
+    router = ModelRouter(FALLBACKS, failure_threshold=1, open_seconds=0)
+    router.record_failure("pro")
+    assert router.candidates("pro") == ["pro", "pro-2", "flash"]
+    # The trial is in flight, so the next caller skips the model
+    assert router.candidates("pro") == ["pro-2", "flash"]
+    router.record_success("pro", 0.5)
+    assert router.snapshot()["pro"]["state"] == "closed"
+    assert router.candidates("pro") == ["pro", "pro-2", "flash"]
+
+
+def test_all_circuits_open_still_returns_a_model() -> None:
+    """Callers never get an empty chain."""
+    router = ModelRouter(FALLBACKS, failure_threshold=1, open_seconds=60)
+    for model in ("pro", "pro-2", "flash"):
+        router.record_failure(model)
+    assert router.candidates("pro") == ["pro"]
+
+
+def test_call_falls_back_on_overload() -> None:
+    """An overloaded model is skipped and the next one serves the call."""
+    router = ModelRouter(FALLBACKS, failure_threshold=1, open_seconds=60)
+    tried = []
+
+    async def request(model: str) -> str:
+        tried.append(model)
+        if model == "pro":
+            raise ServerError(503, {})
+        return f"answer from {model}"
+
+    result, served = asyncio.run(router.call("pro", request))
+
+    assert (result, served) == ("answer from pro-2", "pro-2")
+    assert tried == ["pro", "pro-2"]
+    assert router.snapshot()["pro"]["state"] == "open"
+
+
+def test_call_raises_other_errors_without_fallback() -> None:
+    """A bad request fails fast instead of trying every model."""
+    router = ModelRouter(FALLBACKS)
+    tried = []
+
+    async def request(model: str) -> str:
+        tried.append(model)
+        raise ClientError(400, {})
+
+    with pytest.raises(ClientError):
+        asyncio.run(router.call("pro", request))
+    assert tried == ["pro"]
+    assert router.snapshot()["pro"]["failures"] == 0
+
+
+def test_call_raises_the_last_error_when_all_are_overloaded() -> None:
+    """With every model overloaded the caller sees the last error."""
+    router = ModelRouter(FALLBACKS)
+
+    async def request(model: str) -> str:
+        raise TimeoutError(model)
+
+    with pytest.raises(TimeoutError, match="flash"):
+        asyncio.run(router.call("pro", request))
+
+
+@pytest.mark.parametrize(("model", "attempts"), [("pro", 2), ("flash", 3), ("solo", 5)])
+def test_retry_attempts_cover_the_chain(monkeypatch, model: str, attempts: int) -> None:
+    """Agents retry each model less, but the chain as a whole at least 5 times."""
+    monkeypatch.setattr(
+        model_router, "model_router", ModelRouter({"pro": ["pro-2", "flash"], "flash": ["flash-2"]})
+    )
+    assert retry_attempts(model) == attempts
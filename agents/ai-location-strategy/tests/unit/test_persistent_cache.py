@@ -0,0 +1,118 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Unit tests for the SQLite and tiered caches (app/tools/persistent_cache.py)."""
+
+from pathlib import Path
+
+import pytest
+
+from app.tools import persistent_cache
+from app.tools.persistent_cache import PersistentCache, TieredCache, get_cache
+
+
+class FakeClock:
+    """Stands in for time.time() in the cache module."""
+
+    def __init__(self, now: float = 1_000_000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    fake = FakeClock()
+    monkeypatch.setattr(persistent_cache.time, "time", fake)
+    return fake
+
+
+def test_round_trip_by_namespace(tmp_path: Path) -> None:
+    """Values are stored as JSON and keys are scoped to their namespace."""
+    cache = PersistentCache(tmp_path / "cache.sqlite3")
+    cache.set("geocode", "austin", {"lat": 30.27, "lng": -97.74}, 60)
+
+    assert cache.get("geocode", "austin") == (True, {"lat": 30.27, "lng": -97.74})
+    assert cache.get("places", "austin") == (False, None)
+
+
+def test_negative_results_are_hits(tmp_path: Path) -> None:
+    """A cached None is distinguishable from a miss."""
+    cache = PersistentCache(tmp_path / "cache.sqlite3")
+    cache.set("geocode", "nowhere", None, 60)
+    assert cache.get("geocode", "nowhere") == (True, None)
+
+
+def test_entries_expire(tmp_path: Path, clock: FakeClock) -> None:
+    """Expired entries miss and are removed by purge_expired."""
+    cache = PersistentCache(tmp_path / "cache.sqlite3")
+    cache.set("geocode", "short", 1, 10)
+    cache.set("geocode", "long", 2, 100)
+    cache.set("geocode", "disabled", 3, 0)
+
+    clock.now += 50
+    assert cache.get("geocode", "short") == (False, None)
+    assert cache.get("geocode", "long") == (True, 2)
+    assert cache.get("geocode", "disabled") == (False, None)
+    assert cache.purge_expired() == 1
+
+
+def test_entries_survive_reopening(tmp_path: Path) -> None:
+    """Another PersistentCache on the same file (e.g. a process) sees them."""
+    PersistentCache(tmp_path / "cache.sqlite3").set("places", "key", [1, 2], 60)
+    assert PersistentCache(tmp_path / "cache.sqlite3").get("places", "key") == (
+        True,
+        [1, 2],
+    )
+
+
+def test_tiered_cache_evicts_least_recently_used() -> None:
+    """The in-memory tier is bounded by max_entries."""
+    cache = TieredCache("places", ttl_seconds=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == (True, 1)
+    cache.set("c", 3)
+
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    assert cache.get("c") == (True, 3)
+    assert cache.stats() == {"hits": 3, "misses": 1, "size": 2}
+
+
+def test_tiered_cache_reads_through_to_disk(tmp_path: Path) -> None:
+    """A fresh process promotes disk hits into memory."""
+    store = PersistentCache(tmp_path / "cache.sqlite3")
+    TieredCache("places", 60, 10, store).set("query", {"results": []})
+
+    cache = TieredCache("places", 60, 10, store)
+    assert cache.get("query") == (True, {"results": []})
+    assert cache.stats()["size"] == 1
+
+
+def test_tiered_cache_expires_memory_entries(clock: FakeClock) -> None:
+    """Memory entries honor the TTL too."""
+    cache = TieredCache("places", ttl_seconds=10, max_entries=10)
+    cache.set("query", 1)
+    clock.now += 11
+    assert cache.get("query") == (False, None)
+
+
+def test_get_cache_disabled_when_the_database_cannot_open(tmp_path: Path) -> None:
+    """An unusable cache path disables caching instead of failing."""
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    assert get_cache(str(blocker / "cache.sqlite3")) is None
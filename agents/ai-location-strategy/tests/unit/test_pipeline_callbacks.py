@@ -0,0 +1,54 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Unit tests for pipeline tracking callbacks (app/callbacks/pipeline_callbacks.py)."""
+
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+from app.callbacks.pipeline_callbacks import PIPELINE_STAGES, after_pipeline
+
+
+def test_after_pipeline_reports_missing_stages(caplog: pytest.LogCaptureFixture) -> None:
+    """A run with failed stages is logged as incomplete, naming them."""
+    context = SimpleNamespace(state={
+        "stages_completed": ["intake", "market_research", "competitor_mapping"],
+        "stage_timings": {},
+    })
+    with caplog.at_level(logging.INFO, logger="LocationStrategyPipeline"):
+        after_pipeline(context)
+
+    warnings = [r.getMessage() for r in caplog.records if r.levelno == logging.WARNING]
+    assert len(warnings) == 1
+    assert warnings[0].startswith("PIPELINE INCOMPLETE")
+    assert "'gap_analysis'" in warnings[0] and "'map_generation'" in warnings[0]
+    assert "PIPELINE COMPLETE" not in caplog.text
+    assert "Total stages: 3/8" in caplog.text
+
+
+def test_after_pipeline_reports_complete_runs(caplog: pytest.LogCaptureFixture) -> None:
+    """A run with every stage is logged as complete."""
+    context = SimpleNamespace(state={
+        "stages_completed": list(PIPELINE_STAGES),
+        "stage_timings": {},
+    })
+    with caplog.at_level(logging.INFO, logger="LocationStrategyPipeline"):
+        after_pipeline(context)
+
+    assert "PIPELINE COMPLETE" in caplog.text
+    assert "INCOMPLETE" not in caplog.text
+    assert "Total stages: 8/8" in caplog.text
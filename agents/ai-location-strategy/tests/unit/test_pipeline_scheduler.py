@@ -0,0 +1,89 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Unit tests for dependency-aware stage scheduling (app/pipeline_scheduler.py)."""
+
+from google.adk.agents import BaseAgent
+
+from app.pipeline_scheduler import PipelineStage, schedule_levels
+
+
+def _stage(name: str, reads=(), writes=(), optional_writes=()) -> PipelineStage:
+    return PipelineStage(
+        BaseAgent(name=name),
+        name=name,
+        reads=reads,
+        writes=writes,
+        optional_writes=optional_writes,
+    )
+
+
+def _names(levels: list[list[PipelineStage]]) -> list[list[str]]:
+    return [[stage.name for stage in level] for level in levels]
+
+
+def test_independent_stages_share_a_level() -> None:
+    """Stages that only read the request inputs run concurrently."""
+    stages = [
+        _stage("research", reads=["target"], writes=["findings"]),
+        _stage("competitors", reads=["target"], writes=["competitors"]),
+    ]
+    assert _names(schedule_levels(stages)) == [["research", "competitors"]]
+
+
+def test_reader_runs_after_writer() -> None:
+    """Read-after-write puts the reader one level past the writer."""
+    stages = [
+        _stage("research", reads=["target"], writes=["findings"]),
+        _stage("competitors", reads=["target"], writes=["competitors"]),
+        _stage("gaps", reads=["findings", "competitors"], writes=["gaps"]),
+        _stage("strategy", reads=["gaps"], writes=["report"]),
+        _stage("html", reads=["report"], writes=["html"]),
+        _stage("map", reads=["report"], writes=["map"]),
+    ]
+    assert _names(schedule_levels(stages)) == [
+        ["research", "competitors"],
+        ["gaps"],
+        ["strategy"],
+        ["html", "map"],
+    ]
+
+
+def test_optional_writes_are_dependencies() -> None:
+    """A key a stage may write orders its readers like a required one."""
+    stages = [
+        _stage("competitors", writes=["analysis"], optional_writes=["dataset"]),
+        _stage("map", reads=["dataset"], writes=["map"]),
+    ]
+    assert _names(schedule_levels(stages)) == [["competitors"], ["map"]]
+
+
+def test_conflicting_writers_keep_declaration_order() -> None:
+    """Write-after-write and write-after-read conflicts are serialized."""
+    stages = [
+        _stage("first", writes=["shared"]),
+        _stage("second", writes=["shared"]),
+        _stage("reader", reads=["input"], writes=["a"]),
+        _stage("overwriter", writes=["input"]),
+    ]
+    assert _names(schedule_levels(stages)) == [
+        ["first", "reader"],
+        ["second", "overwriter"],
+    ]
+
+
+def test_empty_pipeline_has_no_levels() -> None:
+    """No stages schedule to no levels."""
+    assert schedule_levels([]) == []
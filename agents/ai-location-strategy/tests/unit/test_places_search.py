@@ -0,0 +1,97 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Unit tests for the paginated, cached Places search tool (app/tools/places_search.py)."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.tools import places_search
+from app.tools.persistent_cache import TieredCache
+
+
+class FakeMaps:
+    """A googlemaps.Client stand-in serving `pages` pages of 20 places."""
+
+    def __init__(self, pages: int) -> None:
+        self.pages = pages
+        self.requests = 0
+
+    def places(self, query: str | None = None, page_token: str | None = None) -> dict:
+        self.requests += 1
+        page = int(page_token) if page_token else 0
+        result = {
+            "results": [
+                {"place_id": f"p{page}-{i}", "name": f"Cafe {page}-{i}"}
+                for i in range(20)
+            ]
+        }
+        if page + 1 < self.pages:
+            result["next_page_token"] = str(page + 1)
+        return result
+
+
+@pytest.fixture
+def maps(monkeypatch: pytest.MonkeyPatch) -> FakeMaps:
+    fake = FakeMaps(pages=3)
+    cache = TieredCache("places", ttl_seconds=60, max_entries=10)
+    monkeypatch.setattr(places_search, "get_maps_client", lambda key: fake)
+    monkeypatch.setattr(places_search, "get_places_cache", lambda: cache)
+    monkeypatch.setattr(places_search, "PLACES_PAGE_TOKEN_DELAY", 0)
+    return fake
+
+
+def _search(query: str, **kwargs) -> dict:
+    context = SimpleNamespace(state={"maps_api_key": "test-key"})
+    return asyncio.run(places_search.search_places(query, context, **kwargs))
+
+
+def test_fetches_one_page_by_default(maps: FakeMaps) -> None:
+    """One Text Search request, with more_results telling the agent more exist."""
+    result = _search("cafe near Austin")
+    assert (result["count"], result["pages_fetched"], maps.requests) == (20, 1, 1)
+    assert result["more_results"] is True
+    # The agent can't continue from a page token, so none is returned
+    assert "next_page_token" not in result
+
+
+def test_more_pages_return_a_superset(maps: FakeMaps) -> None:
+    """Repeating a query with a larger max_pages includes the first page."""
+    first = _search("cafe near Austin")
+    more = _search("cafe near Austin", max_pages=3)
+
+    first_ids = {place["place_id"] for place in first["results"]}
+    more_ids = [place["place_id"] for place in more["results"]]
+    assert first_ids < set(more_ids)
+    assert len(more_ids) == len(set(more_ids)) == 60
+    assert more["more_results"] is False
+
+
+def test_repeated_queries_are_cached(maps: FakeMaps) -> None:
+    """Equivalent queries with the same page limit reuse the cached response."""
+    _search("cafe near Austin")
+    result = _search("  Cafe near   austin ")
+    assert maps.requests == 1
+    assert result["cache_hit"] is True
+    assert result["more_results"] is True
+
+
+def test_results_are_identical_across_cache_hits(maps: FakeMaps) -> None:
+    """No per-process counters in the result, so a hit equals the miss."""
+    miss = _search("cafe near Austin")
+    hit = _search("cafe near Austin")
+    assert {**miss, "cache_hit": True} == hit
@@ -0,0 +1,100 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the rule-based request parser (app/tools/request_parser.py)."""
+
+import pytest
+
+from app.tools.request_parser import ParsedRequest, parse_request
+
+
+@pytest.mark.parametrize(
+    ("text", "style", "expected"),
+    [
+        (
+            "I want to open a coffee shop in Indiranagar, Bangalore",
+            "retail",
+            ParsedRequest("Indiranagar, Bangalore", "coffee shop"),
+        ),
+        (
+            "Where should I open my restaurant in San Francisco's Mission District?",
+            "retail",
+            ParsedRequest("Mission District, San Francisco", "restaurant"),
+        ),
+        (
+            "open a gym in downtown austin",
+            "retail",
+            ParsedRequest("Downtown Austin", "gym"),
+        ),
+        (
+            "I want to open a coffee shop in Seattle targeting remote workers",
+            "retail",
+            ParsedRequest("Seattle", "coffee shop", "targeting remote workers"),
+        ),
+        (
+            "I need a 50MW hyperscale data center in Northern Virginia",
+            "datacenter",
+            ParsedRequest(
+                "Northern Virginia",
+                "hyperscale data center",
+                "50MW capacity requirement",
+            ),
+        ),
+        (
+            "Target location: Northern Virginia. Business type: hyperscale data center",
+            "datacenter",
+            ParsedRequest("Northern Virginia", "hyperscale data center"),
+        ),
+    ],
+)
+def test_parses_unambiguous_requests(
+    text: str, style: str, expected: ParsedRequest
+) -> None:
+    """Requests with one business type and one place are parsed without the model."""
+    assert parse_request(text, style) == expected
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        # Negation: the target is Austin, the last place phrase is Dallas
+        "open a bakery in Austin, not in Dallas",
+        "I don't want a cafe in Austin",
+        "Location: Austin, not Dallas. Business type: bakery",
+        # More than one place
+        "We run a salon in Chicago and want to expand to Denver",
+        "open a cafe in Austin or Dallas",
+        "open a cafe in Austin and Dallas",
+        # Trailing clause after the place
+        "I live in Boston and want to open a bakery",
+        "open a bakery in Austin near the university",
+        # No place, or no (or more than one) business type
+        "I want to open a bakery",
+        "Help me find a location in Austin",
+        "open a bakery and a cafe in Austin",
+        "",
+    ],
+)
+def test_defers_ambiguous_requests_to_the_model(text: str) -> None:
+    """Anything the rules can't parse with certainty returns None."""
+    assert parse_request(text, "retail") is None
+
+
+def test_other_style_business_type_is_not_parsed() -> None:
+    """A data center request under the retail prompt style goes to the model."""
+    assert parse_request("a colocation data center in Dallas", "retail") is None
+    assert (
+        parse_request("Location: Dallas. Business type: colocation data center", "retail")
+        is None
+    )
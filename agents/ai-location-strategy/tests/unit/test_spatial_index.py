@@ -0,0 +1,112 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Unit tests for the grid spatial index (app/tools/spatial_index.py)."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.tools.spatial_index import GridIndex, area_label, assign_zones
+
+
+def _brute_force(index: GridIndex) -> np.ndarray:
+    dist = np.hypot(
+        index.x[:, None] - index.x[None, :], index.y[:, None] - index.y[None, :]
+    )
+    np.fill_diagonal(dist, np.inf)
+    return dist
+
+
+def _points(seed: int, n: int) -> tuple[np.ndarray, np.ndarray]:
+    """A dense cluster, a sparse spread and a few far outliers around Austin."""
+    rng = np.random.default_rng(seed)
+    lat = np.concatenate([
+        30.27 + rng.normal(0, 0.005, n),
+        30.27 + rng.uniform(-0.2, 0.2, n // 2),
+        [30.9, 29.6],
+    ])
+    lng = np.concatenate([
+        -97.74 + rng.normal(0, 0.005, n),
+        -97.74 + rng.uniform(-0.2, 0.2, n // 2),
+        [-97.1, -98.5],
+    ])
+    return lat, lng
+
+
+@pytest.mark.parametrize("cell_km", [0.25, 1.5, 10.0])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_nearest_neighbor_matches_brute_force(seed: int, cell_km: float) -> None:
+    """The ring search is exact, including for isolated outliers."""
+    index = GridIndex(*_points(seed, 80), cell_km=cell_km)
+    expected = _brute_force(index).min(axis=1)
+    np.testing.assert_allclose(index.nearest_neighbor_km(), expected)
+
+
+@pytest.mark.parametrize("radius_km", [0.3, 1.0, 5.0])
+def test_count_within_matches_brute_force(radius_km: float) -> None:
+    """Radius counts exclude the point itself."""
+    index = GridIndex(*_points(3, 60), cell_km=1.5)
+    expected = (_brute_force(index) <= radius_km).sum(axis=1)
+    np.testing.assert_array_equal(index.count_within(radius_km), expected)
+
+
+def test_single_point_has_no_neighbor() -> None:
+    """A lone competitor is infinitely far from any other."""
+    index = GridIndex([30.27], [-97.74])
+    assert index.nearest_neighbor_km().tolist() == [np.inf]
+    assert index.count_within(1.0).tolist() == [0]
+
+
+def test_duplicate_points_are_zero_apart() -> None:
+    """Two places at the same coordinates are each other's neighbor."""
+    index = GridIndex([30.27, 30.27], [-97.74, -97.74])
+    assert index.nearest_neighbor_km().tolist() == [0.0, 0.0]
+
+
+@pytest.mark.parametrize(
+    ("address", "label"),
+    [
+        ("12 Main Rd, Indiranagar, Bengaluru, Karnataka 560038, India", "Indiranagar"),
+        ("500 Congress Ave, Austin, TX 78701, USA", "Austin"),
+        ("Austin", "Austin"),
+        ("", ""),
+        (None, ""),
+    ],
+)
+def test_area_label(address: str | None, label: str) -> None:
+    """The neighborhood (or city) component of a formatted address."""
+    assert area_label(address) == label
+
+
+def test_assign_zones_names_cells_uniquely() -> None:
+    """Cells are named after their most common area; repeats get a suffix."""
+    df = pd.DataFrame({
+        "lat": [30.2672, 30.2673, 30.2674, 30.4000],
+        "lng": [-97.7431, -97.7431, -97.7431, -97.7000],
+        "address": [
+            "1 A St, Downtown, Austin, TX 78701, USA",
+            "2 B St, Downtown, Austin, TX 78701, USA",
+            "3 C St, Rainey, Austin, TX 78701, USA",
+            "4 D St, Downtown, Austin, TX 78758, USA",
+        ],
+    })
+    zones = assign_zones(df, cell_km=1.0, radius_km=1.0)
+
+    assert list(zones["zone"]) == ["Downtown", "Downtown", "Downtown", "Downtown (2)"]
+    assert zones["zone_id"].nunique() == 2
+    assert zones["nearest_km"].iloc[3] > 10
+    # Each competitor counts itself in its local density
+    assert zones["local_density_per_km2"].iloc[3] == pytest.approx(1 / np.pi)
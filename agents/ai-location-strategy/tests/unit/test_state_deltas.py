@@ -0,0 +1,269 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Unit tests for JSON Patch state streaming (app/frontend/backend/state_deltas.py)."""
+
+import copy
+import random
+from typing import Any
+
+import pytest
+from ag_ui.core import (
+    EventType,
+    StateDeltaEvent,
+    StateSnapshotEvent,
+    TextMessageContentEvent,
+)
+
+from app.frontend.backend.state_deltas import (
+    StateDeltaEncoder,
+    apply_patch,
+    json_patch,
+)
+
+
+def _snapshot(state: dict) -> StateSnapshotEvent:
+    return StateSnapshotEvent(type=EventType.STATE_SNAPSHOT, snapshot=state)
+
+
+def _delta(operations: list[dict]) -> StateDeltaEvent:
+    return StateDeltaEvent(type=EventType.STATE_DELTA, delta=operations)
+
+
+def _operations(event: StateDeltaEvent) -> list[dict]:
+    return [op.model_dump(by_alias=True) for op in event.delta]
+
+
+def test_json_patch_of_nested_change() -> None:
+    """Only the changed leaf is sent, not the whole top-level key."""
+    old = {"stage_timings": {"market_research": {"duration_seconds": 12.5}}}
+    new = {
+        "stage_timings": {
+            "market_research": {"duration_seconds": 12.5},
+            "competitor_mapping": {"duration_seconds": 8.0},
+        }
+    }
+    assert json_patch(old, new) == [
+        {
+            "op": "add",
+            "path": "/stage_timings/competitor_mapping",
+            "value": {"duration_seconds": 8.0},
+        }
+    ]
+
+
+def test_json_patch_appends_to_lists() -> None:
+    """Growing a list sends only the new items."""
+    old = {"stages_completed": ["intake"]}
+    new = {"stages_completed": ["intake", "market_research"]}
+    assert json_patch(old, new) == [
+        {"op": "add", "path": "/stages_completed/-", "value": "market_research"}
+    ]
+
+
+def test_json_patch_replaces_changed_types() -> None:
+    """A value that changes type is replaced whole."""
+    assert json_patch({"a": 1}, {"a": "1"}) == [
+        {"op": "replace", "path": "/a", "value": "1"}
+    ]
+    assert json_patch({"a": 1}, {"a": 1}) == []
+
+
+def test_encoder_sends_snapshots_as_deltas() -> None:
+    """A snapshot becomes the diff from what the client already holds."""
+    encoder = StateDeltaEncoder({"target_location": "Austin", "pipeline_stage": "intake"})
+    event = encoder.encode(
+        _snapshot({"target_location": "Austin", "pipeline_stage": "market_research"})
+    )
+
+    assert isinstance(event, StateDeltaEvent)
+    assert _operations(event) == [
+        {"op": "replace", "path": "/pipeline_stage", "value": "market_research"}
+    ]
+
+
+def test_encoder_rewrites_whole_key_deltas() -> None:
+    """A STATE_DELTA re-sending a whole key is narrowed to what changed."""
+    encoder = StateDeltaEncoder({"stages_completed": ["intake"]})
+    event = encoder.encode(_delta([
+        {"op": "replace", "path": "/stages_completed", "value": ["intake", "market_research"]}
+    ]))
+
+    assert _operations(event) == [
+        {"op": "add", "path": "/stages_completed/-", "value": "market_research"}
+    ]
+    assert encoder.client_state == {"stages_completed": ["intake", "market_research"]}
+
+
+def test_encoder_drops_updates_that_change_nothing() -> None:
+    """Re-sending the state the client holds sends nothing."""
+    encoder = StateDeltaEncoder({"pipeline_stage": "intake"})
+    assert encoder.encode(_snapshot({"pipeline_stage": "intake"})) is None
+
+
+def test_encoder_passes_other_events_through() -> None:
+    """Only state events are re-encoded."""
+    event = TextMessageContentEvent(
+        type=EventType.TEXT_MESSAGE_CONTENT, message_id="m1", delta="Hello"
+    )
+    assert StateDeltaEncoder({}).encode(event) is event
+
+
+def test_encoder_passes_on_inapplicable_deltas() -> None:
+    """A delta that doesn't apply to the tracked state is sent as-is."""
+    encoder = StateDeltaEncoder({})
+    event = _delta([{"op": "replace", "path": "/missing/key", "value": 1}])
+    assert encoder.encode(event) is event
+
+
+def _round_trip(old: dict, new: dict) -> dict:
+    state = copy.deepcopy(old)
+    apply_patch(state, copy.deepcopy(json_patch(old, new)))
+    return state
+
+
+@pytest.mark.parametrize(
+    ("old", "new"),
+    [
+        # Nested dicts: add, replace and remove at several depths
+        (
+            {"report": {"zones": {"a": {"score": 1}}, "meta": {"v": 1}}},
+            {"report": {"zones": {"a": {"score": 2}, "b": {"score": 3}}}},
+        ),
+        # List growth, as appends and as a changed prefix
+        ({"stages": ["intake"]}, {"stages": ["intake", "research", "mapping"]}),
+        ({"stages": ["intake", "research"]}, {"stages": ["intake", "mapping", "x"]}),
+        ({"stages": []}, {"stages": [{"name": "intake"}]}),
+        # List shrink, to a prefix and to something else
+        ({"stages": ["intake", "research", "mapping"]}, {"stages": ["intake"]}),
+        ({"stages": ["intake", "research"]}, {"stages": ["mapping"]}),
+        ({"stages": ["intake"]}, {"stages": []}),
+        # Same-length lists patched element-wise, including nested values
+        (
+            {"zones": [{"score": 1, "tags": ["a"]}, {"score": 2}]},
+            {"zones": [{"score": 1, "tags": ["a", "b"]}, {"score": 5, "new": None}]},
+        ),
+        # Keys that need JSON Pointer escaping
+        ({"a/b": 1, "c~d": {"~1": 2}}, {"a/b": 2, "c~d": {"~1": 3, "/": 4}}),
+        ({"~0/~1": [1]}, {"~0/~1": [1, 2], "~": {"/~": "x"}}),
+        # Type changes and removals at the top level
+        ({"a": 1, "b": [1], "c": {"d": 1}}, {"a": "1", "b": {"0": 1}, "c": [1]}),
+        ({"a": 1, "b": 2}, {}),
+        ({}, {"a": {"b": {"c": [1, {"d": 2}]}}}),
+    ],
+)
+def test_apply_patch_round_trip(old: dict, new: dict) -> None:
+    """Applying the patch from old to new yields new."""
+    assert _round_trip(old, new) == new
+
+
+def _random_value(rng: random.Random, depth: int) -> Any:
+    kind = rng.choice(["scalar", "scalar", "list", "dict"] if depth else ["scalar"])
+    if kind == "list":
+        return [_random_value(rng, depth - 1) for _ in range(rng.randint(0, 4))]
+    if kind == "dict":
+        keys = ["a", "b", "a/b", "c~d", "~1", "/", "0"]
+        return {
+            rng.choice(keys): _random_value(rng, depth - 1)
+            for _ in range(rng.randint(0, 4))
+        }
+    return rng.choice([None, True, 0, 1, 2.5, "x", "y", ""])
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_apply_patch_round_trip_random(seed: int) -> None:
+    """Round trip between random nested documents."""
+    rng = random.Random(seed)
+    old = {str(i): _random_value(rng, 3) for i in range(rng.randint(0, 4))}
+    new = {str(i): _random_value(rng, 3) for i in range(rng.randint(0, 4))}
+    assert _round_trip(old, new) == new
+
+
+class FakeClock:
+    """A settable monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_encoder_resyncs_after_resync_events_deltas() -> None:
+    """Every resync_events-th update is a full snapshot."""
+    encoder = StateDeltaEncoder({}, resync_events=3, resync_seconds=3600)
+    kinds = [
+        type(encoder.encode(_snapshot({"count": count}))).__name__
+        for count in range(1, 9)
+    ]
+    assert kinds == [
+        "StateDeltaEvent",
+        "StateDeltaEvent",
+        "StateDeltaEvent",
+        "StateSnapshotEvent",
+        "StateDeltaEvent",
+        "StateDeltaEvent",
+        "StateDeltaEvent",
+        "StateSnapshotEvent",
+    ]
+
+
+def test_encoder_resyncs_after_resync_seconds() -> None:
+    """A snapshot is due once resync_seconds have passed since the last one."""
+    clock = FakeClock()
+    encoder = StateDeltaEncoder(
+        {}, resync_events=100, resync_seconds=10, clock=clock
+    )
+    assert isinstance(encoder.encode(_snapshot({"count": 1})), StateDeltaEvent)
+    clock.now = 10
+    event = encoder.encode(_snapshot({"count": 2}))
+    assert isinstance(event, StateSnapshotEvent)
+    assert event.snapshot == {"count": 2}
+    clock.now = 15
+    assert isinstance(encoder.encode(_snapshot({"count": 3})), StateDeltaEvent)
+
+
+def test_encoder_resyncs_after_an_inapplicable_delta() -> None:
+    """After passing on a delta it couldn't apply, the next update resyncs."""
+    encoder = StateDeltaEncoder({}, resync_events=100, resync_seconds=3600)
+    encoder.encode(_delta([{"op": "replace", "path": "/missing/key", "value": 1}]))
+    assert isinstance(encoder.encode(_snapshot({"count": 1})), StateSnapshotEvent)
+
+
+def test_encoder_sends_a_snapshot_when_smaller_than_the_patch() -> None:
+    """A large patch that rewrites most of the state goes out as a snapshot."""
+    old = {"rows": list(range(500))}
+    encoder = StateDeltaEncoder(old, resync_events=100, resync_seconds=3600)
+    event = encoder.encode(_snapshot({"rows": list(range(1, 501))}))
+    assert isinstance(event, StateSnapshotEvent)
+
+
+def test_client_following_the_stream_matches_the_server() -> None:
+    """A client applying every event ends up with the server's state."""
+    rng = random.Random(7)
+    server: dict = {}
+    client: dict = {}
+    encoder = StateDeltaEncoder(client, resync_events=5, resync_seconds=3600)
+    for _ in range(50):
+        server = copy.deepcopy(server)
+        server[rng.choice(["a", "b/c", "d~e"])] = _random_value(rng, 3)
+        if rng.random() < 0.2 and server:
+            server.pop(rng.choice(list(server)))
+        event = encoder.encode(_snapshot(copy.deepcopy(server)))
+        if isinstance(event, StateSnapshotEvent):
+            client = copy.deepcopy(event.snapshot)
+        elif event is not None:
+            apply_patch(client, _operations(event))
+        assert client == server
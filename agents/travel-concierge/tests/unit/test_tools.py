@@ -16,6 +16,7 @@
 
 import os
 import unittest
+from unittest import mock
 
 import pytest
 from dotenv import load_dotenv
@@ -26,7 +27,7 @@ from google.adk.tools import ToolContext
 
 from travel_concierge.agent import root_agent
 from travel_concierge.tools.memory import memorize
-from travel_concierge.tools.places import map_tool
+from travel_concierge.tools.places import map_tool, places_service
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -87,3 +88,50 @@ class TestAgents(unittest.TestCase):
             self.tool_context.state["poi"]["places"][0]["place_id"],
             "ChIJVVVViV-abZERJxqgpA43EDo",
         )
+
+    def test_places_batched_lookup(self):
+        self.tool_context.state["poi"] = {
+            "places": [
+                {"place_name": f"Place {i}", "address": "Cusco, Peru"}
+                for i in range(12)
+            ]
+        }
+        queries = []
+
+        def fake_get(url, params, timeout):
+            query = params["input"]
+            queries.append(query)
+            response = mock.Mock(status_code=200)
+            # The first lookup of one POI fails with a transient error
+            if query == "Place 3, Cusco, Peru" and queries.count(query) == 1:
+                response.status_code = 503
+            response.json.return_value = {
+                "status": "OK",
+                "candidates": [
+                    {
+                        "place_id": "id-" + query.split(",")[0],
+                        "name": query.split(",")[0],
+                        "formatted_address": "Cusco, Peru",
+                        "geometry": {"location": {"lat": -13.5, "lng": -71.9}},
+                    }
+                ],
+            }
+            return response
+
+        session = mock.Mock()
+        session.get.side_effect = fake_get
+        with (
+            mock.patch.object(places_service, "_get_session", return_value=session),
+            mock.patch("travel_concierge.tools.places.time.sleep"),
+        ):
+            result = map_tool(key="poi", tool_context=self.tool_context)
+
+        self.assertEqual(
+            [poi["place_id"] for poi in result["places"]],
+            [f"id-Place {i}" for i in range(12)],
+        )
+        self.assertTrue(all(poi["map_url"] for poi in result["places"]))
+        self.assertTrue(all(poi["lat"] == "-13.5" for poi in result["places"]))
+        self.assertTrue(all(poi["long"] == "-71.9" for poi in result["places"]))
+        self.assertEqual(queries.count("Place 3, Cusco, Peru"), 2)
+        self.assertEqual(len(queries), 13)
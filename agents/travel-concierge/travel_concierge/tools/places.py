@@ -15,15 +15,33 @@
 """Wrapper to Google Maps Places API."""
 
 import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 import requests
 from google.adk.tools import ToolContext
+from requests.adapters import HTTPAdapter
+
+# Lookups of one map_tool call run in parallel over a pooled HTTP session.
+MAX_CONCURRENT_LOOKUPS = 8
+REQUEST_TIMEOUT = (3.05, 10)  # seconds: (connect, read)
+MAX_RETRIES = 3
+RETRY_BASE_DELAY = 0.5  # seconds, doubled per attempt, with full jitter
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# Places API statuses (HTTP 200) that are worth retrying
+RETRY_API_STATUSES = {"OVER_QUERY_LIMIT", "UNKNOWN_ERROR"}
 
 
 class PlacesService:
     """Wrapper to Placees API."""
 
+    def __init__(self):
+        self._session: requests.Session | None = None
+        self._session_lock = threading.Lock()
+
     def _check_key(self):
         if (
             not hasattr(self, "places_api_key") or not self.places_api_key
@@ -31,6 +49,46 @@ class PlacesService:
             # https://developers.google.com/maps/documentation/places/web-service/get-api-key
             self.places_api_key = os.getenv("GOOGLE_PLACES_API_KEY")
 
+    def _get_session(self) -> requests.Session:
+        """HTTP session whose connection pool is shared by all lookups."""
+        with self._session_lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1, pool_maxsize=MAX_CONCURRENT_LOOKUPS
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._session = session
+            return self._session
+
+    def _get_json(self, url: str, params: dict[str, Any]) -> dict[str, Any]:
+        """GET url with a timeout, retrying transient errors with jittered backoff."""
+        for attempt in range(MAX_RETRIES + 1):
+            retry = attempt < MAX_RETRIES
+            try:
+                response = self._get_session().get(
+                    url, params=params, timeout=REQUEST_TIMEOUT
+                )
+                if retry and response.status_code in RETRY_STATUS_CODES:
+                    raise requests.exceptions.RetryError(
+                        f"HTTP {response.status_code}"
+                    )
+                response.raise_for_status()
+                data = response.json()
+                if retry and data.get("status") in RETRY_API_STATUSES:
+                    raise requests.exceptions.RetryError(data["status"])
+                return data
+            except (
+                requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout,
+                requests.exceptions.RetryError,
+            ):
+                if not retry:
+                    raise
+            time.sleep(random.uniform(0, RETRY_BASE_DELAY * 2**attempt))
+        raise requests.exceptions.RetryError(f"Giving up after {MAX_RETRIES} retries")
+
     def find_place_from_text(self, query: str) -> dict[str, str]:
         """Fetches place details using a text query."""
         self._check_key()
@@ -45,9 +103,7 @@ class PlacesService:
         }
 
         try:
-            response = requests.get(places_url, params=params)
-            response.raise_for_status()
-            place_data = response.json()
+            place_data = self._get_json(places_url, params)
 
             if not place_data.get("candidates"):
                 return {"error": "No places found."}
@@ -78,6 +134,29 @@ class PlacesService:
         except requests.exceptions.RequestException as e:
             return {"error": f"Error fetching place data: {e}"}
 
+    def find_places_from_text(self, queries: list[str]) -> list[dict[str, str]]:
+        """Fetches place details for several text queries in parallel.
+
+        Identical queries are looked up once; at most MAX_CONCURRENT_LOOKUPS
+        requests are in flight.
+
+        Args:
+            queries: Text queries, e.g. "<place name>, <address>".
+
+        Returns:
+            The find_place_from_text() result of each query, in order.
+        """
+        unique = list(dict.fromkeys(queries))
+        if not unique:
+            return []
+        self._check_key()
+        workers = min(MAX_CONCURRENT_LOOKUPS, len(unique))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = dict(
+                zip(unique, executor.map(self.find_place_from_text, unique), strict=True)
+            )
+        return [results[query] for query in queries]
+
     def get_photo_urls(
         self, photos: list[dict[str, Any]], maxwidth: int = 400
     ) -> list[str]:
@@ -100,7 +179,8 @@ places_service = PlacesService()
 def map_tool(key: str, tool_context: ToolContext):
     """
     This is going to inspect the pois stored under the specified key in the state.
-    One by one it will retrieve the accurate Lat/Lon from the Map API, if the Map API is available for use.
+    It will retrieve the accurate Lat/Lon of all of them from the Map API in parallel,
+    if the Map API is available for use.
 
     Args:
         key: The key under which the POIs are stored.
@@ -117,9 +197,9 @@ def map_tool(key: str, tool_context: ToolContext):
         tool_context.state[key]["places"] = []
 
     pois = tool_context.state[key]["places"]
-    for poi in pois:  # The pydantic object types.POI
-        location = poi["place_name"] + ", " + poi["address"]
-        result = places_service.find_place_from_text(location)
+    locations = [poi["place_name"] + ", " + poi["address"] for poi in pois]
+    results = places_service.find_places_from_text(locations)
+    for poi, result in zip(pois, results, strict=True):  # The pydantic object types.POI
         # Fill the place holders with verified information.
         poi["place_id"] = result["place_id"] if "place_id" in result else None
         poi["map_url"] = result["map_url"] if "map_url" in result else None